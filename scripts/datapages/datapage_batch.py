@@ -0,0 +1,183 @@
+"""Apply a list of operations to all datapage JSONs in the datapages folder, in one pass.
+
+Operations are applied in the order they are given. Paths are dot-separated keys, with `[n]` for list items and `[*]` for all
+items of a list, e.g. `relatedData[*].type` or `descriptionFromSource.title`.
+
+    --delete PATH          Delete a property
+    --rename PATH NEW_KEY  Rename a property (keeping its position in the object)
+    --set PATH JSON_VALUE  Set a property to a JSON value, e.g. --set status '"draft"'
+    --reformat             Re-serialise files even if their contents didn't change
+
+This prints a diff of all changes, and by default it is a dry run. Use --apply to write the changes. Files are written
+atomically (to a temporary file which is then renamed), and only if their contents change.
+
+Usage:
+
+    python scripts/datapages/datapage_batch.py --delete anomaliesListText
+    python scripts/datapages/datapage_batch.py --delete anomaliesListText --apply
+
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DATAPAGES_DIR = Path(__file__).parent.parent.parent / "datapages"
+
+PATH_TOKEN_RE = re.compile(r"([^.\[\]]+)|\[(\d+|\*)\]")
+
+
+def parse_path(path):
+    # "relatedData[*].type" -> ["relatedData", "*", "type"], with list indices as ints
+    tokens = []
+    for match in PATH_TOKEN_RE.finditer(path):
+        key, index = match.groups()
+        if key is not None:
+            tokens.append(key)
+        else:
+            tokens.append(index if index == "*" else int(index))
+    assert tokens, f"Invalid path: {path!r}"
+    return tokens
+
+
+def resolve_parents(data, tokens):
+    # Yields all (parent, key) pairs that a path refers to, skipping parts of the path that don't exist.
+    if len(tokens) == 1:
+        yield data, tokens[0]
+        return
+    token, rest = tokens[0], tokens[1:]
+    if token == "*":
+        children = data if isinstance(data, list) else []
+    elif isinstance(data, dict) and token in data:
+        children = [data[token]]
+    elif isinstance(data, list) and isinstance(token, int) and token < len(data):
+        children = [data[token]]
+    else:
+        children = []
+    for child in children:
+        yield from resolve_parents(child, rest)
+
+
+def delete(data, tokens):
+    for parent, key in resolve_parents(data, tokens):
+        if key == "*" and isinstance(parent, list):
+            parent.clear()
+        elif isinstance(parent, dict):
+            parent.pop(key, None)
+        elif isinstance(parent, list) and isinstance(key, int) and key < len(parent):
+            del parent[key]
+
+
+def rename(data, tokens, new_key):
+    for parent, key in resolve_parents(data, tokens):
+        if isinstance(parent, dict) and key in parent:
+            # Rebuild the object to keep the key in the same position
+            items = [(new_key if k == key else k, v) for k, v in parent.items()]
+            parent.clear()
+            parent.update(items)
+
+
+def set_value(data, tokens, value):
+    for parent, key in resolve_parents(data, tokens):
+        if key == "*" and isinstance(parent, list):
+            parent[:] = [json.loads(json.dumps(value)) for _ in parent]
+        elif isinstance(parent, dict):
+            parent[key] = json.loads(json.dumps(value))
+        elif isinstance(parent, list) and isinstance(key, int) and key < len(parent):
+            parent[key] = json.loads(json.dumps(value))
+
+
+def serialise(data, original):
+    # Same format as JSON.stringify(data, null, 4), keeping the trailing newline of the original file (if any)
+    text = json.dumps(data, indent=4, ensure_ascii=False)
+    return text + "\n" if original.endswith("\n") else text
+
+
+def transform(file, operations):
+    # Returns the original and the transformed contents of a datapage.
+    original = file.read_text(encoding="utf-8")
+    data = json.loads(original)
+    unchanged = json.loads(original)
+    reformat = False
+
+    for operation, *args in operations:
+        if operation == "delete":
+            delete(data, parse_path(args[0]))
+        elif operation == "rename":
+            rename(data, parse_path(args[0]), args[1])
+        elif operation == "set":
+            set_value(data, parse_path(args[0]), json.loads(args[1]))
+        elif operation == "reformat":
+            reformat = True
+
+    # Compare the serialised data too, so that changes in key order (renames) are not missed
+    if not reformat and json.dumps(data) == json.dumps(unchanged):
+        return original, original
+    return original, serialise(data, original)
+
+
+def write_atomically(file, text):
+    # Write to a temporary file in the same folder, and move it over the original file.
+    fd, tmp_path = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+        os.chmod(tmp_path, os.stat(file).st_mode)
+        os.replace(tmp_path, file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class Operation(argparse.Action):
+    # Collects all operations in command-line order
+    def __call__(self, parser, namespace, values, option_string=None):
+        namespace.operations.append((self.dest, *values))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.set_defaults(operations=[])
+    parser.add_argument("--delete", action=Operation, nargs=1, metavar="PATH")
+    parser.add_argument("--rename", action=Operation, nargs=2, metavar=("PATH", "NEW_KEY"))
+    parser.add_argument("--set", action=Operation, nargs=2, metavar=("PATH", "JSON_VALUE"))
+    parser.add_argument("--reformat", action=Operation, nargs=0)
+    parser.add_argument("--apply", action="store_true", help="Write the changes (default: dry run)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of files processed at the same time")
+    parser.add_argument("--dir", type=Path, default=DATAPAGES_DIR, help="Folder with the datapage JSONs")
+    args = parser.parse_args()
+
+    if not args.operations:
+        parser.error("No operations given")
+
+    files = sorted(args.dir.glob("*.json"))
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda file: transform(file, args.operations), files))
+        changed = [(file, new) for file, (old, new) in zip(files, results) if old != new]
+
+        # Always show what is going to change before writing anything
+        for file, (old, new) in zip(files, results):
+            sys.stdout.writelines(
+                difflib.unified_diff(
+                    old.splitlines(keepends=True),
+                    new.splitlines(keepends=True),
+                    fromfile=str(file),
+                    tofile=str(file),
+                )
+            )
+
+        if args.apply:
+            list(pool.map(lambda change: write_atomically(*change), changed))
+
+    action = "Changed" if args.apply else "Would change"
+    print(f"{action} {len(changed)} of {len(files)} datapages", file=sys.stderr)
@@ -0,0 +1,107 @@
+"""Index of which datapage is shown on which chart, based on `showDataPageOnChartIds` of the datapage JSONs.
+
+The index is cached in scripts/datapages/.cache/ and rebuilt incrementally: only datapages whose modification time or size
+changed since the last build are read again.
+
+Usage:
+
+    python scripts/datapages/datapage_index.py               # list charts claimed by more than one datapage
+    python scripts/datapages/datapage_index.py --chart 3488  # which datapage is shown on chart 3488?
+    python scripts/datapages/datapage_index.py --datapage 815076  # on which charts is datapage 815076 shown?
+
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+DATAPAGES_DIR = Path(__file__).parent.parent.parent / "datapages"
+CACHE_FILE = Path(__file__).parent / ".cache" / "datapage_index.json"
+
+
+class DatapageIndex:
+    def __init__(self, files):
+        # `files` maps datapage file names to {"mtime_ns", "size", "chartIds"}
+        self.files = files
+        # Datapages are named after their variable id
+        self.chart_ids_by_datapage = {
+            int(Path(name).stem): entry["chartIds"] for name, entry in files.items()
+        }
+        self.datapages_by_chart_id = {}
+        for datapage, chart_ids in sorted(self.chart_ids_by_datapage.items()):
+            for chart_id in chart_ids:
+                self.datapages_by_chart_id.setdefault(chart_id, []).append(datapage)
+
+    @classmethod
+    def build(cls, datapages_dir=DATAPAGES_DIR, cache_file=CACHE_FILE):
+        cached_files = {}
+        if cache_file.exists():
+            with open(cache_file, "r") as f:
+                cached = json.load(f)
+            if cached.get("datapages_dir") == str(datapages_dir.resolve()):
+                cached_files = cached["files"]
+
+        files = {}
+        for file in sorted(datapages_dir.glob("*.json")):
+            stat = file.stat()
+            entry = cached_files.get(file.name)
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                with open(file, "r", encoding="utf-8") as f:
+                    chart_ids = json.load(f).get("showDataPageOnChartIds", [])
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "chartIds": chart_ids}
+            files[file.name] = entry
+
+        if files != cached_files:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "w") as f:
+                json.dump({"datapages_dir": str(datapages_dir.resolve()), "files": files}, f, separators=(",", ":"))
+
+        return cls(files)
+
+    def datapages_for_chart(self, chart_id):
+        return self.datapages_by_chart_id.get(chart_id, [])
+
+    def datapage_for_chart(self, chart_id):
+        # Returns the variable id of the datapage shown on the given chart, or None if there is none.
+        datapages = self.datapages_for_chart(chart_id)
+        assert len(datapages) <= 1, f"Chart {chart_id} is claimed by multiple datapages: {datapages}"
+        return datapages[0] if datapages else None
+
+    def charts_for_datapage(self, variable_id):
+        return self.chart_ids_by_datapage.get(variable_id, [])
+
+    def conflicts(self):
+        # Charts claimed by more than one datapage
+        return {
+            chart_id: datapages
+            for chart_id, datapages in sorted(self.datapages_by_chart_id.items())
+            if len(datapages) > 1
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("--chart", type=int, help="Look up the datapage shown on this chart id")
+    parser.add_argument("--datapage", type=int, help="Look up the charts of this datapage (variable id)")
+    args = parser.parse_args()
+
+    index = DatapageIndex.build()
+
+    if args.chart is not None:
+        print(" ".join(str(datapage) for datapage in index.datapages_for_chart(args.chart)))
+    if args.datapage is not None:
+        print(" ".join(str(chart_id) for chart_id in index.charts_for_datapage(args.datapage)))
+
+    conflicts = index.conflicts()
+    for chart_id, datapages in conflicts.items():
+        print(
+            f"Chart {chart_id} is claimed by multiple datapages: {', '.join(str(d) for d in datapages)}",
+            file=sys.stderr,
+        )
+    if conflicts:
+        sys.exit(1)
@@ -0,0 +1,249 @@
+"""Validate all datapage JSONs in the datapages folder against datapage.schema.json.
+
+The schema is compiled once into plain Python functions, and files are validated in parallel. Every error is reported with
+the JSON pointer of the offending value, e.g.
+
+    datapages/815076.json#/relatedData/2/url: '/grapher/co2' does not match '^https?://'
+
+Usage:
+
+    python scripts/datapages/datapage_validate.py [FILE ...]
+
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+DATAPAGES_DIR = Path(__file__).parent.parent.parent / "datapages"
+SCHEMA_FILE = Path(__file__).parent / "datapage.schema.json"
+
+# Below this number of files, starting worker processes takes longer than validating the files.
+MIN_FILES_PER_WORKER = 200
+
+JSON_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+# Keywords that compile_schema() checks, and keywords that only document the schema
+SUPPORTED_KEYWORDS = {
+    "$ref",
+    "type",
+    "enum",
+    "required",
+    "properties",
+    "additionalProperties",
+    "items",
+    "minItems",
+    "uniqueItems",
+    "minLength",
+    "pattern",
+    "minimum",
+}
+ANNOTATION_KEYWORDS = {"$schema", "$comment", "title", "description", "definitions", "default", "examples"}
+
+
+def pointer(path):
+    # JSON pointer (RFC 6901) of a path in the document
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in path)
+
+
+def compile_schema(schema, root=None):
+    # Compiles a (subset of) JSON schema into a function `validate(value, path)`, which yields (path, message) for every error.
+    # Any other keyword than SUPPORTED_KEYWORDS and ANNOTATION_KEYWORDS fails, so that a check added to the schema is never
+    # silently skipped.
+    root = root if root is not None else schema
+    unsupported = set(schema) - SUPPORTED_KEYWORDS - ANNOTATION_KEYWORDS
+    assert not unsupported, f"Unsupported schema keywords: {sorted(unsupported)}"
+    if root is schema:
+        # Definitions are compiled lazily when they are used, but their keywords are checked now
+        for definition in schema.get("definitions", {}).values():
+            compile_schema(definition, root)
+    checks = []
+
+    if "$ref" in schema:
+        assert schema["$ref"].startswith("#/definitions/"), f"Unsupported $ref: {schema['$ref']}"
+        name = schema["$ref"].removeprefix("#/definitions/")
+        # Resolved lazily, so that definitions can refer to each other
+        compiled_ref = []
+
+        def check_ref(value, path):
+            if not compiled_ref:
+                compiled_ref.append(compile_schema(root["definitions"][name], root))
+            yield from compiled_ref[0](value, path)
+
+        checks.append(check_ref)
+
+    if "type" in schema:
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_checks = [JSON_TYPES[t] for t in types]
+
+        def check_type(value, path):
+            if not any(is_type(value) for is_type in type_checks):
+                yield path, f"expected {' or '.join(types)}, got {type(value).__name__}"
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value, path):
+            if value not in allowed:
+                yield path, f"{value!r} is not one of {allowed}"
+
+        checks.append(check_enum)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value, path):
+            if isinstance(value, str) and len(value) < min_length:
+                yield path, f"{value!r} is shorter than {min_length} characters"
+
+        checks.append(check_min_length)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value, path):
+            if isinstance(value, str) and not pattern.search(value):
+                yield path, f"{value!r} does not match {pattern.pattern!r}"
+
+        checks.append(check_pattern)
+
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+
+        def check_minimum(value, path):
+            if JSON_TYPES["number"](value) and value < minimum:
+                yield path, f"{value!r} is less than {minimum}"
+
+        checks.append(check_minimum)
+
+    if "required" in schema:
+        required = schema["required"]
+
+        def check_required(value, path):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        yield path, f"missing required property {key!r}"
+
+        checks.append(check_required)
+
+    if "properties" in schema or "additionalProperties" in schema:
+        properties = {key: compile_schema(sub, root) for key, sub in schema.get("properties", {}).items()}
+        additional = schema.get("additionalProperties", True)
+        compiled_additional = compile_schema(additional, root) if isinstance(additional, dict) else None
+
+        def check_properties(value, path):
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                if key in properties:
+                    yield from properties[key](item, path + [key])
+                elif additional is False:
+                    yield path + [key], "unknown property"
+                elif compiled_additional:
+                    yield from compiled_additional(item, path + [key])
+
+        checks.append(check_properties)
+
+    if "items" in schema:
+        validate_item = compile_schema(schema["items"], root)
+
+        def check_items(value, path):
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    yield from validate_item(item, path + [i])
+
+        checks.append(check_items)
+
+    if "minItems" in schema:
+        min_items = schema["minItems"]
+
+        def check_min_items(value, path):
+            if isinstance(value, list) and len(value) < min_items:
+                yield path, f"expected at least {min_items} items, got {len(value)}"
+
+        checks.append(check_min_items)
+
+    if schema.get("uniqueItems"):
+
+        def check_unique_items(value, path):
+            if isinstance(value, list):
+                seen = set()
+                for i, item in enumerate(value):
+                    key = json.dumps(item, sort_keys=True)
+                    if key in seen:
+                        yield path + [i], f"duplicate item {item!r}"
+                    seen.add(key)
+
+        checks.append(check_unique_items)
+
+    def validate(value, path):
+        for check in checks:
+            yield from check(value, path)
+
+    return validate
+
+
+# Compiled schema of the current (worker) process
+_validate = None
+
+
+def init_validator(schema_file=SCHEMA_FILE):
+    global _validate
+    with open(schema_file, "r") as f:
+        _validate = compile_schema(json.load(f))
+
+
+def validate_file(file):
+    # Returns a list of error messages for the given datapage.
+    try:
+        with open(file, "r", encoding="utf-8") as f:
+            datapage = json.load(f)
+    except json.JSONDecodeError as e:
+        return [f"{file}: invalid JSON: {e}"]
+    return [f"{file}#{pointer(path)}: {message}" for path, message in _validate(datapage, [])]
+
+
+def validate_files(files, workers=os.cpu_count()):
+    files = list(files)
+    if len(files) < MIN_FILES_PER_WORKER * 2 or workers == 1:
+        init_validator()
+        return [error for file in files for error in validate_file(file)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_validator) as pool:
+        chunksize = max(1, len(files) // (workers * 4))
+        return [error for errors in pool.map(validate_file, files, chunksize=chunksize) for error in errors]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("files", nargs="*", type=Path, help="Datapages to validate (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    files = args.files or sorted(DATAPAGES_DIR.glob("*.json"))
+    errors = validate_files(files, args.workers)
+    for error in errors:
+        print(error)
+    print(f"Validated {len(files)} datapages, found {len(errors)} errors", file=sys.stderr)
+    if errors:
+        sys.exit(1)
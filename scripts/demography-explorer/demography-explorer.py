@@ -1,9 +1,15 @@
 # %%
+from itertools import product
+from math import prod
 from os import path
 from string import Template
 import textwrap
 import pandas as pd
 import re
+import sys
+
+sys.path.append(path.join(path.dirname(path.abspath(__file__)), ".."))
+from explorer_tools.tracing import stage
 
 # There are two datasets available:
 # - DATASET_PATH_PREFIX: Classic dataset, with estimates for 1950-2023 and projections for 2024-2100.
@@ -13,8 +19,68 @@ DATASET_PATH_PREFIX_FULL = "grapher/un/2024-07-12/un_wpp_full/"
 
 COLS_TO_DROP = []
 
+# Upper bound for the number of views the dimension expansion is allowed to produce.
+# The expansion refuses to run if metrics.csv asks for more than this, which usually means a typo in one of the `_sex`, `_age_group` or `_projection` columns.
+MAX_VIEWS = 20_000
+
 
 # %%
+def expand_dimensions(df, dimensions, key_col, max_views=MAX_VIEWS):
+    # Every row of `df` lists the slugs it should be expanded to in a space-separated `_<dimension>` column, e.g. `_sex` = "female male".
+    # We take the product of all dimensions for every row in one go, and attach the dimension attributes as `<dimension>__<column>` columns.
+    # Some views are specified twice, once with more specific information (e.g. manual map brackets); the first occurrence of every view wins.
+    explode_cols = ["_" + dim for dim in dimensions]
+    slugs_per_row = {
+        dim: [slugs.split(" ") for slugs in df["_" + dim]] for dim in dimensions
+    }
+
+    # Validate all foreign keys before expanding anything, and report all unknown slugs at once
+    dim_positions = {}
+    unknown_slugs = []
+    for dim, dim_df in dimensions.items():
+        assert dim_df["slug"].is_unique, f"Duplicate slugs in {dim}.csv"
+        dim_positions[dim] = {slug: pos for pos, slug in enumerate(dim_df["slug"])}
+        for row_pos, slugs in enumerate(slugs_per_row[dim]):
+            unknown_slugs += [
+                f"{dim}={slug!r} (metrics row {row_pos + 2})"
+                for slug in slugs
+                if slug not in dim_positions[dim]
+            ]
+    assert not unknown_slugs, f"Unknown slugs: {', '.join(unknown_slugs)}"
+
+    row_counts = [
+        prod(len(slugs_per_row[dim][row_pos]) for dim in dimensions)
+        for row_pos in range(len(df.index))
+    ]
+    expected_views = sum(row_counts)
+    print(f"📐 Expanding {len(df.index)} metrics into up to {expected_views} views")
+    assert (
+        expected_views <= max_views
+    ), f"Expansion would produce {expected_views} views, which exceeds the budget of {max_views}"
+
+    # Only collect positions here, the frames are materialised once at the end
+    seen_views = set()
+    row_positions = []
+    dim_rows = {dim: [] for dim in dimensions}
+    for row_pos, key in enumerate(df[key_col]):
+        for combination in product(*(slugs_per_row[dim][row_pos] for dim in dimensions)):
+            view = (key, *combination)
+            if view in seen_views:
+                continue
+            seen_views.add(view)
+            row_positions.append(row_pos)
+            for dim, slug in zip(dimensions, combination):
+                dim_rows[dim].append(dim_positions[dim][slug])
+
+    expanded = [df.drop(columns=explode_cols).iloc[row_positions].reset_index(drop=True)]
+    for dim, dim_df in dimensions.items():
+        dim_df = dim_df.iloc[dim_rows[dim]].reset_index(drop=True)
+        expanded.append(dim_df.add_prefix(dim + "__"))
+
+    print(f"📈 Generated {len(row_positions)} views")
+    return pd.concat(expanded, axis=1)
+
+
 def substitute_rows(row):
     # Rows can include placeholders like ${sex__slug}, which will be replaced here
     for key in row.keys():
@@ -65,6 +131,7 @@ def table_def(rows, display_names):
 outfile = "../../explorers/population-and-demography.explorer.tsv"
 
 # %%
+stage("read")
 # Read inputs
 with open("demography-explorer.template.tsv", "r") as templateFile:
     template = Template(templateFile.read())
@@ -76,32 +143,17 @@ input_df = {
 df = input_df["metrics"]
 
 # %%
+stage("expand", rows=lambda: len(df))
 merge_cols = input_files[1:]
-for merge_col in merge_cols:
-    explode_col = "_" + merge_col
-    df[explode_col] = df[explode_col].apply(lambda x: x.split(" "))
-    df = df.explode(explode_col)
-    merge_df = input_df[merge_col]
-    merge_df.columns = merge_col + "__" + merge_df.columns.values
-    df = df.merge(
-        merge_df,
-        how="left",
-        left_on=explode_col,
-        right_on=merge_col + "__slug",
-        validate="many_to_one",
-        indicator=merge_col + "__merge",
-    )
-    assert df[merge_col + "__merge"].isin(["both"]).all()
-    df = df.drop([explode_col, merge_col + "__merge"], axis=1)
-
-# We want to specify some variants twice, once with more specific information (e.g. manual map brackets).
-# Use the first occurrence of every view.
-df = df.drop_duplicates(
-    subset=["Metric Dropdown", *[f"{col}__slug" for col in merge_cols]]
+df = expand_dimensions(
+    df,
+    {merge_col: input_df[merge_col] for merge_col in merge_cols},
+    key_col="Metric Dropdown",
+    max_views=MAX_VIEWS,
 )
 
 # %%
-
+stage("substitute", rows=lambda: len(df))
 df = df.apply(substitute_rows, axis=1)
 for col in ["title", "subtitle"]:
     df[col] = (
@@ -146,6 +198,7 @@ for idx, row in df.iterrows():
         df.loc[idx, "yVariableIds"] = " ".join(slugs)
 
 # %%
+stage("columns", rows=lambda: len(col_display_names))
 col_defs = table_def(
     df.reset_index(drop=True),
     col_display_names,
@@ -175,6 +228,7 @@ df = df.drop(columns=df.filter(regex="__"))
 df = df.rename(columns={col_name: "_" + col_name for col_name in COLS_TO_DROP})
 
 # %%
+stage("write", rows=lambda: len(df))
 graphers_tsv = df.to_csv(sep="\t", index=False)
 graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
 
@@ -0,0 +1,70 @@
+"""Keep the dataframes that explorer generators compute as Parquet artifacts, to reuse them in other generators.
+
+Artifacts are saved in .cache/artifacts (or in the folder set in EXPLORER_ARTIFACTS) as <name>-<key>.parquet, where the
+key is a hash of everything the dataframe was computed from: the sheets a generator read and its code. An artifact is
+therefore only found while its inputs stay the same, and older artifacts can be deleted at any time. Parquet keeps the
+dtypes of the columns (e.g. Categorical descriptions and nullable integers), so artifacts read back as they were saved.
+
+    key = artifact_key(welfare, tables, files=[__file__])
+    save_artifact(df_tables, "wid_inequality_tables", key)
+    df_tables = load_artifact("wid_inequality_tables", key)  # None if there is no artifact for these inputs
+
+Saving and loading artifacts needs pyarrow. Without it, artifacts are neither saved nor found.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+ARTIFACTS_DIR = Path(os.environ.get("EXPLORER_ARTIFACTS", ROOT_DIR / ".cache" / "artifacts"))
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def artifact_key(*inputs, files=()):
+    # Hash of the inputs (dataframes or any other values with a stable repr) and of the contents of the files
+    h = hashlib.sha256()
+    for value in inputs:
+        if isinstance(value, pd.DataFrame):
+            h.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode())
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        else:
+            h.update(repr(value).encode())
+    for file in files:
+        h.update(Path(file).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def artifact_path(name, key):
+    return ARTIFACTS_DIR / f"{name}-{key}.parquet"
+
+
+def save_artifact(df, name, key):
+    if not HAS_PYARROW:
+        print(f"⚠️ pyarrow is not installed (pip install pyarrow), not saving the {name} artifact")
+        return None
+    path = artifact_path(name, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write atomically, so that generators running at the same time never read a partial artifact
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_artifact(name, key):
+    path = artifact_path(name, key)
+    if not HAS_PYARROW or not path.exists():
+        return None
+    print(f"♻️ Using the {name} artifact ({path.name})")
+    return pd.read_parquet(path)
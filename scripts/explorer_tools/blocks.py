@@ -0,0 +1,47 @@
+"""Write the blocks of explorer configs (the graphers and the columns of each table) straight to the output file.
+
+write_block() writes a dataframe as a block of an explorer config: a tab-separated table, indented with a tab. By default
+the whole block is converted to text and written at once. Set EXPLORER_CHUNK_ROWS to a number of rows to write every
+block in chunks of that many rows instead: each chunk is converted, indented and written before the next one, so that the
+text of a whole block (several times the size of its dataframe) is never held in memory. Both modes write the same bytes.
+
+A block can also be written in parts that are built one after the other, e.g. the views of each survey type in turn, by
+writing the parts after the first one without header:
+
+    for survey in range(len(survey_type)):
+        write_block(f, survey_views(survey), drop=["survey_type"], header=survey == 0)
+
+    with open(outfile, "w", newline="\n", encoding="utf-8") as f:
+        f.write(header_tsv)
+        f.write("\ngraphers\n")
+        write_block(f, df_graphers, drop=["survey_type"])
+
+        for i in survey_list:
+            f.write("\ncolumns\t" + i + "\n")
+            write_block(f, df_tables[df_tables["survey_type"] == i], drop=["survey_type"])
+
+    EXPLORER_CHUNK_ROWS=500 python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+"""
+
+import os
+import textwrap
+
+CHUNK_ROWS = int(os.environ.get("EXPLORER_CHUNK_ROWS") or 0)
+
+
+def block_text(df, header=True):
+    # Indented tab-separated text of the rows of df, as explorers show them
+    return textwrap.indent(df.to_csv(sep="\t", index=False, header=header), "\t")
+
+
+def write_block(f, df, drop=(), chunk_rows=CHUNK_ROWS, header=True):
+    # Writes the rows of df without the columns in drop (auxiliary columns), at once or in chunks of chunk_rows rows
+    if not chunk_rows:
+        f.write(block_text(df.drop(columns=list(drop)), header=header))
+        return
+    # The header goes with the first chunk, and is written even if there are no rows
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows].drop(columns=list(drop))
+        f.write(block_text(chunk, header=header and start == 0))
+
@@ -0,0 +1,58 @@
+"""Order the views of explorers by the declared order of the choices of their controls.
+
+Each control column gets a declared order of its choices, e.g. the deciles of a `Decile Dropdown` from the poorest to the
+richest. sort_views() stores these columns as ordered pandas Categoricals and sorts the views by all of them in one
+multi-key sort (the first column varying slowest), keeping the original order of views with the same choices:
+
+    df_graphers = sort_views(
+        df_graphers,
+        {
+            "Decile Dropdown": [np.nan, "1 (poorest)", "2", ..., "All deciles"],
+            "Indicator Dropdown": ["Mean income", "Median income", ...],
+        },
+    )
+
+Views without a choice (NaN) go where NaN is in the declared order, or last if it is not there. Choices that are not in
+the declared order are reported, and go after the declared ones in order of appearance.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def ordered_categorical(values, order):
+    # Returns the values as an ordered Categorical with the declared order, followed by any unknown choices, and the
+    # unknown choices.
+    categories = [choice for choice in order if not pd.isnull(choice)]
+    assert len(set(categories)) == len(categories), f"Choices are declared more than once: {categories}"
+    declared = set(categories)
+    unknown = [choice for choice in pd.unique(values.dropna()) if choice not in declared]
+    return pd.Categorical(values, categories=categories + unknown, ordered=True), unknown
+
+
+def sort_key(categorical, order):
+    # Position of every view in the declared order, including views without a choice
+    missing = [i for i, choice in enumerate(order) if pd.isnull(choice)]
+    # Choices take the odd positions, so that a missing choice can go in between
+    key = categorical.codes.astype(np.int64) * 2 + 1
+    if missing:
+        missing_position = 2 * sum(not pd.isnull(choice) for choice in order[: missing[0]])
+    else:
+        missing_position = 2 * len(categorical.categories)
+    key[categorical.codes == -1] = missing_position
+    return key
+
+
+def sort_views(df, orders, report=True):
+    # Returns df sorted by the declared orders of its control columns, which are stored as ordered Categoricals.
+    df = df.copy()
+    keys = []
+    for column, order in orders.items():
+        categorical, unknown = ordered_categorical(df[column], order)
+        if unknown and report:
+            print(f"⚠️ {column} has choices without a declared order, placed last: {unknown}")
+        df[column] = categorical
+        keys.append(sort_key(categorical, order))
+    # np.lexsort is stable, and sorts by its last key first
+    positions = np.lexsort(keys[::-1]) if keys else np.arange(len(df))
+    return df.iloc[positions].reset_index(drop=True)
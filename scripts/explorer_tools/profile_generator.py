@@ -0,0 +1,154 @@
+"""Run an explorer generator under cProfile, save the profile and print its hotspots.
+
+Generators are given as a module (for the poverty and inequality explorers) or as a script path (for the others, which
+then run from their own folder). Google Sheets tabs are read from the cache in .cache/sheets (see sheets.py), so that
+profiles of different commits are comparable and don't include download times.
+
+Profiles are saved as .cache/profiles/<generator>-<commit>.pstats, and can be opened with any pstats viewer (e.g.
+snakeviz). With --speedscope, the generator is also sampled with py-spy (if installed) into a speedscope file.
+
+Usage:
+
+    python scripts/explorer_tools/profile_generator.py scripts.poverty-inequality-explorers.lis.lis_expanded_poverty_explorer
+    python scripts/explorer_tools/profile_generator.py scripts/global-food-explorer/global-food-explorer.py --top 20
+    python scripts/explorer_tools/profile_generator.py --compare OLD.pstats NEW.pstats
+
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import runpy
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+PROFILES_DIR = ROOT_DIR / ".cache" / "profiles"
+SHEET_CACHE_DIR = ROOT_DIR / ".cache" / "sheets"
+
+DEFAULT_TOP = 25
+
+
+def commit():
+    # Short hash of the current commit, with a suffix if there are uncommitted changes
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "scripts"], cwd=ROOT_DIR).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{sha}-dirty" if dirty else sha
+
+
+def generator_name(generator):
+    return Path(generator).stem if generator.endswith(".py") else generator.rsplit(".", 1)[-1]
+
+
+def run_generator(generator):
+    # Runs a generator as if it was run from the command line.
+    if generator.endswith(".py"):
+        script = Path(generator).resolve()
+        os.chdir(script.parent)
+        sys.argv = [str(script)]
+        runpy.run_path(str(script), run_name="__main__")
+    else:
+        sys.path.insert(0, str(ROOT_DIR))
+        sys.argv = [generator]
+        runpy.run_module(generator, run_name="__main__", alter_sys=True)
+
+
+def profile_generator(generator, output_file):
+    profiler = cProfile.Profile()
+    cwd = os.getcwd()
+    profiler.enable()
+    try:
+        run_generator(generator)
+    except SystemExit as e:
+        if e.code:
+            print(f"⚠️ {generator} exited with {e.code}, the profile only covers the run up to then")
+    finally:
+        profiler.disable()
+        os.chdir(cwd)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(output_file)
+    return pstats.Stats(str(output_file))
+
+
+def record_speedscope(generator, output_file):
+    py_spy = shutil.which("py-spy")
+    if py_spy is None:
+        print("⚠️ py-spy is not installed (pip install py-spy), skipping the speedscope profile")
+        return
+    if generator.endswith(".py"):
+        command, cwd = [sys.executable, str(Path(generator).resolve())], Path(generator).resolve().parent
+    else:
+        command, cwd = [sys.executable, "-m", generator], ROOT_DIR
+    subprocess.run([py_spy, "record", "--format", "speedscope", "-o", str(output_file), "--", *command], cwd=cwd, check=True)
+    print(f"🔥 Speedscope profile written to {output_file}")
+
+
+def function_name(func):
+    file, line, name = func
+    if file == "~":
+        return name
+    return f"{Path(file).name}:{line}({name})"
+
+
+def print_hotspots(stats, top=DEFAULT_TOP):
+    # Functions with the most own time, and with the most cumulative time
+    for key, title in [("tottime", "own time"), ("cumtime", "cumulative time")]:
+        print(f"\nTop {top} functions by {title} (of {stats.total_tt:.2f}s)")
+        print(f"{'calls':>10}{'own':>10}{'cumulative':>12}  function")
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2 if key == "tottime" else 3], reverse=True)
+        for func, (_, calls, tottime, cumtime, _) in rows[:top]:
+            print(f"{calls:>10}{tottime:>9.3f}s{cumtime:>11.3f}s  {function_name(func)}")
+
+
+def compare_profiles(old_file, new_file, top=DEFAULT_TOP):
+    # Functions whose own time changed the most between two profiles
+    old, new = pstats.Stats(str(old_file)).stats, pstats.Stats(str(new_file)).stats
+    deltas = {func: new.get(func, (0, 0, 0, 0))[2] - old.get(func, (0, 0, 0, 0))[2] for func in old.keys() | new.keys()}
+    old_total = sum(stat[2] for stat in old.values())
+    new_total = sum(stat[2] for stat in new.values())
+    print(f"Total: {old_total:.2f}s -> {new_total:.2f}s ({new_total - old_total:+.2f}s)")
+    print(f"{'old':>10}{'new':>10}{'change':>10}  function")
+    for func in sorted(deltas, key=lambda func: abs(deltas[func]), reverse=True)[:top]:
+        old_time = old.get(func, (0, 0, 0, 0))[2]
+        new_time = new.get(func, (0, 0, 0, 0))[2]
+        print(f"{old_time:>9.3f}s{new_time:>9.3f}s{deltas[func]:>+9.3f}s  {function_name(func)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("generator", nargs="?", help="Module or script path of the generator")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Number of hotspots to show (default: {DEFAULT_TOP})")
+    parser.add_argument("--output-dir", type=Path, default=PROFILES_DIR, help="Folder for the profiles")
+    parser.add_argument("--speedscope", action="store_true", help="Also record a speedscope profile with py-spy")
+    parser.add_argument("--no-sheet-cache", action="store_true", help="Download the Google Sheets tabs on every run")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"), help="Compare two saved profiles")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_profiles(*args.compare, top=args.top)
+        sys.exit(0)
+    if not args.generator:
+        parser.error("No generator given")
+
+    # Set before the generator imports sheets.py, which reads it
+    if not args.no_sheet_cache:
+        os.environ.setdefault("EXPLORER_SHEET_CACHE", str(SHEET_CACHE_DIR))
+
+    output_dir = args.output_dir.resolve()
+    name = f"{generator_name(args.generator)}-{commit()}"
+    stats = profile_generator(args.generator, output_dir / f"{name}.pstats")
+    print_hotspots(stats, args.top)
+    print(f"\n📊 Profile written to {output_dir / f'{name}.pstats'}")
+
+    if args.speedscope:
+        record_speedscope(args.generator, output_dir / f"{name}.speedscope.json")
@@ -0,0 +1,94 @@
+"""Column schemas of the tables of explorers: the `columns` blocks (COLUMNS_SCHEMA) and the `graphers` block
+(GRAPHERS_SCHEMA).
+
+A schema gives the columns of a table, in the order they are written, with their dtype: nullable integers ("Int64") for
+numbers, "category" for the strings repeated in many rows (types, units, sources, flags, ...) and "string" for the rest.
+Generators allocate their tables with all these columns up front and apply the schema before writing them:
+
+    df_tables = new_frame(COLUMNS_SCHEMA)
+    df_tables.loc[j, "name"] = "Country"
+    ...
+    df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+
+Auxiliary columns are the ones a generator uses to split its tables and drops before writing them (e.g. `tableSlug` or
+`survey_type`): they are categories, and go last. Controls of the graphers (columns ending in Dropdown, Radio or
+Checkbox) depend on each explorer: they are categories, written after `ySlugs` in the order they were added.
+
+Numbers are written as integers (e.g. a tolerance of 5 and not 5.0, which breaks the parameter in the platform), and the
+tables of all explorers have the same columns in the same order.
+"""
+
+import pandas as pd
+
+COLUMNS_SCHEMA = {
+    "name": "string",
+    "slug": "string",
+    "type": "category",
+    "description": "category",
+    "unit": "category",
+    "shortUnit": "category",
+    "colorScaleNumericBins": "category",
+    "colorScaleNumericMinValue": "Int64",
+    "colorScaleEqualSizeBins": "category",
+    "colorScaleScheme": "category",
+    "transform": "string",
+    "sourceName": "category",
+    "dataPublishedBy": "category",
+    "sourceLink": "category",
+    "tolerance": "Int64",
+}
+
+GRAPHERS_SCHEMA = {
+    "title": "string",
+    "ySlugs": "string",
+    "tableSlug": "category",
+    "subtitle": "string",
+    "note": "category",
+    "type": "category",
+    "yAxisMin": "Int64",
+    "selectedFacetStrategy": "category",
+    "hasMapTab": "category",
+    "tab": "category",
+    "yScaleToggle": "category",
+    "hideRelativeToggle": "category",
+    "relatedQuestionText": "category",
+    "relatedQuestionUrl": "category",
+    "defaultView": "category",
+}
+
+CONTROL_SUFFIXES = (" Dropdown", " Radio", " Checkbox")
+CONTROLS_AFTER = "ySlugs"
+
+
+def is_control(column):
+    return column.endswith(CONTROL_SUFFIXES)
+
+
+def new_frame(schema):
+    # Empty table with the columns of the schema. Strings are kept as objects while the table is filled, because string
+    # and categorical columns only take values of their own type (or new categories) one by one.
+    return pd.DataFrame(
+        {column: pd.Series(dtype="Int64" if dtype == "Int64" else "object") for column, dtype in schema.items()}
+    )
+
+
+def apply_schema(df, schema, auxiliary=()):
+    # Returns the table with the dtypes and the order of columns of the schema, its controls after CONTROLS_AFTER and
+    # the auxiliary columns last
+    controls = [column for column in df.columns if is_control(column)]
+    auxiliary = [column for column in auxiliary if column in df.columns]
+    unknown = [column for column in df.columns if column not in schema and column not in controls + auxiliary]
+    assert not unknown, f"Columns not in the schema: {unknown}"
+
+    columns = []
+    for column in schema:
+        if column in df.columns:
+            columns.append(column)
+        if column == CONTROLS_AFTER:
+            columns += controls
+    if CONTROLS_AFTER not in schema:
+        columns += controls
+    columns += auxiliary
+
+    dtypes = {column: schema.get(column, "category") for column in columns}
+    return df[columns].astype(dtypes)
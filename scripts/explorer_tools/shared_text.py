@@ -0,0 +1,128 @@
+"""Shared-text copies of generated explorer configs.
+
+Generated explorers repeat the same long texts (e.g. `additionalInfo` in the migration flows explorer, or the processing
+descriptions of the poverty explorers) in every row of their columns blocks. In a shared-text copy, every such text is
+declared once in a `sharedText` block at the end of the file, and cells reference it as `{{name}}`. The explorer platform
+does not read this format, so shared-text copies are never written to explorers/: set EXPLORER_SHARED_TEXT to a folder to
+make generators also write a shared-text copy of their explorer there, after the full config.
+
+    EXPLORER_SHARED_TEXT=.cache/shared-text python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+`expand_shared_text` turns a shared-text copy back into the fully-expanded config, byte for byte, for consumers that need it:
+
+    python scripts/explorer_tools/shared_text.py expand .cache/shared-text/migration-flows.explorer.tsv -o migration-flows.full.tsv
+    python scripts/explorer_tools/shared_text.py compare explorers/migration-flows.explorer.tsv
+
+"""
+
+import argparse
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+SHARED_TEXT_DIR = os.environ.get("EXPLORER_SHARED_TEXT")
+
+SHARED_TEXT_BLOCK = "\nsharedText\n"
+REFERENCE_RE = re.compile(r"\{\{(\w+)\}\}")
+
+# Cells shorter than this are not worth sharing.
+MIN_SHARED_LENGTH = 200
+
+
+def repeated_cells(config, min_length=MIN_SHARED_LENGTH):
+    # Finds long cell values that appear more than once in the config, and gives them a name.
+    counts = Counter(
+        cell
+        for line in config.split("\n")
+        for cell in line.split("\t")
+        if len(cell) >= min_length and "{" not in cell and "}" not in cell
+    )
+    repeated = [cell for cell, count in counts.most_common() if count > 1]
+    return {f"shared_text_{i + 1}": text for i, text in enumerate(repeated)}
+
+
+def compact_shared_text(config, shared_texts):
+    # Replaces every occurrence of the shared texts with a reference, and declares the texts once at the end of the config.
+    assert "{{" not in config, "Config already contains '{{', can't use shared-text mode"
+    for name, text in shared_texts.items():
+        assert re.fullmatch(r"\w+", name), f"Invalid shared text name: {name!r}"
+        assert not re.search(r"[\t\n{}]", text), f"Shared text {name} can't contain tabs, newlines or braces"
+
+    used_texts = {}
+    # Longer texts first, so that texts containing other shared texts are replaced as a whole
+    for name, text in sorted(shared_texts.items(), key=lambda item: -len(item[1])):
+        if text and text in config:
+            config = config.replace(text, "{{" + name + "}}")
+            used_texts[name] = text
+
+    if not used_texts:
+        return config
+    return (
+        config
+        + SHARED_TEXT_BLOCK
+        + "".join(f"\t{name}\t{text}\n" for name, text in used_texts.items())
+    )
+
+
+def expand_shared_text(config):
+    # Inverse of `compact_shared_text`: returns the fully-expanded config. Configs without a sharedText block are returned as is.
+    block_start = config.rfind(SHARED_TEXT_BLOCK)
+    if block_start == -1:
+        return config
+
+    shared_texts = {}
+    for line in config[block_start + len(SHARED_TEXT_BLOCK) :].splitlines():
+        _, name, text = line.split("\t", 2)
+        shared_texts[name] = text
+
+    return REFERENCE_RE.sub(
+        lambda match: shared_texts[match.group(1)], config[:block_start]
+    )
+
+
+def size_comparison(full, compact):
+    full_size = len(full.encode("utf-8"))
+    compact_size = len(compact.encode("utf-8"))
+    return f"{full_size / 1e6:.2f} MB expanded, {compact_size / 1e6:.2f} MB with shared text ({compact_size / full_size:.0%})"
+
+
+def write_shared_text_copy(outfile, shared_texts=None):
+    # Writes a shared-text copy of a generated explorer to EXPLORER_SHARED_TEXT, if it is set. All long repeated cells are
+    # shared, together with `shared_texts`, which can be used for texts that only appear as part of longer cells (e.g. a
+    # processing description at the end of every description).
+    if not SHARED_TEXT_DIR:
+        return None
+    with open(outfile, "r", encoding="utf-8", newline="") as f:
+        full = f.read()
+    compact = compact_shared_text(full, {**repeated_cells(full), **(shared_texts or {})})
+    assert expand_shared_text(compact) == full, "Shared-text config doesn't expand to the original"
+    copy_file = Path(SHARED_TEXT_DIR) / Path(outfile).name
+    copy_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(copy_file, "w", encoding="utf-8", newline="\n") as f:
+        f.write(compact)
+
+    print(f"🗜️ Shared-text copy written to {copy_file}: {size_comparison(full, compact)}")
+    return copy_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["expand", "compact", "compare"])
+    parser.add_argument("explorer", help="Path to an explorer config")
+    parser.add_argument("-o", "--output", help="Where to write the result (default: stdout)")
+    args = parser.parse_args()
+
+    with open(args.explorer, "r", encoding="utf-8", newline="") as f:
+        config = f.read()
+    full = expand_shared_text(config)
+
+    if args.command == "compare":
+        print(size_comparison(full, compact_shared_text(full, repeated_cells(full))))
+    else:
+        result = full if args.command == "expand" else compact_shared_text(full, repeated_cells(full))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="\n") as f:
+                f.write(result)
+        else:
+            print(result, end="")
@@ -0,0 +1,200 @@
+"""Read the tabs of the Google Sheets that configure the explorer generators.
+
+Set EXPLORER_SHEET_CACHE to a folder to keep a copy of every tab the first time a generator reads it, and to read it from
+that copy afterwards. This makes runs repeatable and independent of the network, e.g. to profile a generator (see
+profile_generator.py). Delete the folder to download the sheets again.
+
+    EXPLORER_SHEET_CACHE=.cache/sheets python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+Sheets change without history, so tabs can also be kept as snapshots: the CSV of each tab is stored once in
+.cache/sheet-snapshots (or in the folder set in EXPLORER_SHEET_SNAPSHOTS) as <sha256>.csv, named by the hash of its
+contents, and a manifest (a JSON file) gives the hash of every tab a build read. Set EXPLORER_SHEET_RECORD to a manifest
+to add every tab a generator reads to it when the generator exits, and EXPLORER_SHEET_MANIFEST to a manifest to pin a
+generator to it: tabs are then only read from the snapshots of the manifest (checking their hashes), never downloaded, so
+the same manifest always builds the same explorers (see snapshot_sheets.py to take and check snapshots).
+
+    EXPLORER_SHEET_MANIFEST=.cache/sheet-snapshots/manifest-20240101T000000Z.json python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+With pyarrow installed, each tab is also kept as Parquet once it has been parsed (for each set of read_csv arguments),
+which loads much faster than parsing the CSV again. A Parquet copy is only kept if it reads back exactly as the parsed
+CSV, otherwise the CSV is parsed every time.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .artifacts import HAS_PYARROW, ROOT_DIR
+
+SHEET_CACHE_DIR = os.environ.get("EXPLORER_SHEET_CACHE")
+SNAPSHOTS_DIR = Path(os.environ.get("EXPLORER_SHEET_SNAPSHOTS", ROOT_DIR / ".cache" / "sheet-snapshots"))
+MANIFEST_FILE = os.environ.get("EXPLORER_SHEET_MANIFEST")
+RECORD_FILE = os.environ.get("EXPLORER_SHEET_RECORD")
+
+
+def sheet_url(sheet_id, sheet_name):
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
+
+
+def write_atomically(path, data):
+    # Write atomically, so that an interrupted write never leaves a partial file behind
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fetch_sheet(sheet_id, sheet_name):
+    # CSV of the tab exactly as Google Sheets exports it
+    with urllib.request.urlopen(sheet_url(sheet_id, sheet_name)) as response:
+        return response.read()
+
+
+def download_sheet(sheet_id, sheet_name, cache_dir):
+    # Keeps the CSV exactly as Google Sheets exports it, so that reading the copy gives the same dataframe.
+    cache_file = Path(cache_dir) / f"{sheet_id}-{urllib.parse.quote(sheet_name, safe='')}.csv"
+    if not cache_file.exists():
+        write_atomically(cache_file, fetch_sheet(sheet_id, sheet_name))
+    return cache_file
+
+
+def sheet_data(sheet_id, sheet_name):
+    # CSV of the tab, from the cached copy if EXPLORER_SHEET_CACHE is set
+    if SHEET_CACHE_DIR:
+        return download_sheet(sheet_id, sheet_name, SHEET_CACHE_DIR).read_bytes()
+    return fetch_sheet(sheet_id, sheet_name)
+
+
+def tab_key(sheet_id, sheet_name):
+    return f"{sheet_id}/{sheet_name}"
+
+
+def snapshot_path(digest):
+    return SNAPSHOTS_DIR / f"{digest}.csv"
+
+
+def store_snapshot(data):
+    # Stores the CSV of a tab by the hash of its contents, and returns the hash
+    digest = hashlib.sha256(data).hexdigest()
+    path = snapshot_path(digest)
+    if not path.exists():
+        write_atomically(path, data)
+    return digest
+
+
+def verify_snapshot(digest):
+    # Path of the snapshot with this hash, after checking it is there and unchanged
+    path = snapshot_path(digest)
+    assert path.exists(), f"Snapshot {digest} is not in {SNAPSHOTS_DIR}"
+    assert hashlib.sha256(path.read_bytes()).hexdigest() == digest, f"Snapshot {path} does not match its hash"
+    return path
+
+
+def new_manifest():
+    return {"created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"), "tabs": {}}
+
+
+def read_manifest(manifest_file):
+    with open(manifest_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, manifest_file):
+    manifest["tabs"] = dict(sorted(manifest["tabs"].items()))
+    write_atomically(Path(manifest_file), (json.dumps(manifest, indent=2, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+# Hashes of the tabs read so far, added to the manifest of EXPLORER_SHEET_RECORD when the generator exits
+_recorded_tabs = {}
+
+
+def record_tab(sheet_id, sheet_name, digest):
+    if not _recorded_tabs:
+        atexit.register(write_recorded_tabs, RECORD_FILE)
+    _recorded_tabs[tab_key(sheet_id, sheet_name)] = digest
+
+
+def write_recorded_tabs(manifest_file):
+    # Adds the recorded tabs to the manifest (created if it does not exist yet), reading and writing it once
+    manifest = read_manifest(manifest_file) if Path(manifest_file).exists() else new_manifest()
+    for key, digest in _recorded_tabs.items():
+        if manifest["tabs"].get(key) not in (None, digest):
+            print(f"⚠️ {key} changed since it was recorded in {manifest_file}, keeping the latest copy")
+    manifest["tabs"].update(_recorded_tabs)
+    write_manifest(manifest, manifest_file)
+
+
+def parquet_path(digest, kwargs):
+    # Parquet copy of a snapshot, for each set of read_csv arguments (which change the dataframe)
+    kwargs_digest = hashlib.sha256(repr(sorted(kwargs.items())).encode()).hexdigest()[:16]
+    return SNAPSHOTS_DIR / "parquet" / f"{digest}-{kwargs_digest}.parquet"
+
+
+def read_parquet_copy(path):
+    df = pd.read_parquet(path)
+    # Missing strings come back as None, where read_csv gives NaN
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def save_parquet_copy(df, path):
+    # Keeps the Parquet copy only if it reads back exactly as the parsed CSV, and remembers when it does not
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path)
+        same = read_parquet_copy(tmp_path)
+        kept = same.equals(df) and same.dtypes.equals(df.dtypes) and same.columns.equals(df.columns)
+    except (ValueError, TypeError, ImportError, OSError):
+        kept = False
+    if kept:
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+        path.with_suffix(".csv-only").touch()
+
+
+def read_snapshot(digest, **kwargs):
+    # Dataframe of a snapshot, from its Parquet copy if there is one
+    if not HAS_PYARROW:
+        return pd.read_csv(snapshot_path(digest), **kwargs)
+    path = parquet_path(digest, kwargs)
+    if path.exists():
+        return read_parquet_copy(path)
+    df = pd.read_csv(snapshot_path(digest), **kwargs)
+    if not path.with_suffix(".csv-only").exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        save_parquet_copy(df, path)
+    return df
+
+
+def read_pinned_sheet(sheet_id, sheet_name, manifest_file, **kwargs):
+    tabs = read_manifest(manifest_file)["tabs"]
+    key = tab_key(sheet_id, sheet_name)
+    assert key in tabs, f"{key} is not in {manifest_file}, take a new snapshot (see snapshot_sheets.py)"
+    verify_snapshot(tabs[key])
+    return read_snapshot(tabs[key], **kwargs)
+
+
+def read_sheet(sheet_id, sheet_name, **kwargs):
+    # Same as pd.read_csv(sheet_url(sheet_id, sheet_name), **kwargs), from the cached copy if EXPLORER_SHEET_CACHE is set.
+    if MANIFEST_FILE:
+        return read_pinned_sheet(sheet_id, sheet_name, MANIFEST_FILE, **kwargs)
+    if RECORD_FILE:
+        digest = store_snapshot(sheet_data(sheet_id, sheet_name))
+        record_tab(sheet_id, sheet_name, digest)
+        return read_snapshot(digest, **kwargs)
+    if SHEET_CACHE_DIR:
+        return pd.read_csv(download_sheet(sheet_id, sheet_name, SHEET_CACHE_DIR), **kwargs)
+    return pd.read_csv(sheet_url(sheet_id, sheet_name), **kwargs)
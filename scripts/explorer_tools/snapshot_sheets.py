@@ -0,0 +1,148 @@
+"""Take snapshots of the Google Sheets tabs that explorer generators read, and check them.
+
+Snapshots every tab in SHEETS (the tabs the poverty and inequality generators read), or the tabs given as
+<sheet id>/<tab>, into the snapshots folder, and writes a new manifest with their hashes,
+.cache/sheet-snapshots/manifest-<time>.json by default (see sheets.py). No generator is run. With --refresh, the tabs of an
+existing manifest are downloaded again into a new manifest instead, reporting the tabs that changed. With --verify, the
+snapshots of a manifest are checked to be there and unchanged.
+
+Builds pinned to a manifest read the tabs from its snapshots only, and don't need the network. A generator reading a tab
+that is not in SHEETS fails when pinned: add the tab to SHEETS and take a new snapshot.
+
+Usage:
+
+    python -m scripts.explorer_tools.snapshot_sheets
+    python -m scripts.explorer_tools.snapshot_sheets 17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8/povlines_abs
+    python -m scripts.explorer_tools.snapshot_sheets --refresh .cache/sheet-snapshots/manifest-20240101T000000Z.json
+    python -m scripts.explorer_tools.snapshot_sheets --verify .cache/sheet-snapshots/manifest-20240101T000000Z.json
+    EXPLORER_SHEET_MANIFEST=.cache/sheet-snapshots/manifest-20240101T000000Z.json python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from .sheets import (
+    SNAPSHOTS_DIR,
+    fetch_sheet,
+    new_manifest,
+    read_manifest,
+    sheet_data,
+    store_snapshot,
+    tab_key,
+    verify_snapshot,
+    write_manifest,
+)
+
+# Tabs read by the generators in scripts/poverty-inequality-explorers, by sheet
+SHEETS = {
+    # World Bank PIP
+    "17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8": [
+        "deciles10",
+        "deciles9",
+        "income_aggregation",
+        "povlines_abs",
+        "povlines_rel",
+        "survey_type",
+        "table",
+    ],
+    # World Bank PIP, comparison of PPP versions
+    "1mR0LPEGlY-wCp1q9lNTlDbVIG65JazKvHL16my9tH8Y": [
+        "povlines_both",
+        "povlines_ppp2011",
+        "povlines_ppp2017",
+        "povlines_rel",
+        "survey_type",
+    ],
+    # World Inequality Database
+    "18T5IGnpyJwb8KL9USYvME6IaLEcYIo26ioHCpkDnwRQ": [
+        "deciles10",
+        "deciles9",
+        "income_aggregation",
+        "tables",
+        "top_pct",
+        "welfare",
+    ],
+    # Luxembourg Income Study
+    "1UFdwB1iBpP2tEP6GtxCHvW1GGhjsFflh42FWR80rYIg": [
+        "deciles10",
+        "deciles9",
+        "equivalence_scales",
+        "income_aggregation",
+        "povlines_abs",
+        "povlines_rel",
+        "tables",
+        "top_pct",
+        "welfare",
+    ],
+    # Multi-source explorers
+    "1wcFsNZCEn_6SJ05BFkXKLUyvCrnigfR8eeemGKgAYsI": [
+        "all_the_tables",
+        "deciles10",
+        "deciles9",
+        "merged_tables",
+        "source_checkbox",
+    ],
+}
+
+
+def default_tabs():
+    return [tab_key(sheet_id, sheet_name) for sheet_id, sheet_names in SHEETS.items() for sheet_name in sheet_names]
+
+
+def manifest_name():
+    return f"manifest-{new_manifest()['created'].replace('-', '').replace(':', '')}.json"
+
+
+def snapshot_tabs(keys, manifest_file, fetch=sheet_data, old_tabs=None):
+    # Stores every tab (given as <sheet id>/<tab>) and writes their hashes to a new manifest, reporting the tabs that
+    # changed since old_tabs
+    manifest = new_manifest()
+    for key in keys:
+        sheet_id, sheet_name = key.split("/", 1)
+        print(f"📸 {key}")
+        manifest["tabs"][key] = store_snapshot(fetch(sheet_id, sheet_name))
+        if old_tabs is not None and manifest["tabs"][key] != old_tabs[key]:
+            print(f"✏️ {key} changed")
+    write_manifest(manifest, manifest_file)
+
+
+def refresh_manifest(old_file, manifest_file):
+    old_tabs = read_manifest(old_file)["tabs"]
+    # Download again, even if EXPLORER_SHEET_CACHE is set
+    snapshot_tabs(old_tabs, manifest_file, fetch=fetch_sheet, old_tabs=old_tabs)
+
+
+def verify_manifest(manifest_file):
+    tabs = read_manifest(manifest_file)["tabs"]
+    for digest in tabs.values():
+        verify_snapshot(digest)
+    print(f"✅ The {len(tabs)} tabs of {manifest_file} are in {SNAPSHOTS_DIR} and unchanged")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("tabs", nargs="*", help="Tabs to snapshot, as <sheet id>/<tab> (default: all the tabs in SHEETS)")
+    parser.add_argument("--manifest", type=Path, help="Manifest to write (default: a new one in the snapshots folder)")
+    parser.add_argument("--refresh", type=Path, metavar="MANIFEST", help="Download the tabs of a manifest again")
+    parser.add_argument("--verify", type=Path, metavar="MANIFEST", help="Check the snapshots of a manifest")
+    args = parser.parse_args()
+
+    if args.verify:
+        verify_manifest(args.verify)
+        sys.exit(0)
+
+    manifest_file = args.manifest or SNAPSHOTS_DIR / manifest_name()
+    assert not manifest_file.exists(), f"{manifest_file} already exists, manifests are never overwritten"
+    if args.refresh:
+        refresh_manifest(args.refresh, manifest_file)
+    else:
+        for key in args.tabs:
+            assert "/" in key, f"{key} is not a tab, give it as <sheet id>/<tab>"
+        snapshot_tabs(args.tabs or default_tabs(), manifest_file)
+    print(f"📸 {len(read_manifest(manifest_file)['tabs'])} tabs snapshotted in {manifest_file}")
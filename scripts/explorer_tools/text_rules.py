@@ -0,0 +1,78 @@
+"""Rewrite texts of explorers (notes, subtitles, ...) with a table of rules, in one pass over each column.
+
+Rules are (text, replacement) pairs of literal texts. rewrite_texts() compiles all the rules of a column into one regular
+expression, so that each text is scanned once for all of them, and rewrites each distinct text of the column only once.
+It then reports how many cells each rule changed, so that rules that no longer match anything are easy to spot:
+
+    NOTE_RULES = [
+        ("Depending on the country and year, the data relates to consumption.", "The data relates to consumption."),
+        ("Depending on the country and year, it relates to consumption.", "It relates to consumption."),
+    ]
+    df_graphers["note"] = rewrite_texts(df_graphers["note"], NOTE_RULES)
+
+Replacements are not rewritten again by other rules, and where a text to replace contains another one, the longer text
+is replaced.
+
+A column built in chunks (e.g. the views of each survey type in turn) is rewritten chunk by chunk, adding up the cells
+each rule changed, and reported once at the end:
+
+    note_cells = {}
+    for views in ...:
+        views["note"] = rewrite_texts(views["note"], NOTE_RULES, report=False, cells=note_cells)
+    report_rewrites("note", note_cells)
+"""
+
+import re
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rules):
+    texts = [text for text, _ in rules]
+    assert len(set(texts)) == len(texts), "Texts are replaced by more than one rule"
+    # Longer texts first, so that a text containing another one is replaced as a whole
+    return re.compile("|".join(re.escape(text) for text in sorted(texts, key=len, reverse=True)))
+
+
+def report_rewrites(name, cells):
+    # Reports how many cells of the column each rule changed
+    for rule_text, count in cells.items():
+        if count:
+            print(f"✏️ {name}: {count} cells with '{rule_text}'")
+        else:
+            print(f"⚠️ {name}: no cells with '{rule_text}'")
+
+
+def rewrite_texts(texts, rules, report=True, cells=None):
+    # Returns the texts with the rules applied, reporting how many cells each rule changed (added to `cells`, if given)
+    rules = tuple(rules)
+    pattern = compile_rules(rules)
+    replacements = dict(rules)
+
+    counts = texts.value_counts()
+    rewritten = {}
+    if cells is None:
+        cells = {}
+    for rule_text in replacements:
+        cells.setdefault(rule_text, 0)
+    for text, count in counts.items():
+        if not isinstance(text, str):
+            continue
+        matched = set()
+
+        def replace(match):
+            matched.add(match.group(0))
+            return replacements[match.group(0)]
+
+        rewritten[text] = pattern.sub(replace, text)
+        for rule_text in matched:
+            cells[rule_text] += count
+
+    if report:
+        report_rewrites(texts.name, cells)
+
+    changed = {text: new_text for text, new_text in rewritten.items() if new_text != text}
+    texts = texts.copy()
+    rewrite = texts.isin(changed)
+    texts[rewrite] = texts[rewrite].map(changed)
+    return texts
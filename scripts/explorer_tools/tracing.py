@@ -0,0 +1,253 @@
+"""Tracing of the stages of explorer generators.
+
+Set EXPLORER_TRACE to the path of a JSON Lines file to record, for every stage of a generator, its wall time, CPU time,
+increase in peak memory (RSS) and number of rows. A summary table is printed when the generator finishes:
+
+    EXPLORER_TRACE=trace.jsonl python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+Stages are either spans, which can be nested:
+
+    with span("graphers", rows=lambda: len(df_graphers)):
+        ...
+
+or consecutive stages, which suit `# %%` cells: each stage ends when the next one starts, or when the script ends.
+
+    stage("tables", rows=lambda: len(df_tables))
+
+`rows` is only evaluated when the stage ends. When EXPLORER_TRACE is not set, span() and stage() do nothing.
+
+Set EXPLORER_MEMORY_LIMIT to a number of MB to make generators fail when their peak memory (RSS) goes above it. It is
+checked at the end of every stage, traced or not, and the generator stops with the name of the stage that went above it
+(raising MemoryLimitExceeded, or with exit status 1 for the last stage):
+
+    EXPLORER_MEMORY_LIMIT=400 EXPLORER_CHUNK_ROWS=500 python -m scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer
+
+    python scripts/explorer_tools/tracing.py trace.jsonl  # summary of all runs in a trace file
+
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where peak memory is not traced
+    resource = None
+
+TRACE_FILE = os.environ.get("EXPLORER_TRACE")
+MEMORY_LIMIT_MB = float(os.environ.get("EXPLORER_MEMORY_LIMIT") or 0)
+
+
+def peak_rss_mb():
+    # On Linux, the peak memory of this process is VmHWM. ru_maxrss is kept across exec, so it would include the peak
+    # memory of the process that started the generator (e.g. a test runner).
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak_rss / 1024**2 if sys.platform == "darwin" else peak_rss / 1024
+
+
+class Span:
+    def __init__(self, tracer, name, rows, is_stage=False):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self.is_stage = is_stage
+
+    def __enter__(self):
+        # Stages are consecutive, and not nested in each other: only spans go on the stack, nested in the current stage
+        if self.is_stage:
+            self.path = self.name
+        else:
+            self.path = "/".join([*self.tracer.path(), self.name])
+            self.tracer.stack.append(self)
+        self.start_rss = peak_rss_mb()
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        end_rss = peak_rss_mb()
+        self.tracer.record(
+            {
+                "span": self.path,
+                "start_s": round(self.start_wall - self.tracer.start, 6),
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "peak_rss_delta_mb": round(end_rss - self.start_rss, 3) if end_rss is not None else None,
+                "rows": self.count_rows(),
+            }
+        )
+        if not self.is_stage:
+            assert self.tracer.stack and self.tracer.stack[-1] is self, (
+                f"Span {self.path} ended before the spans nested in it: {[span.path for span in self.tracer.stack]}"
+            )
+            self.tracer.stack.pop()
+
+    def count_rows(self):
+        # Rows can be given as a number, or as a function evaluated at the end of the span
+        if callable(self.rows):
+            try:
+                return self.rows()
+            except Exception:
+                return None
+        return self.rows
+
+
+class NoSpan:
+    # Returned when tracing is off
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NO_SPAN = NoSpan()
+
+
+class Tracer:
+    def __init__(self, trace_file, script):
+        self.trace_file = Path(trace_file)
+        self.script = script
+        self.run = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.start = time.perf_counter()
+        self.stack = []
+        self.records = []
+        self.current_stage = None
+
+    def record(self, record):
+        record = {"script": self.script, "run": self.run, **record}
+        self.records.append(record)
+        with open(self.trace_file, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def path(self):
+        # Names of the current stage and of the open spans
+        stage = [self.current_stage.name] if self.current_stage is not None else []
+        return stage + [span.name for span in self.stack]
+
+    def span(self, name, rows=None):
+        return Span(self, name, rows)
+
+    def stage(self, name, rows=None):
+        self.end_stage()
+        self.current_stage = Span(self, name, rows, is_stage=True).__enter__()
+
+    def end_stage(self):
+        if self.current_stage is not None:
+            self.current_stage.__exit__(None, None, None)
+            self.current_stage = None
+
+    def close(self):
+        self.end_stage()
+        print_summary(self.records)
+        print(f"⏱️ Trace written to {self.trace_file}")
+
+
+class MemoryLimitExceeded(Exception):
+    pass
+
+
+def check_memory(stage_name, at_exit=False):
+    # Stops the generator if its peak memory went above EXPLORER_MEMORY_LIMIT
+    global _memory_limit_exceeded
+    peak_rss = peak_rss_mb()
+    if not MEMORY_LIMIT_MB or peak_rss is None or peak_rss <= MEMORY_LIMIT_MB or _memory_limit_exceeded:
+        return
+    message = (
+        f"Peak memory of {peak_rss:.1f}MB is above EXPLORER_MEMORY_LIMIT ({MEMORY_LIMIT_MB:.0f}MB) at the end of stage "
+        f"{stage_name}"
+    )
+    if not at_exit:
+        # The generator stops as on any error: exit handlers still write the trace and the sheet manifest
+        _memory_limit_exceeded = True
+        raise MemoryLimitExceeded(message)
+    # Exceptions raised at exit don't change the exit status. This check is registered before the other exit handlers of
+    # the explorer tools (the tracer, the sheet manifest), so it only runs once they are done.
+    print(f"🛑 {message}")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(1)
+
+
+_current_stage = None
+_memory_limit_exceeded = False
+if MEMORY_LIMIT_MB:
+    # Registered before the tracer, so that it runs after the tracer has written the last stage
+    atexit.register(lambda: check_memory(_current_stage, at_exit=True))
+
+_tracer = None
+if TRACE_FILE:
+    _tracer = Tracer(TRACE_FILE, Path(sys.argv[0]).stem)
+    atexit.register(_tracer.close)
+
+
+def span(name, rows=None):
+    if _tracer is None:
+        return NO_SPAN
+    return _tracer.span(name, rows)
+
+
+def stage(name, rows=None):
+    global _current_stage
+    if _current_stage is not None:
+        check_memory(_current_stage)
+    _current_stage = name
+    if _tracer is not None:
+        _tracer.stage(name, rows)
+
+
+def print_summary(records):
+    if not records:
+        return
+    # Spans are recorded when they end, show them in the order they started (parents before their nested spans)
+    records = sorted(records, key=lambda record: record["start_s"])
+    print(f"{'stage':<40}{'wall':>10}{'cpu':>10}{'peak rss Δ':>12}{'rows':>10}")
+    for record in records:
+        depth = record["span"].count("/")
+        name = "  " * depth + record["span"].rsplit("/", 1)[-1]
+        rss = f"{record['peak_rss_delta_mb']:.1f}MB" if record["peak_rss_delta_mb"] is not None else "-"
+        rows = record["rows"] if record["rows"] is not None else "-"
+        print(f"{name:<40}{record['wall_s']:>9.2f}s{record['cpu_s']:>9.2f}s{rss:>12}{rows:>10}")
+    # Nested spans are part of their parents' time
+    top_level = [record for record in records if "/" not in record["span"]]
+    print(
+        f"{'total':<40}{sum(r['wall_s'] for r in top_level):>9.2f}s{sum(r['cpu_s'] for r in top_level):>9.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("trace_file", type=Path, help="JSON Lines file written by a traced generator")
+    args = parser.parse_args()
+
+    runs = {}
+    with open(args.trace_file, "r") as f:
+        for line in f:
+            record = json.loads(line)
+            runs.setdefault((record["script"], record["run"]), []).append(record)
+    for (script, run), records in runs.items():
+        print(f"\n{script} ({run})")
+        print_summary(records)
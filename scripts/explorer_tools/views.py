@@ -0,0 +1,119 @@
+"""Find views of explorers by the values of their controls, e.g. to set the default view.
+
+A ViewIndex maps every combination of values of some columns of the graphers table (usually controls, but any column
+such as ySlugs or tableSlug works) to the positions of the views that have them. Once it is built, finding the views
+with given values is a dictionary lookup, however many views there are. resolve() returns the one view with the given
+values, and fails with a report of the closest views when there is none, or of the matching views when there are many.
+
+set_default_view() marks the one view with the given values as the default view of an explorer:
+
+    set_default_view(
+        df_graphers,
+        {
+            "Indicator Dropdown": "Share in poverty",
+            "Poverty line Dropdown": "$2.15 per day: International Poverty Line",
+        },
+    )
+
+For graphers built and written in chunks, DefaultView marks the view in the chunk that has it, and check() makes sure
+that exactly one view of all the chunks had the given values:
+
+    default_view = DefaultView({"ySlugs": "headcount_ratio_215", "tableSlug": "income_consumption_2017"})
+    for survey in range(len(survey_type)):
+        write_block(f, default_view.mark(survey_views(survey)), ...)
+    default_view.check()
+
+"""
+
+import pandas as pd
+
+# Columns shown to describe views in reports
+REPORT_COLUMNS = ["title", "ySlugs", "tableSlug"]
+# Number of views shown in reports
+REPORT_VIEWS = 5
+
+
+def view_key(values):
+    # Missing values (NaN, None, pd.NA) are all None, so that views without a choice can be found too
+    return tuple(None if pd.isnull(value) else value for value in values)
+
+
+class ViewIndex:
+    def __init__(self, graphers, columns):
+        unknown = [column for column in columns if column not in graphers.columns]
+        assert not unknown, f"Columns not in the graphers table: {unknown}"
+        self.graphers = graphers
+        self.columns = list(columns)
+        self.positions = {}
+        for position, values in enumerate(zip(*(graphers[column].tolist() for column in self.columns))):
+            self.positions.setdefault(view_key(values), []).append(position)
+
+    def key(self, view):
+        assert set(view) == set(self.columns), f"Views are indexed by {self.columns}, not by {list(view)}"
+        return view_key(view[column] for column in self.columns)
+
+    def find(self, view):
+        # Positions of the views with the given values
+        return self.positions.get(self.key(view), [])
+
+    def resolve(self, view):
+        # Position of the one view with the given values
+        positions = self.find(view)
+        if len(positions) != 1:
+            print(self.report(view, positions))
+        assert len(positions) == 1, f"{len(positions)} views match {view} instead of one"
+        return positions[0]
+
+    def closest(self, view):
+        # Keys of the views with the most values in common with the given ones
+        key = self.key(view)
+        common = {other: sum(a == b for a, b in zip(key, other)) for other in self.positions}
+        most = max(common.values(), default=0)
+        return [other for other, count in common.items() if count == most]
+
+    def report(self, view, positions):
+        lines = [f"🛑 {len(positions)} views match {view} instead of one"]
+        if positions:
+            lines.append("Matching views:")
+            shown = positions[:REPORT_VIEWS]
+        else:
+            for column in self.columns:
+                if view_key([view[column]])[0] not in {key[self.columns.index(column)] for key in self.positions}:
+                    lines.append(f"  No view has {column} = {view[column]!r}")
+            lines.append("Closest views:")
+            shown = [position for key in self.closest(view) for position in self.positions[key]][:REPORT_VIEWS]
+        columns = self.columns + [column for column in REPORT_COLUMNS if column in self.graphers and column not in view]
+        lines.append(self.graphers.iloc[shown][columns].to_string())
+        return "\n".join(lines)
+
+
+def set_default_view(graphers, view, column="defaultView"):
+    # Marks the one view with the given values as the default view (adding the column last if it is not there yet)
+    position = ViewIndex(graphers, list(view)).resolve(view)
+    if column not in graphers.columns:
+        graphers[column] = None
+    graphers.iloc[position, graphers.columns.get_loc(column)] = "true"
+    print(f"📌 Default view: {graphers[REPORT_COLUMNS[0]].iloc[position]}")
+    return position
+
+
+class DefaultView:
+    def __init__(self, view, column="defaultView"):
+        self.view = view
+        self.column = column
+        self.titles = []
+
+    def mark(self, graphers):
+        # Marks the views of one chunk with the given values as the default view, and returns the chunk
+        positions = ViewIndex(graphers, list(self.view)).find(self.view)
+        if self.column not in graphers.columns:
+            graphers[self.column] = None
+        for position in positions:
+            graphers.iloc[position, graphers.columns.get_loc(self.column)] = "true"
+            self.titles.append(graphers[REPORT_COLUMNS[0]].iloc[position])
+        return graphers
+
+    def check(self):
+        # The chunks are written as they are marked, so this can only fail once they have all been written
+        assert len(self.titles) == 1, f"{len(self.titles)} views match {self.view} instead of one: {self.titles}"
+        print(f"📌 Default view: {self.titles[0]}")
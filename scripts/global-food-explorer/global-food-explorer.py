@@ -9,11 +9,15 @@
 # %%
 from string import Template
 import pandas as pd
-import numpy as np
 import textwrap
 from os import path
 import sys
 
+sys.path.append(path.join(path.dirname(path.abspath(__file__)), ".."))
+from explorer_tools.ordering import sort_views
+from explorer_tools.tracing import stage
+from explorer_tools.views import set_default_view
+
 # Latest ETL version of the food explorer (https://github.com/owid/etl/tree/master/etl/steps/data/explorers/faostat/).
 VERSION = "latest"
 
@@ -23,7 +27,11 @@ YEAR = "2024"
 
 outfile = "../../explorers/global-food.explorer.tsv"
 
-default_view = '`Food Dropdown` == "Maize (corn)" and `Metric Dropdown` == "Production" and `Per Capita Checkbox` == "false"'
+default_view = {
+    "Food Dropdown": "Maize (corn)",
+    "Metric Dropdown": "Production",
+    "Per Capita Checkbox": "false",
+}
 
 DATA_FILES_URL = f"https://catalog.ourworldindata.org/explorers/faostat/{VERSION}/food_explorer/"
 
@@ -55,6 +63,7 @@ def table_def(food):
 
 
 # %%
+stage("read", rows=lambda: len(views_df))
 with open("global-food-explorer.template.tsv", "r") as templateFile:
     template = Template(templateFile.read())
 foods_df = pd.read_csv("foods.csv", index_col="slug", dtype=str)
@@ -92,9 +101,11 @@ if len(symmetric_diff) > 0:
     )
 
 # %%
+stage("graphers", rows=lambda: len(graphers))
 # merge on column: _tag
 graphers = views_df.merge(foods).apply(substitute_title, axis=1)
-graphers = graphers.drop(columns="_tag").sort_values(by="Food Dropdown", kind="stable")
+# foods are listed alphabetically in the dropdown
+graphers = sort_views(graphers.drop(columns="_tag"), {"Food Dropdown": sorted(foods["Food Dropdown"].unique())})
 # drop duplicates introduced by the tag merge
 graphers = graphers.drop_duplicates()
 
@@ -136,18 +147,10 @@ if len(remaining_cols) > 0:
 # %%
 # Mark the default view with defaultView=true. This is always the last column.
 if default_view is not None:
-    default_view_mask = graphers.eval(default_view)
-    default_view_count = len(graphers[default_view_mask])
-    if default_view_count != 1:
-        print(
-            f"🛑 fatal! Default view ({default_view}) should match exactly one view, but matches {default_view_count} views:"
-        )
-        print(graphers[default_view_mask])
-        sys.exit(1)
-    print(f"📌 Default view:\n{graphers[default_view_mask]}")
-    graphers["defaultView"] = np.where(default_view_mask, "true", None)
+    set_default_view(graphers, default_view)
 
 # %%
+stage("write", rows=lambda: len(graphers))
 graphers_tsv = graphers.to_csv(sep="\t", index=False)
 graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
 
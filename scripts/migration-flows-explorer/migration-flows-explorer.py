@@ -1,13 +1,32 @@
 # %%
 from string import Template
 import pandas as pd
-from os import path
+from os import path, makedirs, environ
+import csv
+import glob
+import hashlib
+import io
+import json
+import sys
 import textwrap
+import urllib.error
+import urllib.request
+
+sys.path.append(path.join(path.dirname(path.abspath(__file__)), ".."))
+from explorer_tools.shared_text import write_shared_text_copy
+from explorer_tools.tracing import stage
 
 outfile = "../../explorers/migration-flows.explorer.tsv"
 
 datafile_url = "https://raw.githubusercontent.com/owid/importers/migration/migration/output/Migration_matrix.csv"
 
+# Offline mode: point MIGRATION_MATRIX_FILE to a local copy of the data file, and it is used instead of datafile_url.
+datafile_source = environ.get("MIGRATION_MATRIX_FILE", datafile_url)
+datafile_is_local = "MIGRATION_MATRIX_FILE" in environ
+
+# We only need the header and the entities of the data file, which are cached here, keyed by the content hash of the data file.
+cache_dir = ".cache"
+
 # %%
 
 
@@ -15,68 +34,144 @@ def slug(str):
     return str.replace(" ", "").lower()
 
 
-def substitute_title(row, country_name):
+def compile_template(template):
+    # Splits a template string into literal text and placeholder names once, so it can be filled in for all countries at the same time.
+    pieces = []
+    last_end = 0
+    for match in Template.pattern.finditer(template):
+        if match.group("invalid") is not None:
+            raise ValueError(f"Invalid placeholder in template: {template!r}")
+        pieces.append((False, template[last_end : match.start()]))
+        if match.group("escaped") is not None:
+            pieces.append((False, "$"))
+        else:
+            pieces.append((True, match.group("named") or match.group("braced")))
+        last_end = match.end()
+    pieces.append((False, template[last_end:]))
+    return pieces
+
+
+def expand_per_country(templates_df, countries):
     # Rows can include placeholders like ${country} and ${country_slug}, which will be replaced with the actual country name here.
-    country_slug = slug(country_name)
-    for key in row.keys():
-        if isinstance(row[key], str):
-            template = Template(row[key])
-            row[key] = template.substitute(
-                country=country_name,
-                country_slug=country_slug,
-            )
-    return row
+    # All countries are cross-joined with all template rows, and every distinct template is compiled once and filled in for all its rows at once.
+    placeholders = pd.DataFrame(
+        {"country": countries, "country_slug": [slug(c) for c in countries]}
+    )
+    expanded = placeholders.merge(templates_df, how="cross")
+    for col in templates_df.columns:
+        values = expanded[col]
+        for template, idx in values.groupby(values, sort=False).groups.items():
+            substituted = ""
+            for is_placeholder, piece in compile_template(template):
+                if is_placeholder and piece not in placeholders.columns:
+                    raise KeyError(piece)
+                substituted = substituted + (
+                    expanded.loc[idx, piece] if is_placeholder else piece
+                )
+            expanded.loc[idx, col] = substituted
+    return expanded[templates_df.columns]
+
+
+def open_datafile(source, local):
+    if local:
+        return open(source, "rb")
+    return urllib.request.urlopen(source)
+
+
+def datafile_hash(source, local):
+    # Local copies are hashed in chunks, without touching the network. For remote files, GitHub's ETag already is a hash
+    # of the file contents, so we don't have to download the file to know whether our cached entities are still valid.
+    if not local:
+        with urllib.request.urlopen(urllib.request.Request(source, method="HEAD")) as response:
+            etag = response.headers.get("ETag")
+        if not etag:
+            return None
+        # Weak ETags start with W/ (str.removeprefix needs Python 3.9, and this script supports 3.8)
+        return (etag[2:] if etag.startswith("W/") else etag).strip('"')
+
+    assert path.exists(source), f"MIGRATION_MATRIX_FILE {source} does not exist"
+
+    sha = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def discover_datafile(source, local):
+    # Returns the column names of the data file, and the entities it contains (in order of appearance).
+    # Only the `entity` column is read, streaming through the file row by row, so this doesn't depend on the size of the data matrix.
+    try:
+        content_hash = datafile_hash(source, local)
+        cache_file = path.join(cache_dir, f"Migration_matrix-{content_hash}.json")
+    except urllib.error.URLError as e:
+        # Offline: the newest cached entities are the best we have, as the data file can't be downloaded either
+        cached_files = glob.glob(path.join(cache_dir, "Migration_matrix-*.json"))
+        if not cached_files:
+            raise
+        content_hash = None
+        cache_file = max(cached_files, key=path.getmtime)
+        print(f"⚠️ Could not check the data file ({e.reason}), using {cache_file} which may be outdated")
+    if path.exists(cache_file):
+        with open(cache_file, "r") as f:
+            cached = json.load(f)
+        print(f"🗃️ Using cached entities from {cache_file}")
+        return cached["columns"], cached["entities"]
+
+    with open_datafile(source, local) as f:
+        reader = csv.reader(io.TextIOWrapper(f, encoding="utf-8", newline=""))
+        columns = next(reader)
+        entity_idx = columns.index("entity")
+        # dicts keep insertion order, so this is equivalent to `unique()`
+        entities = {row[entity_idx]: None for row in reader if row}
+    entities = list(entities)
+
+    if content_hash:
+        makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, "w") as f:
+            json.dump({"columns": columns, "entities": entities}, f)
+
+    return columns, entities
 
 
 # %%
+stage("read", rows=lambda: len(available_entities))
 with open("migration-flows.template.tsv", "r") as templateFile:
     template = Template(templateFile.read())
 views_df = pd.read_csv("views-per-country.csv", dtype=str)
 column_defs_df = pd.read_csv("column-defs.tsv", sep="\t", dtype=str)
 
-datafile = pd.read_csv(datafile_url)
-available_entities = datafile["entity"].unique()
+datafile_columns, available_entities = discover_datafile(datafile_source, datafile_is_local)
 
 print(f"📑 Read {len(views_df.index)} different views")
 print(f"💾 Data file has {len(available_entities)} entities")
 
 # %%
-graphers_list = []
-
-for country in available_entities:
-    for (idx, row) in views_df.iterrows():
-        graphers_list.append(
-            substitute_title(
-                row.copy(),
-                country,
-            ),
-        )
-
-graphers = pd.DataFrame(columns=views_df.columns, data=graphers_list)
+stage("graphers", rows=lambda: len(graphers))
+graphers = expand_per_country(views_df, available_entities)
 
 print(f"📈 Generated {len(graphers.index)} views")
 
 # %%
-columns_list = [
-    {"slug": "year", "name": "Year", "type": "Year"},
-    {"slug": "entity", "name": "Country", "type": "EntityName"}
-]
-
-for country in available_entities:
-    for (idx, row) in column_defs_df.iterrows():
-        columns_list.append(
-            substitute_title(
-                row.copy(),
-                country,
-            ),
-        )
-
-columns = pd.DataFrame(columns=column_defs_df.columns, data=columns_list)
-
-for (idx, row) in columns.iterrows():
-    col_slug = row["slug"]
-    assert col_slug in datafile.columns, f"Column {col_slug} not found in data file"
+stage("columns", rows=lambda: len(columns))
+special_columns = pd.DataFrame(
+    columns=column_defs_df.columns,
+    data=[
+        {"slug": "year", "name": "Year", "type": "Year"},
+        {"slug": "entity", "name": "Country", "type": "EntityName"},
+    ],
+)
+columns = pd.concat(
+    [special_columns, expand_per_country(column_defs_df, available_entities)],
+    ignore_index=True,
+)
+
+missing_slugs = set(columns["slug"]) - set(datafile_columns)
+assert (
+    not missing_slugs
+), f"Columns not found in data file: {', '.join(sorted(missing_slugs))}"
 # %%
+stage("write", rows=lambda: len(graphers))
 graphers_tsv = graphers.to_csv(sep="\t", index=False)
 graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
 
@@ -96,3 +191,7 @@ with open(outfile, "w", newline="\n") as f:
     )
 
     print(f"💾 Explorer config written to {path.abspath(outfile)}")
+
+# %%
+# Optionally write a copy declaring the long `additionalInfo` texts only once, see explorer_tools/shared_text.py
+write_shared_text_copy(outfile)
@@ -0,0 +1,181 @@
+"""Load multidimensional indicator configs from multidimensional-indicators/*.yml.
+
+Configs are parsed with libyaml's C loader when it is available, validated, and cached as pickles in
+scripts/multidimensional-indicators/.cache/, keyed by the hash of the YAML file. Loading a config that didn't change since
+it was last loaded only reads the pickle back.
+
+Usage:
+
+    python scripts/multidimensional-indicators/multidim_config.py              # validate all configs
+    python scripts/multidimensional-indicators/multidim_config.py --benchmark  # compare cold and warm load times
+
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+MULTIDIM_DIR = Path(__file__).parent.parent.parent / "multidimensional-indicators"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# Bump this when the structure of the cached configs changes, to invalidate all caches.
+CACHE_VERSION = b"1"
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Length of the hash in the names of the cache files
+CACHE_HASH_LENGTH = 16
+
+# Roles an indicator can have in a view's `indicator_path`
+INDICATOR_AXES = {"y", "x", "size", "color"}
+
+
+def multidim_files(multidim_dir=MULTIDIM_DIR):
+    return sorted(multidim_dir.glob("*.yml"))
+
+
+def validate_config(config):
+    # Returns a list of errors in the structure of a config. Consistency between views and dimensions is checked by multidim_index.py.
+    if not isinstance(config, dict):
+        return ["config is not a mapping"]
+
+    errors = []
+    if not isinstance(config.get("name"), str):
+        errors.append("name: missing or not a string")
+    if not isinstance(config.get("dimensions"), list):
+        errors.append("dimensions: missing or not a list")
+    if not isinstance(config.get("views"), list):
+        errors.append("views: missing or not a list")
+    if errors:
+        return errors
+
+    for i, dimension in enumerate(config["dimensions"]):
+        if not isinstance(dimension, dict) or not isinstance(dimension.get("slug"), str):
+            errors.append(f"dimensions[{i}]: missing slug")
+            continue
+        if not isinstance(dimension.get("choices"), list) or not dimension["choices"]:
+            errors.append(f"dimensions[{i}] ({dimension['slug']}): missing choices")
+            continue
+        for j, choice in enumerate(dimension["choices"]):
+            if not isinstance(choice, dict) or not isinstance(choice.get("slug"), str):
+                # Unquoted slugs like 10 or 2.15 are parsed as numbers, and never match the (string) choices of views
+                errors.append(f"dimensions[{i}].choices[{j}]: slug missing or not a string")
+            elif not isinstance(choice.get("name"), str):
+                errors.append(f"dimensions[{i}].choices[{j}] ({choice['slug']}): missing name")
+
+    for i, view in enumerate(config["views"]):
+        if not isinstance(view, dict):
+            errors.append(f"views[{i}]: not a mapping")
+            continue
+        dimensions = view.get("dimensions")
+        if not isinstance(dimensions, dict) or not all(
+            isinstance(choice, str) for choice in dimensions.values()
+        ):
+            errors.append(f"views[{i}].dimensions: missing, or choices are not strings")
+        indicator_path = view.get("indicator_path")
+        # Empty indicator paths are structurally fine, multidim_index.py reports them
+        if not isinstance(indicator_path, dict):
+            errors.append(f"views[{i}].indicator_path: missing")
+        else:
+            for indicator_id, axis in indicator_path.items():
+                if not isinstance(indicator_id, int) or axis not in INDICATOR_AXES:
+                    errors.append(f"views[{i}].indicator_path: invalid entry {indicator_id!r}: {axis!r}")
+        if "config" in view and not isinstance(view["config"], dict):
+            errors.append(f"views[{i}].config: not a mapping")
+
+    return errors
+
+
+def parse_config(data, file):
+    config = yaml.load(data, Loader=YAML_LOADER)
+    errors = validate_config(config)
+    if errors:
+        raise ValueError(f"Invalid multidim config {file}:\n" + "\n".join(errors))
+    return config
+
+
+def load_config(file, cache_dir=CACHE_DIR):
+    # Returns the parsed and validated config, from the cache if the file didn't change.
+    file = Path(file)
+    data = file.read_bytes()
+    file_hash = hashlib.sha256(CACHE_VERSION + data).hexdigest()
+    cache_file = cache_dir / f"{file.stem}-{file_hash[:CACHE_HASH_LENGTH]}.pickle"
+
+    if cache_file.exists():
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+
+    config = parse_config(data, file)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Only caches of this file: the cache of e.g. gdp-per-capita.yml also starts with "gdp-"
+    stale_cache_name = re.compile(re.escape(file.stem) + f"-[0-9a-f]{{{CACHE_HASH_LENGTH}}}\\.pickle")
+    for stale_cache_file in cache_dir.glob(f"{file.stem}-*.pickle"):
+        if stale_cache_name.fullmatch(stale_cache_file.name):
+            stale_cache_file.unlink()
+    # Write atomically, so that an interrupted write never leaves a broken cache behind
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_file)
+
+    return config
+
+
+def benchmark(files, repeat=5):
+    # Prints the best of `repeat` load times per file: pure-Python parser, C parser without cache (cold) and with cache (warm).
+    def best_time(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    print(f"{'file':<30}{'views':>8}{'python':>12}{'cold':>12}{'warm':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file in files:
+            data = file.read_bytes()
+            cache_dir = Path(tmp_dir)
+            python_ms = best_time(lambda: yaml.load(data, Loader=yaml.SafeLoader))
+            cold_ms = best_time(lambda: parse_config(data, file))
+            views = len(load_config(file, cache_dir)["views"])
+            warm_ms = best_time(lambda: load_config(file, cache_dir))
+            print(f"{file.name:<30}{views:>8}{python_ms:>10.1f}ms{cold_ms:>10.1f}ms{warm_ms:>10.1f}ms")
+    if YAML_LOADER is yaml.SafeLoader:
+        print("⚠️ libyaml is not available, cold loads use the pure-Python parser")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("files", nargs="*", type=Path, help="Configs to load (default: all)")
+    parser.add_argument("--benchmark", action="store_true", help="Compare cold and warm load times")
+    args = parser.parse_args()
+
+    files = args.files or multidim_files()
+    if args.benchmark:
+        benchmark(files)
+        sys.exit(0)
+
+    failed = False
+    for file in files:
+        try:
+            config = load_config(file)
+            print(f"{file.name}: {len(config['dimensions'])} dimensions, {len(config['views'])} views")
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
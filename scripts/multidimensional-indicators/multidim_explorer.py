@@ -0,0 +1,282 @@
+"""Convert multidimensional indicator configs to explorer TSVs and back.
+
+Dimensions become control columns (`<dimension name> Dropdown`, `Radio` or `Checkbox`) with the names of the choices as
+values, the indicators of `indicator_path` become `yVariableIds` (and `xVariableId`, `sizeVariableId`, `colorVariableId`),
+the `config` of a view becomes the other columns of its row (nested values as JSON), and `name` becomes `explorerTitle`.
+
+Only what both formats can express survives a round trip. Explorers have no slugs or descriptions, so converting an
+explorer gives slugs derived from the names, and the order of choices is the order in which they first appear in the
+graphers table. The control type of each dimension is kept in the config as `control`, and controls that are empty in
+every row are left out. Explorers without a graphers table or with catalog paths instead of variable ids can't be
+converted, and their other header fields and tables are not converted.
+
+Usage:
+
+    python scripts/multidimensional-indicators/multidim_explorer.py to-explorer multidimensional-indicators/poverty.yml -o poverty.explorer.tsv
+    python scripts/multidimensional-indicators/multidim_explorer.py to-config explorers/conflict-data.explorer.tsv -o conflict-data.yml
+    python scripts/multidimensional-indicators/multidim_explorer.py check explorers/conflict-data.explorer.tsv  # round trip
+
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+from pathlib import Path
+
+import yaml
+
+from multidim_config import load_config, validate_config
+
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+CONTROL_TYPES = ["Dropdown", "Radio", "Checkbox"]
+CONTROL_COLUMN_RE = re.compile(rf"^(.+) ({'|'.join(CONTROL_TYPES)})$")
+
+# Explorer columns of the indicators of each axis of `indicator_path`. Only y can have several indicators.
+AXIS_COLUMNS = {"y": "yVariableIds", "x": "xVariableId", "size": "sizeVariableId", "color": "colorVariableId"}
+
+# Dimensions without a `control` are shown as radio buttons if they have up to this many choices, otherwise as a dropdown.
+RADIO_MAX_CHOICES = 3
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def format_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def parse_value(text):
+    # Inverse of format_value, for the values explorers use: booleans, integers, strings, and JSON for nested values.
+    if text in ("true", "false"):
+        return text == "true"
+    if re.fullmatch(r"-?[1-9][0-9]*|0", text):
+        return int(text)
+    if text.startswith(("{", "[")):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    return text
+
+
+def control_column(dimension):
+    control = dimension.get("control") or ("Radio" if len(dimension["choices"]) <= RADIO_MAX_CHOICES else "Dropdown")
+    assert control in CONTROL_TYPES, f"Unknown control {control!r} of dimension {dimension['slug']}"
+    return f"{dimension['name']} {control}"
+
+
+def write_explorer(config, f):
+    # Writes the explorer TSV of a config to the (text) file f, one row per view.
+    choice_names = {
+        dimension["slug"]: {choice["slug"]: choice["name"] for choice in dimension["choices"]}
+        for dimension in config["dimensions"]
+    }
+    axes = [axis for axis in AXIS_COLUMNS if any(axis in view["indicator_path"].values() for view in config["views"])]
+    # Config columns in order of first appearance
+    config_columns = list(dict.fromkeys(key for view in config["views"] for key in view.get("config", {})))
+    columns = (
+        [AXIS_COLUMNS[axis] for axis in axes]
+        + [control_column(dimension) for dimension in config["dimensions"]]
+        + config_columns
+    )
+
+    f.write(f"explorerTitle\t{config['name']}\n")
+    f.write("graphers\n")
+    f.write("\t" + "\t".join(columns) + "\n")
+    for i, view in enumerate(config["views"]):
+        ids = {axis: [] for axis in axes}
+        for indicator_id, axis in view["indicator_path"].items():
+            ids[axis].append(str(indicator_id))
+        for axis in axes:
+            assert axis == "y" or len(ids[axis]) <= 1, f"views[{i}] has several {axis} indicators"
+        row = [" ".join(ids[axis]) for axis in axes]
+        # Views can leave out dimensions that don't apply to them, like explorers can leave controls empty
+        row += [choice_names[slug].get(view["dimensions"].get(slug), "") for slug in choice_names]
+        view_config = view.get("config", {})
+        row += [format_value(view_config[key]) if key in view_config else "" for key in config_columns]
+        f.write("\t" + "\t".join(row) + "\n")
+
+
+def read_explorer(f):
+    # Returns the header fields of an explorer TSV, the columns of its graphers table, and an iterator over the rows of the
+    # graphers table (as dicts of non-empty cells). The file is read line by line. Explorers without a graphers table (with
+    # a single chart) have no columns (None).
+    header = {}
+    lines = iter(f)
+    for line in lines:
+        line = line.rstrip("\n")
+        if line == "graphers":
+            break
+        if line and not line.startswith("\t"):
+            key, *values = line.split("\t")
+            header[key] = "\t".join(values).rstrip("\t")
+    columns_line = next(lines, None)
+    if columns_line is None:
+        return header, None, iter([])
+    columns = columns_line.rstrip("\n").split("\t")[1:]
+
+    def rows():
+        for line in lines:
+            if not line.startswith("\t"):
+                break
+            cells = line.rstrip("\n").split("\t")[1:]
+            yield {column: cell for column, cell in zip(columns, cells) if cell.strip()}
+
+    return header, columns, rows()
+
+
+def read_config(f):
+    # Returns the config of the explorer TSV in the (text) file f.
+    header, columns, rows = read_explorer(f)
+    assert columns is not None, "the explorer has no graphers table"
+    controls = []
+    for column in columns:
+        match = CONTROL_COLUMN_RE.match(column)
+        if match:
+            controls.append((column, match.group(1), match.group(2)))
+    id_columns = {column: axis for axis, column in AXIS_COLUMNS.items()}
+
+    choices = {column: {} for column, _, _ in controls}
+    views = []
+    for row in rows:
+        view = {"dimensions": {}, "indicator_path": {}}
+        for column, name, _ in controls:
+            if column in row:
+                choice = row[column]
+                choices[column].setdefault(choice, None)
+                view["dimensions"][slugify(name)] = choice
+        for column, axis in id_columns.items():
+            for indicator_id in row.get(column, "").split():
+                assert indicator_id.isdigit(), f"Only variable ids can be converted, not {indicator_id!r}"
+                view["indicator_path"][int(indicator_id)] = axis
+        view_config = {
+            column: parse_value(value) for column, value in row.items() if column not in choices and column not in id_columns
+        }
+        if view_config:
+            view["config"] = view_config
+        views.append(view)
+
+    config = {
+        "name": header.get("explorerTitle", ""),
+        "dimensions": [
+            {
+                "slug": slugify(name),
+                "name": name,
+                "control": control,
+                "choices": [{"slug": choice, "name": choice} for choice in choices[column]],
+            }
+            for column, name, control in controls
+            # Controls that are empty in every row have no choices, and are not part of any view
+            if choices[column]
+        ],
+        "views": views,
+    }
+    errors = validate_config(config)
+    assert not errors, "Explorer can't be converted:\n" + "\n".join(errors)
+    return config
+
+
+def write_config(config, f):
+    # Writes a config in the same format as yaml.dump (keeping the order of its keys), views last and view by view.
+    header = {key: value for key, value in config.items() if key != "views"}
+    f.write(yaml.dump(header, Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False))
+    if not config["views"]:
+        f.write("views: []\n")
+        return
+    f.write("views:\n")
+    for view in config["views"]:
+        f.write(yaml.dump([view], Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False))
+
+
+def comparable_rows(text):
+    # Graphers table of an explorer TSV as a sorted list of rows, ignoring the order of columns, empty cells and surrounding
+    # whitespace.
+    header, _, rows = read_explorer(io.StringIO(text))
+    return header.get("explorerTitle", ""), sorted(sorted((key, value.strip()) for key, value in row.items()) for row in rows)
+
+
+def check_explorer(file):
+    # Converts an explorer to a config and back, and returns the differences between both explorers.
+    original = file.read_text(encoding="utf-8")
+    try:
+        config = read_config(io.StringIO(original))
+    except AssertionError as e:
+        return [f"can't be converted: {e}"]
+    converted = io.StringIO()
+    write_explorer(config, converted)
+
+    title, rows = comparable_rows(original)
+    converted_title, converted_rows = comparable_rows(converted.getvalue())
+    problems = []
+    if title != converted_title:
+        problems.append(f"explorerTitle: {title!r} != {converted_title!r}")
+    for row in set(map(tuple, rows)) ^ set(map(tuple, converted_rows)):
+        problems.append(f"row only in {'original' if list(row) in rows else 'converted'}: {dict(row)}")
+    return problems
+
+
+def check_config(file):
+    # Converts a config to an explorer and back, and returns the differences in the parts both formats have.
+    config = load_config(file)
+    explorer = io.StringIO()
+    write_explorer(config, explorer)
+    converted = read_config(io.StringIO(explorer.getvalue()))
+
+    def comparable(config):
+        names = {
+            dimension["slug"]: (dimension["name"], {choice["slug"]: choice["name"] for choice in dimension["choices"]})
+            for dimension in config["dimensions"]
+        }
+        return [
+            (
+                sorted((names[slug][0], names[slug][1][choice]) for slug, choice in view["dimensions"].items()),
+                view["indicator_path"],
+                view.get("config", {}),
+            )
+            for view in config["views"]
+        ]
+
+    problems = []
+    if config["name"] != converted["name"]:
+        problems.append(f"name: {config['name']!r} != {converted['name']!r}")
+    for i, (view, converted_view) in enumerate(zip(comparable(config), comparable(converted))):
+        if view != converted_view:
+            problems.append(f"views[{i}]: {view} != {converted_view}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("command", choices=["to-explorer", "to-config", "check"])
+    parser.add_argument("file", type=Path, help="Config (.yml) or explorer (.tsv) to convert")
+    parser.add_argument("-o", "--output", type=Path, help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        problems = check_config(args.file) if args.file.suffix == ".yml" else check_explorer(args.file)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"✅ {args.file.name} converts without losses")
+        sys.exit(0)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    with output:
+        if args.command == "to-explorer":
+            write_explorer(load_config(args.file), output)
+        else:
+            with open(args.file, "r", encoding="utf-8") as f:
+                write_config(read_config(f), output)
@@ -0,0 +1,303 @@
+"""Generate a multidimensional indicator config from a compact spec.
+
+A spec has the same `name`, `dimensions_title` and `dimensions` as a config, but instead of listing every view it has an
+`indicators` section, which gives the indicators of every combination of choices. Either as a lookup table:
+
+    indicators:
+        table: causes-of-death.csv  # one column per dimension, `indicator_id` and optionally `axis` (default: y)
+        combine:                    # optional, choices that get the indicators of all other choices of their dimension
+            cause: all
+
+or as a rule, evaluated on the combinations of choices with pandas. Each dimension is available as `<slug>_index` (position
+of the choice), and numeric `params` of the choices as `<slug>_<param>`:
+
+    indicators:
+        rule: 900000 + cause_id * 100 + age_index * 3 + metric_index
+
+Views are generated for the cross product of all choices, in the order of `order` (default: the order of the dimensions,
+first dimension varying slowest), skipping combinations without indicators unless `keep_empty: true`. All views get the
+same `config`, if given. Keys are written in the order of the spec, views last, and the dimensions of each view in the
+order of `dimensions` (or of `dimension_keys`, if given). The output is the same as `yaml.dump(config, sort_keys=False)`,
+and it is written view by view.
+
+Usage:
+
+    python scripts/multidimensional-indicators/multidim_generate.py causes-of-death.spec.yml
+    python scripts/multidimensional-indicators/multidim_generate.py --extract multidimensional-indicators/causes-of-death.yml
+    python scripts/multidimensional-indicators/multidim_generate.py --benchmark 10000
+
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from math import prod
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from multidim_config import MULTIDIM_DIR, YAML_LOADER, load_config
+from multidim_index import duplicate_choices
+
+# Keys of a spec that are not copied to the config
+SPEC_KEYS = {"indicators", "order", "keep_empty", "config", "dimension_keys"}
+
+# Number of views formatted at once
+CHUNK_SIZE = 5000
+
+
+def load_spec(file):
+    with open(file, "r") as f:
+        spec = yaml.load(f, Loader=YAML_LOADER)
+    assert "indicators" in spec, f"Spec {file} has no `indicators` section"
+    assert ("table" in spec["indicators"]) != ("rule" in spec["indicators"]), (
+        f"Spec {file} needs either `indicators.table` or `indicators.rule`"
+    )
+    return spec
+
+
+def combinations(dimensions, order):
+    # Cross product of all choices, as a frame with one column per dimension (choice slugs) and one per dimension with the
+    # position of its choice.
+    duplicates = duplicate_choices(dimensions)
+    assert not duplicates, ", ".join(f"duplicate choice {slug}={choice!r}" for slug, choice in duplicates)
+    choices = {dimension["slug"]: [choice["slug"] for choice in dimension["choices"]] for dimension in dimensions}
+    index = pd.MultiIndex.from_product([range(len(choices[slug])) for slug in order], names=order)
+    df = index.to_frame(index=False).add_suffix("_index")
+    for slug in order:
+        df[slug] = pd.Categorical.from_codes(df[f"{slug}_index"], categories=choices[slug])
+    return df
+
+
+def indicators_from_rule(df, dimensions, rule):
+    # Adds the numeric params of the choices as columns, and evaluates the rule on every combination.
+    df = df.copy()
+    for dimension in dimensions:
+        params = pd.DataFrame([choice.get("params", {}) for choice in dimension["choices"]])
+        for param in params.columns:
+            df[f"{dimension['slug']}_{param}"] = params[param].to_numpy()[df[f"{dimension['slug']}_index"]]
+    df["indicator_id"] = df.eval(rule)
+    df["axis"] = "y"
+    return df.dropna(subset=["indicator_id"])
+
+
+def indicators_from_table(df, dimensions, table, combine):
+    slugs = [dimension["slug"] for dimension in dimensions]
+    lookup = pd.read_csv(table, dtype=str, keep_default_na=False)
+    missing_columns = set(slugs + ["indicator_id"]) - set(lookup.columns)
+    assert not missing_columns, f"Lookup table {table} has no columns {missing_columns}"
+    if "axis" not in lookup.columns:
+        lookup["axis"] = "y"
+
+    # Combined choices get the indicators of all other choices of their dimension
+    for slug, combined_choice in combine.items():
+        others = lookup[lookup[slug] != combined_choice]
+        lookup = pd.concat([lookup, others.assign(**{slug: combined_choice})], ignore_index=True)
+
+    # Report choices that are not in the spec, instead of silently dropping their rows
+    for dimension in dimensions:
+        declared = {choice["slug"] for choice in dimension["choices"]}
+        unknown = sorted(set(lookup[dimension["slug"]]) - declared)
+        assert not unknown, f"Lookup table {table} has unknown choices for {dimension['slug']}: {unknown}"
+
+    keys = df[slugs].astype(str)
+    keys["combination"] = range(len(df))
+    df = keys.merge(lookup[slugs + ["indicator_id", "axis"]], on=slugs, how="inner")
+    df["indicator_id"] = df["indicator_id"].astype(int)
+    return df
+
+
+def indicator_rows(spec, base_dir):
+    # Returns all combinations of choices, and the indicators of each combination (by position in the combinations).
+    dimensions = spec["dimensions"]
+    order = spec.get("order") or [dimension["slug"] for dimension in dimensions]
+    assert sorted(order) == sorted(dimension["slug"] for dimension in dimensions), (
+        f"`order` {order} must list all dimensions"
+    )
+    df = combinations(dimensions, order)
+
+    indicators = spec["indicators"]
+    if "rule" in indicators:
+        rows = indicators_from_rule(df, dimensions, indicators["rule"])
+        rows["combination"] = rows.index
+    else:
+        rows = indicators_from_table(df, dimensions, base_dir / indicators["table"], indicators.get("combine", {}))
+
+    rows = rows[["combination", "indicator_id", "axis"]].astype({"indicator_id": int})
+    # Indicators of each view in the order of the lookup table
+    rows = rows.drop_duplicates(["combination", "indicator_id"]).sort_values("combination", kind="stable")
+    return df, rows
+
+
+def dimension_lines(dimensions):
+    # YAML of every `slug: choice` line, as yaml.dump formats it inside a view (with the same quoting and indentation).
+    lines = {}
+    for dimension in dimensions:
+        for choice in dimension["choices"]:
+            text = yaml.dump([{"dimensions": {dimension["slug"]: choice["slug"]}}], allow_unicode=True)
+            lines[(dimension["slug"], choice["slug"])] = text.removeprefix("- dimensions:\n")
+    return lines
+
+
+def format_views(spec, df, rows):
+    # Yields the YAML of all views in chunks, in the same format as yaml.dump, with the number of views in each chunk.
+    dimensions = spec["dimensions"]
+    lines = dimension_lines(dimensions)
+    dimension_keys = spec.get("dimension_keys") or [dimension["slug"] for dimension in dimensions]
+    assert sorted(dimension_keys) == sorted(dimension["slug"] for dimension in dimensions), (
+        f"`dimension_keys` {dimension_keys} must list all dimensions"
+    )
+
+    text = pd.Series("- dimensions:\n", index=df.index)
+    for slug in dimension_keys:
+        text += df[slug].map(lambda choice, slug=slug: lines[(slug, choice)]).astype(str)
+
+    indicator_text = ("    " + rows["indicator_id"].astype(str) + ": " + rows["axis"] + "\n").groupby(rows["combination"]).sum()
+    has_indicators = df.index.isin(indicator_text.index)
+    text.loc[indicator_text.index] += "  indicator_path:\n" + indicator_text
+    if spec.get("keep_empty"):
+        text[~has_indicators] += "  indicator_path: {}\n"
+    else:
+        text = text[has_indicators]
+    if spec.get("config"):
+        text += "  " + yaml.dump([{"config": spec["config"]}], allow_unicode=True, sort_keys=False).removeprefix("- ")
+
+    for start in range(0, len(text), CHUNK_SIZE):
+        chunk = text.iloc[start : start + CHUNK_SIZE]
+        yield "".join(chunk), len(chunk)
+
+
+def write_config(spec, f, base_dir=Path(".")):
+    # Writes the config of a spec to the (text) file f, and returns the number of views.
+    header = {key: value for key, value in spec.items() if key not in SPEC_KEYS}
+    # Choices without their params, keeping the order of the keys of the spec
+    header["dimensions"] = [
+        {
+            key: [{key: value for key, value in choice.items() if key != "params"} for choice in value]
+            if key == "choices"
+            else value
+            for key, value in dimension.items()
+        }
+        for dimension in spec["dimensions"]
+    ]
+
+    df, rows = indicator_rows(spec, base_dir)
+    # Views are written last, after the other keys in the order of the spec
+    f.write(yaml.dump(header, allow_unicode=True, sort_keys=False))
+
+    views = 0
+    for chunk, chunk_views in format_views(spec, df, rows):
+        if not views:
+            f.write("views:\n")
+        f.write(chunk)
+        views += chunk_views
+    if not views:
+        f.write("views: []\n")
+    return views
+
+
+def write_atomically(output, spec, base_dir):
+    # Generates the config into a temporary file in the same folder, and moves it over the output only once it is complete,
+    # so that an error never leaves a truncated config. Returns the number of views.
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            views = write_config(spec, f, base_dir)
+        # mkstemp creates the file readable by its owner only, give it the mode of the config it replaces
+        if output.exists():
+            os.chmod(tmp_path, os.stat(output).st_mode)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, output)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return views
+
+
+def extract_spec(config_file, output_dir):
+    # Writes a spec and a lookup table that generate the views of an existing config (with their own config dropped).
+    config = load_config(config_file)
+    slugs = [dimension["slug"] for dimension in config["dimensions"]]
+    stem = Path(config_file).stem
+
+    table = pd.DataFrame(
+        [
+            {**view["dimensions"], "indicator_id": indicator_id, "axis": axis}
+            for view in config["views"]
+            for indicator_id, axis in view["indicator_path"].items()
+        ],
+        columns=slugs + ["indicator_id", "axis"],
+    )
+    spec = {key: value for key, value in config.items() if key != "views"}
+    spec["indicators"] = {"table": f"{stem}.csv"}
+    # Keep the order of the dimensions in the views, if it is not the order of the dimensions
+    if config["views"] and list(config["views"][0]["dimensions"]) != slugs:
+        spec["dimension_keys"] = list(config["views"][0]["dimensions"])
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_dir / f"{stem}.csv", index=False)
+    with open(output_dir / f"{stem}.spec.yml", "w") as f:
+        yaml.dump(spec, f, allow_unicode=True, sort_keys=False)
+    print(f"✅ Extracted {len(table)} indicators of {len(config['views'])} views to {output_dir / f'{stem}.spec.yml'}")
+    empty_views = sum(not view["indicator_path"] for view in config["views"])
+    if empty_views:
+        print(f"⚠️ {empty_views} views without indicators are not part of the spec")
+
+
+def benchmark(views):
+    # Generates a config with (at least) the given number of views from a rule, and checks it against yaml.dump.
+    sizes = [max(1, round(views ** (1 / 3)))] * 2
+    sizes.append(-(-views // prod(sizes)))
+    spec = {
+        "name": "Benchmark",
+        "dimensions": [
+            {
+                "slug": f"dimension{i}",
+                "name": f"Dimension {i}",
+                "choices": [{"slug": f"choice {j}", "name": f"Choice {j}", "params": {"id": j * 7}} for j in range(size)],
+            }
+            for i, size in enumerate(sizes)
+        ],
+        "indicators": {"rule": "900000 + dimension0_id * 10000 + dimension1_id * 100 + dimension2_index"},
+        "config": {"hasMapTab": True},
+    }
+
+    start = time.perf_counter()
+    f = io.StringIO()
+    written = write_config(spec, f)
+    elapsed = time.perf_counter() - start
+
+    assert yaml.dump(yaml.load(f.getvalue(), Loader=YAML_LOADER), allow_unicode=True, sort_keys=False) == f.getvalue()
+    print(f"Generated {written} views ({len(f.getvalue()) / 1e6:.1f} MB) in {elapsed * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("spec", nargs="?", type=Path, help="Spec to generate the config from")
+    parser.add_argument("-o", "--output", type=Path, help="Output config (default: multidimensional-indicators/<name>.yml)")
+    parser.add_argument("--extract", type=Path, metavar="CONFIG", help="Write a spec and lookup table for this config")
+    parser.add_argument("--benchmark", type=int, metavar="VIEWS", help="Time the generation of a config with this many views")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    elif args.extract:
+        extract_spec(args.extract, args.output or Path(tempfile.gettempdir()) / "multidim-specs")
+    elif args.spec:
+        output = args.output or MULTIDIM_DIR / f"{args.spec.name.removesuffix('.yml').removesuffix('.spec')}.yml"
+        views = write_atomically(output, load_spec(args.spec), args.spec.parent)
+        print(f"✅ Generated {views} views in {output}")
+    else:
+        parser.print_usage(sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,160 @@
+"""Index the views of multidimensional indicator configs by their combination of choices, and check their consistency.
+
+For every config this reports duplicate choices within a dimension, views that use the same combination of choices, views
+that use undeclared dimensions or choices, views without indicators, and combinations of choices that no view covers.
+
+Usage:
+
+    python scripts/multidimensional-indicators/multidim_index.py                # check all configs
+    python scripts/multidimensional-indicators/multidim_index.py poverty.yml    # check one config
+    python scripts/multidimensional-indicators/multidim_index.py --uncovered 0  # only count uncovered combinations
+
+"""
+
+import argparse
+import sys
+from itertools import product
+from math import prod
+from pathlib import Path
+
+from multidim_config import MULTIDIM_DIR, load_config, multidim_files
+
+# Number of uncovered combinations listed per config by default
+MAX_UNCOVERED_LISTED = 20
+
+
+def duplicate_choices(dimensions):
+    # Returns the (dimension, choice) slugs of every choice declared more than once in its dimension
+    duplicates = []
+    for dimension in dimensions:
+        seen = set()
+        for choice in dimension["choices"]:
+            if choice["slug"] in seen:
+                duplicates.append((dimension["slug"], choice["slug"]))
+            seen.add(choice["slug"])
+    return duplicates
+
+
+class MultidimIndex:
+    def __init__(self, config):
+        # Builds the index in one pass over the dimensions and one pass over the views.
+        self.dimension_slugs = [dimension["slug"] for dimension in config["dimensions"]]
+        # Choices of each dimension, in the order they are declared (without duplicates)
+        self.choices = {}
+        for dimension in config["dimensions"]:
+            choices = self.choices.setdefault(dimension["slug"], {})
+            for choice in dimension["choices"]:
+                choices[choice["slug"]] = choice
+        self.duplicate_choices = duplicate_choices(config["dimensions"])
+
+        self.views = config["views"]
+        # Maps each tuple of choices (in the order of `dimension_slugs`) to the position of its first view
+        self.view_positions = {}
+        self.duplicate_views = {}
+        self.unknown_slugs = []
+        self.empty_views = []
+        for i, view in enumerate(self.views):
+            dimensions = view["dimensions"]
+            for slug in dimensions.keys() - self.choices.keys():
+                self.unknown_slugs.append((i, f"unknown dimension {slug!r}"))
+            key = tuple(dimensions.get(slug) for slug in self.dimension_slugs)
+            valid = True
+            for slug, choice in zip(self.dimension_slugs, key):
+                if choice is None:
+                    self.unknown_slugs.append((i, f"missing dimension {slug!r}"))
+                    valid = False
+                elif choice not in self.choices[slug]:
+                    self.unknown_slugs.append((i, f"unknown choice {slug}={choice!r}"))
+                    valid = False
+            if not view["indicator_path"]:
+                self.empty_views.append(i)
+            if not valid:
+                continue
+            if key in self.view_positions:
+                self.duplicate_views.setdefault(key, [self.view_positions[key]]).append(i)
+            else:
+                self.view_positions[key] = i
+
+    @classmethod
+    def load(cls, file):
+        return cls(load_config(file))
+
+    def key(self, **choices):
+        return tuple(choices[slug] for slug in self.dimension_slugs)
+
+    def view(self, **choices):
+        # Returns the view for the given choice of every dimension, or None if there is none.
+        position = self.view_positions.get(self.key(**choices))
+        return self.views[position] if position is not None else None
+
+    def combinations(self):
+        return prod(len(choices) for choices in self.choices.values())
+
+    def uncovered_count(self):
+        # Only valid views are in the index, so each of them covers a distinct combination
+        return self.combinations() - len(self.view_positions)
+
+    def uncovered(self):
+        # Yields the combinations of choices without a view, in the order the choices are declared.
+        for key in product(*(choices.keys() for choices in self.choices.values())):
+            if key not in self.view_positions:
+                yield key
+
+    def problems(self):
+        # Errors that make the config ambiguous or inconsistent (uncovered combinations and empty views are not errors)
+        problems = [f"duplicate choice {slug}={choice!r}" for slug, choice in self.duplicate_choices]
+        problems += [
+            f"views {', '.join(str(i) for i in positions)} all have {self.format_key(key)}"
+            for key, positions in self.duplicate_views.items()
+        ]
+        problems += [f"views[{i}]: {message}" for i, message in self.unknown_slugs]
+        return problems
+
+    def format_key(self, key):
+        return ", ".join(f"{slug}={choice!r}" for slug, choice in zip(self.dimension_slugs, key))
+
+
+def report(file, max_uncovered=MAX_UNCOVERED_LISTED):
+    # Prints a report for one config, and returns whether it has problems.
+    index = MultidimIndex.load(file)
+    problems = index.problems()
+
+    print(f"{file.name}: {len(index.views)} views, {index.combinations()} combinations of choices")
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    if index.empty_views:
+        print(f"  ⚠️ {len(index.empty_views)} views without indicators: {', '.join(str(i) for i in index.empty_views)}")
+
+    uncovered_count = index.uncovered_count()
+    if uncovered_count:
+        print(f"  ⚠️ {uncovered_count} combinations of choices without a view")
+        for i, key in enumerate(index.uncovered()):
+            if i >= max_uncovered:
+                print(f"    ... and {uncovered_count - max_uncovered} more")
+                break
+            print(f"    {index.format_key(key)}")
+
+    return bool(problems)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n\n".join(__doc__.split("\n\n")[1:]),
+    )
+    parser.add_argument("files", nargs="*", type=Path, help="Configs to check (default: all)")
+    parser.add_argument(
+        "--uncovered",
+        type=int,
+        default=MAX_UNCOVERED_LISTED,
+        help=f"Number of uncovered combinations to list per config (default: {MAX_UNCOVERED_LISTED})",
+    )
+    args = parser.parse_args()
+
+    files = [file if file.exists() else MULTIDIM_DIR / file for file in args.files] or multidim_files()
+    failed = False
+    for file in files:
+        failed |= report(file, args.uncovered)
+    if failed:
+        sys.exit(1)
@@ -2,16 +2,19 @@
 
 NOTE:
 * This script is quite messy, but it probably doesn't need to be used often (or ever again).
-* This script needs to be executed using the ETL virtual environment.
+* This script needs to be executed using the ETL virtual environment, unless it reads variables from a local snapshot (see variable_sources.py).
 
 """
 
 import os
+import sys
 from pathlib import Path
 
-import MySQLdb
 import pandas as pd
-from dotenv import load_dotenv
+from variable_sources import MySQLVariableSource, SQLiteVariableSource
+
+sys.path.append(str(Path(__file__).parent.parent))
+from explorer_tools.tracing import span
 
 # MAIN INPUTS.
 # Version of the latest natural disasters dataset.
@@ -30,10 +33,15 @@ assert OUTPUT_FILE.parent.exists()
 # Path to ETL folder.
 ETL_FOLDER = Path(__file__).parent.parent.parent.parent / "etl"
 
-# Uncomment to load credentials to local grapher.
-# load_dotenv(ETL_FOLDER / ".env")
-# Uncomment to load credentials to live grapher.
-load_dotenv(ETL_FOLDER / ".env.live")
+# Set VARIABLES_SNAPSHOT to the path of a SQLite snapshot of the variables to generate the explorer offline.
+VARIABLES_SNAPSHOT = os.getenv("VARIABLES_SNAPSHOT")
+if VARIABLES_SNAPSHOT:
+    variable_source = SQLiteVariableSource(VARIABLES_SNAPSHOT)
+else:
+    # Uncomment to load credentials to local grapher.
+    # variable_source = MySQLVariableSource(ETL_FOLDER / ".env")
+    # Uncomment to load credentials to live grapher.
+    variable_source = MySQLVariableSource(ETL_FOLDER / ".env.live")
 
 # List "combined disaster types" (as they were defined in the garden/grapher steps).
 DISASTER_COMBINATION_TYPES = [
@@ -64,6 +72,11 @@ ECONOMIC_IMPACTS = [
     # "Reconstruction costs as a share of GDP",
     # "Insured damages as a share of GDP",
 ]
+# Impacts and timespans whose views of each disaster type must find their variable. Other views without a variable are
+# reported and skipped (e.g. the economic damages of fog, which only exist as decadal averages).
+REQUIRED_VARIABLES = [(impact, "Decadal average") for impact in HUMAN_IMPACTS + ECONOMIC_IMPACTS] + [
+    (impact, "Annual") for impact in HUMAN_IMPACTS
+]
 # Common string to use in the footer of all views in the explorer.
 COMMON_NOTE = f"Data pre-2000 is incomplete, see [our article on missing data](https://ourworldindata.org/disaster-database-limitations). Disasters are recorded until {LAST_DISASTERS_DATE}."
 # String to use in the footer of all views in the explorer showing decadal averages.
@@ -78,313 +91,127 @@ IMPACT_MAPPING = {
     "Disasters": "reported events",
 }
 
-# Connect to grapher database.
-conn = MySQLdb.connect(
-    db=os.getenv("DB_NAME"),  # type: ignore
-    host=os.getenv("DB_HOST"),  # type: ignore
-    port=int(os.getenv("DB_PORT")),  # type: ignore
-    user=os.getenv("DB_USER"),  # type: ignore
-    password=os.getenv("DB_PASS"),  # type: ignore
-    charset="utf8mb4",
-    autocommit=True,
-)
-
 # Download all natural disasters variables (for the relevant version).
-query = f"""
-SELECT *
-FROM variables
-WHERE catalogPath LIKE 'grapher/emdat/{VERSION}/natural_disasters/%'
-
-"""
-df = pd.read_sql(sql=query, con=conn)
-
-# Select relevant columns.
-df = df[["id", "name", "datasetId", "shortName", "catalogPath", "titlePublic", "titleVariant", "descriptionShort"]]
-
-# Select yearly variables.
-df_yearly = df[~df["name"].str.contains("decadal")].reset_index(drop=True)
-
-# Select decadal variables.
-df_decadal = df[df["name"].str.contains("decadal")].reset_index(drop=True)
-
-# Initialize a list that will gather all relevant data to construct the explorer file.
-data = []
-
-# Add rows of decadal data.
-
-# Add a row with all variables showing a specific human impact.
-for impact in HUMAN_IMPACTS:
-    if impact == "Disasters":
-        title = "Decadal average: Annual number of reported natural disasters"
-    else:
-        title = f"Decadal average: Annual number of {IMPACT_MAPPING[impact]} from natural disasters"
-    names = [f"{impact} - {disaster} (decadal)" for disaster in DISASTER_TYPES]
-    selected = df_decadal[df_decadal["name"].isin(names)]
-    data.append(
-        {
-            "yVariableIds": " ".join(selected["id"].astype(str).tolist()),
-            "Disaster Type Dropdown": "All disasters (by type)",
-            "Impact Dropdown": impact,
-            "Timespan Radio": "Decadal average",
-            "Per capita Checkbox": "false",
-            "type": "StackedBar",
-            "note": DECADAL_AVERAGE_NOTE,
-            "title": title,
-            # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
-            "missingDataStrategy": "show",
-            "hasMapTab": "false",
-        }
-    )
-# Add a row with all variables showing a specific economic impact.
-for impact in ECONOMIC_IMPACTS:
-    names = [f"{impact} - {disaster} (decadal)" for disaster in DISASTER_TYPES]
-    selected = df_decadal[df_decadal["name"].isin(names)]
-    data.append(
-        {
-            "yVariableIds": " ".join(selected["id"].astype(str).tolist()),
-            "Disaster Type Dropdown": "All disasters (by type)",
-            "Impact Dropdown": impact,
-            "Timespan Radio": "Decadal average",
-            "Per capita Checkbox": "false",
-            "type": "StackedBar",
-            "note": DECADAL_AVERAGE_NOTE,
-            "title": f"Decadal average: {impact} from natural disasters",
-            # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
-            "missingDataStrategy": "show",
-            "hasMapTab": "false",
-        }
+with span("variables", rows=lambda: len(df)):
+    df = variable_source.get_variables(f"grapher/emdat/{VERSION}/natural_disasters/")
+
+# Columns of the graphers table of the explorer.
+COLUMNS = [
+    "yVariableIds",
+    "Disaster Type Dropdown",
+    "Impact Dropdown",
+    "Timespan Radio",
+    "Per capita Checkbox",
+    "type",
+    "note",
+    "title",
+    "missingDataStrategy",
+    "hasMapTab",
+]
+# Variable names look like "Deaths - Flood", "Deaths per 100,000 people - Flood" or "Deaths - Flood (decadal)".
+VARIABLE_NAME_PATTERN = r"^(?P<impact>.+?)(?P<per_capita> per 100,000 people)? - (?P<disaster>.+?)(?P<decadal> \(decadal\))?$"
+
+
+def index_variables(df):
+    # Index all variables once by (impact, disaster type, timespan, per capita), so that each view can find its variables in constant time.
+    # Variables of the dataset that are not disaster impacts (e.g. added later to the dataset) are not used in the explorer.
+    parts = df["name"].str.extract(VARIABLE_NAME_PATTERN)
+    unparsed = parts["impact"].isna()
+    if unparsed.any():
+        print(f"Ignoring {unparsed.sum()} variables that are not disaster impacts: {df.loc[unparsed, 'name'].tolist()}")
+    df, parts = df[~unparsed], parts[~unparsed]
+    keys = zip(
+        parts["impact"],
+        parts["disaster"],
+        parts["decadal"].notna().map({True: "Decadal average", False: "Annual"}),
+        parts["per_capita"].notna().map({True: "true", False: "false"}),
     )
-# Add a row with all variables showing a specific impact per 100,000 people.
-for impact in HUMAN_IMPACTS:
+    index = {}
+    for key, variable in zip(keys, df[["id", "titlePublic"]].to_dict(orient="records")):
+        assert key not in index, f"Multiple variables found for {key}"
+        index[key] = variable
+    return index
+
+
+def overview_title(impact, per_capita):
+    # Title of the views showing an impact for all disaster types.
+    if impact in ECONOMIC_IMPACTS:
+        return f"{impact} from natural disasters"
+    measure = "rate" if per_capita == "true" else "number"
     if impact == "Disasters":
-        title = "Decadal average: Annual rate of reported natural disasters"
-    else:
-        title = f"Decadal average: Annual rate of {IMPACT_MAPPING[impact]} from natural disasters"
-    names = [f"{impact} per 100,000 people - {disaster} (decadal)" for disaster in DISASTER_TYPES]
-    selected = df_decadal[df_decadal["name"].isin(names)]
-    data.append(
-        {
-            "yVariableIds": " ".join(selected["id"].astype(str).tolist()),
-            "Disaster Type Dropdown": "All disasters (by type)",
-            "Impact Dropdown": impact,
-            "Timespan Radio": "Decadal average",
-            "Per capita Checkbox": "true",
-            "type": "StackedBar",
-            "note": DECADAL_AVERAGE_NOTE,
-            "title": title,
-            # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
-            "missingDataStrategy": "show",
-            "hasMapTab": "false",
-        }
-    )
-# Add a row for each disaster type and human impact.
-for impact in HUMAN_IMPACTS:
-    for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
-        name = f"{impact} - {disaster} (decadal)"
-        selected = df_decadal[(df_decadal["name"] == name)]
-        assert len(selected) == 1
-        if (impact == "Disasters") & (disaster == "All disasters"):
-            title = "Decadal average: Annual number of reported natural disasters"
-        else:
-            title = selected["titlePublic"].item()
-        data.append(
-            {
-                "yVariableIds": selected["id"].item(),
-                "Disaster Type Dropdown": disaster,
-                "Impact Dropdown": impact,
-                "Timespan Radio": "Decadal average",
-                "Per capita Checkbox": "false",
-                "type": "StackedBar",
-                "note": DECADAL_AVERAGE_NOTE,
-                "title": title,
-                "missingDataStrategy": "auto",
-                "hasMapTab": "true",
-            }
-        )
-# Add a row for each disaster type and human impact per 100,000 people.
-for impact in HUMAN_IMPACTS:
-    for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
-        name = f"{impact} per 100,000 people - {disaster} (decadal)"
-        selected = df_decadal[(df_decadal["name"] == name)]
-        assert len(selected) == 1
-        if (impact == "Disasters") & (disaster == "All disasters"):
-            title = "Decadal average: Annual rate of reported natural disasters"
-        else:
-            title = selected["titlePublic"].item()
-        data.append(
-            {
-                "yVariableIds": selected["id"].item(),
-                "Disaster Type Dropdown": disaster,
+        return f"Annual {measure} of reported natural disasters"
+    return f"Annual {measure} of {IMPACT_MAPPING[impact]} from natural disasters"
+
+
+def explorer_rows(variables, missing):
+    # Yields all rows of the explorer's graphers table. Combinations without a matching variable are added to `missing`,
+    # and left out of the views showing all disaster types, or skipped if they are views of a single disaster type.
+    def lookup(impact, disaster, timespan, per_capita):
+        key = (impact, disaster, timespan, per_capita)
+        if key not in variables:
+            missing.append(key)
+        return variables.get(key)
+
+    for timespan, title_prefix, note in [
+        ("Decadal average", "Decadal average: ", DECADAL_AVERAGE_NOTE),
+        ("Annual", "", COMMON_NOTE),
+    ]:
+        # Add a row with all variables showing a specific impact (also per 100,000 people, for human impacts).
+        for impact, per_capita in (
+            [(impact, "false") for impact in HUMAN_IMPACTS]
+            + [(impact, "false") for impact in ECONOMIC_IMPACTS]
+            + [(impact, "true") for impact in HUMAN_IMPACTS]
+        ):
+            # Keep the order of DISASTER_TYPES, so that the stacks are always in the same order.
+            selected = [lookup(impact, disaster, timespan, per_capita) for disaster in DISASTER_TYPES]
+            selected = [variable for variable in selected if variable is not None]
+            if not selected:
+                continue
+            yield {
+                "yVariableIds": " ".join(str(variable["id"]) for variable in selected),
+                "Disaster Type Dropdown": "All disasters (by type)",
                 "Impact Dropdown": impact,
-                "Timespan Radio": "Decadal average",
-                "Per capita Checkbox": "true",
+                "Timespan Radio": timespan,
+                "Per capita Checkbox": per_capita,
                 "type": "StackedBar",
-                "note": DECADAL_AVERAGE_NOTE,
-                "title": title,
-                "missingDataStrategy": "auto",
-                "hasMapTab": "true",
+                "note": note,
+                "title": title_prefix + overview_title(impact, per_capita),
+                # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
+                "missingDataStrategy": "show",
+                "hasMapTab": "false",
             }
-        )
-# Add a row for each individual disaster type and economic impact per GDP.
-for impact in ECONOMIC_IMPACTS:
-    for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
-        name = f"{impact} - {disaster} (decadal)"
-        selected = df_decadal[(df_decadal["name"] == name)]
-        assert len(selected) == 1
-        data.append(
-            {
-                "yVariableIds": selected["id"].item(),
-                "Disaster Type Dropdown": disaster,
-                "Impact Dropdown": impact,
-                "Timespan Radio": "Decadal average",
-                "Per capita Checkbox": "false",
-                "type": "StackedBar",
-                "note": DECADAL_AVERAGE_NOTE,
-                "missingDataStrategy": "auto",
-                "hasMapTab": "true",
-            }
-        )
-
-# Add rows of yearly data.
-# Add a row with all variables showing a specific impact.
-for impact in HUMAN_IMPACTS:
-    if impact == "Disasters":
-        title = "Annual number of reported natural disasters"
-    else:
-        title = f"Annual number of {IMPACT_MAPPING[impact]} from natural disasters"
 
-    names = [f"{impact} - {disaster}" for disaster in DISASTER_TYPES]
-    selected = df_yearly[df_yearly["name"].isin(names)]
-    data.append(
-        {
-            "yVariableIds": " ".join(selected["id"].astype(str).tolist()),
-            "Disaster Type Dropdown": "All disasters (by type)",
-            "Impact Dropdown": impact,
-            "Timespan Radio": "Annual",
-            "Per capita Checkbox": "false",
-            "type": "StackedBar",
-            "note": COMMON_NOTE,
-            "title": title,
-            # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
-            "missingDataStrategy": "show",
-            "hasMapTab": "false",
-        }
-    )
-# Add a row with all variables showing a specific economic impact.
-for impact in ECONOMIC_IMPACTS:
-    names = [f"{impact} - {disaster}" for disaster in DISASTER_TYPES]
-    selected = df_yearly[df_yearly["name"].isin(names)]
-    data.append(
-        {
-            "yVariableIds": " ".join(selected["id"].astype(str).tolist()),
-            "Disaster Type Dropdown": "All disasters (by type)",
-            "Impact Dropdown": impact,
-            "Timespan Radio": "Annual",
-            "Per capita Checkbox": "false",
-            "type": "StackedBar",
-            "note": COMMON_NOTE,
-            "title": f"{impact} from natural disasters",
-            # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
-            "missingDataStrategy": "show",
-            "hasMapTab": "false",
-        }
-    )
-# Add a row with all variables showing a specific impact per 100,000 people.
-for impact in HUMAN_IMPACTS:
-    if impact == "Disasters":
-        title = "Annual rate of reported natural disasters"
-    else:
-        title = f"Annual rate of {IMPACT_MAPPING[impact]} from natural disasters"
-    names = [f"{impact} per 100,000 people - {disaster}" for disaster in DISASTER_TYPES]
-    selected = df_yearly[df_yearly["name"].isin(names)]
-    data.append(
-        {
-            "yVariableIds": " ".join(selected["id"].astype(str).tolist()),
-            "Disaster Type Dropdown": "All disasters (by type)",
-            "Impact Dropdown": impact,
-            "Timespan Radio": "Annual",
-            "Per capita Checkbox": "true",
-            "type": "StackedBar",
-            "note": COMMON_NOTE,
-            "title": title,
-            # For this view with multiple (sparse) variables, we need to always show the data, even when there are nans.
-            "missingDataStrategy": "show",
-            "hasMapTab": "false",
-        }
-    )
-# Add a row for each disaster type and human impact.
-for impact in HUMAN_IMPACTS:
-    for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
-        name = f"{impact} - {disaster}"
-        selected = df_yearly[(df_yearly["name"] == name)]
-        assert len(selected) == 1
-        if (impact == "Disasters") & (disaster == "All disasters"):
-            title = "Annual number of reported natural disasters"
-        else:
-            title = selected["titlePublic"].item()
-        data.append(
-            {
-                "yVariableIds": selected["id"].item(),
-                "Disaster Type Dropdown": disaster,
-                "Impact Dropdown": impact,
-                "Timespan Radio": "Annual",
-                "Per capita Checkbox": "false",
-                "type": "StackedBar",
-                "note": COMMON_NOTE,
-                "title": title,
-                "missingDataStrategy": "auto",
-                "hasMapTab": "true",
-            }
-        )
-# Add a row for each disaster type and human impact per 100,000 people.
-for impact in HUMAN_IMPACTS:
-    for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
-        name = f"{impact} per 100,000 people - {disaster}"
-        selected = df_yearly[(df_yearly["name"] == name)]
-        assert len(selected) == 1
-        if (impact == "Disasters") & (disaster == "All disasters"):
-            title = "Annual rate of reported natural disasters"
-        else:
-            title = selected["titlePublic"].item()
-        data.append(
-            {
-                "yVariableIds": selected["id"].item(),
-                "Disaster Type Dropdown": disaster,
-                "Impact Dropdown": impact,
-                "Timespan Radio": "Annual",
-                "Per capita Checkbox": "true",
-                "type": "StackedBar",
-                "note": COMMON_NOTE,
-                "title": title,
-                "missingDataStrategy": "auto",
-                "hasMapTab": "true",
-            }
-        )
-# Add a row for each individual disaster type and economic impact per GDP.
-for impact in ECONOMIC_IMPACTS:
-    for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
-        name = f"{impact} - {disaster}"
-        selected = df_yearly[(df_yearly["name"] == name)]
-        if len(selected) == 1:
-            data.append(
-                {
-                    "yVariableIds": selected["id"].item(),
+        # Add a row for each disaster type and impact (also per 100,000 people, for human impacts).
+        for impact, per_capita in (
+            [(impact, "false") for impact in HUMAN_IMPACTS]
+            + [(impact, "true") for impact in HUMAN_IMPACTS]
+            + [(impact, "false") for impact in ECONOMIC_IMPACTS]
+        ):
+            for disaster in DISASTER_COMBINATION_TYPES + DISASTER_TYPES:
+                variable = lookup(impact, disaster, timespan, per_capita)
+                if variable is None:
+                    continue
+                row = {
+                    "yVariableIds": variable["id"],
                     "Disaster Type Dropdown": disaster,
                     "Impact Dropdown": impact,
-                    "Timespan Radio": "Annual",
-                    "Per capita Checkbox": "false",
+                    "Timespan Radio": timespan,
+                    "Per capita Checkbox": per_capita,
                     "type": "StackedBar",
-                    "note": COMMON_NOTE,
+                    "note": note,
                     "missingDataStrategy": "auto",
                     "hasMapTab": "true",
                 }
-            )
-        else:
-            print(f"Not found: {name}")
+                if impact in HUMAN_IMPACTS:
+                    if (impact == "Disasters") & (disaster == "All disasters"):
+                        row["title"] = title_prefix + overview_title(impact, per_capita)
+                    else:
+                        row["title"] = variable["titlePublic"]
+                yield row
 
-# Prepare header of explorer file.
-df_explorer = pd.DataFrame.from_records(data)
-explorer = """# DO NOT EDIT THIS FILE BY HAND. It is automatically generated using a script. Any changes made directly to it will be overwritten.
+
+# Header of explorer file.
+EXPLORER_HEADER = """# DO NOT EDIT THIS FILE BY HAND. It is automatically generated using a script. Any changes made directly to it will be overwritten.
 
 explorerTitle\tNatural Disasters
 explorerSubtitle\tExplore the global frequency, severity, and consequences of disasters.
@@ -399,13 +226,23 @@ hideAnnotationFieldsInTitle\ttrue
 minTime\t2000
 graphers
 """
-# Add column names to explorer.
-explorer += "\t" + "\t".join(df_explorer.columns) + "\n"
-
-# Add rows to explorer.
-for i, row in df_explorer.iterrows():
-    explorer += "\t" + "\t".join([str(item) if pd.notna(item) else "" for item in row]) + "\n"
 
-# Save explorer file.
-with open(OUTPUT_FILE, "w") as output_file:
-    output_file.write(explorer)
+with span("index", rows=lambda: len(variables)):
+    variables = index_variables(df)
+missing = []
+
+# Stream the explorer to disk, row by row.
+written = 0
+with span("write", rows=lambda: written), open(OUTPUT_FILE, "w") as output_file:
+    output_file.write(EXPLORER_HEADER)
+    output_file.write("\t" + "\t".join(COLUMNS) + "\n")
+    for row in explorer_rows(variables, missing):
+        output_file.write("\t" + "\t".join(str(row[column]) if pd.notna(row.get(column)) else "" for column in COLUMNS) + "\n")
+        written += 1
+
+required_missing = []
+for impact, disaster, timespan, per_capita in dict.fromkeys(missing):
+    print(f"Not found: {impact} - {disaster} ({timespan}, per capita: {per_capita})")
+    if (impact, timespan) in REQUIRED_VARIABLES:
+        required_missing.append(f"{impact} - {disaster} ({timespan}, per capita: {per_capita})")
+assert not required_missing, f"Required variables not found: {required_missing}"
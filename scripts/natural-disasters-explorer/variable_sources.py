@@ -0,0 +1,101 @@
+"""Sources of grapher variable metadata for the natural disasters explorer.
+
+* MySQLVariableSource reads variables from a grapher database, using the credentials of an ETL .env file.
+* SQLiteVariableSource reads variables from a local SQLite snapshot, so that the explorer can be regenerated offline.
+
+To create a snapshot (this needs access to the grapher database):
+
+    python variable_sources.py variables.sqlite --catalog-path grapher/emdat/2024-04-11/natural_disasters/
+
+"""
+
+import argparse
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+# Columns of the variables table used by the explorer.
+VARIABLE_COLUMNS = ["id", "name", "datasetId", "shortName", "catalogPath", "titlePublic", "titleVariant", "descriptionShort"]
+
+# Default ETL .env file with the credentials of the live grapher database.
+ETL_ENV_FILE = Path(__file__).parent.parent.parent.parent / "etl" / ".env.live"
+
+
+class VariableSource(ABC):
+    @abstractmethod
+    def get_variables(self, catalog_path_prefix):
+        # Returns VARIABLE_COLUMNS of all variables whose catalogPath starts with the given prefix, ordered by id.
+        ...
+
+
+class MySQLVariableSource(VariableSource):
+    # Connections are shared between all sources using the same .env file, so that each database is only connected to once.
+    _connections = {}
+
+    def __init__(self, env_file=ETL_ENV_FILE):
+        self.env_file = Path(env_file)
+
+    def connection(self):
+        if self.env_file not in self._connections:
+            import MySQLdb
+            from dotenv import load_dotenv
+
+            load_dotenv(self.env_file)
+            self._connections[self.env_file] = MySQLdb.connect(
+                db=os.getenv("DB_NAME"),  # type: ignore
+                host=os.getenv("DB_HOST"),  # type: ignore
+                port=int(os.getenv("DB_PORT")),  # type: ignore
+                user=os.getenv("DB_USER"),  # type: ignore
+                password=os.getenv("DB_PASS"),  # type: ignore
+                charset="utf8mb4",
+                autocommit=True,
+            )
+        return self._connections[self.env_file]
+
+    def get_variables(self, catalog_path_prefix):
+        query = f"""
+        SELECT {", ".join(VARIABLE_COLUMNS)}
+        FROM variables
+        WHERE catalogPath LIKE %s
+        ORDER BY id
+        """
+        return pd.read_sql(sql=query, con=self.connection(), params=(catalog_path_prefix + "%",))
+
+
+class SQLiteVariableSource(VariableSource):
+    def __init__(self, snapshot_file):
+        self.snapshot_file = Path(snapshot_file)
+        assert self.snapshot_file.exists(), f"Snapshot not found: {self.snapshot_file}"
+
+    def get_variables(self, catalog_path_prefix):
+        # A range query on the prefix (instead of LIKE) can use the index on catalogPath.
+        query = f"""
+        SELECT {", ".join(VARIABLE_COLUMNS)}
+        FROM variables
+        WHERE catalogPath >= ? AND catalogPath < ?
+        ORDER BY id
+        """
+        prefix_end = catalog_path_prefix[:-1] + chr(ord(catalog_path_prefix[-1]) + 1)
+        with sqlite3.connect(self.snapshot_file) as conn:
+            return pd.read_sql(sql=query, con=conn, params=(catalog_path_prefix, prefix_end))
+
+    @staticmethod
+    def write_snapshot(variables, snapshot_file):
+        with sqlite3.connect(snapshot_file) as conn:
+            variables[VARIABLE_COLUMNS].to_sql("variables", conn, if_exists="replace", index=False)
+            conn.execute("CREATE INDEX IF NOT EXISTS variables_catalogPath ON variables (catalogPath)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a local SQLite snapshot of grapher variables.")
+    parser.add_argument("snapshot_file", help="Path of the SQLite snapshot to create")
+    parser.add_argument("--catalog-path", required=True, help="Only include variables whose catalogPath starts with this")
+    parser.add_argument("--env-file", default=ETL_ENV_FILE, help="ETL .env file with the grapher database credentials")
+    args = parser.parse_args()
+
+    variables = MySQLVariableSource(args.env_file).get_variables(args.catalog_path)
+    SQLiteVariableSource.write_snapshot(variables, args.snapshot_file)
+    print(f"Wrote {len(variables)} variables to {args.snapshot_file}")
@@ -58,6 +58,31 @@ RELATIVE_POVERTY_DESCRIPTION_PIP = "This is a measure of _relative_ poverty –
 
 NOTES_TITLE_PIP = "NOTES ON HOW WE PROCESSED THIS INDICATOR"
 
+# Rewrites of the "Depending on" footnotes of the grapher views, for tables with only income or only consumption data
+# When int-$ are not included
+DATA_RELATES_RULES_PIP = [
+    (
+        "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
+        "The data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
+    ),
+    (
+        "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita).",
+        "The data relates to consumption [per capita](#dod:per-capita).",
+    ),
+]
+# When int-$ are included
+IT_RELATES_RULES_PIP = [
+    (
+        "Depending on the country and year, it relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
+        "It relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
+    ),
+    (
+        "Depending on the country and year, it relates to consumption [per capita](#dod:per-capita).",
+        "It relates to consumption [per capita](#dod:per-capita).",
+    ),
+]
+NOTE_RULES_PIP = DATA_RELATES_RULES_PIP + IT_RELATES_RULES_PIP
+
 PROCESSING_DESCRIPTION_PIP_BASE = NEW_LINE.join(
     [
         "For most countries in the PIP dataset, estimates relate to _either_ disposable income or consumption, for all available years. A number of countries, however, have a mix of income and consumption data points, with both data types sometimes available for particular years.",
@@ -103,6 +128,16 @@ PROCESSING_DESCRIPTION_PIP_POVERTY = NEW_LINE.join(
 PPP_DESCRIPTION_PIP_2017 = "The data is measured in international-$ at 2017 prices – this adjusts for inflation and for differences in the cost of living between countries."
 PPP_DESCRIPTION_PIP_2011 = "The data is measured in international-$ at 2011 prices – this adjusts for inflation and for differences in the cost of living between countries."
 
+# Texts declared once in the shared-text copies of the PIP explorers (see explorer_tools/shared_text.py)
+SHARED_TEXTS_PIP = {
+    "processing_description": PROCESSING_DESCRIPTION_PIP,
+    "additional_description": ADDITIONAL_DESCRIPTION_PIP,
+}
+SHARED_TEXTS_PIP_PPP_COMPARISON = {
+    **SHARED_TEXTS_PIP,
+    "processing_description": PROCESSING_DESCRIPTION_PIP_PPP_COMPARISON,
+}
+
 ####################################################################################################
 # WORLD INEQUALITY DATABASE
 ####################################################################################################
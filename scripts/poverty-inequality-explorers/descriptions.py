@@ -0,0 +1,31 @@
+"""Descriptions of the columns of the poverty and inequality explorers.
+
+Descriptions are made of a few long parts shared by many columns (the processing notes, additional descriptions of each
+source, etc.). describe() joins them with empty lines, as explorers show them, and remembers every description it has
+made: a description made again from the same parts is the same string, instead of another copy of several kilobytes.
+Description columns are then stored as pandas Categoricals by the column schema (see explorer_tools/schema.py), with
+each distinct description kept once:
+
+    df_tables.loc[j, "description"] = describe(
+        f"Mean income per day.",
+        ADDITIONAL_DESCRIPTION_WID,
+        PROCESSING_DESCRIPTION_WID,
+    )
+
+"""
+
+import sys
+from functools import lru_cache
+
+from .common_parameters import NEW_LINE
+
+
+@lru_cache(maxsize=None)
+def _join(parts):
+    return sys.intern(NEW_LINE.join(parts))
+
+
+def describe(*parts):
+    # Description made of the given parts, the same string for the same parts
+    return _join(parts)
+
@@ -0,0 +1,57 @@
+"""Income aggregations (per day, month and year) of the columns of the incomes across the distribution explorers.
+
+The aggregations are defined in the `income_aggregation` sheet of each source, with their `aggregation` name, `slug_suffix`
+and `multiplier`. Instead of restating every column for each aggregation, explorers define the aggregated columns once, in
+a frame of base columns, and aggregate_incomes() derives the columns of all aggregations from it in one cross join:
+
+- `slug` is the slug of the base column followed by the `slug_suffix` of the aggregation,
+- `transform` multiplies the base column by the `multiplier` of the aggregation,
+- `{aggregation}` in any text (e.g. "Mean income per {aggregation}.") is replaced by the name of the aggregation,
+- `colorScaleNumericBins` is taken from the `colorScaleNumericBins_<aggregation>` columns, if the base columns have them.
+
+    df_base.loc[k, bins_columns(income_aggregation)] = deciles9.loc[dec9, bins_columns(income_aggregation, "scale_thr_")].values
+    df_tables = pd.concat([df_tables, aggregate_incomes(df_base, income_aggregation)], ignore_index=True)
+
+"""
+
+import pandas as pd
+
+PLACEHOLDER = "{aggregation}"
+BINS_PREFIX = "colorScaleNumericBins_"
+
+
+def bins_columns(income_aggregation, prefix=BINS_PREFIX):
+    # Columns with the colour bins of each aggregation, e.g. scale_thr_day, scale_thr_month and scale_thr_year
+    return [f"{prefix}{aggregation}" for aggregation in income_aggregation["aggregation"]]
+
+
+def aggregate_incomes(df_base, income_aggregation):
+    # Returns the aggregated columns of every base column, aggregation by aggregation and in the order of df_base.
+    bins = bins_columns(income_aggregation)
+    has_bins = all(column in df_base.columns for column in bins)
+    assert has_bins or not set(bins) & set(df_base.columns), f"Base columns need colour bins for all of {bins}"
+    columns = [column for column in df_base.columns if column not in bins]
+    # Aggregated bins take the place of the bins of each aggregation, and transform goes last
+    output_columns = []
+    for column in df_base.columns:
+        if column in bins:
+            column = "colorScaleNumericBins"
+        if column not in output_columns and column != "transform":
+            output_columns.append(column)
+
+    aggregations = income_aggregation[["aggregation", "slug_suffix", "multiplier"]].add_prefix("_")
+    df = aggregations.merge(df_base[columns], how="cross")
+
+    df["transform"] = "multiplyBy " + df["slug"] + " " + df["_multiplier"]
+    df["slug"] = df["slug"] + df["_slug_suffix"]
+    for column in columns:
+        if df_base[column].astype(str).str.contains(PLACEHOLDER, regex=False).any():
+            df[column] = [
+                text.replace(PLACEHOLDER, aggregation) if isinstance(text, str) else text
+                for text, aggregation in zip(df[column], df["_aggregation"])
+            ]
+    if has_bins:
+        # Rows of the cross join go aggregation by aggregation, like the transposed bins of the base columns
+        df["colorScaleNumericBins"] = df_base[bins].to_numpy().T.ravel()
+
+    return df[output_columns + ["transform"]]
@@ -3,7 +3,6 @@
 # This code creates the tsv file for the expanded poverty explorer from the LIS data, available [here](https://owid.cloud/admin/explorers/preview/lis-expanded-poverty)
 
 
-import textwrap
 from pathlib import Path
 
 import numpy as np
@@ -11,7 +10,18 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.blocks import write_block
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "poverty-lis.explorer.tsv"
@@ -21,39 +31,36 @@ outfile = PARENT_DIR / "explorers" / "poverty-lis.explorer.tsv"
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "1UFdwB1iBpP2tEP6GtxCHvW1GGhjsFflh42FWR80rYIg"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-welfare = pd.read_csv(url, keep_default_na=False)
+welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Equivalence scales
 sheet_name = "equivalence_scales"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-equivalence_scales = pd.read_csv(url, keep_default_na=False, dtype={"checkbox": "str"})
+equivalence_scales = read_sheet(sheet_id, sheet_name, keep_default_na=False, dtype={"checkbox": "str"})
 
 # Absolute povlines
 sheet_name = "povlines_abs"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_abs = pd.read_csv(url, keep_default_na=False, dtype={"dollars_text": "str"})
+povlines_abs = read_sheet(sheet_id, sheet_name, keep_default_na=False, dtype={"dollars_text": "str"})
 
 # Relative povlines
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_rel = pd.read_csv(url, keep_default_na=False)
+povlines_rel = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Tables sheet
 sheet_name = "tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-tables = pd.read_csv(url, keep_default_na=False)
+tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Poverty - Luxembourg Income Study",
@@ -85,6 +92,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 # Table generation
 
 sourceName = SOURCE_NAME_LIS
@@ -93,7 +101,6 @@ sourceLink = SOURCE_LINK_LIS
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
@@ -108,7 +115,7 @@ processing_distribution = PROCESSING_DISTRIBUTION_LIS
 ppp_description = PPP_DESCRIPTION_LIS
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_LIS
 
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for tab in range(len(tables)):
@@ -134,16 +141,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"headcount_ratio_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs['cents'][p]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"% of population living in households with {welfare['welfare_type'][wel]} below ${povlines_abs['dollars_text'][p]} a day.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"% of population living in households with {welfare['welfare_type'][wel]} below ${povlines_abs['dollars_text'][p]} a day.",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -162,16 +167,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"headcount_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs['cents'][p]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"Number of people living in households with {welfare['welfare_type'][wel]} below ${povlines_abs['dollars_text'][p]} a day.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"Number of people living in households with {welfare['welfare_type'][wel]} below ${povlines_abs['dollars_text'][p]} a day.",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = np.nan
                 df_tables.loc[j, "shortUnit"] = np.nan
@@ -190,16 +193,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"total_shortfall_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs.cents[p]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The total shortfall from a poverty line of ${povlines_abs['dollars_text'][p]} a day. This is the amount of money that would be theoretically needed to lift the {welfare['welfare_type'][wel]} of all people in poverty up to the poverty line. However this is not a measure of the actual cost of eliminating poverty, since it does not take into account the costs involved in making the necessary transfers nor any changes in behaviour they would bring about.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The total shortfall from a poverty line of ${povlines_abs['dollars_text'][p]} a day. This is the amount of money that would be theoretically needed to lift the {welfare['welfare_type'][wel]} of all people in poverty up to the poverty line. However this is not a measure of the actual cost of eliminating poverty, since it does not take into account the costs involved in making the necessary transfers nor any changes in behaviour they would bring about.",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -218,16 +219,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"avg_shortfall_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs['cents'][p]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The average shortfall from a poverty line of ${povlines_abs['dollars_text'][p]} (averaged across the population in poverty).",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The average shortfall from a poverty line of ${povlines_abs['dollars_text'][p]} (averaged across the population in poverty).",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -246,16 +245,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"avg_shortfall_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs['cents'][p]}_day"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The average shortfall from a poverty line of ${povlines_abs['dollars_text'][p]} (averaged across the population in poverty).",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The average shortfall from a poverty line of ${povlines_abs['dollars_text'][p]} (averaged across the population in poverty).",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -277,16 +274,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"income_gap_ratio_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs['cents'][p]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f'The average shortfall from a poverty line of ${povlines_abs.dollars_text[p]} a day (averaged across the population in poverty) expressed as a share of the poverty line. This metric is sometimes called the "income gap ratio". It captures the depth of poverty of those living on less than the poverty line.',
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f'The average shortfall from a poverty line of ${povlines_abs.dollars_text[p]} a day (averaged across the population in poverty) expressed as a share of the poverty line. This metric is sometimes called the "income gap ratio". It captures the depth of poverty of those living on less than the poverty line.',
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -305,16 +300,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"poverty_gap_index_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_{povlines_abs['cents'][p]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The poverty gap index calculated at a poverty line of ${povlines_abs['dollars_text'][p]} a day. The poverty gap index is a measure that reflects both the depth and prevalence of poverty. It is defined as the mean shortfall of the total population from the poverty line counting the non-poor as having zero shortfall and expressed as a percentage of the poverty line. It is worth unpacking that definition a little. For those below the poverty line, the shortfall corresponds to the amount of money required in order to reach the poverty line. For those at or above the poverty line, the shortfall is counted as zero. The average shortfall is then calculated across the total population – both poor and non-poor – and then expressed as a share of the poverty line. Unlike the more commonly-used metric of the headcount ratio, the poverty gap index is thus sensitive not only to whether a person’s income falls below the poverty line or not, but also by how much – i.e. to the depth of poverty they experience.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The poverty gap index calculated at a poverty line of ${povlines_abs['dollars_text'][p]} a day. The poverty gap index is a measure that reflects both the depth and prevalence of poverty. It is defined as the mean shortfall of the total population from the poverty line counting the non-poor as having zero shortfall and expressed as a percentage of the poverty line. It is worth unpacking that definition a little. For those below the poverty line, the shortfall corresponds to the amount of money required in order to reach the poverty line. For those at or above the poverty line, the shortfall is counted as zero. The average shortfall is then calculated across the total population – both poor and non-poor – and then expressed as a share of the poverty line. Unlike the more commonly-used metric of the headcount ratio, the poverty gap index is thus sensitive not only to whether a person’s income falls below the poverty line or not, but also by how much – i.e. to the depth of poverty they experience.",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -333,16 +326,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"headcount_ratio_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"% of population living in households with {welfare['welfare_type'][wel]} below {povlines_rel['percent'][pct]} of the median {welfare['welfare_type'][wel]}.",
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"% of population living in households with {welfare['welfare_type'][wel]} below {povlines_rel['percent'][pct]} of the median {welfare['welfare_type'][wel]}.",
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -359,16 +350,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"headcount_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"Number of people living in households with {welfare['welfare_type'][wel]} below {povlines_rel['percent'][pct]} of the median {welfare['welfare_type'][wel]}.",
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"Number of people living in households with {welfare['welfare_type'][wel]} below {povlines_rel['percent'][pct]} of the median {welfare['welfare_type'][wel]}.",
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = np.nan
                 df_tables.loc[j, "shortUnit"] = np.nan
@@ -387,16 +376,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"total_shortfall_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The total shortfall from a poverty line of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]}. This is the amount of money that would be theoretically needed to lift the {welfare['welfare_type'][wel]} of all people in poverty up to the poverty line. However this is not a measure of the actual cost of eliminating poverty, since it does not take into account the costs involved in making the necessary transfers nor any changes in behaviour they would bring about.",
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The total shortfall from a poverty line of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]}. This is the amount of money that would be theoretically needed to lift the {welfare['welfare_type'][wel]} of all people in poverty up to the poverty line. However this is not a measure of the actual cost of eliminating poverty, since it does not take into account the costs involved in making the necessary transfers nor any changes in behaviour they would bring about.",
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = np.nan
                 df_tables.loc[j, "shortUnit"] = np.nan
@@ -415,16 +402,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"avg_shortfall_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The average shortfall from a poverty line of of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]} (averaged across the population in poverty).",
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The average shortfall from a poverty line of of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]} (averaged across the population in poverty).",
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -441,16 +426,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"avg_shortfall_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}_day"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The average shortfall from a poverty line of of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]} (averaged across the population in poverty).",
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The average shortfall from a poverty line of of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]} (averaged across the population in poverty).",
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -470,16 +453,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"income_gap_ratio_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f'The average shortfall from a poverty line of of {povlines_rel.text[pct]} {welfare.welfare_type[wel]} (averaged across the population in poverty) expressed as a share of the poverty line. This metric is sometimes called the "income gap ratio". It captures the depth of poverty of those living on less than the poverty line.',
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f'The average shortfall from a poverty line of of {povlines_rel.text[pct]} {welfare.welfare_type[wel]} (averaged across the population in poverty) expressed as a share of the poverty line. This metric is sometimes called the "income gap ratio". It captures the depth of poverty of those living on less than the poverty line.',
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -496,16 +477,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"poverty_gap_index_{povlines_rel['slug_suffix'][pct]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The poverty gap index calculated at a poverty line of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]}. The poverty gap index is a measure that reflects both the depth and prevalence of poverty. It is defined as the mean shortfall of the total population from the poverty line counting the non-poor as having zero shortfall and expressed as a percentage of the poverty line. It is worth unpacking that definition a little. For those below the poverty line, the shortfall corresponds to the amount of money required in order to reach the poverty line. For those at or above the poverty line, the shortfall is counted as zero. The average shortfall is then calculated across the total population – both poor and non-poor – and then expressed as a share of the poverty line. Unlike the more commonly-used metric of the headcount ratio, the poverty gap index is thus sensitive not only to whether a person’s income falls below the poverty line or not, but also by how much – i.e. to the depth of poverty they experience.",
-                        relative_poverty_description,
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_poverty,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The poverty gap index calculated at a poverty line of {povlines_rel['text'][pct]} {welfare['welfare_type'][wel]}. The poverty gap index is a measure that reflects both the depth and prevalence of poverty. It is defined as the mean shortfall of the total population from the poverty line counting the non-poor as having zero shortfall and expressed as a percentage of the poverty line. It is worth unpacking that definition a little. For those below the poverty line, the shortfall corresponds to the amount of money required in order to reach the poverty line. For those at or above the poverty line, the shortfall is counted as zero. The average shortfall is then calculated across the total population – both poor and non-poor – and then expressed as a share of the poverty line. Unlike the more commonly-used metric of the headcount ratio, the poverty gap index is thus sensitive not only to whether a person’s income falls below the poverty line or not, but also by how much – i.e. to the depth of poverty they experience.",
+                    relative_poverty_description,
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_poverty,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -523,17 +502,15 @@ df_tables["colorScaleNumericMinValue"] = colorScaleNumericMinValue
 df_tables["tolerance"] = tolerance
 df_tables["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -1458,18 +1435,15 @@ df_graphers["relatedQuestionUrl"] = np.nan
 df_graphers["yAxisMin"] = yAxisMin
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Share in poverty")
-    & (df_graphers["Poverty line Dropdown"] == "$30 per day")
-    & (df_graphers["Income measure Dropdown"] == "After tax")
-    & (
-        df_graphers[
-            "Adjust for cost sharing within households (equivalized income) Checkbox"
-        ]
-        == "false"
-    ),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Share in poverty",
+        "Poverty line Dropdown": "$30 per day",
+        "Income measure Dropdown": "After tax",
+        "Adjust for cost sharing within households (equivalized income) Checkbox": "false",
+    },
+)
 
 
 # %% [markdown]
@@ -1477,32 +1451,27 @@ df_graphers.loc[
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names
 table_list = list(tables["name"].unique())
 
 # Header is converted into a tab-separated text
 header_tsv = df_header.to_csv(sep="\t", header=False)
 
-# Graphers table is converted into a tab-separated text
-graphers_tsv = df_graphers
-graphers_tsv = graphers_tsv.to_csv(sep="\t", index=False)
-
-# This table is indented, to follow explorers' format
-graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
-
-# The dataframes are combined, including tables and links to the datasets
+# The dataframes are combined, including tables and links to the datasets.
+# They are written as indented blocks, to follow explorers' format (see explorer_tools/blocks.py)
 with open(outfile, "w", newline="\n", encoding="utf-8") as f:
     f.write(header_tsv)
-    f.write("\ngraphers\n" + graphers_tsv_indented)
+    f.write("\ngraphers\n")
+    write_block(f, df_graphers)
 
     for tab in range(len(tables)):
-        table_tsv = (
-            df_tables[df_tables["tableSlug"] == tables["name"][tab]]
-            .copy()
-            .reset_index(drop=True)
-        )
-        table_tsv = table_tsv.drop(columns=["tableSlug"])
-        table_tsv = table_tsv.to_csv(sep="\t", index=False)
-        table_tsv_indented = textwrap.indent(table_tsv, "\t")
         f.write("\ntable\t" + tables["link"][tab] + "\t" + tables["name"][tab])
-        f.write("\ncolumns\t" + tables["name"][tab] + "\n" + table_tsv_indented)
+        f.write("\ncolumns\t" + tables["name"][tab] + "\n")
+        write_block(
+            f,
+            df_tables[df_tables["tableSlug"] == tables["name"][tab]],
+            drop=["tableSlug"],
+        )
@@ -2,7 +2,6 @@
 # # Incomes Across the Distribution Explorer of the Luxembourg Income Study
 # This code creates the tsv file for the incomes across the distribution explorer from the LIS data, available [here](https://owid.cloud/admin/explorers/preview/lis-incomes-across-distribution)
 
-import textwrap
 from pathlib import Path
 
 import numpy as np
@@ -10,7 +9,20 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.blocks import write_block
+from ...explorer_tools.ordering import sort_views
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
+from ..income_aggregation import aggregate_incomes, bins_columns
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "incomes-across-distribution-lis.explorer.tsv"
@@ -20,44 +32,38 @@ outfile = PARENT_DIR / "explorers" / "incomes-across-distribution-lis.explorer.t
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "1UFdwB1iBpP2tEP6GtxCHvW1GGhjsFflh42FWR80rYIg"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-welfare = pd.read_csv(url, keep_default_na=False)
+welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Equivalence scales
 sheet_name = "equivalence_scales"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-equivalence_scales = pd.read_csv(url, keep_default_na=False, dtype={"checkbox": "str"})
+equivalence_scales = read_sheet(sheet_id, sheet_name, keep_default_na=False, dtype={"checkbox": "str"})
 
 # Tables sheet
 sheet_name = "tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-tables = pd.read_csv(url, keep_default_na=False)
+tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles9 sheet (needed to handle thresholds data)
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles9 = pd.read_csv(url, keep_default_na=False)
+deciles9 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles10 sheet (needed to handle average and share data)
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles10 = pd.read_csv(url, keep_default_na=False)
+deciles10 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Top sheet (needed to handle data at the top of the distribution)
 sheet_name = "top_pct"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-top_pct = pd.read_csv(url, keep_default_na=False)
+top_pct = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Income aggregation sheet (day, month, year)
 sheet_name = "income_aggregation"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-income_aggregation = pd.read_csv(
-    url, keep_default_na=False, dtype={"multiplier": "str"}
+income_aggregation = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"multiplier": "str"}
 )
 
 # %% [markdown]
@@ -65,6 +71,7 @@ income_aggregation = pd.read_csv(
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Incomes Across the Distribution - Luxembourg Income Study",
@@ -96,6 +103,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 # Table generation
 
 sourceName = SOURCE_NAME_LIS
@@ -104,7 +112,6 @@ sourceLink = SOURCE_LINK_LIS
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
@@ -118,7 +125,7 @@ processing_distribution = PROCESSING_DISTRIBUTION_LIS
 
 ppp_description = PPP_DESCRIPTION_LIS
 
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for tab in range(len(tables)):
@@ -144,16 +151,14 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"mean_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"Mean {welfare['welfare_type'][wel]}.",
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    ppp_description,
-                    notes_title,
-                    processing_description,
-                    processing_gini_mean_median,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"Mean {welfare['welfare_type'][wel]}.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
             )
             df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
             df_tables.loc[j, "shortUnit"] = "$"
@@ -169,16 +174,14 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"median_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {welfare['welfare_type'][wel]} below which half of the population falls.",
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    ppp_description,
-                    notes_title,
-                    processing_description,
-                    processing_gini_mean_median,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The level of {welfare['welfare_type'][wel]} below which half of the population falls.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
             )
             df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
             df_tables.loc[j, "shortUnit"] = "$"
@@ -195,16 +198,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"thr_{deciles9['lis_notation'][dec9]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {welfare['welfare_type'][wel]} below which {deciles9['decile'][dec9]}0% of the population falls.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_distribution,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The level of {welfare['welfare_type'][wel]} below which {deciles9['decile'][dec9]}0% of the population falls.",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -221,16 +222,14 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"avg_{deciles10['lis_notation'][dec10]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The mean {welfare['welfare_type'][wel]} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_distribution,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The mean {welfare['welfare_type'][wel]} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
                 )
                 df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables.loc[j, "shortUnit"] = "$"
@@ -249,15 +248,13 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "slug"] = (
                     f"share_{deciles10['lis_notation'][dec10]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The share of {welfare['welfare_type'][wel]} received by the {deciles10['ordinal'][dec10]} (tenth of the population).",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_distribution,
-                    ]
+                df_tables.loc[j, "description"] = describe(
+                    f"The share of {welfare['welfare_type'][wel]} received by the {deciles10['ordinal'][dec10]} (tenth of the population).",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
                 )
                 df_tables.loc[j, "unit"] = "%"
                 df_tables.loc[j, "shortUnit"] = "%"
@@ -268,129 +265,123 @@ for tab in range(len(tables)):
                 df_tables.loc[j, "colorScaleScheme"] = "OrRd"
                 j += 1
 
-            # Income aggregations
-            for agg in range(len(income_aggregation)):
-                # Mean
-                df_tables.loc[j, "name"] = (
-                    f"Mean {welfare['welfare_type'][wel]} ({welfare['title'][wel]})"
-                )
-                df_tables.loc[j, "slug"] = (
-                    f"mean_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}{income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"Mean {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]}.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_gini_mean_median,
-                    ]
-                )
-                df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-                df_tables.loc[j, "shortUnit"] = "$"
-                df_tables.loc[j, "type"] = "Numeric"
-                df_tables.loc[j, "colorScaleNumericBins"] = income_aggregation["scale"][
-                    agg
-                ]
-                df_tables.loc[j, "colorScaleScheme"] = "BuGn"
-                df_tables.loc[j, "transform"] = (
-                    f"multiplyBy mean_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]} {income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
+            # Income aggregations, defined once for all periods (see income_aggregation.py)
+            df_base = pd.DataFrame()
+            k = 0
 
-                # Median
-                df_tables.loc[j, "name"] = (
-                    f"Median {welfare['welfare_type'][wel]} ({welfare['title'][wel]})"
+            # Mean
+            df_base.loc[k, "name"] = (
+                f"Mean {welfare['welfare_type'][wel]} ({welfare['title'][wel]})"
+            )
+            df_base.loc[k, "slug"] = (
+                f"mean_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
+            )
+            df_base.loc[k, "description"] = describe(
+                f"Mean {welfare['welfare_type'][wel]} per {{aggregation}}.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
+            )
+            df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+            df_base.loc[k, "shortUnit"] = "$"
+            df_base.loc[k, "type"] = "Numeric"
+            df_base.loc[k, bins_columns(income_aggregation)] = income_aggregation[
+                "scale"
+            ].values
+            df_base.loc[k, "colorScaleScheme"] = "BuGn"
+            k += 1
+
+            # Median
+            df_base.loc[k, "name"] = (
+                f"Median {welfare['welfare_type'][wel]} ({welfare['title'][wel]})"
+            )
+            df_base.loc[k, "slug"] = (
+                f"median_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
+            )
+            df_base.loc[k, "description"] = describe(
+                f"The level of {welfare['welfare_type'][wel]} per {{aggregation}} below which half of the population falls.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
+            )
+            df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+            df_base.loc[k, "shortUnit"] = "$"
+            df_base.loc[k, "type"] = "Numeric"
+            df_base.loc[k, bins_columns(income_aggregation)] = income_aggregation[
+                "scale"
+            ].values
+            df_base.loc[k, "colorScaleScheme"] = "Blues"
+            k += 1
+
+            # Thresholds - Deciles
+            for dec9 in range(len(deciles9)):
+                df_base.loc[k, "name"] = (
+                    f"{deciles9['ordinal'][dec9].capitalize()} ({welfare['title'][wel]})"
                 )
-                df_tables.loc[j, "slug"] = (
-                    f"median_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}{income_aggregation['slug_suffix'][agg]}"
+                df_base.loc[k, "slug"] = (
+                    f"thr_{deciles9['lis_notation'][dec9]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} below which half of the population falls.",
-                        welfare["description"][wel],
-                        equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_gini_mean_median,
-                    ]
+                df_base.loc[k, "description"] = describe(
+                    f"The level of {welfare['welfare_type'][wel]} per {{aggregation}} below which {deciles9['decile'][dec9]}0% of the population falls.",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
+                )
+                df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+                df_base.loc[k, "shortUnit"] = "$"
+                df_base.loc[k, "type"] = "Numeric"
+                df_base.loc[k, bins_columns(income_aggregation)] = deciles9.loc[
+                    dec9,
+                    bins_columns(
+                        income_aggregation, f"scale_thr_{welfare['slug'][wel]}_"
+                    ),
+                ].values
+                df_base.loc[k, "colorScaleScheme"] = "Purples"
+                k += 1
+
+            # Averages - Deciles
+            for dec10 in range(len(deciles10)):
+                df_base.loc[k, "name"] = (
+                    f"{deciles10['ordinal'][dec10].capitalize()} ({welfare['title'][wel]})"
                 )
-                df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-                df_tables.loc[j, "shortUnit"] = "$"
-                df_tables.loc[j, "type"] = "Numeric"
-                df_tables.loc[j, "colorScaleNumericBins"] = income_aggregation["scale"][
-                    agg
-                ]
-                df_tables.loc[j, "colorScaleScheme"] = "Blues"
-                df_tables.loc[j, "transform"] = (
-                    f"multiplyBy median_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]} {income_aggregation['multiplier'][agg]}"
+                df_base.loc[k, "slug"] = (
+                    f"avg_{deciles10['lis_notation'][dec10]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
                 )
-                j += 1
-
-                # Thresholds - Deciles
-                for dec9 in range(len(deciles9)):
-                    df_tables.loc[j, "name"] = (
-                        f"{deciles9['ordinal'][dec9].capitalize()} ({welfare['title'][wel]})"
-                    )
-                    df_tables.loc[j, "slug"] = (
-                        f"thr_{deciles9['lis_notation'][dec9]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}{income_aggregation['slug_suffix'][agg]}"
-                    )
-                    df_tables.loc[j, "description"] = new_line.join(
-                        [
-                            f"The level of {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} below which {deciles9['decile'][dec9]}0% of the population falls.",
-                            welfare["description"][wel],
-                            equivalence_scales["description"][eq],
-                            ppp_description,
-                            notes_title,
-                            processing_description,
-                            processing_distribution,
-                        ]
-                    )
-                    df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-                    df_tables.loc[j, "shortUnit"] = "$"
-                    df_tables.loc[j, "type"] = "Numeric"
-                    df_tables.loc[j, "colorScaleNumericBins"] = deciles9[
-                        f"scale_thr_{welfare['slug'][wel]}_{income_aggregation['aggregation'][agg]}"
-                    ][dec9]
-                    df_tables.loc[j, "colorScaleScheme"] = "Purples"
-                    df_tables.loc[j, "transform"] = (
-                        f"multiplyBy thr_{deciles9['lis_notation'][dec9]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]} {income_aggregation['multiplier'][agg]}"
-                    )
-                    j += 1
-
-                # Averages - Deciles
-                for dec10 in range(len(deciles10)):
-                    df_tables.loc[j, "name"] = (
-                        f"{deciles10['ordinal'][dec10].capitalize()} ({welfare['title'][wel]})"
-                    )
-                    df_tables.loc[j, "slug"] = (
-                        f"avg_{deciles10['lis_notation'][dec10]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}{income_aggregation['slug_suffix'][agg]}"
-                    )
-                    df_tables.loc[j, "description"] = new_line.join(
-                        [
-                            f"The mean {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
-                            welfare["description"][wel],
-                            equivalence_scales["description"][eq],
-                            ppp_description,
-                            notes_title,
-                            processing_description,
-                            processing_distribution,
-                        ]
-                    )
-                    df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-                    df_tables.loc[j, "shortUnit"] = "$"
-                    df_tables.loc[j, "type"] = "Numeric"
-                    df_tables.loc[j, "colorScaleNumericBins"] = deciles10[
-                        f"scale_avg_{welfare['slug'][wel]}_{income_aggregation['aggregation'][agg]}"
-                    ][dec10]
-                    df_tables.loc[j, "colorScaleScheme"] = "Greens"
-                    df_tables.loc[j, "transform"] = (
-                        f"multiplyBy avg_{deciles10['lis_notation'][dec10]}_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]} {income_aggregation['multiplier'][agg]}"
-                    )
-                    j += 1
+                df_base.loc[k, "description"] = describe(
+                    f"The mean {welfare['welfare_type'][wel]} per {{aggregation}} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
+                    welfare["description"][wel],
+                    equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
+                )
+                df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+                df_base.loc[k, "shortUnit"] = "$"
+                df_base.loc[k, "type"] = "Numeric"
+                df_base.loc[k, bins_columns(income_aggregation)] = deciles10.loc[
+                    dec10,
+                    bins_columns(
+                        income_aggregation, f"scale_avg_{welfare['slug'][wel]}_"
+                    ),
+                ].values
+                df_base.loc[k, "colorScaleScheme"] = "Greens"
+                k += 1
+
+            df_tables = pd.concat(
+                [df_tables, aggregate_incomes(df_base, income_aggregation)],
+                ignore_index=True,
+            )
+            j = len(df_tables)
 
     df_tables["tableSlug"] = tables["name"][tab]
 
@@ -401,17 +392,15 @@ df_tables["colorScaleNumericMinValue"] = colorScaleNumericMinValue
 df_tables["tolerance"] = tolerance
 df_tables["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -829,19 +818,16 @@ df_graphers["yAxisMin"] = yAxisMin
 
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Decile thresholds")
-    & (df_graphers["Decile Dropdown"] == "9 (richest)")
-    & (df_graphers["Income measure Dropdown"] == "After tax")
-    & (df_graphers["Period Radio"] == "Year")
-    & (
-        df_graphers[
-            "Adjust for cost sharing within households (equivalized income) Checkbox"
-        ]
-        == "false"
-    ),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Decile thresholds",
+        "Decile Dropdown": "9 (richest)",
+        "Income measure Dropdown": "After tax",
+        "Period Radio": "Year",
+        "Adjust for cost sharing within households (equivalized income) Checkbox": "false",
+    },
+)
 
 # Reorder dropdown menus
 # Decile/quantile Dropdown
@@ -862,16 +848,6 @@ decile_dropdown_list = [
     "All deciles",
 ]
 
-df_graphers_mapping = pd.DataFrame(
-    {
-        "decile_dropdown": decile_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("decile_dropdown")
-df_graphers["decile_dropdown_aux"] = df_graphers["Decile Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
 # Metric dropdown
 metric_dropdown_list = [
     "Mean income",
@@ -881,66 +857,44 @@ metric_dropdown_list = [
     "Decile shares",
 ]
 
-df_graphers_mapping = pd.DataFrame(
-    {
-        "metric_dropdown": metric_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("metric_dropdown")
-df_graphers["metric_dropdown_aux"] = df_graphers["Indicator Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
 # # Equivalence scales dropdown
 # eq_dropdown_list = ["Equivalized", "Per capita", "Equivalized vs. per capita"]
 
-# df_graphers_mapping = pd.DataFrame(
-#     {
-#         "eq_dropdown": eq_dropdown_list,
-#     }
-# )
-# df_graphers_mapping = df_graphers_mapping.reset_index().set_index("eq_dropdown")
-# df_graphers["eq_dropdown_aux"] = df_graphers["Equivalence scale Dropdown"].map(
-#     df_graphers_mapping["index"]
-# )
-
-# Sort by auxiliary variables and drop
-df_graphers = df_graphers.sort_values(
-    ["decile_dropdown_aux", "metric_dropdown_aux"], ignore_index=True
+# Sort by the order of both dropdowns
+df_graphers = sort_views(
+    df_graphers,
+    {
+        "Decile Dropdown": decile_dropdown_list,
+        "Indicator Dropdown": metric_dropdown_list,
+    },
 )
-df_graphers = df_graphers.drop(columns=["metric_dropdown_aux", "decile_dropdown_aux"])
 
 # %% [markdown]
 # ## Explorer generation
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names
 table_list = list(tables["name"].unique())
 
 # Header is converted into a tab-separated text
 header_tsv = df_header.to_csv(sep="\t", header=False)
 
-# Graphers table is converted into a tab-separated text
-graphers_tsv = df_graphers
-graphers_tsv = graphers_tsv.to_csv(sep="\t", index=False)
-
-# This table is indented, to follow explorers' format
-graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
-
-# The dataframes are combined, including tables and links to the datasets
+# The dataframes are combined, including tables and links to the datasets.
+# They are written as indented blocks, to follow explorers' format (see explorer_tools/blocks.py)
 with open(outfile, "w", newline="\n", encoding="utf-8") as f:
     f.write(header_tsv)
-    f.write("\ngraphers\n" + graphers_tsv_indented)
+    f.write("\ngraphers\n")
+    write_block(f, df_graphers)
 
     for tab in range(len(tables)):
-        table_tsv = (
-            df_tables[df_tables["tableSlug"] == tables["name"][tab]]
-            .copy()
-            .reset_index(drop=True)
-        )
-        table_tsv = table_tsv.drop(columns=["tableSlug"])
-        table_tsv = table_tsv.to_csv(sep="\t", index=False)
-        table_tsv_indented = textwrap.indent(table_tsv, "\t")
         f.write("\ntable\t" + tables["link"][tab] + "\t" + tables["name"][tab])
-        f.write("\ncolumns\t" + tables["name"][tab] + "\n" + table_tsv_indented)
+        f.write("\ncolumns\t" + tables["name"][tab] + "\n")
+        write_block(
+            f,
+            df_tables[df_tables["tableSlug"] == tables["name"][tab]],
+            drop=["tableSlug"],
+        )
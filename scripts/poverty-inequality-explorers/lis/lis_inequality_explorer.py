@@ -2,7 +2,6 @@
 # # Inequality Data Explorer of the Luxembourg Income Study
 # This code creates the tsv file for the inequality explorer from the LIS data, available [here](https://owid.cloud/admin/explorers/preview/lis-inequality)
 
-import textwrap
 from pathlib import Path
 
 import numpy as np
@@ -10,7 +9,18 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.blocks import write_block
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "inequality-lis.explorer.tsv"
@@ -20,34 +30,32 @@ outfile = PARENT_DIR / "explorers" / "inequality-lis.explorer.tsv"
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "1UFdwB1iBpP2tEP6GtxCHvW1GGhjsFflh42FWR80rYIg"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-welfare = pd.read_csv(url, keep_default_na=False)
+welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Equivalence scales
 sheet_name = "equivalence_scales"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-equivalence_scales = pd.read_csv(url, keep_default_na=False, dtype={"checkbox": "str"})
+equivalence_scales = read_sheet(sheet_id, sheet_name, keep_default_na=False, dtype={"checkbox": "str"})
 
 # Relative poverty sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_rel = pd.read_csv(url)
+povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # Tables sheet
 sheet_name = "tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-tables = pd.read_csv(url, keep_default_na=False)
+tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Inequality - Luxembourg Income Study",
@@ -79,6 +87,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 # Table generation
 
 sourceName = SOURCE_NAME_LIS
@@ -86,7 +95,6 @@ dataPublishedBy = DATA_PUBLISHED_BY_LIS
 sourceLink = SOURCE_LINK_LIS
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
@@ -101,7 +109,7 @@ processing_distribution = PROCESSING_DISTRIBUTION_LIS
 ppp_description = PPP_DESCRIPTION_LIS
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_LIS
 
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for tab in range(len(tables)):
@@ -124,15 +132,13 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"gini_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_gini_mean_median,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
             )
             df_tables.loc[j, "unit"] = np.nan
             df_tables.loc[j, "shortUnit"] = np.nan
@@ -149,15 +155,13 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"share_p100_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {welfare['welfare_type'][wel]} received by the richest 10% of the population.",
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_distribution,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the richest 10% of the population.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                notes_title,
+                processing_description,
+                processing_distribution,
             )
             df_tables.loc[j, "unit"] = "%"
             df_tables.loc[j, "shortUnit"] = "%"
@@ -174,15 +178,13 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"share_bottom50_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_distribution,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                notes_title,
+                processing_description,
+                processing_distribution,
             )
             df_tables.loc[j, "unit"] = "%"
             df_tables.loc[j, "shortUnit"] = "%"
@@ -197,15 +199,13 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"palma_ratio_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_distribution,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                notes_title,
+                processing_description,
+                processing_distribution,
             )
             df_tables.loc[j, "unit"] = np.nan
             df_tables.loc[j, "shortUnit"] = np.nan
@@ -224,16 +224,14 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"headcount_ratio_50_median_{welfare['slug'][wel]}_{equivalence_scales['slug'][eq]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of the population with {welfare['welfare_type'][wel]} below 50% of the median.",
-                    relative_poverty_description,
-                    welfare["description"][wel],
-                    equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_poverty,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The share of the population with {welfare['welfare_type'][wel]} below 50% of the median.",
+                relative_poverty_description,
+                welfare["description"][wel],
+                equivalence_scales["description"][eq],
+                notes_title,
+                processing_description,
+                processing_poverty,
             )
             df_tables.loc[j, "unit"] = "%"
             df_tables.loc[j, "shortUnit"] = "%"
@@ -255,17 +253,15 @@ df_tables["sourceLink"] = sourceLink
 df_tables["tolerance"] = tolerance
 df_tables["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -507,17 +503,14 @@ df_graphers["relatedQuestionUrl"] = np.nan
 df_graphers["yAxisMin"] = yAxisMin
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Gini coefficient")
-    & (df_graphers["Income measure Dropdown"] == "After tax")
-    & (
-        df_graphers[
-            "Adjust for cost sharing within households (equivalized income) Checkbox"
-        ]
-        == "false"
-    ),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Gini coefficient",
+        "Income measure Dropdown": "After tax",
+        "Adjust for cost sharing within households (equivalized income) Checkbox": "false",
+    },
+)
 
 
 # %% [markdown]
@@ -525,32 +518,27 @@ df_graphers.loc[
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names
 table_list = list(tables["name"].unique())
 
 # Header is converted into a tab-separated text
 header_tsv = df_header.to_csv(sep="\t", header=False)
 
-# Graphers table is converted into a tab-separated text
-graphers_tsv = df_graphers
-graphers_tsv = graphers_tsv.to_csv(sep="\t", index=False)
-
-# This table is indented, to follow explorers' format
-graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
-
-# The dataframes are combined, including tables and links to the datasets
+# The dataframes are combined, including tables and links to the datasets.
+# They are written as indented blocks, to follow explorers' format (see explorer_tools/blocks.py)
 with open(outfile, "w", newline="\n", encoding="utf-8") as f:
     f.write(header_tsv)
-    f.write("\ngraphers\n" + graphers_tsv_indented)
+    f.write("\ngraphers\n")
+    write_block(f, df_graphers)
 
     for tab in range(len(tables)):
-        table_tsv = (
-            df_tables[df_tables["tableSlug"] == tables["name"][tab]]
-            .copy()
-            .reset_index(drop=True)
-        )
-        table_tsv = table_tsv.drop(columns=["tableSlug"])
-        table_tsv = table_tsv.to_csv(sep="\t", index=False)
-        table_tsv_indented = textwrap.indent(table_tsv, "\t")
         f.write("\ntable\t" + tables["link"][tab] + "\t" + tables["name"][tab])
-        f.write("\ncolumns\t" + tables["name"][tab] + "\n" + table_tsv_indented)
+        f.write("\ncolumns\t" + tables["name"][tab] + "\n")
+        write_block(
+            f,
+            df_tables[df_tables["tableSlug"] == tables["name"][tab]],
+            drop=["tableSlug"],
+        )
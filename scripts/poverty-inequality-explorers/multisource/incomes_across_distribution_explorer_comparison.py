@@ -10,7 +10,19 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.ordering import sort_views
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
+from ..source_combinations import broadcast_to_tables, select_views
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = (
@@ -22,50 +34,40 @@ outfile = (
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # MULTI-SOURCE
 # Read Google sheets
 sheet_id = "1wcFsNZCEn_6SJ05BFkXKLUyvCrnigfR8eeemGKgAYsI"
 
 # Merged sheet (this contains PIP, WID and LIS dataset information together in one file)
 sheet_name = "merged_tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-merged_tables = pd.read_csv(url, keep_default_na=False)
+merged_tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Source checkbox covers all the possible combinations to get for the multi-source selector
 sheet_name = "source_checkbox"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-source_checkbox = pd.read_csv(
-    url, keep_default_na=False, dtype={"pip": "str", "wid": "str", "lis": "str"}
+source_checkbox = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"pip": "str", "wid": "str", "lis": "str"}
 )
 
 # Only get the combinations where all the sources are available (pre and post tax)
-source_checkbox = source_checkbox[
-    (
-        (source_checkbox["type"] == "pre")
-        & (source_checkbox["wid"] == "true")
-        & (source_checkbox["pip"] == "false")
-        & (source_checkbox["lis"] == "true")
-    )
-    | (
-        (source_checkbox["type"] == "post")
-        & (source_checkbox["wid"] == "true")
-        & (source_checkbox["pip"] == "true")
-        & (source_checkbox["lis"] == "true")
-    )
-].reset_index(drop=True)
+source_checkbox = select_views(
+    source_checkbox,
+    [
+        {"type": "pre", "pip": False, "wid": True, "lis": True},
+        {"type": "post", "pip": True, "wid": True, "lis": True},
+    ],
+)
 
 # Deciles9 sheet (needed to handle thresholds data)
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles9 = pd.read_csv(
-    url, keep_default_na=False, dtype={"dropdown": "str", "decile": "str"}
+deciles9 = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"dropdown": "str", "decile": "str"}
 )
 
 # Deciles10 sheet (needed to handle average and share data)
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles10 = pd.read_csv(
-    url, keep_default_na=False, dtype={"dropdown": "str", "decile": "str"}
+deciles10 = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"dropdown": "str", "decile": "str"}
 )
 
 # LUXEMBOURG INCOME STUDY
@@ -74,34 +76,28 @@ sheet_id = "1UFdwB1iBpP2tEP6GtxCHvW1GGhjsFflh42FWR80rYIg"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_welfare = pd.read_csv(url, keep_default_na=False)
+lis_welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Equivalence scales
 sheet_name = "equivalence_scales"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_equivalence_scales = pd.read_csv(url, keep_default_na=False)
+lis_equivalence_scales = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Relative poverty sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_povlines_rel = pd.read_csv(url)
+lis_povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # Deciles9 sheet (needed to handle thresholds data)
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_deciles9 = pd.read_csv(url, keep_default_na=False)
+lis_deciles9 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles10 sheet (needed to handle average and share data)
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_deciles10 = pd.read_csv(url, keep_default_na=False)
+lis_deciles10 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Income aggregation sheet (day, month, year)
 sheet_name = "income_aggregation"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_income_aggregation = pd.read_csv(
-    url, keep_default_na=False, dtype={"multiplier": "str"}
+lis_income_aggregation = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"multiplier": "str"}
 )
 
 # WORLD INEQUALITY DATABASE
@@ -110,24 +106,20 @@ sheet_id = "18T5IGnpyJwb8KL9USYvME6IaLEcYIo26ioHCpkDnwRQ"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_welfare = pd.read_csv(url, keep_default_na=False)
+wid_welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles9 sheet (needed to handle thresholds data)
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_deciles9 = pd.read_csv(url, keep_default_na=False)
+wid_deciles9 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles10 sheet (needed to handle average and share data)
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_deciles10 = pd.read_csv(url, keep_default_na=False)
+wid_deciles10 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Income aggregation sheet (day, month, year)
 sheet_name = "income_aggregation"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_income_aggregation = pd.read_csv(
-    url, keep_default_na=False, dtype={"multiplier": "str"}
+wid_income_aggregation = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"multiplier": "str"}
 )
 
 # WORLD BANK POVERTY AND INEQUALITY PLATFORM
@@ -136,24 +128,20 @@ sheet_id = "17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8"
 
 # Survey type sheet
 sheet_name = "table"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_tables = pd.read_csv(url)
+pip_tables = read_sheet(sheet_id, sheet_name)
 
 # Settings for 10 deciles variables (share, avg) sheet
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_deciles10 = pd.read_csv(url, dtype={"dropdown": "str", "decile": "str"})
+pip_deciles10 = read_sheet(sheet_id, sheet_name, dtype={"dropdown": "str", "decile": "str"})
 
 # Settings for 9 deciles variables (thr) sheet
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_deciles9 = pd.read_csv(url, dtype={"dropdown": "str", "decile": "str"})
+pip_deciles9 = read_sheet(sheet_id, sheet_name, dtype={"dropdown": "str", "decile": "str"})
 
 # Income aggregation sheet (day, month, year)
 sheet_name = "income_aggregation"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_income_aggregation = pd.read_csv(
-    url, keep_default_na=False, dtype={"multiplier": "str"}
+pip_income_aggregation = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"multiplier": "str"}
 )
 
 # %% [markdown]
@@ -161,6 +149,7 @@ pip_income_aggregation = pd.read_csv(
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Incomes Across the Distribution - World Bank, WID, and LIS",
@@ -192,6 +181,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 
 ###########################################################################################
 # WORLD BANK POVERTY AND INEQUALITY PLATFORM
@@ -202,8 +192,6 @@ sourceLink = SOURCE_LINK_PIP
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-tableSlug = "poverty_inequality"
-new_line = NEW_LINE
 
 additional_description = ADDITIONAL_DESCRIPTION_PIP_COMPARISON
 
@@ -213,7 +201,7 @@ processing_description = PROCESSING_DESCRIPTION_PIP_INCOMES_ACROSS_DISTRIBUTION
 ppp_description = PPP_DESCRIPTION_PIP_2017
 
 # Table generation
-df_tables_pip = pd.DataFrame()
+df_tables_pip = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for tab in range(len(pip_tables)):
@@ -233,14 +221,12 @@ for tab in range(len(pip_tables)):
     # mean
     df_tables_pip.loc[j, "name"] = f"Mean {pip_tables.text[tab]} (PIP data)"
     df_tables_pip.loc[j, "slug"] = "mean"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            f"Mean {pip_tables.text[tab]}.",
-            additional_description,
-            ppp_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        f"Mean {pip_tables.text[tab]}.",
+        additional_description,
+        ppp_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -252,14 +238,12 @@ for tab in range(len(pip_tables)):
     # median
     df_tables_pip.loc[j, "name"] = f"Median {pip_tables.text[tab]} (PIP data)"
     df_tables_pip.loc[j, "slug"] = "median"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {pip_tables.text[tab]} per day below which half of the population falls.",
-            additional_description,
-            ppp_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        f"The level of {pip_tables.text[tab]} per day below which half of the population falls.",
+        additional_description,
+        ppp_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -274,14 +258,12 @@ for tab in range(len(pip_tables)):
             f"{pip_deciles9.ordinal[dec9].capitalize()} (PIP data)"
         )
         df_tables_pip.loc[j, "slug"] = f"decile{pip_deciles9.decile[dec9]}_thr"
-        df_tables_pip.loc[j, "description"] = new_line.join(
-            [
-                f"The level of {pip_tables.text[tab]} per day below which {pip_deciles9.decile[dec9]}0% of the population falls.",
-                additional_description,
-                ppp_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables_pip.loc[j, "description"] = describe(
+            f"The level of {pip_tables.text[tab]} per day below which {pip_deciles9.decile[dec9]}0% of the population falls.",
+            additional_description,
+            ppp_description,
+            notes_title,
+            processing_description,
         )
         df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
         df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -296,14 +278,12 @@ for tab in range(len(pip_tables)):
             f"{pip_deciles10.ordinal[dec10].capitalize()} (PIP data)"
         )
         df_tables_pip.loc[j, "slug"] = f"decile{pip_deciles10.decile[dec10]}_avg"
-        df_tables_pip.loc[j, "description"] = new_line.join(
-            [
-                f"The mean {pip_tables.text[tab]} per day within the {pip_deciles10.ordinal[dec10]} (tenth of the population).",
-                additional_description,
-                ppp_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables_pip.loc[j, "description"] = describe(
+            f"The mean {pip_tables.text[tab]} per day within the {pip_deciles10.ordinal[dec10]} (tenth of the population).",
+            additional_description,
+            ppp_description,
+            notes_title,
+            processing_description,
         )
         df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
         df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -318,13 +298,11 @@ for tab in range(len(pip_tables)):
             f"{pip_deciles10.ordinal[dec10].capitalize()} (PIP data)"
         )
         df_tables_pip.loc[j, "slug"] = f"decile{pip_deciles10.decile[dec10]}_share"
-        df_tables_pip.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {pip_tables.text[tab]} received by the {pip_deciles10.ordinal[dec10]} (tenth of the population).",
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables_pip.loc[j, "description"] = describe(
+            f"The share of {pip_tables.text[tab]} received by the {pip_deciles10.ordinal[dec10]} (tenth of the population).",
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables_pip.loc[j, "unit"] = "%"
         df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -338,14 +316,12 @@ for tab in range(len(pip_tables)):
         # mean
         df_tables_pip.loc[j, "name"] = f"Mean {pip_tables.text[tab]} (PIP data)"
         df_tables_pip.loc[j, "slug"] = f"mean{pip_income_aggregation.slug_suffix[agg]}"
-        df_tables_pip.loc[j, "description"] = new_line.join(
-            [
-                f"The mean level of {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]}.",
-                additional_description,
-                ppp_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables_pip.loc[j, "description"] = describe(
+            f"The mean level of {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]}.",
+            additional_description,
+            ppp_description,
+            notes_title,
+            processing_description,
         )
         df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
         df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -364,14 +340,12 @@ for tab in range(len(pip_tables)):
         df_tables_pip.loc[j, "slug"] = (
             f"median{pip_income_aggregation.slug_suffix[agg]}"
         )
-        df_tables_pip.loc[j, "description"] = new_line.join(
-            [
-                f"The level of {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]} below which half of the population falls.",
-                additional_description,
-                ppp_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables_pip.loc[j, "description"] = describe(
+            f"The level of {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]} below which half of the population falls.",
+            additional_description,
+            ppp_description,
+            notes_title,
+            processing_description,
         )
         df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
         df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -393,14 +367,12 @@ for tab in range(len(pip_tables)):
             df_tables_pip.loc[j, "slug"] = (
                 f"decile{pip_deciles9.decile[dec9]}_thr{pip_income_aggregation.slug_suffix[agg]}"
             )
-            df_tables_pip.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]} below which {pip_deciles9.decile[dec9]}0% of the population falls.",
-                    additional_description,
-                    ppp_description,
-                    notes_title,
-                    processing_description,
-                ]
+            df_tables_pip.loc[j, "description"] = describe(
+                f"The level of {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]} below which {pip_deciles9.decile[dec9]}0% of the population falls.",
+                additional_description,
+                ppp_description,
+                notes_title,
+                processing_description,
             )
             df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
             df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -422,14 +394,12 @@ for tab in range(len(pip_tables)):
             df_tables_pip.loc[j, "slug"] = (
                 f"decile{pip_deciles10.decile[dec10]}_avg{pip_income_aggregation.slug_suffix[agg]}"
             )
-            df_tables_pip.loc[j, "description"] = new_line.join(
-                [
-                    f"The mean {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]} within the {pip_deciles10.ordinal[dec10]} (tenth of the population).",
-                    additional_description,
-                    ppp_description,
-                    notes_title,
-                    processing_description,
-                ]
+            df_tables_pip.loc[j, "description"] = describe(
+                f"The mean {pip_tables.text[tab]} per {pip_income_aggregation.aggregation[agg]} within the {pip_deciles10.ordinal[dec10]} (tenth of the population).",
+                additional_description,
+                ppp_description,
+                notes_title,
+                processing_description,
             )
             df_tables_pip.loc[j, "unit"] = "international-$ in 2017 prices"
             df_tables_pip.loc[j, "shortUnit"] = "$"
@@ -443,7 +413,7 @@ for tab in range(len(pip_tables)):
             )
             j += 1
 
-df_tables_pip["tableSlug"] = tableSlug
+df_tables_pip = broadcast_to_tables(df_tables_pip, merged_tables)
 df_tables_pip["sourceName"] = sourceName
 df_tables_pip["dataPublishedBy"] = dataPublishedBy
 df_tables_pip["sourceLink"] = sourceLink
@@ -463,61 +433,175 @@ sourceLink = SOURCE_LINK_WID
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 additional_description = ADDITIONAL_DESCRIPTION_WID
 ppp_description = PPP_DESCRIPTION_WID
 
-df_tables_wid = pd.DataFrame()
+df_tables_wid = new_frame(COLUMNS_SCHEMA)
 j = 0
 
-for tab in range(len(merged_tables)):
-    for wel in range(len(wid_welfare)):
-        # Define additional description depending on the welfare type
-        if wel == 0:
-            additional_description = ADDITIONAL_DESCRIPTION_WID_POST_TAX
-        else:
-            additional_description = ADDITIONAL_DESCRIPTION_WID
+for wel in range(len(wid_welfare)):
+    # Define additional description depending on the welfare type
+    if wel == 0:
+        additional_description = ADDITIONAL_DESCRIPTION_WID_POST_TAX
+    else:
+        additional_description = ADDITIONAL_DESCRIPTION_WID
 
-        # I need the original variables to not break the aggregations
+    # I need the original variables to not break the aggregations
+    # Mean
+    df_tables_wid.loc[j, "name"] = (
+        f"Mean {wid_welfare['welfare_type'][wel]} (WID data)"
+    )
+    df_tables_wid.loc[j, "slug"] = f"p0p100_avg_{wid_welfare['slug'][wel]}"
+    df_tables_wid.loc[j, "description"] = describe(
+        f"Mean {wid_welfare['welfare_type'][wel]}",
+        wid_welfare["description"][wel],
+        ppp_description,
+        additional_description,
+    )
+    df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+    df_tables_wid.loc[j, "shortUnit"] = "$"
+    df_tables_wid.loc[j, "type"] = "Numeric"
+    # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_mean"][wel]
+    df_tables_wid.loc[j, "colorScaleScheme"] = "BuGn"
+    j += 1
+
+    # Median
+    df_tables_wid.loc[j, "name"] = (
+        f"Median {wid_welfare['welfare_type'][wel]} (WID data)"
+    )
+    df_tables_wid.loc[j, "slug"] = f"median_{wid_welfare['slug'][wel]}"
+    df_tables_wid.loc[j, "description"] = describe(
+        f"This is the level of {wid_welfare['welfare_type'][wel]} below which half of the population falls.",
+        wid_welfare["description"][wel],
+        ppp_description,
+        additional_description,
+    )
+    df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+    df_tables_wid.loc[j, "shortUnit"] = "$"
+    df_tables_wid.loc[j, "type"] = "Numeric"
+    # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_median"][wel]
+    df_tables_wid.loc[j, "colorScaleScheme"] = "Blues"
+    j += 1
+
+    # Thresholds - Deciles
+    for dec9 in range(len(wid_deciles9)):
+        df_tables_wid.loc[j, "name"] = (
+            f"{wid_deciles9['ordinal'][dec9].capitalize()} (WID data)"
+        )
+        df_tables_wid.loc[j, "slug"] = (
+            f"{wid_deciles9['wid_notation'][dec9]}_thr_{wid_welfare['slug'][wel]}"
+        )
+        df_tables_wid.loc[j, "description"] = describe(
+            f"The level of {wid_welfare['welfare_type'][wel]} below which {wid_deciles9['decile'][dec9]}0% of the population falls.",
+            wid_welfare["description"][wel],
+            ppp_description,
+            additional_description,
+        )
+        df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+        df_tables_wid.loc[j, "shortUnit"] = "$"
+        df_tables_wid.loc[j, "type"] = "Numeric"
+        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles9["scale_thr"][
+        #     dec9
+        # ]
+        df_tables_wid.loc[j, "colorScaleScheme"] = "Purples"
+        j += 1
+
+    # Averages - Deciles
+    for dec10 in range(len(wid_deciles10)):
+        df_tables_wid.loc[j, "name"] = (
+            f"{wid_deciles10['ordinal'][dec10].capitalize()} (WID data)"
+        )
+        df_tables_wid.loc[j, "slug"] = (
+            f"{wid_deciles10['wid_notation'][dec10]}_avg_{wid_welfare['slug'][wel]}"
+        )
+        df_tables_wid.loc[j, "description"] = describe(
+            f"The mean {wid_welfare['welfare_type'][wel]} within the {wid_deciles10['ordinal'][dec10]} (tenth of the population).",
+            wid_welfare["description"][wel],
+            ppp_description,
+            additional_description,
+        )
+        df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+        df_tables_wid.loc[j, "shortUnit"] = "$"
+        df_tables_wid.loc[j, "type"] = "Numeric"
+        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles10["scale_avg"][
+        #     dec10
+        # ]
+        df_tables_wid.loc[j, "colorScaleScheme"] = "Greens"
+        j += 1
+
+    # Shares - Deciles
+    for dec10 in range(len(wid_deciles10)):
+        df_tables_wid.loc[j, "name"] = (
+            f"{wid_deciles10['ordinal'][dec10].capitalize()} (WID data)"
+        )
+        df_tables_wid.loc[j, "slug"] = (
+            f"{wid_deciles10['wid_notation'][dec10]}_share_{wid_welfare['slug'][wel]}"
+        )
+        df_tables_wid.loc[j, "description"] = describe(
+            f"The share of {wid_welfare['welfare_type'][wel]} received by the {wid_deciles10['ordinal'][dec10]} (tenth of the population).",
+            wid_welfare["description"][wel],
+            additional_description,
+        )
+        df_tables_wid.loc[j, "unit"] = "%"
+        df_tables_wid.loc[j, "shortUnit"] = "%"
+        df_tables_wid.loc[j, "type"] = "Numeric"
+        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles10[
+        #     "scale_share"
+        # ][dec10]
+        df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
+        j += 1
+
+    # Daily, monthly, annual aggregations
+    for agg in range(len(wid_income_aggregation)):
         # Mean
         df_tables_wid.loc[j, "name"] = (
             f"Mean {wid_welfare['welfare_type'][wel]} (WID data)"
         )
-        df_tables_wid.loc[j, "slug"] = f"p0p100_avg_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"Mean {wid_welfare['welfare_type'][wel]}",
-                wid_welfare["description"][wel],
-                ppp_description,
-                additional_description,
-            ]
+        df_tables_wid.loc[j, "slug"] = (
+            f"p0p100_avg_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
+        )
+        df_tables_wid.loc[j, "description"] = describe(
+            f"Mean {wid_welfare['welfare_type'][wel]}.",
+            wid_welfare["description"][wel],
+            ppp_description,
+            additional_description,
         )
         df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
         df_tables_wid.loc[j, "shortUnit"] = "$"
         df_tables_wid.loc[j, "type"] = "Numeric"
-        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_mean"][wel]
+        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_mean"][
+        #     wel
+        # ]
         df_tables_wid.loc[j, "colorScaleScheme"] = "BuGn"
+        df_tables_wid.loc[j, "transform"] = (
+            f"multiplyBy p0p100_avg_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
+        )
         j += 1
 
         # Median
         df_tables_wid.loc[j, "name"] = (
             f"Median {wid_welfare['welfare_type'][wel]} (WID data)"
         )
-        df_tables_wid.loc[j, "slug"] = f"median_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"This is the level of {wid_welfare['welfare_type'][wel]} below which half of the population falls.",
-                wid_welfare["description"][wel],
-                ppp_description,
-                additional_description,
-            ]
+        df_tables_wid.loc[j, "slug"] = (
+            f"median_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
+        )
+        df_tables_wid.loc[j, "description"] = describe(
+            f"This is the level of {wid_welfare['welfare_type'][wel]} below which 50% of the population falls.",
+            wid_welfare["description"][wel],
+            ppp_description,
+            additional_description,
         )
         df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
         df_tables_wid.loc[j, "shortUnit"] = "$"
         df_tables_wid.loc[j, "type"] = "Numeric"
-        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_median"][wel]
+        # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_median"][
+        #     wel
+        # ]
         df_tables_wid.loc[j, "colorScaleScheme"] = "Blues"
+        df_tables_wid.loc[j, "transform"] = (
+            f"multiplyBy median_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
+        )
         j += 1
 
         # Thresholds - Deciles
@@ -526,23 +610,26 @@ for tab in range(len(merged_tables)):
                 f"{wid_deciles9['ordinal'][dec9].capitalize()} (WID data)"
             )
             df_tables_wid.loc[j, "slug"] = (
-                f"{wid_deciles9['wid_notation'][dec9]}_thr_{wid_welfare['slug'][wel]}"
+                f"{wid_deciles9['wid_notation'][dec9]}_thr_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
             )
-            df_tables_wid.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {wid_welfare['welfare_type'][wel]} below which {wid_deciles9['decile'][dec9]}0% of the population falls.",
-                    wid_welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_tables_wid.loc[j, "description"] = describe(
+                f"The level of {wid_welfare['welfare_type'][wel]} below which {wid_deciles9['decile'][dec9]}0% of the population falls.",
+                wid_welfare["description"][wel],
+                ppp_description,
+                additional_description,
+            )
+            df_tables_wid.loc[j, "unit"] = (
+                f"international-$ in {PPP_YEAR_WID} prices"
             )
-            df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
             df_tables_wid.loc[j, "shortUnit"] = "$"
             df_tables_wid.loc[j, "type"] = "Numeric"
-            # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles9["scale_thr"][
-            #     dec9
-            # ]
+            # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles9[
+            #     "scale_thr"
+            # ][dec9]
             df_tables_wid.loc[j, "colorScaleScheme"] = "Purples"
+            df_tables_wid.loc[j, "transform"] = (
+                f"multiplyBy {wid_deciles9['wid_notation'][dec9]}_thr_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
+            )
             j += 1
 
         # Averages - Deciles
@@ -551,166 +638,29 @@ for tab in range(len(merged_tables)):
                 f"{wid_deciles10['ordinal'][dec10].capitalize()} (WID data)"
             )
             df_tables_wid.loc[j, "slug"] = (
-                f"{wid_deciles10['wid_notation'][dec10]}_avg_{wid_welfare['slug'][wel]}"
-            )
-            df_tables_wid.loc[j, "description"] = new_line.join(
-                [
-                    f"The mean {wid_welfare['welfare_type'][wel]} within the {wid_deciles10['ordinal'][dec10]} (tenth of the population).",
-                    wid_welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
-            )
-            df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-            df_tables_wid.loc[j, "shortUnit"] = "$"
-            df_tables_wid.loc[j, "type"] = "Numeric"
-            # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles10["scale_avg"][
-            #     dec10
-            # ]
-            df_tables_wid.loc[j, "colorScaleScheme"] = "Greens"
-            j += 1
-
-        # Shares - Deciles
-        for dec10 in range(len(wid_deciles10)):
-            df_tables_wid.loc[j, "name"] = (
-                f"{wid_deciles10['ordinal'][dec10].capitalize()} (WID data)"
+                f"{wid_deciles10['wid_notation'][dec10]}_avg_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
             )
-            df_tables_wid.loc[j, "slug"] = (
-                f"{wid_deciles10['wid_notation'][dec10]}_share_{wid_welfare['slug'][wel]}"
+            df_tables_wid.loc[j, "description"] = describe(
+                f"The mean {wid_welfare['welfare_type'][wel]} within the {wid_deciles10['ordinal'][dec10]} (tenth of the population).",
+                wid_welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
-            df_tables_wid.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {wid_welfare['welfare_type'][wel]} received by the {wid_deciles10['ordinal'][dec10]} (tenth of the population).",
-                    wid_welfare["description"][wel],
-                    additional_description,
-                ]
+            df_tables_wid.loc[j, "unit"] = (
+                f"international-$ in {PPP_YEAR_WID} prices"
             )
-            df_tables_wid.loc[j, "unit"] = "%"
-            df_tables_wid.loc[j, "shortUnit"] = "%"
+            df_tables_wid.loc[j, "shortUnit"] = "$"
             df_tables_wid.loc[j, "type"] = "Numeric"
             # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles10[
-            #     "scale_share"
+            #     "scale_avg"
             # ][dec10]
-            df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
-            j += 1
-
-        # Daily, monthly, annual aggregations
-        for agg in range(len(wid_income_aggregation)):
-            # Mean
-            df_tables_wid.loc[j, "name"] = (
-                f"Mean {wid_welfare['welfare_type'][wel]} (WID data)"
-            )
-            df_tables_wid.loc[j, "slug"] = (
-                f"p0p100_avg_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
-            )
-            df_tables_wid.loc[j, "description"] = new_line.join(
-                [
-                    f"Mean {wid_welfare['welfare_type'][wel]}.",
-                    wid_welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
-            )
-            df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-            df_tables_wid.loc[j, "shortUnit"] = "$"
-            df_tables_wid.loc[j, "type"] = "Numeric"
-            # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_mean"][
-            #     wel
-            # ]
-            df_tables_wid.loc[j, "colorScaleScheme"] = "BuGn"
-            df_tables_wid.loc[j, "transform"] = (
-                f"multiplyBy p0p100_avg_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
-            )
-            j += 1
-
-            # Median
-            df_tables_wid.loc[j, "name"] = (
-                f"Median {wid_welfare['welfare_type'][wel]} (WID data)"
-            )
-            df_tables_wid.loc[j, "slug"] = (
-                f"median_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
-            )
-            df_tables_wid.loc[j, "description"] = new_line.join(
-                [
-                    f"This is the level of {wid_welfare['welfare_type'][wel]} below which 50% of the population falls.",
-                    wid_welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
-            )
-            df_tables_wid.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-            df_tables_wid.loc[j, "shortUnit"] = "$"
-            df_tables_wid.loc[j, "type"] = "Numeric"
-            # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_median"][
-            #     wel
-            # ]
-            df_tables_wid.loc[j, "colorScaleScheme"] = "Blues"
+            df_tables_wid.loc[j, "colorScaleScheme"] = "Greens"
             df_tables_wid.loc[j, "transform"] = (
-                f"multiplyBy median_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
+                f"multiplyBy {wid_deciles10['wid_notation'][dec10]}_avg_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
             )
             j += 1
 
-            # Thresholds - Deciles
-            for dec9 in range(len(wid_deciles9)):
-                df_tables_wid.loc[j, "name"] = (
-                    f"{wid_deciles9['ordinal'][dec9].capitalize()} (WID data)"
-                )
-                df_tables_wid.loc[j, "slug"] = (
-                    f"{wid_deciles9['wid_notation'][dec9]}_thr_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables_wid.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {wid_welfare['welfare_type'][wel]} below which {wid_deciles9['decile'][dec9]}0% of the population falls.",
-                        wid_welfare["description"][wel],
-                        ppp_description,
-                        additional_description,
-                    ]
-                )
-                df_tables_wid.loc[j, "unit"] = (
-                    f"international-$ in {PPP_YEAR_WID} prices"
-                )
-                df_tables_wid.loc[j, "shortUnit"] = "$"
-                df_tables_wid.loc[j, "type"] = "Numeric"
-                # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles9[
-                #     "scale_thr"
-                # ][dec9]
-                df_tables_wid.loc[j, "colorScaleScheme"] = "Purples"
-                df_tables_wid.loc[j, "transform"] = (
-                    f"multiplyBy {wid_deciles9['wid_notation'][dec9]}_thr_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
-
-            # Averages - Deciles
-            for dec10 in range(len(wid_deciles10)):
-                df_tables_wid.loc[j, "name"] = (
-                    f"{wid_deciles10['ordinal'][dec10].capitalize()} (WID data)"
-                )
-                df_tables_wid.loc[j, "slug"] = (
-                    f"{wid_deciles10['wid_notation'][dec10]}_avg_{wid_welfare['slug'][wel]}{wid_income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables_wid.loc[j, "description"] = new_line.join(
-                    [
-                        f"The mean {wid_welfare['welfare_type'][wel]} within the {wid_deciles10['ordinal'][dec10]} (tenth of the population).",
-                        wid_welfare["description"][wel],
-                        ppp_description,
-                        additional_description,
-                    ]
-                )
-                df_tables_wid.loc[j, "unit"] = (
-                    f"international-$ in {PPP_YEAR_WID} prices"
-                )
-                df_tables_wid.loc[j, "shortUnit"] = "$"
-                df_tables_wid.loc[j, "type"] = "Numeric"
-                # df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_deciles10[
-                #     "scale_avg"
-                # ][dec10]
-                df_tables_wid.loc[j, "colorScaleScheme"] = "Greens"
-                df_tables_wid.loc[j, "transform"] = (
-                    f"multiplyBy {wid_deciles10['wid_notation'][dec10]}_avg_{wid_welfare['slug'][wel]} {wid_income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
-
-    df_tables_wid["tableSlug"] = merged_tables["name"][tab]
+df_tables_wid = broadcast_to_tables(df_tables_wid, merged_tables)
 
 df_tables_wid["sourceName"] = sourceName
 df_tables_wid["dataPublishedBy"] = dataPublishedBy
@@ -728,7 +678,6 @@ sourceLink = SOURCE_LINK_LIS
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 notes_title = NOTES_TITLE_LIS
 
@@ -740,39 +689,172 @@ processing_distribution = PROCESSING_DISTRIBUTION_LIS
 
 ppp_description = PPP_DESCRIPTION_LIS
 
-df_tables_lis = pd.DataFrame()
+# Only the per capita columns of LIS are compared with the other sources
+lis_equivalence_scales = lis_equivalence_scales[
+    lis_equivalence_scales["text"] != "equivalized"
+].reset_index(drop=True)
+
+df_tables_lis = new_frame(COLUMNS_SCHEMA)
 j = 0
 
-for tab in range(len(merged_tables)):
-    for wel in range(len(lis_welfare)):
-        for eq in range(len(lis_equivalence_scales)):
-            # I need the original variables to not break the aggregations
+for wel in range(len(lis_welfare)):
+    for eq in range(len(lis_equivalence_scales)):
+        # I need the original variables to not break the aggregations
+        # Mean
+        df_tables_lis.loc[j, "name"] = (
+            f"Mean {lis_welfare['welfare_type'][wel]} (LIS data)"
+        )
+        df_tables_lis.loc[j, "slug"] = (
+            f"mean_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            f"Mean {lis_welfare['welfare_type'][wel]}.",
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            ppp_description,
+            notes_title,
+            processing_description,
+            processing_gini_mean_median,
+        )
+        df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
+        df_tables_lis.loc[j, "shortUnit"] = "$"
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_mean"][
+            wel
+        ]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "BuGn"
+        j += 1
+
+        # Median
+        df_tables_lis.loc[j, "name"] = (
+            f"Median {lis_welfare['welfare_type'][wel]} (LIS data)"
+        )
+        df_tables_lis.loc[j, "slug"] = (
+            f"median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            f"The level of {lis_welfare['welfare_type'][wel]} below which half of the population falls.",
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            ppp_description,
+            notes_title,
+            processing_description,
+            processing_gini_mean_median,
+        )
+        df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
+        df_tables_lis.loc[j, "shortUnit"] = "$"
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_median"][
+            wel
+        ]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "Blues"
+        j += 1
+
+        # Thresholds - Deciles
+        for dec9 in range(len(lis_deciles9)):
+            df_tables_lis.loc[j, "name"] = (
+                f"{lis_deciles9['ordinal'][dec9].capitalize()} (LIS data)"
+            )
+            df_tables_lis.loc[j, "slug"] = (
+                f"thr_{lis_deciles9['lis_notation'][dec9]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+            )
+            df_tables_lis.loc[j, "description"] = describe(
+                f"The level of {lis_welfare['welfare_type'][wel]} below which {lis_deciles9['decile'][dec9]}0% of the population falls.",
+                lis_welfare["description"][wel],
+                lis_equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_distribution,
+            )
+            df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
+            df_tables_lis.loc[j, "shortUnit"] = "$"
+            df_tables_lis.loc[j, "type"] = "Numeric"
+            # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_deciles9[
+            #     "scale_thr"
+            # ][dec9]
+            df_tables_lis.loc[j, "colorScaleScheme"] = "Purples"
+            j += 1
+
+        # Averages - Deciles
+        for dec10 in range(len(lis_deciles10)):
+            df_tables_lis.loc[j, "name"] = (
+                f"{lis_deciles10['ordinal'][dec10].capitalize()} (LIS data)"
+            )
+            df_tables_lis.loc[j, "slug"] = (
+                f"avg_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+            )
+            df_tables_lis.loc[j, "description"] = describe(
+                f"The mean {lis_welfare['welfare_type'][wel]} within the {lis_deciles10['ordinal'][dec10]} (tenth of the population).",
+                lis_welfare["description"][wel],
+                lis_equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_distribution,
+            )
+            df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
+            df_tables_lis.loc[j, "shortUnit"] = "$"
+            df_tables_lis.loc[j, "type"] = "Numeric"
+            # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_deciles10[
+            #     "scale_avg"
+            # ][dec10]
+            df_tables_lis.loc[j, "colorScaleScheme"] = "Greens"
+            j += 1
+
+        # Shares - Deciles
+        for dec10 in range(len(lis_deciles10)):
+            df_tables_lis.loc[j, "name"] = (
+                f"{lis_deciles10['ordinal'][dec10].capitalize()} (LIS data)"
+            )
+            df_tables_lis.loc[j, "slug"] = (
+                f"share_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+            )
+            df_tables_lis.loc[j, "description"] = describe(
+                f"The share of {lis_welfare['welfare_type'][wel]} received by the {lis_deciles10['ordinal'][dec10]} (tenth of the population).",
+                lis_welfare["description"][wel],
+                lis_equivalence_scales["description"][eq],
+                notes_title,
+                processing_description,
+                processing_distribution,
+            )
+            df_tables_lis.loc[j, "unit"] = "%"
+            df_tables_lis.loc[j, "shortUnit"] = "%"
+            df_tables_lis.loc[j, "type"] = "Numeric"
+            # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_deciles10[
+            #     "scale_share"
+            # ][dec10]
+            df_tables_lis.loc[j, "colorScaleScheme"] = "OrRd"
+            j += 1
+
+        # Daily, monthly, annual aggregations
+        for agg in range(len(lis_income_aggregation)):
             # Mean
             df_tables_lis.loc[j, "name"] = (
                 f"Mean {lis_welfare['welfare_type'][wel]} (LIS data)"
             )
             df_tables_lis.loc[j, "slug"] = (
-                f"mean_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+                f"mean_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
             )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    f"Mean {lis_welfare['welfare_type'][wel]}.",
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    ppp_description,
-                    notes_title,
-                    processing_description,
-                    processing_gini_mean_median,
-                ]
+            df_tables_lis.loc[j, "description"] = describe(
+                f"Mean {lis_welfare['welfare_type'][wel]}.",
+                lis_welfare["description"][wel],
+                lis_equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
             )
             df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
             df_tables_lis.loc[j, "shortUnit"] = "$"
             df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_mean"][
-                wel
-            ]
+            # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
+            #     "scale_mean"
+            # ][wel]
             df_tables_lis.loc[j, "colorScaleScheme"] = "BuGn"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
+            df_tables_lis.loc[j, "transform"] = (
+                f"multiplyBy mean_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
+            )
             j += 1
 
             # Median
@@ -780,27 +862,27 @@ for tab in range(len(merged_tables)):
                 f"Median {lis_welfare['welfare_type'][wel]} (LIS data)"
             )
             df_tables_lis.loc[j, "slug"] = (
-                f"median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+                f"median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
             )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {lis_welfare['welfare_type'][wel]} below which half of the population falls.",
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    ppp_description,
-                    notes_title,
-                    processing_description,
-                    processing_gini_mean_median,
-                ]
+            df_tables_lis.loc[j, "description"] = describe(
+                f"The level of {lis_welfare['welfare_type'][wel]} below which half of the population falls.",
+                lis_welfare["description"][wel],
+                lis_equivalence_scales["description"][eq],
+                ppp_description,
+                notes_title,
+                processing_description,
+                processing_gini_mean_median,
             )
             df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
             df_tables_lis.loc[j, "shortUnit"] = "$"
             df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_median"][
-                wel
-            ]
+            # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
+            #     "scale_median"
+            # ][wel]
             df_tables_lis.loc[j, "colorScaleScheme"] = "Blues"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
+            df_tables_lis.loc[j, "transform"] = (
+                f"multiplyBy median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
+            )
             j += 1
 
             # Thresholds - Deciles
@@ -809,18 +891,16 @@ for tab in range(len(merged_tables)):
                     f"{lis_deciles9['ordinal'][dec9].capitalize()} (LIS data)"
                 )
                 df_tables_lis.loc[j, "slug"] = (
-                    f"thr_{lis_deciles9['lis_notation'][dec9]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+                    f"thr_{lis_deciles9['lis_notation'][dec9]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
                 )
-                df_tables_lis.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {lis_welfare['welfare_type'][wel]} below which {lis_deciles9['decile'][dec9]}0% of the population falls.",
-                        lis_welfare["description"][wel],
-                        lis_equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_distribution,
-                    ]
+                df_tables_lis.loc[j, "description"] = describe(
+                    f"The level of {lis_welfare['welfare_type'][wel]} below which {lis_deciles9['decile'][dec9]}0% of the population falls.",
+                    lis_welfare["description"][wel],
+                    lis_equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
                 )
                 df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables_lis.loc[j, "shortUnit"] = "$"
@@ -829,7 +909,9 @@ for tab in range(len(merged_tables)):
                 #     "scale_thr"
                 # ][dec9]
                 df_tables_lis.loc[j, "colorScaleScheme"] = "Purples"
-                df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
+                df_tables_lis.loc[j, "transform"] = (
+                    f"multiplyBy thr_{lis_deciles9['lis_notation'][dec9]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
+                )
                 j += 1
 
             # Averages - Deciles
@@ -838,18 +920,16 @@ for tab in range(len(merged_tables)):
                     f"{lis_deciles10['ordinal'][dec10].capitalize()} (LIS data)"
                 )
                 df_tables_lis.loc[j, "slug"] = (
-                    f"avg_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+                    f"avg_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
                 )
-                df_tables_lis.loc[j, "description"] = new_line.join(
-                    [
-                        f"The mean {lis_welfare['welfare_type'][wel]} within the {lis_deciles10['ordinal'][dec10]} (tenth of the population).",
-                        lis_welfare["description"][wel],
-                        lis_equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_distribution,
-                    ]
+                df_tables_lis.loc[j, "description"] = describe(
+                    f"The mean {lis_welfare['welfare_type'][wel]} within the {lis_deciles10['ordinal'][dec10]} (tenth of the population).",
+                    lis_welfare["description"][wel],
+                    lis_equivalence_scales["description"][eq],
+                    ppp_description,
+                    notes_title,
+                    processing_description,
+                    processing_distribution,
                 )
                 df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
                 df_tables_lis.loc[j, "shortUnit"] = "$"
@@ -858,170 +938,12 @@ for tab in range(len(merged_tables)):
                 #     "scale_avg"
                 # ][dec10]
                 df_tables_lis.loc[j, "colorScaleScheme"] = "Greens"
-                df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-                j += 1
-
-            # Shares - Deciles
-            for dec10 in range(len(lis_deciles10)):
-                df_tables_lis.loc[j, "name"] = (
-                    f"{lis_deciles10['ordinal'][dec10].capitalize()} (LIS data)"
-                )
-                df_tables_lis.loc[j, "slug"] = (
-                    f"share_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
-                )
-                df_tables_lis.loc[j, "description"] = new_line.join(
-                    [
-                        f"The share of {lis_welfare['welfare_type'][wel]} received by the {lis_deciles10['ordinal'][dec10]} (tenth of the population).",
-                        lis_welfare["description"][wel],
-                        lis_equivalence_scales["description"][eq],
-                        notes_title,
-                        processing_description,
-                        processing_distribution,
-                    ]
-                )
-                df_tables_lis.loc[j, "unit"] = "%"
-                df_tables_lis.loc[j, "shortUnit"] = "%"
-                df_tables_lis.loc[j, "type"] = "Numeric"
-                # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_deciles10[
-                #     "scale_share"
-                # ][dec10]
-                df_tables_lis.loc[j, "colorScaleScheme"] = "OrRd"
-                df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-                j += 1
-
-            # Daily, monthly, annual aggregations
-            for agg in range(len(lis_income_aggregation)):
-                # Mean
-                df_tables_lis.loc[j, "name"] = (
-                    f"Mean {lis_welfare['welfare_type'][wel]} (LIS data)"
-                )
-                df_tables_lis.loc[j, "slug"] = (
-                    f"mean_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables_lis.loc[j, "description"] = new_line.join(
-                    [
-                        f"Mean {lis_welfare['welfare_type'][wel]}.",
-                        lis_welfare["description"][wel],
-                        lis_equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_gini_mean_median,
-                    ]
-                )
-                df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
-                df_tables_lis.loc[j, "shortUnit"] = "$"
-                df_tables_lis.loc[j, "type"] = "Numeric"
-                # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
-                #     "scale_mean"
-                # ][wel]
-                df_tables_lis.loc[j, "colorScaleScheme"] = "BuGn"
                 df_tables_lis.loc[j, "transform"] = (
-                    f"multiplyBy mean_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
+                    f"multiplyBy avg_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
                 )
-                df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
                 j += 1
 
-                # Median
-                df_tables_lis.loc[j, "name"] = (
-                    f"Median {lis_welfare['welfare_type'][wel]} (LIS data)"
-                )
-                df_tables_lis.loc[j, "slug"] = (
-                    f"median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables_lis.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {lis_welfare['welfare_type'][wel]} below which half of the population falls.",
-                        lis_welfare["description"][wel],
-                        lis_equivalence_scales["description"][eq],
-                        ppp_description,
-                        notes_title,
-                        processing_description,
-                        processing_gini_mean_median,
-                    ]
-                )
-                df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
-                df_tables_lis.loc[j, "shortUnit"] = "$"
-                df_tables_lis.loc[j, "type"] = "Numeric"
-                # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
-                #     "scale_median"
-                # ][wel]
-                df_tables_lis.loc[j, "colorScaleScheme"] = "Blues"
-                df_tables_lis.loc[j, "transform"] = (
-                    f"multiplyBy median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
-                )
-                df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-                j += 1
-
-                # Thresholds - Deciles
-                for dec9 in range(len(lis_deciles9)):
-                    df_tables_lis.loc[j, "name"] = (
-                        f"{lis_deciles9['ordinal'][dec9].capitalize()} (LIS data)"
-                    )
-                    df_tables_lis.loc[j, "slug"] = (
-                        f"thr_{lis_deciles9['lis_notation'][dec9]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
-                    )
-                    df_tables_lis.loc[j, "description"] = new_line.join(
-                        [
-                            f"The level of {lis_welfare['welfare_type'][wel]} below which {lis_deciles9['decile'][dec9]}0% of the population falls.",
-                            lis_welfare["description"][wel],
-                            lis_equivalence_scales["description"][eq],
-                            ppp_description,
-                            notes_title,
-                            processing_description,
-                            processing_distribution,
-                        ]
-                    )
-                    df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
-                    df_tables_lis.loc[j, "shortUnit"] = "$"
-                    df_tables_lis.loc[j, "type"] = "Numeric"
-                    # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_deciles9[
-                    #     "scale_thr"
-                    # ][dec9]
-                    df_tables_lis.loc[j, "colorScaleScheme"] = "Purples"
-                    df_tables_lis.loc[j, "transform"] = (
-                        f"multiplyBy thr_{lis_deciles9['lis_notation'][dec9]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
-                    )
-                    df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales[
-                        "text"
-                    ][eq]
-                    j += 1
-
-                # Averages - Deciles
-                for dec10 in range(len(lis_deciles10)):
-                    df_tables_lis.loc[j, "name"] = (
-                        f"{lis_deciles10['ordinal'][dec10].capitalize()} (LIS data)"
-                    )
-                    df_tables_lis.loc[j, "slug"] = (
-                        f"avg_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}{lis_income_aggregation['slug_suffix'][agg]}"
-                    )
-                    df_tables_lis.loc[j, "description"] = new_line.join(
-                        [
-                            f"The mean {lis_welfare['welfare_type'][wel]} within the {lis_deciles10['ordinal'][dec10]} (tenth of the population).",
-                            lis_welfare["description"][wel],
-                            lis_equivalence_scales["description"][eq],
-                            ppp_description,
-                            notes_title,
-                            processing_description,
-                            processing_distribution,
-                        ]
-                    )
-                    df_tables_lis.loc[j, "unit"] = "international-$ in 2017 prices"
-                    df_tables_lis.loc[j, "shortUnit"] = "$"
-                    df_tables_lis.loc[j, "type"] = "Numeric"
-                    # df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_deciles10[
-                    #     "scale_avg"
-                    # ][dec10]
-                    df_tables_lis.loc[j, "colorScaleScheme"] = "Greens"
-                    df_tables_lis.loc[j, "transform"] = (
-                        f"multiplyBy avg_{lis_deciles10['lis_notation'][dec10]}_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]} {lis_income_aggregation['multiplier'][agg]}"
-                    )
-                    df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales[
-                        "text"
-                    ][eq]
-                    j += 1
-
-    df_tables_lis["tableSlug"] = merged_tables["name"][tab]
+df_tables_lis = broadcast_to_tables(df_tables_lis, merged_tables)
 
 df_tables_lis["sourceName"] = sourceName
 df_tables_lis["dataPublishedBy"] = dataPublishedBy
@@ -1030,24 +952,14 @@ df_tables_lis["colorScaleNumericMinValue"] = colorScaleNumericMinValue
 df_tables_lis["tolerance"] = tolerance
 df_tables_lis["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Remove all the rows that have the "equivalized" value in the equivalized column
-df_tables_lis = df_tables_lis[
-    df_tables_lis["equivalized"] != "equivalized"
-].reset_index(drop=True)
-
-# Drop the equivalized column
-df_tables_lis = df_tables_lis.drop(columns=["equivalized"])
-
 # Concatenate all the tables into one
 df_tables = pd.concat([df_tables_pip, df_tables_wid, df_tables_lis], ignore_index=True)
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
 yAxisMin = Y_AXIS_MIN
@@ -1055,136 +967,135 @@ selectedFacetStrategy = "entity"
 hasMapTab = "false"
 tab_parameter = "chart"
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
-for tab in range(len(merged_tables)):
-    for view in range(len(source_checkbox)):
-        for agg in range(len(lis_income_aggregation)):
-            # Mean
-            df_graphers.loc[j, "title"] = (
-                f"Mean income per {lis_income_aggregation['aggregation'][agg]} ({source_checkbox['type_title'][view]})"
-            )
-            df_graphers.loc[j, "ySlugs"] = source_checkbox["mean"][view].replace(
-                "{agg}", lis_income_aggregation["slug_suffix"][agg]
-            )
-            df_graphers.loc[j, "Indicator Dropdown"] = "Mean income or consumption"
-            df_graphers.loc[j, "Decile Dropdown"] = np.nan
-            df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
-                "type_title"
-            ][view].capitalize()
-            df_graphers.loc[j, "Period Radio"] = lis_income_aggregation["aggregation"][
-                agg
-            ].capitalize()
-            df_graphers.loc[j, "hideRelativeToggle"] = "false"
-            df_graphers.loc[j, "subtitle"] = f"{source_checkbox['note'][view]}"
-            df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
-            df_graphers.loc[j, "yScaleToggle"] = "true"
-            j += 1
+for view in range(len(source_checkbox)):
+    for agg in range(len(lis_income_aggregation)):
+        # Mean
+        df_graphers.loc[j, "title"] = (
+            f"Mean income per {lis_income_aggregation['aggregation'][agg]} ({source_checkbox['type_title'][view]})"
+        )
+        df_graphers.loc[j, "ySlugs"] = source_checkbox["mean"][view].replace(
+            "{agg}", lis_income_aggregation["slug_suffix"][agg]
+        )
+        df_graphers.loc[j, "Indicator Dropdown"] = "Mean income or consumption"
+        df_graphers.loc[j, "Decile Dropdown"] = np.nan
+        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
+            "type_title"
+        ][view].capitalize()
+        df_graphers.loc[j, "Period Radio"] = lis_income_aggregation["aggregation"][
+            agg
+        ].capitalize()
+        df_graphers.loc[j, "hideRelativeToggle"] = "false"
+        df_graphers.loc[j, "subtitle"] = f"{source_checkbox['note'][view]}"
+        df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
+        df_graphers.loc[j, "yScaleToggle"] = "true"
+        j += 1
 
-            # Median
+        # Median
+        df_graphers.loc[j, "title"] = (
+            f"Median income per {lis_income_aggregation['aggregation'][agg]} ({source_checkbox['type_title'][view]})"
+        )
+        df_graphers.loc[j, "ySlugs"] = source_checkbox["median"][view].replace(
+            "{agg}", lis_income_aggregation["slug_suffix"][agg]
+        )
+        df_graphers.loc[j, "Indicator Dropdown"] = "Median income or consumption"
+        df_graphers.loc[j, "Decile Dropdown"] = np.nan
+        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
+            "type_title"
+        ][view].capitalize()
+        df_graphers.loc[j, "Period Radio"] = lis_income_aggregation["aggregation"][
+            agg
+        ].capitalize()
+        df_graphers.loc[j, "hideRelativeToggle"] = "false"
+        df_graphers.loc[j, "subtitle"] = f"{source_checkbox['note'][view]}"
+        df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
+        df_graphers.loc[j, "yScaleToggle"] = "true"
+        j += 1
+
+        # Thresholds - Deciles
+        for dec9 in range(len(deciles9)):
             df_graphers.loc[j, "title"] = (
-                f"Median income per {lis_income_aggregation['aggregation'][agg]} ({source_checkbox['type_title'][view]})"
+                f"Threshold income marking the {deciles9['ordinal'][dec9]} ({source_checkbox['type_title'][view]})"
             )
-            df_graphers.loc[j, "ySlugs"] = source_checkbox["median"][view].replace(
-                "{agg}", lis_income_aggregation["slug_suffix"][agg]
+            df_graphers.loc[j, "ySlugs"] = (
+                source_checkbox["thr"][view]
+                .replace("{agg}", lis_income_aggregation["slug_suffix"][agg])
+                .replace("{dec9_pip}", deciles9["decile"][dec9])
+                .replace("{dec9_wid}", deciles9["wid_notation"][dec9])
+                .replace("{dec9_lis}", deciles9["lis_notation"][dec9])
             )
-            df_graphers.loc[j, "Indicator Dropdown"] = "Median income or consumption"
-            df_graphers.loc[j, "Decile Dropdown"] = np.nan
+            df_graphers.loc[j, "Indicator Dropdown"] = "Decile thresholds"
+            df_graphers.loc[j, "Decile Dropdown"] = deciles9["dropdown"][dec9]
             df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
                 "type_title"
             ][view].capitalize()
-            df_graphers.loc[j, "Period Radio"] = lis_income_aggregation["aggregation"][
-                agg
-            ].capitalize()
+            df_graphers.loc[j, "Period Radio"] = lis_income_aggregation[
+                "aggregation"
+            ][agg].capitalize()
             df_graphers.loc[j, "hideRelativeToggle"] = "false"
-            df_graphers.loc[j, "subtitle"] = f"{source_checkbox['note'][view]}"
+            df_graphers.loc[j, "subtitle"] = (
+                f"The level of income per {lis_income_aggregation['aggregation'][agg]} below which {deciles9['decile'][dec9]}0% of the population falls. {source_checkbox['note'][view]}"
+            )
             df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
             df_graphers.loc[j, "yScaleToggle"] = "true"
             j += 1
 
-            # Thresholds - Deciles
-            for dec9 in range(len(deciles9)):
-                df_graphers.loc[j, "title"] = (
-                    f"Threshold income marking the {deciles9['ordinal'][dec9]} ({source_checkbox['type_title'][view]})"
-                )
-                df_graphers.loc[j, "ySlugs"] = (
-                    source_checkbox["thr"][view]
-                    .replace("{agg}", lis_income_aggregation["slug_suffix"][agg])
-                    .replace("{dec9_pip}", deciles9["decile"][dec9])
-                    .replace("{dec9_wid}", deciles9["wid_notation"][dec9])
-                    .replace("{dec9_lis}", deciles9["lis_notation"][dec9])
-                )
-                df_graphers.loc[j, "Indicator Dropdown"] = "Decile thresholds"
-                df_graphers.loc[j, "Decile Dropdown"] = deciles9["dropdown"][dec9]
-                df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
-                    "type_title"
-                ][view].capitalize()
-                df_graphers.loc[j, "Period Radio"] = lis_income_aggregation[
-                    "aggregation"
-                ][agg].capitalize()
-                df_graphers.loc[j, "hideRelativeToggle"] = "false"
-                df_graphers.loc[j, "subtitle"] = (
-                    f"The level of income per {lis_income_aggregation['aggregation'][agg]} below which {deciles9['decile'][dec9]}0% of the population falls. {source_checkbox['note'][view]}"
-                )
-                df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
-                df_graphers.loc[j, "yScaleToggle"] = "true"
-                j += 1
-
-            # Averages - Deciles
-            for dec10 in range(len(deciles10)):
-                df_graphers.loc[j, "title"] = (
-                    f"Mean income within the {deciles10['ordinal'][dec10]} ({source_checkbox['type_title'][view]})"
-                )
-                df_graphers.loc[j, "ySlugs"] = (
-                    source_checkbox["avg"][view]
-                    .replace("{agg}", lis_income_aggregation["slug_suffix"][agg])
-                    .replace("{dec10_pip}", deciles10["decile"][dec10])
-                    .replace("{dec10_wid}", deciles10["wid_notation"][dec10])
-                    .replace("{dec10_lis}", deciles10["lis_notation"][dec10])
-                )
-                df_graphers.loc[j, "Indicator Dropdown"] = (
-                    "Mean income or consumption, by decile"
-                )
-                df_graphers.loc[j, "Decile Dropdown"] = deciles10["dropdown"][dec10]
-                df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
-                    "type_title"
-                ][view].capitalize()
-                df_graphers.loc[j, "Period Radio"] = lis_income_aggregation[
-                    "aggregation"
-                ][agg].capitalize()
-                df_graphers.loc[j, "hideRelativeToggle"] = "false"
-                df_graphers.loc[j, "subtitle"] = (
-                    f"The mean income per {lis_income_aggregation['aggregation'][agg]} within the {deciles10['ordinal'][dec10]} (tenth of the population). {source_checkbox['note'][view]}"
-                )
-                df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
-                df_graphers.loc[j, "yScaleToggle"] = "true"
-                j += 1
-
-        # Shares - Deciles
+        # Averages - Deciles
         for dec10 in range(len(deciles10)):
             df_graphers.loc[j, "title"] = (
-                f"Income share of the {deciles10['ordinal'][dec10]} ({source_checkbox['type_title'][view]})"
+                f"Mean income within the {deciles10['ordinal'][dec10]} ({source_checkbox['type_title'][view]})"
             )
             df_graphers.loc[j, "ySlugs"] = (
-                source_checkbox["share"][view]
+                source_checkbox["avg"][view]
+                .replace("{agg}", lis_income_aggregation["slug_suffix"][agg])
                 .replace("{dec10_pip}", deciles10["decile"][dec10])
                 .replace("{dec10_wid}", deciles10["wid_notation"][dec10])
                 .replace("{dec10_lis}", deciles10["lis_notation"][dec10])
             )
-            df_graphers.loc[j, "Indicator Dropdown"] = "Decile shares"
+            df_graphers.loc[j, "Indicator Dropdown"] = (
+                "Mean income or consumption, by decile"
+            )
             df_graphers.loc[j, "Decile Dropdown"] = deciles10["dropdown"][dec10]
             df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
                 "type_title"
             ][view].capitalize()
+            df_graphers.loc[j, "Period Radio"] = lis_income_aggregation[
+                "aggregation"
+            ][agg].capitalize()
+            df_graphers.loc[j, "hideRelativeToggle"] = "false"
             df_graphers.loc[j, "subtitle"] = (
-                f"The share of income received by the {deciles10['ordinal'][dec10]}. {source_checkbox['note'][view]}"
+                f"The mean income per {lis_income_aggregation['aggregation'][agg]} within the {deciles10['ordinal'][dec10]} (tenth of the population). {source_checkbox['note'][view]}"
             )
-            df_graphers.loc[j, "note"] = np.nan
+            df_graphers.loc[j, "note"] = f"{source_checkbox['note_ppp'][view]}"
+            df_graphers.loc[j, "yScaleToggle"] = "true"
             j += 1
 
-    df_graphers["tableSlug"] = merged_tables["name"][tab]
+    # Shares - Deciles
+    for dec10 in range(len(deciles10)):
+        df_graphers.loc[j, "title"] = (
+            f"Income share of the {deciles10['ordinal'][dec10]} ({source_checkbox['type_title'][view]})"
+        )
+        df_graphers.loc[j, "ySlugs"] = (
+            source_checkbox["share"][view]
+            .replace("{dec10_pip}", deciles10["decile"][dec10])
+            .replace("{dec10_wid}", deciles10["wid_notation"][dec10])
+            .replace("{dec10_lis}", deciles10["lis_notation"][dec10])
+        )
+        df_graphers.loc[j, "Indicator Dropdown"] = "Decile shares"
+        df_graphers.loc[j, "Decile Dropdown"] = deciles10["dropdown"][dec10]
+        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox[
+            "type_title"
+        ][view].capitalize()
+        df_graphers.loc[j, "subtitle"] = (
+            f"The share of income received by the {deciles10['ordinal'][dec10]}. {source_checkbox['note'][view]}"
+        )
+        df_graphers.loc[j, "note"] = np.nan
+        j += 1
+
+df_graphers = broadcast_to_tables(df_graphers, merged_tables)
 
 # Add yAxisMin and other columns
 df_graphers["yAxisMin"] = yAxisMin
@@ -1204,12 +1115,14 @@ df_graphers["relatedQuestionText"] = np.nan
 df_graphers["relatedQuestionUrl"] = np.nan
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Mean income or consumption")
-    & (df_graphers["Income measure Dropdown"] == "After tax")
-    & (df_graphers["Period Radio"] == "Year"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Mean income or consumption",
+        "Income measure Dropdown": "After tax",
+        "Period Radio": "Year",
+    },
+)
 
 # Reorder dropdown menus
 # Decile dropdown
@@ -1230,16 +1143,6 @@ decile_dropdown_list = [
     "All deciles",
 ]
 
-df_graphers_mapping = pd.DataFrame(
-    {
-        "decile_dropdown": decile_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("decile_dropdown")
-df_graphers["decile_dropdown_aux"] = df_graphers["Decile Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
 # Metric dropdown
 metric_dropdown_list = [
     "Mean income or consumption",
@@ -1249,27 +1152,23 @@ metric_dropdown_list = [
     "Decile shares",
 ]
 
-df_graphers_mapping = pd.DataFrame(
+# Sort by the order of both dropdowns
+df_graphers = sort_views(
+    df_graphers,
     {
-        "metric_dropdown": metric_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("metric_dropdown")
-df_graphers["metric_dropdown_aux"] = df_graphers["Indicator Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
-# Sort by auxiliary variables and drop
-df_graphers = df_graphers.sort_values(
-    ["decile_dropdown_aux", "metric_dropdown_aux"], ignore_index=True
+        "Decile Dropdown": decile_dropdown_list,
+        "Indicator Dropdown": metric_dropdown_list,
+    },
 )
-df_graphers = df_graphers.drop(columns=["metric_dropdown_aux", "decile_dropdown_aux"])
 
 # %% [markdown]
 # ## Explorer generation
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names (from table dataframe)
 table_list = list(df_tables["tableSlug"].unique())
 
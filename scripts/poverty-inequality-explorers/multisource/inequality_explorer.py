@@ -10,7 +10,19 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
+from ..source_artifacts import source_artifact
+from ..wid_inequality_tables import wid_inequality_tables
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "inequality.explorer.tsv"
@@ -20,14 +32,14 @@ outfile = PARENT_DIR / "explorers" / "inequality.explorer.tsv"
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # MULTI-SOURCE
 # Read Google sheets
 sheet_id = "1wcFsNZCEn_6SJ05BFkXKLUyvCrnigfR8eeemGKgAYsI"
 
 # All the tables sheet (this contains PIP, WID and LIS dataset information)
 sheet_name = "all_the_tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-all_the_tables = pd.read_csv(url, keep_default_na=False)
+all_the_tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # NOTE: We decided to drop LIS from the main inequality explorer
 
@@ -37,13 +49,11 @@ sheet_id = "18T5IGnpyJwb8KL9USYvME6IaLEcYIo26ioHCpkDnwRQ"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_welfare = pd.read_csv(url, keep_default_na=False)
+wid_welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Tables sheet
 sheet_name = "tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_tables = pd.read_csv(url, keep_default_na=False)
+wid_tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # WORLD BANK POVERTY AND INEQUALITY PLATFORM
 # Read Google sheets
@@ -51,19 +61,18 @@ sheet_id = "17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8"
 
 # Relative poverty sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_povlines_rel = pd.read_csv(url)
+pip_povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # Survey type sheet
 sheet_name = "table"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_tables = pd.read_csv(url)
+pip_tables = read_sheet(sheet_id, sheet_name)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Economic Inequality",
@@ -95,6 +104,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 
 ###########################################################################################
 # WORLD BANK POVERTY AND INEQUALITY PLATFORM
@@ -104,7 +114,6 @@ dataPublishedBy = DATA_PUBLISHED_BY_PIP
 sourceLink = SOURCE_LINK_PIP
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 additional_description = ADDITIONAL_DESCRIPTION_PIP_COMPARISON
 
@@ -115,7 +124,7 @@ ppp_description = PPP_DESCRIPTION_PIP_2017
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_PIP
 
 # Table generation
-df_tables_pip = pd.DataFrame()
+df_tables_pip = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for survey in range(len(pip_tables)):
@@ -136,13 +145,11 @@ for survey in range(len(pip_tables)):
     # Gini coefficient
     df_tables_pip.loc[j, "name"] = f"Gini coefficient (World Bank PIP)"
     df_tables_pip.loc[j, "slug"] = f"gini"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = np.nan
     df_tables_pip.loc[j, "shortUnit"] = np.nan
@@ -161,13 +168,11 @@ for survey in range(len(pip_tables)):
         f"{pip_tables.text[survey].capitalize()} share of the richest 10% (World Bank PIP)"
     )
     df_tables_pip.loc[j, "slug"] = f"decile10_share"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The share of after tax income or consumption received by the richest 10% of the population.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The share of after tax income or consumption received by the richest 10% of the population.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "%"
     df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -184,13 +189,11 @@ for survey in range(len(pip_tables)):
         f"{pip_tables.text[survey].capitalize()} share of the poorest 50% (World Bank PIP)"
     )
     df_tables_pip.loc[j, "slug"] = f"bottom50_share"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The share of after tax income or consumption received by the poorest 50% of the population.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The share of after tax income or consumption received by the poorest 50% of the population.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "%"
     df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -205,13 +208,11 @@ for survey in range(len(pip_tables)):
     # Palma ratio
     df_tables_pip.loc[j, "name"] = f"Palma ratio (World Bank PIP)"
     df_tables_pip.loc[j, "slug"] = f"palma_ratio"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = np.nan
     df_tables_pip.loc[j, "shortUnit"] = np.nan
@@ -226,15 +227,13 @@ for survey in range(len(pip_tables)):
     # Headcount ratio (rel)
     df_tables_pip.loc[j, "name"] = f"Share in relative poverty (World Bank PIP)"
     df_tables_pip.loc[j, "slug"] = f"headcount_ratio_50_median"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The share of population with after tax income or consumption below 50% of the median. Relative poverty reflects the extent of inequality within the bottom of the distribution.",
-            relative_poverty_description,
-            additional_description,
-            notes_title,
-            "Measures of relative poverty are not directly available in the World Bank PIP data. To calculate this metric we take the median income or consumption for the country and year, calculate a relative poverty line – in this case 50% of the median – and then run a specific query on the PIP API to return the share of population below that line.",
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The share of population with after tax income or consumption below 50% of the median. Relative poverty reflects the extent of inequality within the bottom of the distribution.",
+        relative_poverty_description,
+        additional_description,
+        notes_title,
+        "Measures of relative poverty are not directly available in the World Bank PIP data. To calculate this metric we take the median income or consumption for the country and year, calculate a relative poverty line – in this case 50% of the median – and then run a specific query on the PIP API to return the share of population below that line.",
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "%"
     df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -255,170 +254,13 @@ df_tables_pip["tolerance"] = tolerance
 # WORLD INEQUALITY DATABASE (WID)
 ###########################################################################################
 
-# Table generation
-
-sourceName = SOURCE_NAME_WID
-dataPublishedBy = DATA_PUBLISHED_BY_WID
-sourceLink = SOURCE_LINK_WID
-tolerance = TOLERANCE
-new_line = NEW_LINE
-
-additional_description = ADDITIONAL_DESCRIPTION_WID
-ppp_description = PPP_DESCRIPTION_WID
-
-df_tables_wid = pd.DataFrame()
-j = 0
-
-for tab in range(len(wid_tables)):
-    # Define country as entityName
-    df_tables_wid.loc[j, "name"] = "Country"
-    df_tables_wid.loc[j, "slug"] = "country"
-    df_tables_wid.loc[j, "type"] = "EntityName"
-    j += 1
-
-    # Define year as Year
-    df_tables_wid.loc[j, "name"] = "Year"
-    df_tables_wid.loc[j, "slug"] = "year"
-    df_tables_wid.loc[j, "type"] = "Year"
-    j += 1
-
-    for wel in range(len(wid_welfare)):
-        # Gini coefficient
-        df_tables_wid.loc[j, "name"] = (
-            f"Gini coefficient {wid_welfare['title'][wel]} (World Inequality Database)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p0p100_gini_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = np.nan
-        df_tables_wid.loc[j, "shortUnit"] = np.nan
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_gini"][wel]
-        df_tables_wid.loc[j, "colorScaleNumericMinValue"] = 1
-        df_tables_wid.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables_wid.loc[j, "colorScaleScheme"] = "Oranges"
-        j += 1
-
-        # Share of the top 10%
-        df_tables_wid.loc[j, "name"] = (
-            f"{wid_welfare['welfare_type'][wel].capitalize()} share of the richest 10% {wid_welfare['title'][wel]} (World Inequality Database)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p90p100_share_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {wid_welfare['welfare_type'][wel]} received by the richest 10% of the population.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = "%"
-        df_tables_wid.loc[j, "shortUnit"] = "%"
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_top10"][wel]
-        df_tables_wid.loc[j, "colorScaleNumericMinValue"] = 100
-        df_tables_wid.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
-
-        # Share of the top 1%
-        df_tables_wid.loc[j, "name"] = (
-            f"{wid_welfare['welfare_type'][wel].capitalize()} share of the richest 1% {wid_welfare['title'][wel]} (World Inequality Database)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p99p100_share_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {wid_welfare['welfare_type'][wel]} received by the richest 1% of the population.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = "%"
-        df_tables_wid.loc[j, "shortUnit"] = "%"
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_top1"][wel]
-        df_tables_wid.loc[j, "colorScaleNumericMinValue"] = 0
-        df_tables_wid.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
-
-        # Share of the top 0.1%
-        df_tables_wid.loc[j, "name"] = (
-            f"{wid_welfare['welfare_type'][wel].capitalize()} share of the richest 0.1% {wid_welfare['title'][wel]} (World Inequality Database)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p99_9p100_share_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {wid_welfare['welfare_type'][wel]} received by the richest 0.1% of the population.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = "%"
-        df_tables_wid.loc[j, "shortUnit"] = "%"
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_top01"][wel]
-        df_tables_wid.loc[j, "colorScaleNumericMinValue"] = 0
-        df_tables_wid.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
-
-        # Share of the bottom 50%
-        df_tables_wid.loc[j, "name"] = (
-            f"{wid_welfare['welfare_type'][wel].capitalize()} share of the poorest 50% {wid_welfare['title'][wel]} (World Inequality Database)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p0p50_share_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {wid_welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = "%"
-        df_tables_wid.loc[j, "shortUnit"] = "%"
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_bottom50"][
-            wel
-        ]
-        df_tables_wid.loc[j, "colorScaleNumericMinValue"] = 100
-        df_tables_wid.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables_wid.loc[j, "colorScaleScheme"] = "Blues"
-        j += 1
-
-        # Palma ratio
-        df_tables_wid.loc[j, "name"] = (
-            f"Palma ratio {wid_welfare['title'][wel]} (World Inequality Database)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"palma_ratio_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = np.nan
-        df_tables_wid.loc[j, "shortUnit"] = np.nan
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare[
-            "scale_palma_ratio"
-        ][wel]
-        df_tables_wid.loc[j, "colorScaleNumericMinValue"] = 0
-        df_tables_wid.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables_wid.loc[j, "colorScaleScheme"] = "YlOrBr"
-        j += 1
-
-    df_tables_wid["tableSlug"] = wid_tables["name"][tab]
-
-df_tables_wid["sourceName"] = sourceName
-df_tables_wid["dataPublishedBy"] = dataPublishedBy
-df_tables_wid["sourceLink"] = sourceLink
-df_tables_wid["tolerance"] = tolerance
+# The columns are the same as in the WID inequality explorer, with the source in their names
+df_tables_wid = source_artifact(
+    wid_inequality_tables,
+    wid_welfare,
+    wid_tables,
+    name_suffix=" (World Inequality Database)",
+)
 
 # Keep only pretax national values for WID:
 df_tables_wid = df_tables_wid[
@@ -427,14 +269,12 @@ df_tables_wid = df_tables_wid[
 
 # Concatenate all the tables into one
 df_tables = pd.concat([df_tables_pip, df_tables_wid], ignore_index=True)
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
 ###########################################################################################
@@ -445,7 +285,7 @@ df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
 
 yAxisMin = Y_AXIS_MIN
 
-df_graphers_wid = pd.DataFrame()
+df_graphers_wid = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -633,7 +473,7 @@ df_graphers_wid["yAxisMin"] = yAxisMin
 ###########################################################################################
 yAxisMin = Y_AXIS_MIN
 
-df_graphers_pip = pd.DataFrame()
+df_graphers_pip = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -813,11 +653,13 @@ df_graphers["relatedQuestionText"] = np.nan
 df_graphers["relatedQuestionUrl"] = np.nan
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Data Radio"] == "World Inequality Database (Incomes before tax)")
-    & (df_graphers["Indicator Dropdown"] == "Gini coefficient"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Data Radio": "World Inequality Database (Incomes before tax)",
+        "Indicator Dropdown": "Gini coefficient",
+    },
+)
 
 
 # %% [markdown]
@@ -825,6 +667,9 @@ df_graphers.loc[
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names (from table dataframe)
 table_list = list(df_tables["tableSlug"].unique())
 
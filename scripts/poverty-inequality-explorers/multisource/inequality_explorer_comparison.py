@@ -10,7 +10,18 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
+from ..source_combinations import broadcast_to_tables, select_views
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "inequality-comparison.explorer.tsv"
@@ -20,37 +31,29 @@ outfile = PARENT_DIR / "explorers" / "inequality-comparison.explorer.tsv"
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # MULTI-SOURCE
 # Read Google sheets
 sheet_id = "1wcFsNZCEn_6SJ05BFkXKLUyvCrnigfR8eeemGKgAYsI"
 
 # Merged sheet (this contains PIP, WID and LIS dataset information together in one file)
 sheet_name = "merged_tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-merged_tables = pd.read_csv(url, keep_default_na=False)
+merged_tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Source checkbox covers all the possible combinations to get for the multi-source selector
 sheet_name = "source_checkbox"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-source_checkbox = pd.read_csv(
-    url, keep_default_na=False, dtype={"pip": "str", "wid": "str", "lis": "str"}
+source_checkbox = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"pip": "str", "wid": "str", "lis": "str"}
 )
 
 # Only get the combinations where all the sources are available (pre and post tax)
-source_checkbox = source_checkbox[
-    (
-        (source_checkbox["type"] == "pre")
-        & (source_checkbox["wid"] == "true")
-        & (source_checkbox["pip"] == "false")
-        & (source_checkbox["lis"] == "true")
-    )
-    | (
-        (source_checkbox["type"] == "post")
-        & (source_checkbox["wid"] == "true")
-        & (source_checkbox["pip"] == "true")
-        & (source_checkbox["lis"] == "true")
-    )
-].reset_index(drop=True)
+source_checkbox = select_views(
+    source_checkbox,
+    [
+        {"type": "pre", "pip": False, "wid": True, "lis": True},
+        {"type": "post", "pip": True, "wid": True, "lis": True},
+    ],
+)
 
 # LUXEMBOURG INCOME STUDY
 # Read Google sheets
@@ -58,18 +61,15 @@ sheet_id = "1UFdwB1iBpP2tEP6GtxCHvW1GGhjsFflh42FWR80rYIg"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_welfare = pd.read_csv(url, keep_default_na=False)
+lis_welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Equivalence scales
 sheet_name = "equivalence_scales"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_equivalence_scales = pd.read_csv(url, keep_default_na=False)
+lis_equivalence_scales = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Relative poverty sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-lis_povlines_rel = pd.read_csv(url)
+lis_povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # WORLD INEQUALITY DATABASE
 # Read Google sheets
@@ -77,8 +77,7 @@ sheet_id = "18T5IGnpyJwb8KL9USYvME6IaLEcYIo26ioHCpkDnwRQ"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-wid_welfare = pd.read_csv(url, keep_default_na=False)
+wid_welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # WORLD BANK POVERTY AND INEQUALITY PLATFORM
 # Read Google sheets
@@ -86,19 +85,18 @@ sheet_id = "17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8"
 
 # Survey type sheet
 sheet_name = "table"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_tables = pd.read_csv(url)
+pip_tables = read_sheet(sheet_id, sheet_name)
 
 # Relative poverty sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-pip_povlines_rel = pd.read_csv(url)
+pip_povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Inequality - World Bank, WID, and LIS",
@@ -130,6 +128,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 
 ###########################################################################################
 # WORLD BANK POVERTY AND INEQUALITY PLATFORM
@@ -140,8 +139,6 @@ sourceLink = SOURCE_LINK_PIP
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-tableSlug = "poverty_inequality"
-new_line = NEW_LINE
 
 additional_description = ADDITIONAL_DESCRIPTION_PIP_COMPARISON
 
@@ -152,7 +149,7 @@ ppp_description = PPP_DESCRIPTION_PIP_2017
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_PIP
 
 # Table generation
-df_tables_pip = pd.DataFrame()
+df_tables_pip = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for tab in range(len(pip_tables)):
@@ -171,13 +168,11 @@ for tab in range(len(pip_tables)):
     # Gini coefficient
     df_tables_pip.loc[j, "name"] = f"Gini coefficient (PIP data)"
     df_tables_pip.loc[j, "slug"] = f"gini"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = np.nan
     df_tables_pip.loc[j, "shortUnit"] = np.nan
@@ -193,13 +188,11 @@ for tab in range(len(pip_tables)):
         f"{pip_tables.text[tab].capitalize()} share of the richest 10% (PIP data)"
     )
     df_tables_pip.loc[j, "slug"] = f"decile10_share"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The share of after tax income or consumption received by the richest 10% of the population.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The share of after tax income or consumption received by the richest 10% of the population.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "%"
     df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -213,13 +206,11 @@ for tab in range(len(pip_tables)):
         f"{pip_tables.text[tab].capitalize()} share of the poorest 50% (PIP data)"
     )
     df_tables_pip.loc[j, "slug"] = f"bottom50_share"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The share of after tax income or consumption received by the poorest 50% of the population.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The share of after tax income or consumption received by the poorest 50% of the population.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "%"
     df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -231,13 +222,11 @@ for tab in range(len(pip_tables)):
     # Palma ratio
     df_tables_pip.loc[j, "name"] = f"Palma ratio (PIP data)"
     df_tables_pip.loc[j, "slug"] = f"palma_ratio"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = np.nan
     df_tables_pip.loc[j, "shortUnit"] = np.nan
@@ -249,15 +238,13 @@ for tab in range(len(pip_tables)):
     # Headcount ratio (rel)
     df_tables_pip.loc[j, "name"] = f"Share in relative poverty (PIP data)"
     df_tables_pip.loc[j, "slug"] = f"headcount_ratio_50_median"
-    df_tables_pip.loc[j, "description"] = new_line.join(
-        [
-            "The share of population with after tax income or consumption below 50% of the median.",
-            relative_poverty_description,
-            additional_description,
-            notes_title,
-            "Measures of relative poverty are not directly available in the World Bank PIP data. To calculate this metric we take the median income or consumption for the country and year, calculate a relative poverty line – in this case 50% of the median – and then run a specific query on the PIP API to return the share of population below that line.",
-            processing_description,
-        ]
+    df_tables_pip.loc[j, "description"] = describe(
+        "The share of population with after tax income or consumption below 50% of the median.",
+        relative_poverty_description,
+        additional_description,
+        notes_title,
+        "Measures of relative poverty are not directly available in the World Bank PIP data. To calculate this metric we take the median income or consumption for the country and year, calculate a relative poverty line – in this case 50% of the median – and then run a specific query on the PIP API to return the share of population below that line.",
+        processing_description,
     )
     df_tables_pip.loc[j, "unit"] = "%"
     df_tables_pip.loc[j, "shortUnit"] = "%"
@@ -266,7 +253,7 @@ for tab in range(len(pip_tables)):
     df_tables_pip.loc[j, "colorScaleScheme"] = "YlOrBr"
     j += 1
 
-df_tables_pip["tableSlug"] = tableSlug
+df_tables_pip = broadcast_to_tables(df_tables_pip, merged_tables)
 df_tables_pip["sourceName"] = sourceName
 df_tables_pip["dataPublishedBy"] = dataPublishedBy
 df_tables_pip["sourceLink"] = sourceLink
@@ -286,99 +273,89 @@ sourceLink = SOURCE_LINK_WID
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 additional_description = ADDITIONAL_DESCRIPTION_WID
 ppp_description = PPP_DESCRIPTION_WID
 
-df_tables_wid = pd.DataFrame()
+df_tables_wid = new_frame(COLUMNS_SCHEMA)
 j = 0
 
-for tab in range(len(merged_tables)):
-    for wel in range(len(wid_welfare)):
-        # Define additional description depending on the welfare type
-        if wel == 0:
-            additional_description = ADDITIONAL_DESCRIPTION_WID_POST_TAX
-        else:
-            additional_description = ADDITIONAL_DESCRIPTION_WID
+for wel in range(len(wid_welfare)):
+    # Define additional description depending on the welfare type
+    if wel == 0:
+        additional_description = ADDITIONAL_DESCRIPTION_WID_POST_TAX
+    else:
+        additional_description = ADDITIONAL_DESCRIPTION_WID
 
-        # Gini coefficient
-        df_tables_wid.loc[j, "name"] = f"Gini coefficient (WID data)"
-        df_tables_wid.loc[j, "slug"] = f"p0p100_gini_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = np.nan
-        df_tables_wid.loc[j, "shortUnit"] = np.nan
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_gini"][wel]
-        df_tables_wid.loc[j, "colorScaleScheme"] = "Oranges"
-        j += 1
+    # Gini coefficient
+    df_tables_wid.loc[j, "name"] = f"Gini coefficient (WID data)"
+    df_tables_wid.loc[j, "slug"] = f"p0p100_gini_{wid_welfare['slug'][wel]}"
+    df_tables_wid.loc[j, "description"] = describe(
+        "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+        wid_welfare["description"][wel],
+        additional_description,
+    )
+    df_tables_wid.loc[j, "unit"] = np.nan
+    df_tables_wid.loc[j, "shortUnit"] = np.nan
+    df_tables_wid.loc[j, "type"] = "Numeric"
+    df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_gini"][wel]
+    df_tables_wid.loc[j, "colorScaleScheme"] = "Oranges"
+    j += 1
 
-        # Share of the top 10%
-        df_tables_wid.loc[j, "name"] = (
-            f"{wid_welfare['welfare_type'][wel].capitalize()} share of the richest 10% (WID data)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p90p100_share_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {wid_welfare['welfare_type'][wel]} received by the richest 10% of the population.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = "%"
-        df_tables_wid.loc[j, "shortUnit"] = "%"
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_top10"][wel]
-        df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
+    # Share of the top 10%
+    df_tables_wid.loc[j, "name"] = (
+        f"{wid_welfare['welfare_type'][wel].capitalize()} share of the richest 10% (WID data)"
+    )
+    df_tables_wid.loc[j, "slug"] = f"p90p100_share_{wid_welfare['slug'][wel]}"
+    df_tables_wid.loc[j, "description"] = describe(
+        f"The share of {wid_welfare['welfare_type'][wel]} received by the richest 10% of the population.",
+        wid_welfare["description"][wel],
+        additional_description,
+    )
+    df_tables_wid.loc[j, "unit"] = "%"
+    df_tables_wid.loc[j, "shortUnit"] = "%"
+    df_tables_wid.loc[j, "type"] = "Numeric"
+    df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_top10"][wel]
+    df_tables_wid.loc[j, "colorScaleScheme"] = "OrRd"
+    j += 1
 
-        # Share of the bottom 50%
-        df_tables_wid.loc[j, "name"] = (
-            f"{wid_welfare['welfare_type'][wel].capitalize()} share of the poorest 50% (WID data)"
-        )
-        df_tables_wid.loc[j, "slug"] = f"p0p50_share_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {wid_welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = "%"
-        df_tables_wid.loc[j, "shortUnit"] = "%"
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_bottom50"][
-            wel
-        ]
-        df_tables_wid.loc[j, "colorScaleScheme"] = "Blues"
-        j += 1
+    # Share of the bottom 50%
+    df_tables_wid.loc[j, "name"] = (
+        f"{wid_welfare['welfare_type'][wel].capitalize()} share of the poorest 50% (WID data)"
+    )
+    df_tables_wid.loc[j, "slug"] = f"p0p50_share_{wid_welfare['slug'][wel]}"
+    df_tables_wid.loc[j, "description"] = describe(
+        f"The share of {wid_welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
+        wid_welfare["description"][wel],
+        additional_description,
+    )
+    df_tables_wid.loc[j, "unit"] = "%"
+    df_tables_wid.loc[j, "shortUnit"] = "%"
+    df_tables_wid.loc[j, "type"] = "Numeric"
+    df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare["scale_bottom50"][
+        wel
+    ]
+    df_tables_wid.loc[j, "colorScaleScheme"] = "Blues"
+    j += 1
 
-        # Palma ratio
-        df_tables_wid.loc[j, "name"] = f"Palma ratio (WID data)"
-        df_tables_wid.loc[j, "slug"] = f"palma_ratio_{wid_welfare['slug'][wel]}"
-        df_tables_wid.loc[j, "description"] = new_line.join(
-            [
-                "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-                wid_welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables_wid.loc[j, "unit"] = np.nan
-        df_tables_wid.loc[j, "shortUnit"] = np.nan
-        df_tables_wid.loc[j, "type"] = "Numeric"
-        df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare[
-            "scale_palma_ratio"
-        ][wel]
-        df_tables_wid.loc[j, "colorScaleScheme"] = "YlOrBr"
-        j += 1
+    # Palma ratio
+    df_tables_wid.loc[j, "name"] = f"Palma ratio (WID data)"
+    df_tables_wid.loc[j, "slug"] = f"palma_ratio_{wid_welfare['slug'][wel]}"
+    df_tables_wid.loc[j, "description"] = describe(
+        "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+        wid_welfare["description"][wel],
+        additional_description,
+    )
+    df_tables_wid.loc[j, "unit"] = np.nan
+    df_tables_wid.loc[j, "shortUnit"] = np.nan
+    df_tables_wid.loc[j, "type"] = "Numeric"
+    df_tables_wid.loc[j, "colorScaleNumericBins"] = wid_welfare[
+        "scale_palma_ratio"
+    ][wel]
+    df_tables_wid.loc[j, "colorScaleScheme"] = "YlOrBr"
+    j += 1
 
-    df_tables_wid["tableSlug"] = merged_tables["name"][tab]
+df_tables_wid = broadcast_to_tables(df_tables_wid, merged_tables)
 
 df_tables_wid["sourceName"] = sourceName
 df_tables_wid["dataPublishedBy"] = dataPublishedBy
@@ -396,7 +373,6 @@ sourceLink = SOURCE_LINK_LIS
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 notes_title = NOTES_TITLE_LIS
 
@@ -409,143 +385,132 @@ processing_distribution = PROCESSING_DISTRIBUTION_LIS
 ppp_description = PPP_DESCRIPTION_LIS
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_LIS
 
-df_tables_lis = pd.DataFrame()
+# Only the per capita columns of LIS are compared with the other sources
+lis_equivalence_scales = lis_equivalence_scales[
+    lis_equivalence_scales["text"] != "equivalized"
+].reset_index(drop=True)
+
+df_tables_lis = new_frame(COLUMNS_SCHEMA)
 j = 0
 
-for tab in range(len(merged_tables)):
-    for wel in range(len(lis_welfare)):
-        for eq in range(len(lis_equivalence_scales)):
-            # Gini coefficient
-            df_tables_lis.loc[j, "name"] = f"Gini coefficient (LIS data)"
-            df_tables_lis.loc[j, "slug"] = (
-                f"gini_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
-            )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_gini_mean_median,
-                ]
-            )
-            df_tables_lis.loc[j, "unit"] = np.nan
-            df_tables_lis.loc[j, "shortUnit"] = np.nan
-            df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_gini"][
-                wel
-            ]
-            df_tables_lis.loc[j, "colorScaleScheme"] = "Oranges"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-            j += 1
-
-            # Share of the top 10%
-            df_tables_lis.loc[j, "name"] = (
-                f"{lis_welfare['welfare_type'][wel].capitalize()} share of the richest 10% (LIS data)"
-            )
-            df_tables_lis.loc[j, "slug"] = (
-                f"share_p100_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
-            )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {lis_welfare['welfare_type'][wel]} received by the richest 10% of the population.",
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_distribution,
-                ]
-            )
-            df_tables_lis.loc[j, "unit"] = "%"
-            df_tables_lis.loc[j, "shortUnit"] = "%"
-            df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_top10"][
-                wel
-            ]
-            df_tables_lis.loc[j, "colorScaleScheme"] = "OrRd"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-            j += 1
-
-            # Share of the bottom 50%
-            df_tables_lis.loc[j, "name"] = (
-                f"{lis_welfare['welfare_type'][wel].capitalize()} share of the poorest 50% (LIS data)"
-            )
-            df_tables_lis.loc[j, "slug"] = (
-                f"share_bottom50_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
-            )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {lis_welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_distribution,
-                ]
-            )
-            df_tables_lis.loc[j, "unit"] = "%"
-            df_tables_lis.loc[j, "shortUnit"] = "%"
-            df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
-                "scale_bottom50"
-            ][wel]
-            df_tables_lis.loc[j, "colorScaleScheme"] = "Blues"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-            j += 1
-
-            # Palma ratio
-            df_tables_lis.loc[j, "name"] = f"Palma ratio (LIS data)"
-            df_tables_lis.loc[j, "slug"] = (
-                f"palma_ratio_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
-            )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_distribution,
-                ]
-            )
-            df_tables_lis.loc[j, "unit"] = np.nan
-            df_tables_lis.loc[j, "shortUnit"] = np.nan
-            df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
-                "scale_palma_ratio"
-            ][wel]
-            df_tables_lis.loc[j, "colorScaleScheme"] = "YlOrBr"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-            j += 1
-
-            # Headcount ratio (rel)
-            df_tables_lis.loc[j, "name"] = f"Share in relative poverty (LIS data)"
-            df_tables_lis.loc[j, "slug"] = (
-                f"headcount_ratio_50_median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
-            )
-            df_tables_lis.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of the population with {lis_welfare['welfare_type'][wel]} below 50% of the median.",
-                    relative_poverty_description,
-                    lis_welfare["description"][wel],
-                    lis_equivalence_scales["description"][eq],
-                    notes_title,
-                    processing_description,
-                    processing_poverty,
-                ]
-            )
-            df_tables_lis.loc[j, "unit"] = "%"
-            df_tables_lis.loc[j, "shortUnit"] = "%"
-            df_tables_lis.loc[j, "type"] = "Numeric"
-            df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
-                "scale_relative_poverty"
-            ][wel]
-            df_tables_lis.loc[j, "colorScaleScheme"] = "YlOrBr"
-            df_tables_lis.loc[j, "equivalized"] = lis_equivalence_scales["text"][eq]
-            j += 1
-
-    df_tables_lis["tableSlug"] = merged_tables["name"][tab]
+for wel in range(len(lis_welfare)):
+    for eq in range(len(lis_equivalence_scales)):
+        # Gini coefficient
+        df_tables_lis.loc[j, "name"] = f"Gini coefficient (LIS data)"
+        df_tables_lis.loc[j, "slug"] = (
+            f"gini_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            notes_title,
+            processing_description,
+            processing_gini_mean_median,
+        )
+        df_tables_lis.loc[j, "unit"] = np.nan
+        df_tables_lis.loc[j, "shortUnit"] = np.nan
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_gini"][
+            wel
+        ]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "Oranges"
+        j += 1
+
+        # Share of the top 10%
+        df_tables_lis.loc[j, "name"] = (
+            f"{lis_welfare['welfare_type'][wel].capitalize()} share of the richest 10% (LIS data)"
+        )
+        df_tables_lis.loc[j, "slug"] = (
+            f"share_p100_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            f"The share of {lis_welfare['welfare_type'][wel]} received by the richest 10% of the population.",
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            notes_title,
+            processing_description,
+            processing_distribution,
+        )
+        df_tables_lis.loc[j, "unit"] = "%"
+        df_tables_lis.loc[j, "shortUnit"] = "%"
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare["scale_top10"][
+            wel
+        ]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "OrRd"
+        j += 1
+
+        # Share of the bottom 50%
+        df_tables_lis.loc[j, "name"] = (
+            f"{lis_welfare['welfare_type'][wel].capitalize()} share of the poorest 50% (LIS data)"
+        )
+        df_tables_lis.loc[j, "slug"] = (
+            f"share_bottom50_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            f"The share of {lis_welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            notes_title,
+            processing_description,
+            processing_distribution,
+        )
+        df_tables_lis.loc[j, "unit"] = "%"
+        df_tables_lis.loc[j, "shortUnit"] = "%"
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
+            "scale_bottom50"
+        ][wel]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "Blues"
+        j += 1
+
+        # Palma ratio
+        df_tables_lis.loc[j, "name"] = f"Palma ratio (LIS data)"
+        df_tables_lis.loc[j, "slug"] = (
+            f"palma_ratio_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            notes_title,
+            processing_description,
+            processing_distribution,
+        )
+        df_tables_lis.loc[j, "unit"] = np.nan
+        df_tables_lis.loc[j, "shortUnit"] = np.nan
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
+            "scale_palma_ratio"
+        ][wel]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "YlOrBr"
+        j += 1
+
+        # Headcount ratio (rel)
+        df_tables_lis.loc[j, "name"] = f"Share in relative poverty (LIS data)"
+        df_tables_lis.loc[j, "slug"] = (
+            f"headcount_ratio_50_median_{lis_welfare['slug'][wel]}_{lis_equivalence_scales['slug'][eq]}"
+        )
+        df_tables_lis.loc[j, "description"] = describe(
+            f"The share of the population with {lis_welfare['welfare_type'][wel]} below 50% of the median.",
+            relative_poverty_description,
+            lis_welfare["description"][wel],
+            lis_equivalence_scales["description"][eq],
+            notes_title,
+            processing_description,
+            processing_poverty,
+        )
+        df_tables_lis.loc[j, "unit"] = "%"
+        df_tables_lis.loc[j, "shortUnit"] = "%"
+        df_tables_lis.loc[j, "type"] = "Numeric"
+        df_tables_lis.loc[j, "colorScaleNumericBins"] = lis_welfare[
+            "scale_relative_poverty"
+        ][wel]
+        df_tables_lis.loc[j, "colorScaleScheme"] = "YlOrBr"
+        j += 1
+
+df_tables_lis = broadcast_to_tables(df_tables_lis, merged_tables)
 
 df_tables_lis["sourceName"] = sourceName
 df_tables_lis["dataPublishedBy"] = dataPublishedBy
@@ -554,23 +519,14 @@ df_tables_lis["colorScaleNumericMinValue"] = colorScaleNumericMinValue
 df_tables_lis["tolerance"] = tolerance
 df_tables_lis["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Remove all the rows that have the "equivalized" value in the equivalized column
-df_tables_lis = df_tables_lis[
-    df_tables_lis["equivalized"] != "equivalized"
-].reset_index(drop=True)
-# Drop the equivalized column
-df_tables_lis = df_tables_lis.drop(columns=["equivalized"])
-
 # Concatenate all the tables into one
 df_tables = pd.concat([df_tables_pip, df_tables_wid, df_tables_lis], ignore_index=True)
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
 yAxisMin = Y_AXIS_MIN
@@ -582,92 +538,91 @@ datasets_description_subtitle = (
     "The definition of income varies across the data sources."
 )
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
-for tab in range(len(merged_tables)):
-    for view in range(len(source_checkbox)):
-        # Gini coefficient
-        df_graphers.loc[j, "title"] = (
-            f"Gini coefficient ({source_checkbox['type_title'][view]})"
-        )
-        df_graphers.loc[j, "ySlugs"] = source_checkbox["gini"][view]
-        df_graphers.loc[j, "Indicator Dropdown"] = "Gini coefficient"
-        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
-            view
-        ].capitalize()
-        df_graphers.loc[j, "subtitle"] = (
-            f"The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality. {datasets_description_subtitle}"
-        )
-        df_graphers.loc[j, "note"] = source_checkbox["note"][view]
-        df_graphers.loc[j, "type"] = np.nan
-        j += 1
+for view in range(len(source_checkbox)):
+    # Gini coefficient
+    df_graphers.loc[j, "title"] = (
+        f"Gini coefficient ({source_checkbox['type_title'][view]})"
+    )
+    df_graphers.loc[j, "ySlugs"] = source_checkbox["gini"][view]
+    df_graphers.loc[j, "Indicator Dropdown"] = "Gini coefficient"
+    df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
+        view
+    ].capitalize()
+    df_graphers.loc[j, "subtitle"] = (
+        f"The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality. {datasets_description_subtitle}"
+    )
+    df_graphers.loc[j, "note"] = source_checkbox["note"][view]
+    df_graphers.loc[j, "type"] = np.nan
+    j += 1
 
-        # Share of the top 10%
-        df_graphers.loc[j, "title"] = (
-            f"Income share of the richest 10% ({source_checkbox['type_title'][view]})"
-        )
-        df_graphers.loc[j, "ySlugs"] = source_checkbox["top10"][view]
-        df_graphers.loc[j, "Indicator Dropdown"] = "Share of the richest 10%"
-        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
-            view
-        ].capitalize()
-        df_graphers.loc[j, "subtitle"] = (
-            f"The share of income received by the richest 10% of the population. {datasets_description_subtitle}"
-        )
-        df_graphers.loc[j, "note"] = source_checkbox["note"][view]
-        df_graphers.loc[j, "type"] = np.nan
-        j += 1
+    # Share of the top 10%
+    df_graphers.loc[j, "title"] = (
+        f"Income share of the richest 10% ({source_checkbox['type_title'][view]})"
+    )
+    df_graphers.loc[j, "ySlugs"] = source_checkbox["top10"][view]
+    df_graphers.loc[j, "Indicator Dropdown"] = "Share of the richest 10%"
+    df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
+        view
+    ].capitalize()
+    df_graphers.loc[j, "subtitle"] = (
+        f"The share of income received by the richest 10% of the population. {datasets_description_subtitle}"
+    )
+    df_graphers.loc[j, "note"] = source_checkbox["note"][view]
+    df_graphers.loc[j, "type"] = np.nan
+    j += 1
 
-        # Share of the bottom 50%
-        df_graphers.loc[j, "title"] = (
-            f"Income share of the poorest 50% ({source_checkbox['type_title'][view]})"
-        )
-        df_graphers.loc[j, "ySlugs"] = source_checkbox["bottom50"][view]
-        df_graphers.loc[j, "Indicator Dropdown"] = "Share of the poorest 50%"
-        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
-            view
-        ].capitalize()
-        df_graphers.loc[j, "subtitle"] = (
-            f"The share of income received by the poorest 50% of the population. {datasets_description_subtitle}"
-        )
-        df_graphers.loc[j, "note"] = source_checkbox["note"][view]
-        j += 1
+    # Share of the bottom 50%
+    df_graphers.loc[j, "title"] = (
+        f"Income share of the poorest 50% ({source_checkbox['type_title'][view]})"
+    )
+    df_graphers.loc[j, "ySlugs"] = source_checkbox["bottom50"][view]
+    df_graphers.loc[j, "Indicator Dropdown"] = "Share of the poorest 50%"
+    df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
+        view
+    ].capitalize()
+    df_graphers.loc[j, "subtitle"] = (
+        f"The share of income received by the poorest 50% of the population. {datasets_description_subtitle}"
+    )
+    df_graphers.loc[j, "note"] = source_checkbox["note"][view]
+    j += 1
 
-        # Palma ratio
-        df_graphers.loc[j, "title"] = (
-            f"Palma ratio ({source_checkbox['type_title'][view]})"
-        )
-        df_graphers.loc[j, "ySlugs"] = source_checkbox["palma"][view]
-        df_graphers.loc[j, "Indicator Dropdown"] = "Palma ratio"
-        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
-            view
-        ].capitalize()
-        df_graphers.loc[j, "subtitle"] = (
-            f"The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality. {datasets_description_subtitle}"
-        )
-        df_graphers.loc[j, "note"] = source_checkbox["note"][view]
-        df_graphers.loc[j, "type"] = np.nan
-        j += 1
+    # Palma ratio
+    df_graphers.loc[j, "title"] = (
+        f"Palma ratio ({source_checkbox['type_title'][view]})"
+    )
+    df_graphers.loc[j, "ySlugs"] = source_checkbox["palma"][view]
+    df_graphers.loc[j, "Indicator Dropdown"] = "Palma ratio"
+    df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
+        view
+    ].capitalize()
+    df_graphers.loc[j, "subtitle"] = (
+        f"The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality. {datasets_description_subtitle}"
+    )
+    df_graphers.loc[j, "note"] = source_checkbox["note"][view]
+    df_graphers.loc[j, "type"] = np.nan
+    j += 1
 
-        # Headcount ratio (rel)
-        df_graphers.loc[j, "title"] = (
-            f"Share of people in relative poverty ({source_checkbox['type_title'][view]})"
-        )
-        df_graphers.loc[j, "ySlugs"] = source_checkbox["relative"][view]
-        df_graphers.loc[j, "Indicator Dropdown"] = f"Share in relative poverty"
-        df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
-            view
-        ].capitalize()
-        df_graphers.loc[j, "subtitle"] = (
-            f"The share of population with income below 50% of the median. Relative poverty reflects the extent of inequality within the bottom of the distribution. {datasets_description_subtitle}"
-        )
-        df_graphers.loc[j, "note"] = source_checkbox["note"][view]
-        df_graphers.loc[j, "type"] = np.nan
-        j += 1
+    # Headcount ratio (rel)
+    df_graphers.loc[j, "title"] = (
+        f"Share of people in relative poverty ({source_checkbox['type_title'][view]})"
+    )
+    df_graphers.loc[j, "ySlugs"] = source_checkbox["relative"][view]
+    df_graphers.loc[j, "Indicator Dropdown"] = f"Share in relative poverty"
+    df_graphers.loc[j, "Income measure Dropdown"] = source_checkbox["type_title"][
+        view
+    ].capitalize()
+    df_graphers.loc[j, "subtitle"] = (
+        f"The share of population with income below 50% of the median. Relative poverty reflects the extent of inequality within the bottom of the distribution. {datasets_description_subtitle}"
+    )
+    df_graphers.loc[j, "note"] = source_checkbox["note"][view]
+    df_graphers.loc[j, "type"] = np.nan
+    j += 1
 
-    df_graphers["tableSlug"] = merged_tables["name"][tab]
+df_graphers = broadcast_to_tables(df_graphers, merged_tables)
 
 # Add yAxisMin
 df_graphers["yAxisMin"] = yAxisMin
@@ -695,11 +650,13 @@ df_graphers["relatedQuestionText"] = np.nan
 df_graphers["relatedQuestionUrl"] = np.nan
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Gini coefficient")
-    & (df_graphers["Income measure Dropdown"] == "After tax"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Gini coefficient",
+        "Income measure Dropdown": "After tax",
+    },
+)
 
 
 # %% [markdown]
@@ -707,6 +664,9 @@ df_graphers.loc[
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names (from table dataframe)
 table_list = list(df_tables["tableSlug"].unique())
 
@@ -0,0 +1,37 @@
+"""Artifacts of the dataframes that several generators build from the same sheets, so that they are built only once.
+
+source_artifact() calls a function of this package that builds a dataframe from sheets (e.g. wid_inequality_tables()),
+and keeps the result as an artifact, keyed by the sheets, the other arguments and the code of the function (and the
+shared code of the explorers). Any generator calling it with the same sheets then loads the artifact instead of building
+the dataframe again. Without an artifact (e.g. the sheets changed, or pyarrow is not installed), the function is called.
+
+    # In wid/wid_inequality_explorer.py
+    df_tables = source_artifact(wid_inequality_tables, welfare, tables)
+
+    # In multisource/inequality_explorer.py
+    df_tables_wid = source_artifact(
+        wid_inequality_tables, wid_welfare, wid_tables, name_suffix=" (World Inequality Database)"
+    )
+
+"""
+
+import inspect
+from pathlib import Path
+
+from ..explorer_tools.artifacts import HAS_PYARROW, artifact_key, load_artifact, save_artifact
+
+PACKAGE_DIR = Path(__file__).parent
+SHARED_FILES = [PACKAGE_DIR / "common_parameters.py", PACKAGE_DIR / "descriptions.py"]
+
+
+def source_artifact(build, *sheets, **kwargs):
+    # Returns build(*sheets, **kwargs), from its artifact if it was saved for the same sheets, arguments and code
+    name = f"{build.__module__.removeprefix(__package__ + '.')}.{build.__name__}"
+    key = artifact_key(*sheets, kwargs, files=[inspect.getfile(build), *SHARED_FILES])
+    df = load_artifact(name, key)
+    if df is None:
+        df = build(*sheets, **kwargs)
+        # Without pyarrow nothing can be saved, and building is all there is to do
+        if HAS_PYARROW:
+            save_artifact(df, name, key)
+    return df
@@ -0,0 +1,48 @@
+"""Combinations of sources shown by the multi-source comparison explorers.
+
+The `source_checkbox` sheet lists every combination of sources (PIP, WID and LIS) of the multi-source selector, with the
+slugs of their views. Each comparison explorer declares the combinations it shows, and select_views() picks their rows,
+in the order of the sheet. Missing keys match any value:
+
+    source_checkbox = select_views(
+        source_checkbox,
+        [
+            {"type": "pre", "pip": False, "wid": True, "lis": True},
+            {"type": "post", "pip": True, "wid": True, "lis": True},
+        ],
+    )
+
+The columns and views of each source are then defined once, and broadcast_to_tables() copies them to every table of
+`merged_tables` in one cross join, instead of defining them again for each table.
+"""
+
+import pandas as pd
+
+
+def checkbox_value(value):
+    # Checkboxes are "true" or "false" in the sheet
+    if isinstance(value, bool):
+        return str(value).lower()
+    return value
+
+
+def select_views(source_checkbox, combinations):
+    # Returns the rows of source_checkbox matching any of the combinations
+    selected = pd.Series(False, index=source_checkbox.index)
+    for combination in combinations:
+        assert set(combination) <= set(source_checkbox.columns), f"Unknown keys in {combination}"
+        matches = pd.Series(True, index=source_checkbox.index)
+        for column, value in combination.items():
+            matches &= source_checkbox[column] == checkbox_value(value)
+        if not matches.any():
+            print(f"⚠️ No views in source_checkbox for {combination}")
+        selected |= matches
+    return source_checkbox[selected].reset_index(drop=True)
+
+
+def broadcast_to_tables(df, tables, column="tableSlug"):
+    # Copies the rows of df to each table, table by table, with the name of the table as the last column (replacing the
+    # empty column of the schema)
+    df = df.drop(columns=column, errors="ignore")
+    df = tables[["name"]].rename(columns={"name": column}).merge(df, how="cross")
+    return df[[c for c in df.columns if c != column] + [column]]
@@ -2,7 +2,6 @@
 # # Incomes across the distribution explorer
 # This code creates the tsv file for the incomes across the distribution explorer from the World Bank PIP data, available [here](https://owid.cloud/admin/explorers/preview/incomes-across-distribution-ppp2017)
 
-import textwrap
 from pathlib import Path
 
 import numpy as np
@@ -10,7 +9,22 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.blocks import write_block
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.shared_text import write_shared_text_copy
+from ...explorer_tools.ordering import sort_views
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.text_rules import rewrite_texts
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
+from ..income_aggregation import PLACEHOLDER, aggregate_incomes, bins_columns
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "incomes-across-distribution-wb.explorer.tsv"
@@ -20,36 +34,34 @@ outfile = PARENT_DIR / "explorers" / "incomes-across-distribution-wb.explorer.ts
 # These spreadsheets provide with different details depending on each poverty line or survey type.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8"
 
 # Settings for 10 deciles variables (share, avg) sheet
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles10 = pd.read_csv(url, dtype={"dropdown": "str", "decile": "str"})
+deciles10 = read_sheet(sheet_id, sheet_name, dtype={"dropdown": "str", "decile": "str"})
 
 # Settings for 9 deciles variables (thr) sheet
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles9 = pd.read_csv(url, dtype={"dropdown": "str", "decile": "str"})
+deciles9 = read_sheet(sheet_id, sheet_name, dtype={"dropdown": "str", "decile": "str"})
 
 # Income aggregation sheet (day, month, year)
 sheet_name = "income_aggregation"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-income_aggregation = pd.read_csv(
-    url, keep_default_na=False, dtype={"multiplier": "str"}
+income_aggregation = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"multiplier": "str"}
 )
 
 # Survey type sheet
 sheet_name = "survey_type"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-survey_type = pd.read_csv(url)
+survey_type = read_sheet(sheet_id, sheet_name)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Incomes Across the Distribution - World Bank",
@@ -74,13 +86,13 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 sourceName = SOURCE_NAME_PIP
 dataPublishedBy = DATA_PUBLISHED_BY_PIP
 sourceLink = SOURCE_LINK_PIP
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
@@ -92,7 +104,7 @@ processing_description = PROCESSING_DESCRIPTION_PIP
 ppp_description = PPP_DESCRIPTION_PIP_2017
 
 # Table generation
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for survey in range(len(survey_type)):
@@ -114,15 +126,13 @@ for survey in range(len(survey_type)):
     # mean
     df_tables.loc[j, "name"] = f"Mean {survey_type.text[survey]} per day"
     df_tables.loc[j, "slug"] = f"mean"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The mean level of {survey_type.text[survey]} per person per day.",
-            ppp_description,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The mean level of {survey_type.text[survey]} per person per day.",
+        ppp_description,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -135,15 +145,13 @@ for survey in range(len(survey_type)):
     # median
     df_tables.loc[j, "name"] = f"Median {survey_type.text[survey]} per day"
     df_tables.loc[j, "slug"] = f"median"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per person per day below which half of the population falls.",
-            ppp_description,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per person per day below which half of the population falls.",
+        ppp_description,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -157,15 +165,13 @@ for survey in range(len(survey_type)):
         # thresholds
         df_tables.loc[j, "name"] = deciles9.ordinal[dec9].capitalize()
         df_tables.loc[j, "slug"] = f"decile{deciles9.decile[dec9]}_thr"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The level of {survey_type.text[survey]} per person per day below which {deciles9.decile[dec9]}0% of the population falls.",
-                ppp_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"The level of {survey_type.text[survey]} per person per day below which {deciles9.decile[dec9]}0% of the population falls.",
+            ppp_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
         df_tables.loc[j, "shortUnit"] = "$"
@@ -179,15 +185,13 @@ for survey in range(len(survey_type)):
         # averages
         df_tables.loc[j, "name"] = deciles10.ordinal[dec10].capitalize()
         df_tables.loc[j, "slug"] = f"decile{deciles10.decile[dec10]}_avg"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The mean {survey_type.text[survey]} per person per day within the {deciles10.ordinal[dec10]} (tenth of the population).",
-                ppp_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"The mean {survey_type.text[survey]} per person per day within the {deciles10.ordinal[dec10]} (tenth of the population).",
+            ppp_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
         df_tables.loc[j, "shortUnit"] = "$"
@@ -201,14 +205,12 @@ for survey in range(len(survey_type)):
         # shares
         df_tables.loc[j, "name"] = deciles10.ordinal[dec10].capitalize()
         df_tables.loc[j, "slug"] = f"decile{deciles10.decile[dec10]}_share"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The {survey_type.text[survey]} of the {deciles10.ordinal[dec10]} (tenth of the population) as a share of total {survey_type.text[survey]}.",
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"The {survey_type.text[survey]} of the {deciles10.ordinal[dec10]} (tenth of the population) as a share of total {survey_type.text[survey]}.",
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "%"
         df_tables.loc[j, "shortUnit"] = "%"
@@ -218,117 +220,96 @@ for survey in range(len(survey_type)):
         df_tables.loc[j, "survey_type"] = survey_type["table_name"][survey]
         j += 1
 
-    # Aggregations
-    for agg in range(len(income_aggregation)):
-        # mean
-        df_tables.loc[j, "name"] = (
-            f"Mean {survey_type.text[survey]} per {income_aggregation.aggregation[agg]}"
-        )
-        df_tables.loc[j, "slug"] = f"mean{income_aggregation.slug_suffix[agg]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The mean level of {survey_type.text[survey]} per person per {income_aggregation.aggregation[agg]}.",
-                ppp_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-        df_tables.loc[j, "shortUnit"] = "$"
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = income_aggregation.scale[agg]
-        df_tables.loc[j, "colorScaleScheme"] = "BuGn"
-        df_tables.loc[j, "transform"] = (
-            f"multiplyBy mean {income_aggregation.multiplier[agg]}"
-        )
-        df_tables.loc[j, "survey_type"] = survey_type["table_name"][survey]
-        j += 1
+    # Aggregations, defined once for all periods (see income_aggregation.py)
+    df_base = pd.DataFrame()
+    k = 0
 
-        # median
-        df_tables.loc[j, "name"] = (
-            f"Median {survey_type.text[survey]} per {income_aggregation.aggregation[agg]}"
-        )
-        df_tables.loc[j, "slug"] = f"median{income_aggregation.slug_suffix[agg]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The level of {survey_type.text[survey]} per person per {income_aggregation.aggregation[agg]} below which half of the population falls.",
-                ppp_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-        df_tables.loc[j, "shortUnit"] = "$"
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = income_aggregation.scale[agg]
-        df_tables.loc[j, "colorScaleScheme"] = "Blues"
-        df_tables.loc[j, "transform"] = (
-            f"multiplyBy median {income_aggregation.multiplier[agg]}"
-        )
-        df_tables.loc[j, "survey_type"] = survey_type["table_name"][survey]
-        j += 1
+    # mean
+    df_base.loc[k, "name"] = f"Mean {survey_type.text[survey]} per {{aggregation}}"
+    df_base.loc[k, "slug"] = f"mean"
+    df_base.loc[k, "description"] = describe(
+        f"The mean level of {survey_type.text[survey]} per person per {{aggregation}}.",
+        ppp_description,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
+    )
+    df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+    df_base.loc[k, "shortUnit"] = "$"
+    df_base.loc[k, "type"] = "Numeric"
+    df_base.loc[k, bins_columns(income_aggregation)] = income_aggregation.scale.values
+    df_base.loc[k, "colorScaleScheme"] = "BuGn"
+    df_base.loc[k, "survey_type"] = survey_type["table_name"][survey]
+    k += 1
 
-        for dec9 in range(len(deciles9)):
-            # thresholds
-            df_tables.loc[j, "name"] = deciles9.ordinal[dec9].capitalize()
-            df_tables.loc[j, "slug"] = (
-                f"decile{deciles9.decile[dec9]}_thr{income_aggregation.slug_suffix[agg]}"
-            )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {survey_type.text[survey]} per person per {income_aggregation.aggregation[agg]} below which {deciles9.decile[dec9]}0% of the population falls.",
-                    ppp_description,
-                    survey_type.description[survey],
-                    additional_description,
-                    notes_title,
-                    processing_description,
-                ]
-            )
-            df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-            df_tables.loc[j, "shortUnit"] = "$"
-            df_tables.loc[j, "type"] = "Numeric"
-            df_tables.loc[j, "colorScaleNumericBins"] = deciles9[
-                f"scale_thr_{income_aggregation.aggregation[agg]}"
-            ][dec9]
-            df_tables.loc[j, "colorScaleScheme"] = "Purples"
-            df_tables.loc[j, "transform"] = (
-                f"multiplyBy decile{deciles9.decile[dec9]}_thr {income_aggregation.multiplier[agg]}"
-            )
-            df_tables.loc[j, "survey_type"] = survey_type["table_name"][survey]
-            j += 1
+    # median
+    df_base.loc[k, "name"] = f"Median {survey_type.text[survey]} per {{aggregation}}"
+    df_base.loc[k, "slug"] = f"median"
+    df_base.loc[k, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per person per {{aggregation}} below which half of the population falls.",
+        ppp_description,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
+    )
+    df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+    df_base.loc[k, "shortUnit"] = "$"
+    df_base.loc[k, "type"] = "Numeric"
+    df_base.loc[k, bins_columns(income_aggregation)] = income_aggregation.scale.values
+    df_base.loc[k, "colorScaleScheme"] = "Blues"
+    df_base.loc[k, "survey_type"] = survey_type["table_name"][survey]
+    k += 1
 
-        for dec10 in range(len(deciles10)):
-            # averages
-            df_tables.loc[j, "name"] = deciles10.ordinal[dec10].capitalize()
-            df_tables.loc[j, "slug"] = (
-                f"decile{deciles10.decile[dec10]}_avg{income_aggregation.slug_suffix[agg]}"
-            )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The mean {survey_type.text[survey]} per person per {income_aggregation.aggregation[agg]} within the {deciles10.ordinal[dec10]} (tenth of the population).",
-                    ppp_description,
-                    survey_type.description[survey],
-                    additional_description,
-                    notes_title,
-                    processing_description,
-                ]
-            )
-            df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
-            df_tables.loc[j, "shortUnit"] = "$"
-            df_tables.loc[j, "type"] = "Numeric"
-            df_tables.loc[j, "colorScaleNumericBins"] = deciles10[
-                f"scale_avg_{income_aggregation.aggregation[agg]}"
-            ][dec10]
-            df_tables.loc[j, "colorScaleScheme"] = "Greens"
-            df_tables.loc[j, "transform"] = (
-                f"multiplyBy decile{deciles10.decile[dec10]}_avg {income_aggregation.multiplier[agg]}"
-            )
-            df_tables.loc[j, "survey_type"] = survey_type["table_name"][survey]
-            j += 1
+    for dec9 in range(len(deciles9)):
+        # thresholds
+        df_base.loc[k, "name"] = deciles9.ordinal[dec9].capitalize()
+        df_base.loc[k, "slug"] = f"decile{deciles9.decile[dec9]}_thr"
+        df_base.loc[k, "description"] = describe(
+            f"The level of {survey_type.text[survey]} per person per {{aggregation}} below which {deciles9.decile[dec9]}0% of the population falls.",
+            ppp_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
+        )
+        df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+        df_base.loc[k, "shortUnit"] = "$"
+        df_base.loc[k, "type"] = "Numeric"
+        df_base.loc[k, bins_columns(income_aggregation)] = deciles9.loc[
+            dec9, bins_columns(income_aggregation, "scale_thr_")
+        ].values
+        df_base.loc[k, "colorScaleScheme"] = "Purples"
+        df_base.loc[k, "survey_type"] = survey_type["table_name"][survey]
+        k += 1
+
+    for dec10 in range(len(deciles10)):
+        # averages
+        df_base.loc[k, "name"] = deciles10.ordinal[dec10].capitalize()
+        df_base.loc[k, "slug"] = f"decile{deciles10.decile[dec10]}_avg"
+        df_base.loc[k, "description"] = describe(
+            f"The mean {survey_type.text[survey]} per person per {{aggregation}} within the {deciles10.ordinal[dec10]} (tenth of the population).",
+            ppp_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
+        )
+        df_base.loc[k, "unit"] = "international-$ in 2017 prices"
+        df_base.loc[k, "shortUnit"] = "$"
+        df_base.loc[k, "type"] = "Numeric"
+        df_base.loc[k, bins_columns(income_aggregation)] = deciles10.loc[
+            dec10, bins_columns(income_aggregation, "scale_avg_")
+        ].values
+        df_base.loc[k, "colorScaleScheme"] = "Greens"
+        df_base.loc[k, "survey_type"] = survey_type["table_name"][survey]
+        k += 1
+
+    df_tables = pd.concat(
+        [df_tables, aggregate_incomes(df_base, income_aggregation)], ignore_index=True
+    )
+    j = len(df_tables)
 
 df_tables["sourceName"] = sourceName
 df_tables["dataPublishedBy"] = dataPublishedBy
@@ -337,141 +318,131 @@ df_tables["colorScaleNumericMinValue"] = colorScaleNumericMinValue
 df_tables["tolerance"] = tolerance
 df_tables["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Tables for variables showing breaks between surveys
 # These variables consider a breaks in the series due to changes in surveys' methodology. Special modifications have to be included to graph monthly and yearly variables properly.
 
 # %%
-# Create master table for line breaks
-df_spells = pd.DataFrame()
-j = 0
-
-for i in range(len(df_tables)):
-    # Define country as entityName
-    df_spells.loc[j, "master_var"] = df_tables.slug[i]
-    df_spells.loc[j, "name"] = "Country"
-    df_spells.loc[j, "slug"] = "country"
-    df_spells.loc[j, "type"] = "EntityName"
-    df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
-    j += 1
-
-    # Define year as Year
-    df_spells.loc[j, "master_var"] = df_tables.slug[i]
-    df_spells.loc[j, "name"] = "Year"
-    df_spells.loc[j, "slug"] = "year"
-    df_spells.loc[j, "type"] = "Year"
-    df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
-    j += 1
-
-    for c_spell in range(1, CONSUMPTION_SPELLS_PIP + 1):
-        df_spells.loc[j, "master_var"] = df_tables.slug[i]
-        df_spells.loc[j, "name"] = "Consumption surveys"
-        df_spells.loc[j, "slug"] = f"consumption_spell_{c_spell}"
-        df_spells.loc[j, "sourceName"] = df_tables.sourceName[i]
-        df_spells.loc[j, "description"] = df_tables.description[i]
-        df_spells.loc[j, "sourceLink"] = df_tables.sourceLink[i]
-        df_spells.loc[j, "dataPublishedBy"] = df_tables.dataPublishedBy[i]
-        df_spells.loc[j, "unit"] = df_tables.unit[i]
-        df_spells.loc[j, "shortUnit"] = df_tables.shortUnit[i]
-        df_spells.loc[j, "tolerance"] = df_tables.tolerance[i]
-        df_spells.loc[j, "type"] = df_tables.type[i]
-        df_spells.loc[j, "colorScaleNumericMinValue"] = (
-            df_tables.colorScaleNumericMinValue[i]
-        )
-        df_spells.loc[j, "colorScaleNumericBins"] = df_tables.colorScaleNumericBins[i]
-        df_spells.loc[j, "colorScaleEqualSizeBins"] = df_tables.colorScaleEqualSizeBins[
-            i
-        ]
-        df_spells.loc[j, "colorScaleScheme"] = df_tables.colorScaleScheme[i]
-        df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
+def spell_columns(tables):
+    # Columns of the spell tables of the variables in `tables` (rows of df_tables), with their `master_var` and
+    # `survey_type`. They are built variable by variable while the explorer is written, so that the columns of all
+    # the spell tables are never in memory at once.
+    tables = tables.reset_index(drop=True)
+
+    # Create master table for line breaks
+    df_spells = new_frame(COLUMNS_SCHEMA)
+    j = 0
+
+    for i in range(len(tables)):
+        # Define country as entityName
+        df_spells.loc[j, "master_var"] = tables.slug[i]
+        df_spells.loc[j, "name"] = "Country"
+        df_spells.loc[j, "slug"] = "country"
+        df_spells.loc[j, "type"] = "EntityName"
+        df_spells.loc[j, "survey_type"] = tables.survey_type[i]
         j += 1
 
-    for i_spell in range(1, INCOME_SPELLS_PIP + 1):
-        df_spells.loc[j, "master_var"] = df_tables.slug[i]
-        df_spells.loc[j, "name"] = "Income surveys"
-        df_spells.loc[j, "slug"] = f"income_spell_{i_spell}"
-        df_spells.loc[j, "sourceName"] = df_tables.sourceName[i]
-        df_spells.loc[j, "description"] = df_tables.description[i]
-        df_spells.loc[j, "sourceLink"] = df_tables.sourceLink[i]
-        df_spells.loc[j, "dataPublishedBy"] = df_tables.dataPublishedBy[i]
-        df_spells.loc[j, "unit"] = df_tables.unit[i]
-        df_spells.loc[j, "shortUnit"] = df_tables.shortUnit[i]
-        df_spells.loc[j, "tolerance"] = df_tables.tolerance[i]
-        df_spells.loc[j, "type"] = df_tables.type[i]
-        df_spells.loc[j, "colorScaleNumericMinValue"] = (
-            df_tables.colorScaleNumericMinValue[i]
-        )
-        df_spells.loc[j, "colorScaleNumericBins"] = df_tables.colorScaleNumericBins[i]
-        df_spells.loc[j, "colorScaleEqualSizeBins"] = df_tables.colorScaleEqualSizeBins[
-            i
-        ]
-        df_spells.loc[j, "colorScaleScheme"] = df_tables.colorScaleScheme[i]
-        df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
+        # Define year as Year
+        df_spells.loc[j, "master_var"] = tables.slug[i]
+        df_spells.loc[j, "name"] = "Year"
+        df_spells.loc[j, "slug"] = "year"
+        df_spells.loc[j, "type"] = "Year"
+        df_spells.loc[j, "survey_type"] = tables.survey_type[i]
         j += 1
 
-# Delete monthly and yearly variables, because there are not spells files for them
-df_spells = df_spells[~df_spells["master_var"].str.contains("_month")].reset_index(
-    drop=True
-)
-df_spells = df_spells[~df_spells["master_var"].str.contains("_year")].reset_index(
-    drop=True
-)
-
-# Delete rows for country and year
-df_spells = df_spells[
-    (df_spells["master_var"] != "country") & (df_spells["master_var"] != "year")
-].reset_index(drop=True)
-
-# Create new rows for daily, monthly and yearly aggregations
-# Drop shares, because they are not aggregated
-df_spells_agg = (
-    df_spells[~df_spells["master_var"].str.contains("_share")]
-    .copy()
-    .reset_index(drop=True)
-)
+        for c_spell in range(1, CONSUMPTION_SPELLS_PIP + 1):
+            df_spells.loc[j, "master_var"] = tables.slug[i]
+            df_spells.loc[j, "name"] = "Consumption surveys"
+            df_spells.loc[j, "slug"] = f"consumption_spell_{c_spell}"
+            df_spells.loc[j, "sourceName"] = tables.sourceName[i]
+            df_spells.loc[j, "description"] = tables.description[i]
+            df_spells.loc[j, "sourceLink"] = tables.sourceLink[i]
+            df_spells.loc[j, "dataPublishedBy"] = tables.dataPublishedBy[i]
+            df_spells.loc[j, "unit"] = tables.unit[i]
+            df_spells.loc[j, "shortUnit"] = tables.shortUnit[i]
+            df_spells.loc[j, "tolerance"] = tables.tolerance[i]
+            df_spells.loc[j, "type"] = tables.type[i]
+            df_spells.loc[j, "colorScaleNumericMinValue"] = (
+                tables.colorScaleNumericMinValue[i]
+            )
+            df_spells.loc[j, "colorScaleNumericBins"] = tables.colorScaleNumericBins[i]
+            df_spells.loc[j, "colorScaleEqualSizeBins"] = (
+                tables.colorScaleEqualSizeBins[i]
+            )
+            df_spells.loc[j, "colorScaleScheme"] = tables.colorScaleScheme[i]
+            df_spells.loc[j, "survey_type"] = tables.survey_type[i]
+            j += 1
 
-# Remove country and year slugs
-df_spells_agg = df_spells_agg[
-    (df_spells_agg["slug"] != "country") & (df_spells_agg["slug"] != "year")
-].reset_index(drop=True)
+        for i_spell in range(1, INCOME_SPELLS_PIP + 1):
+            df_spells.loc[j, "master_var"] = tables.slug[i]
+            df_spells.loc[j, "name"] = "Income surveys"
+            df_spells.loc[j, "slug"] = f"income_spell_{i_spell}"
+            df_spells.loc[j, "sourceName"] = tables.sourceName[i]
+            df_spells.loc[j, "description"] = tables.description[i]
+            df_spells.loc[j, "sourceLink"] = tables.sourceLink[i]
+            df_spells.loc[j, "dataPublishedBy"] = tables.dataPublishedBy[i]
+            df_spells.loc[j, "unit"] = tables.unit[i]
+            df_spells.loc[j, "shortUnit"] = tables.shortUnit[i]
+            df_spells.loc[j, "tolerance"] = tables.tolerance[i]
+            df_spells.loc[j, "type"] = tables.type[i]
+            df_spells.loc[j, "colorScaleNumericMinValue"] = (
+                tables.colorScaleNumericMinValue[i]
+            )
+            df_spells.loc[j, "colorScaleNumericBins"] = tables.colorScaleNumericBins[i]
+            df_spells.loc[j, "colorScaleEqualSizeBins"] = (
+                tables.colorScaleEqualSizeBins[i]
+            )
+            df_spells.loc[j, "colorScaleScheme"] = tables.colorScaleScheme[i]
+            df_spells.loc[j, "survey_type"] = tables.survey_type[i]
+            j += 1
 
-# Create columns for each aggregation
-df_spells_consolidated = pd.DataFrame()
-for agg in range(len(income_aggregation)):
-    df_spells_period = df_spells_agg.copy()
-    df_spells_period["transform"] = (
-        "multiplyBy "
-        + df_spells_period["slug"]
-        + " "
-        + income_aggregation["multiplier"][agg]
+    # Delete monthly and yearly variables, because there are not spells files for them
+    df_spells = df_spells[~df_spells["master_var"].str.contains("_month")].reset_index(
+        drop=True
     )
-    df_spells_period["slug"] = (
-        df_spells_period["slug"] + income_aggregation["slug_suffix"][agg]
+    df_spells = df_spells[~df_spells["master_var"].str.contains("_year")].reset_index(
+        drop=True
     )
-    df_spells_period["description"] = df_spells_period["description"].str.replace(
-        "day", income_aggregation["aggregation"][agg]
+
+    # Delete rows for country and year
+    df_spells = df_spells[
+        (df_spells["master_var"] != "country") & (df_spells["master_var"] != "year")
+    ].reset_index(drop=True)
+
+    # Create new rows for daily, monthly and yearly aggregations
+    # Drop shares, because they are not aggregated
+    df_spells_agg = (
+        df_spells[~df_spells["master_var"].str.contains("_share")]
+        .copy()
+        .reset_index(drop=True)
     )
-    df_spells_consolidated = pd.concat(
-        [df_spells_consolidated, df_spells_period], ignore_index=True
+
+    # Remove country and year slugs
+    df_spells_agg = df_spells_agg[
+        (df_spells_agg["slug"] != "country") & (df_spells_agg["slug"] != "year")
+    ].reset_index(drop=True)
+
+    # Create columns for each aggregation
+    df_spells_agg["description"] = df_spells_agg["description"].str.replace(
+        "day", PLACEHOLDER
     )
+    df_spells_consolidated = aggregate_incomes(df_spells_agg, income_aggregation)
 
-# Concatenate all the spells tables
-df_spells = pd.concat([df_spells, df_spells_consolidated], ignore_index=True)
+    # Concatenate all the spells tables
+    df_spells = pd.concat([df_spells, df_spells_consolidated], ignore_index=True)
+
+    return df_spells
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_spells["tolerance"] = df_spells["tolerance"].astype("Int64")
 
 # %% [markdown]
 # ## Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by survey type and poverty lines.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -754,7 +725,8 @@ df_graphers["Show breaks between less comparable surveys Checkbox"] = "false"
 # Similar to the tables, additional modifications have to be done to process monthly and yearly data properly.
 
 # %%
-df_graphers_spells = pd.DataFrame()
+stage("graphers_spells", rows=lambda: len(df_graphers_spells))
+df_graphers_spells = new_frame(GRAPHERS_SCHEMA)
 j = 0
 
 # Create ySlugs dynamically
@@ -834,39 +806,19 @@ df_graphers["relatedQuestionUrl"] = np.nan
 # "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita)."
 # "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita)."
 
-# When int-$ are not included
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "The data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita).",
-    "The data relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
-)
-
-# When int-$ are included
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, it relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "It relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, it relates to consumption [per capita](#dod:per-capita).",
-    "It relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
-)
+df_graphers["note"] = rewrite_texts(df_graphers["note"], NOTE_RULES_PIP)
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Decile Dropdown"] == "9 (richest)")
-    & (df_graphers["Indicator Dropdown"] == "Decile thresholds")
-    & (df_graphers["Period Radio"] == "Day")
-    & (df_graphers["Show breaks between less comparable surveys Checkbox"] == "false")
-    & (df_graphers["tableSlug"] == "income_consumption_2017"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Decile Dropdown": "9 (richest)",
+        "Indicator Dropdown": "Decile thresholds",
+        "Period Radio": "Day",
+        "Show breaks between less comparable surveys Checkbox": "false",
+        "tableSlug": "income_consumption_2017",
+    },
+)
 
 
 # Reorder dropdown menus
@@ -888,16 +840,6 @@ decile_dropdown_list = [
     "All deciles",
 ]
 
-df_graphers_mapping = pd.DataFrame(
-    {
-        "decile_dropdown": decile_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("decile_dropdown")
-df_graphers["decile_dropdown_aux"] = df_graphers["Decile Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
 # Metric dropdown
 metric_dropdown_list = [
     "Mean income or consumption",
@@ -907,53 +849,40 @@ metric_dropdown_list = [
     "Decile shares",
 ]
 
-df_graphers_mapping = pd.DataFrame(
+# Sort by the order of both dropdowns
+df_graphers = sort_views(
+    df_graphers,
     {
-        "metric_dropdown": metric_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("metric_dropdown")
-df_graphers["metric_dropdown_aux"] = df_graphers["Indicator Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
-# Sort by auxiliary variables and drop
-df_graphers = df_graphers.sort_values(
-    ["decile_dropdown_aux", "metric_dropdown_aux"], ignore_index=True
+        "Decile Dropdown": decile_dropdown_list,
+        "Indicator Dropdown": metric_dropdown_list,
+    },
 )
-df_graphers = df_graphers.drop(columns=["metric_dropdown_aux", "decile_dropdown_aux"])
 
 # %% [markdown]
 # ## Explorer generation
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["survey_type"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA, auxiliary=["survey_type"])
 # Define list of variables to iterate: survey types and the list of variables (the latter for spell tables)
 survey_list = list(survey_type["table_name"].unique())
-var_list = list(df_spells["master_var"].unique())
+var_list = list(df_tables["slug"].unique())
 
 # Header is converted into a tab-separated text
 header_tsv = df_header.to_csv(sep="\t", header=False)
 
-# Auxiliar variable `survey_type` is dropped and graphers table is converted into a tab-separated text
-graphers_tsv = df_graphers.drop(columns=["survey_type"])
-graphers_tsv = graphers_tsv.to_csv(sep="\t", index=False)
-
-# This table is indented, to follow explorers' format
-graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
-
-# The dataframes are combined, including tables which are filtered by survey type and variable
+# The dataframes are combined, including tables which are filtered by survey type and variable.
+# They are written as indented blocks, to follow explorers' format, without the auxiliar variables `survey_type`
+# and `master_var` (see explorer_tools/blocks.py). Spell tables are built while they are written, variable by
+# variable, so that only the tables of one variable are in memory at a time.
 with open(outfile, "w", newline="\n", encoding="utf-8") as f:
     f.write(header_tsv)
-    f.write("\ngraphers\n" + graphers_tsv_indented)
+    f.write("\ngraphers\n")
+    write_block(f, df_graphers, drop=["survey_type"])
 
     for i in survey_list:
-        table_tsv = (
-            df_tables[df_tables["survey_type"] == i].copy().reset_index(drop=True)
-        )
-        table_tsv = table_tsv.drop(columns=["survey_type"])
-        table_tsv = table_tsv.to_csv(sep="\t", index=False)
-        table_tsv_indented = textwrap.indent(table_tsv, "\t")
         f.write(
             "\ntable\t"
             + "https://catalog.ourworldindata.org/explorers/wb/latest/world_bank_pip/"
@@ -961,20 +890,18 @@ with open(outfile, "w", newline="\n", encoding="utf-8") as f:
             + ".csv\t"
             + i
         )
-        f.write("\ncolumns\t" + i + "\n" + table_tsv_indented)
+        f.write("\ncolumns\t" + i + "\n")
+        write_block(f, df_tables[df_tables["survey_type"] == i], drop=["survey_type"])
 
     for var in var_list:
+        # Variables without spells (e.g. country and year) have no spell tables
+        df_spells = spell_columns(df_tables[df_tables["slug"] == var])
+        if df_spells.empty:
+            continue
+        df_spells = apply_schema(
+            df_spells, COLUMNS_SCHEMA, auxiliary=["master_var", "survey_type"]
+        )
         for i in survey_list:
-            table_tsv = (
-                df_spells[
-                    (df_spells["master_var"] == var) & (df_spells["survey_type"] == i)
-                ]
-                .copy()
-                .reset_index(drop=True)
-            )
-            table_tsv = table_tsv.drop(columns=["master_var", "survey_type"])
-            table_tsv = table_tsv.to_csv(sep="\t", index=False)
-            table_tsv_indented = textwrap.indent(table_tsv, "\t")
             f.write(
                 "\ntable\t"
                 + "https://catalog.ourworldindata.org/explorers/wb/latest/world_bank_pip/"
@@ -986,4 +913,13 @@ with open(outfile, "w", newline="\n", encoding="utf-8") as f:
                 + "_"
                 + var
             )
-            f.write("\ncolumns\t" + i + "_" + var + "\n" + table_tsv_indented)
+            f.write("\ncolumns\t" + i + "_" + var + "\n")
+            write_block(
+                f,
+                df_spells[df_spells["survey_type"] == i],
+                drop=["master_var", "survey_type"],
+            )
+
+# %%
+# Optionally write a copy declaring the long repeated descriptions only once, see explorer_tools/shared_text.py
+write_shared_text_copy(outfile, SHARED_TEXTS_PIP)
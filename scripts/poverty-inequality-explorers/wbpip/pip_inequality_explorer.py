@@ -2,7 +2,6 @@
 # # Inequality Data Explorer of World Bank data
 # This code creates the tsv file for the inequality explorer from the World Bank PIP data, available [here](https://owid.cloud/admin/explorers/preview/pip-inequality-explorer)
 
-import textwrap
 from pathlib import Path
 
 import numpy as np
@@ -10,7 +9,20 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.blocks import write_block
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.shared_text import write_shared_text_copy
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.text_rules import report_rewrites, rewrite_texts
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import DefaultView
 from ..common_parameters import *
+from ..descriptions import describe
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "inequality-wb.explorer.tsv"
@@ -20,24 +32,24 @@ outfile = PARENT_DIR / "explorers" / "inequality-wb.explorer.tsv"
 # These spreadsheets provide with different details depending on each relative poverty line or survey type.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "17KJ9YcvfdmO_7-Sv2Ij0vmzAQI6rXSIqHfJtgFHN-a8"
 
 # Relative poverty sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_rel = pd.read_csv(url)
+povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # Survey type sheet
 sheet_name = "survey_type"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-survey_type = pd.read_csv(url)
+survey_type = read_sheet(sheet_id, sheet_name)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Inequality - World Bank",
@@ -69,13 +81,13 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 sourceName = SOURCE_NAME_PIP
 dataPublishedBy = DATA_PUBLISHED_BY_PIP
 sourceLink = SOURCE_LINK_PIP
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
@@ -87,7 +99,7 @@ processing_description = PROCESSING_DESCRIPTION_PIP
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_PIP
 
 # Table generation
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for survey in range(len(survey_type)):
@@ -108,14 +120,12 @@ for survey in range(len(survey_type)):
     # Gini coefficient
     df_tables.loc[j, "name"] = f"Gini coefficient"
     df_tables.loc[j, "slug"] = f"gini"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = np.nan
     df_tables.loc[j, "shortUnit"] = np.nan
@@ -131,14 +141,12 @@ for survey in range(len(survey_type)):
         f"{survey_type.text[survey].capitalize()} share of the richest 10%"
     )
     df_tables.loc[j, "slug"] = f"decile10_share"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The {survey_type.text[survey]} of the richest decile (tenth of the population) as a share of total {survey_type.text[survey]}.",
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The {survey_type.text[survey]} of the richest decile (tenth of the population) as a share of total {survey_type.text[survey]}.",
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "%"
     df_tables.loc[j, "shortUnit"] = "%"
@@ -152,14 +160,12 @@ for survey in range(len(survey_type)):
     # Palma ratio
     df_tables.loc[j, "name"] = f"Palma ratio"
     df_tables.loc[j, "slug"] = f"palma_ratio"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = np.nan
     df_tables.loc[j, "shortUnit"] = np.nan
@@ -173,15 +179,13 @@ for survey in range(len(survey_type)):
     # Headcount ratio (rel)
     df_tables.loc[j, "name"] = f"Share in relative poverty"
     df_tables.loc[j, "slug"] = f"headcount_ratio_50_median"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The share of population with {survey_type.text_ineq[survey]} below 50% of the median. Relative poverty reflects the extent of inequality within the bottom of the distribution.",
-            relative_poverty_description,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The share of population with {survey_type.text_ineq[survey]} below 50% of the median. Relative poverty reflects the extent of inequality within the bottom of the distribution.",
+        relative_poverty_description,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "%"
     df_tables.loc[j, "shortUnit"] = "%"
@@ -195,14 +199,12 @@ for survey in range(len(survey_type)):
     # MLD
     df_tables.loc[j, "name"] = f"Mean Log Deviation"
     df_tables.loc[j, "slug"] = f"mld"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            "The mean log deviation (MLD) is a measure of inequality. An MLD of zero indicates perfect equality and it takes on larger positive values as incomes become more unequal. The measure is also referred to as 'Theil L' or 'GE(0)', in reference to the wider families of inequality measures to which the MLD belongs.",
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        "The mean log deviation (MLD) is a measure of inequality. An MLD of zero indicates perfect equality and it takes on larger positive values as incomes become more unequal. The measure is also referred to as 'Theil L' or 'GE(0)', in reference to the wider families of inequality measures to which the MLD belongs.",
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = np.nan
     df_tables.loc[j, "shortUnit"] = np.nan
@@ -219,101 +221,108 @@ df_tables["sourceLink"] = sourceLink
 df_tables["tolerance"] = tolerance
 df_tables["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ### Tables for variables showing breaks between surveys
 # These variables consider a breaks in the series due to changes in surveys' methodology.
 
 # %%
-# Create master table for line breaks
-df_spells = pd.DataFrame()
-j = 0
-
-for i in range(len(df_tables)):
-    # Define country as entityName
-    df_spells.loc[j, "master_var"] = df_tables.slug[i]
-    df_spells.loc[j, "name"] = "Country"
-    df_spells.loc[j, "slug"] = "country"
-    df_spells.loc[j, "type"] = "EntityName"
-    df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
-    j += 1
-
-    # Define year as Year
-    df_spells.loc[j, "master_var"] = df_tables.slug[i]
-    df_spells.loc[j, "name"] = "Year"
-    df_spells.loc[j, "slug"] = "year"
-    df_spells.loc[j, "type"] = "Year"
-    df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
-    j += 1
-
-    for c_spell in range(1, CONSUMPTION_SPELLS_PIP + 1):
-        df_spells.loc[j, "master_var"] = df_tables.slug[i]
-        df_spells.loc[j, "name"] = "Consumption surveys"
-        df_spells.loc[j, "slug"] = f"consumption_spell_{c_spell}"
-        df_spells.loc[j, "sourceName"] = df_tables.sourceName[i]
-        df_spells.loc[j, "description"] = df_tables.description[i]
-        df_spells.loc[j, "sourceLink"] = df_tables.sourceLink[i]
-        df_spells.loc[j, "dataPublishedBy"] = df_tables.dataPublishedBy[i]
-        df_spells.loc[j, "unit"] = df_tables.unit[i]
-        df_spells.loc[j, "shortUnit"] = df_tables.shortUnit[i]
-        df_spells.loc[j, "tolerance"] = df_tables.tolerance[i]
-        df_spells.loc[j, "type"] = df_tables.type[i]
-        df_spells.loc[j, "colorScaleNumericMinValue"] = (
-            df_tables.colorScaleNumericMinValue[i]
-        )
-        df_spells.loc[j, "colorScaleNumericBins"] = df_tables.colorScaleNumericBins[i]
-        df_spells.loc[j, "colorScaleEqualSizeBins"] = df_tables.colorScaleEqualSizeBins[
-            i
-        ]
-        df_spells.loc[j, "colorScaleScheme"] = df_tables.colorScaleScheme[i]
-        df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
+def spell_columns(tables):
+    # Columns of the spell tables of the variables in `tables` (rows of df_tables), with their `master_var` and
+    # `survey_type`. They are built variable by variable while the explorer is written, so that the columns of all
+    # the spell tables are never in memory at once.
+    tables = tables.reset_index(drop=True)
+
+    # Create master table for line breaks
+    df_spells = new_frame(COLUMNS_SCHEMA)
+    j = 0
+
+    for i in range(len(tables)):
+        # Define country as entityName
+        df_spells.loc[j, "master_var"] = tables.slug[i]
+        df_spells.loc[j, "name"] = "Country"
+        df_spells.loc[j, "slug"] = "country"
+        df_spells.loc[j, "type"] = "EntityName"
+        df_spells.loc[j, "survey_type"] = tables.survey_type[i]
         j += 1
 
-    for i_spell in range(1, INCOME_SPELLS_PIP + 1):
-        df_spells.loc[j, "master_var"] = df_tables.slug[i]
-        df_spells.loc[j, "name"] = "Income surveys"
-        df_spells.loc[j, "slug"] = f"income_spell_{i_spell}"
-        df_spells.loc[j, "sourceName"] = df_tables.sourceName[i]
-        df_spells.loc[j, "description"] = df_tables.description[i]
-        df_spells.loc[j, "sourceLink"] = df_tables.sourceLink[i]
-        df_spells.loc[j, "dataPublishedBy"] = df_tables.dataPublishedBy[i]
-        df_spells.loc[j, "unit"] = df_tables.unit[i]
-        df_spells.loc[j, "shortUnit"] = df_tables.shortUnit[i]
-        df_spells.loc[j, "tolerance"] = df_tables.tolerance[i]
-        df_spells.loc[j, "type"] = df_tables.type[i]
-        df_spells.loc[j, "colorScaleNumericMinValue"] = (
-            df_tables.colorScaleNumericMinValue[i]
-        )
-        df_spells.loc[j, "colorScaleNumericBins"] = df_tables.colorScaleNumericBins[i]
-        df_spells.loc[j, "colorScaleEqualSizeBins"] = df_tables.colorScaleEqualSizeBins[
-            i
-        ]
-        df_spells.loc[j, "colorScaleScheme"] = df_tables.colorScaleScheme[i]
-        df_spells.loc[j, "survey_type"] = df_tables.survey_type[i]
+        # Define year as Year
+        df_spells.loc[j, "master_var"] = tables.slug[i]
+        df_spells.loc[j, "name"] = "Year"
+        df_spells.loc[j, "slug"] = "year"
+        df_spells.loc[j, "type"] = "Year"
+        df_spells.loc[j, "survey_type"] = tables.survey_type[i]
         j += 1
 
-# Delete rows for country and year
-df_spells = df_spells[
-    (df_spells["master_var"] != "country") & (df_spells["master_var"] != "year")
-].reset_index(drop=True)
+        for c_spell in range(1, CONSUMPTION_SPELLS_PIP + 1):
+            df_spells.loc[j, "master_var"] = tables.slug[i]
+            df_spells.loc[j, "name"] = "Consumption surveys"
+            df_spells.loc[j, "slug"] = f"consumption_spell_{c_spell}"
+            df_spells.loc[j, "sourceName"] = tables.sourceName[i]
+            df_spells.loc[j, "description"] = tables.description[i]
+            df_spells.loc[j, "sourceLink"] = tables.sourceLink[i]
+            df_spells.loc[j, "dataPublishedBy"] = tables.dataPublishedBy[i]
+            df_spells.loc[j, "unit"] = tables.unit[i]
+            df_spells.loc[j, "shortUnit"] = tables.shortUnit[i]
+            df_spells.loc[j, "tolerance"] = tables.tolerance[i]
+            df_spells.loc[j, "type"] = tables.type[i]
+            df_spells.loc[j, "colorScaleNumericMinValue"] = (
+                tables.colorScaleNumericMinValue[i]
+            )
+            df_spells.loc[j, "colorScaleNumericBins"] = tables.colorScaleNumericBins[i]
+            df_spells.loc[j, "colorScaleEqualSizeBins"] = (
+                tables.colorScaleEqualSizeBins[i]
+            )
+            df_spells.loc[j, "colorScaleScheme"] = tables.colorScaleScheme[i]
+            df_spells.loc[j, "survey_type"] = tables.survey_type[i]
+            j += 1
+
+        for i_spell in range(1, INCOME_SPELLS_PIP + 1):
+            df_spells.loc[j, "master_var"] = tables.slug[i]
+            df_spells.loc[j, "name"] = "Income surveys"
+            df_spells.loc[j, "slug"] = f"income_spell_{i_spell}"
+            df_spells.loc[j, "sourceName"] = tables.sourceName[i]
+            df_spells.loc[j, "description"] = tables.description[i]
+            df_spells.loc[j, "sourceLink"] = tables.sourceLink[i]
+            df_spells.loc[j, "dataPublishedBy"] = tables.dataPublishedBy[i]
+            df_spells.loc[j, "unit"] = tables.unit[i]
+            df_spells.loc[j, "shortUnit"] = tables.shortUnit[i]
+            df_spells.loc[j, "tolerance"] = tables.tolerance[i]
+            df_spells.loc[j, "type"] = tables.type[i]
+            df_spells.loc[j, "colorScaleNumericMinValue"] = (
+                tables.colorScaleNumericMinValue[i]
+            )
+            df_spells.loc[j, "colorScaleNumericBins"] = tables.colorScaleNumericBins[i]
+            df_spells.loc[j, "colorScaleEqualSizeBins"] = (
+                tables.colorScaleEqualSizeBins[i]
+            )
+            df_spells.loc[j, "colorScaleScheme"] = tables.colorScaleScheme[i]
+            df_spells.loc[j, "survey_type"] = tables.survey_type[i]
+            j += 1
+
+    # Delete rows for country and year
+    df_spells = df_spells[
+        (df_spells["master_var"] != "country") & (df_spells["master_var"] != "year")
+    ].reset_index(drop=True)
+
+    return df_spells
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_spells["tolerance"] = df_spells["tolerance"].astype("Int64")
 
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by survey type.
 
 # %%
+stage("graphers")
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
 
-j = 0
+def survey_views(survey, rewrites=None):
+    # Views of one survey type (a row of survey_type). They are built survey type by survey type while the explorer is
+    # written, so that the views of all survey types are never in memory at once. The cells changed by the text rules
+    # are added to `rewrites` (by column), if given.
+    df_graphers = new_frame(GRAPHERS_SCHEMA)
+    j = 0
 
-for survey in range(len(survey_type)):
     # Gini coefficient
     df_graphers.loc[j, "title"] = f"Gini coefficient"
     df_graphers.loc[j, "ySlugs"] = f"gini"
@@ -422,14 +431,40 @@ for survey in range(len(survey_type)):
     df_graphers.loc[j, "survey_type"] = survey_type["table_name"][survey]
     j += 1
 
-df_graphers["Show breaks between less comparable surveys Checkbox"] = "false"
+    df_graphers["Show breaks between less comparable surveys Checkbox"] = "false"
+
+    # Add related question link
+    df_graphers["relatedQuestionText"] = np.nan
+    df_graphers["relatedQuestionUrl"] = np.nan
+
+    rewrites = {} if rewrites is None else rewrites
+
+    # When the "Depending on" footnote is introduced, it generates unwanted texts as:
+    # "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita)."
+    # "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita)."
+
+    df_graphers["note"] = rewrite_texts(
+        df_graphers["note"],
+        NOTE_RULES_PIP,
+        report=False,
+        cells=rewrites.setdefault("note", {}),
+    )
+
+    # For Gini/Palma subtitle:
+    df_graphers["subtitle"] = rewrite_texts(
+        df_graphers["subtitle"],
+        DATA_RELATES_RULES_PIP,
+        report=False,
+        cells=rewrites.setdefault("subtitle", {}),
+    )
+
+    return df_graphers
+
+
 # %% [markdown]
 # ### Grapher views to show breaks in the curves
 
 # %%
-df_graphers_spells = pd.DataFrame()
-j = 0
-
 # Create ySlugs dynamically
 c_spell_list = []
 i_spell_list = []
@@ -444,125 +479,107 @@ spell_list = c_spell_list + i_spell_list
 
 ySlugs_spells = " ".join(spell_list)
 
-for i in range(len(df_graphers)):
-    df_graphers_spells.loc[j, "title"] = df_graphers["title"][i]
-    df_graphers_spells.loc[j, "ySlugs"] = ySlugs_spells
-    df_graphers_spells.loc[j, "Indicator Dropdown"] = df_graphers["Indicator Dropdown"][
-        i
-    ]
-    df_graphers_spells.loc[j, "Household survey data type Dropdown"] = df_graphers[
-        "Household survey data type Dropdown"
-    ][i]
-    df_graphers_spells.loc[j, "tableSlug"] = (
-        df_graphers["survey_type"][i] + "_" + df_graphers["ySlugs"][i]
-    )
-    df_graphers_spells.loc[j, "subtitle"] = " ".join(
-        [
-            df_graphers["subtitle"][i],
-            "The chart shows breaks in the comparability of the underlying household survey data over time within each country individually.",
-        ]
-    )
-    df_graphers_spells.loc[j, "note"] = df_graphers["note"][i]
-    df_graphers_spells.loc[j, "type"] = df_graphers["type"][i]
-    df_graphers_spells.loc[j, "yAxisMin"] = df_graphers["yAxisMin"][i]
-    df_graphers_spells.loc[j, "selectedFacetStrategy"] = "entity"
-    df_graphers_spells.loc[j, "hasMapTab"] = "false"
-    df_graphers_spells.loc[j, "tab"] = np.nan
-    df_graphers_spells.loc[
-        j, "Show breaks between less comparable surveys Checkbox"
-    ] = "true"
-    j += 1
 
-df_graphers = pd.concat([df_graphers, df_graphers_spells], ignore_index=True)
+def spell_views(graphers):
+    # Views showing the breaks between less comparable surveys, one for each view in `graphers` (the views of one
+    # survey type, see survey_views()). They follow all the other views, and are built survey type by survey type
+    # while the explorer is written.
+    graphers = graphers.reset_index(drop=True)
+    df_graphers_spells = new_frame(GRAPHERS_SCHEMA)
+    j = 0
+
+    for i in range(len(graphers)):
+        df_graphers_spells.loc[j, "title"] = graphers["title"][i]
+        df_graphers_spells.loc[j, "ySlugs"] = ySlugs_spells
+        df_graphers_spells.loc[j, "Indicator Dropdown"] = graphers[
+            "Indicator Dropdown"
+        ][i]
+        df_graphers_spells.loc[j, "Household survey data type Dropdown"] = graphers[
+            "Household survey data type Dropdown"
+        ][i]
+        df_graphers_spells.loc[j, "tableSlug"] = (
+            graphers["survey_type"][i] + "_" + graphers["ySlugs"][i]
+        )
+        df_graphers_spells.loc[j, "subtitle"] = " ".join(
+            [
+                graphers["subtitle"][i],
+                "The chart shows breaks in the comparability of the underlying household survey data over time within each country individually.",
+            ]
+        )
+        df_graphers_spells.loc[j, "note"] = graphers["note"][i]
+        df_graphers_spells.loc[j, "type"] = graphers["type"][i]
+        df_graphers_spells.loc[j, "yAxisMin"] = graphers["yAxisMin"][i]
+        df_graphers_spells.loc[j, "selectedFacetStrategy"] = "entity"
+        df_graphers_spells.loc[j, "hasMapTab"] = "false"
+        df_graphers_spells.loc[j, "tab"] = np.nan
+        df_graphers_spells.loc[
+            j, "Show breaks between less comparable surveys Checkbox"
+        ] = "true"
+        j += 1
 
-# %% [markdown]
-# Final adjustments to the graphers table: add `relatedQuestion` link and `defaultView`:
+    return df_graphers_spells
 
-# %%
-# Add related question link
-df_graphers["relatedQuestionText"] = np.nan
-df_graphers["relatedQuestionUrl"] = np.nan
-
-# When the "Depending on" footnote is introduced, it generates unwanted texts as:
-# "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita)."
-# "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita)."
-
-# When int-$ are not included
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "The data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita).",
-    "The data relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
-)
 
-# When int-$ are included
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, it relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "It relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, it relates to consumption [per capita](#dod:per-capita).",
-    "It relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
-)
+# %% [markdown]
+# Final adjustments to the graphers table: add `defaultView` (the `relatedQuestion` link and the text rules are applied in survey_views()):
 
-# For Gini/Palma subtitle:
-df_graphers["subtitle"] = df_graphers["subtitle"].str.replace(
-    "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "The data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["subtitle"] = df_graphers["subtitle"].str.replace(
-    "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita).",
-    "The data relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
+# %%
+# Select one default view, marked while the views are written
+default_view = DefaultView(
+    {
+        "ySlugs": "gini",
+        "Show breaks between less comparable surveys Checkbox": "false",
+        "tableSlug": "income_consumption_2017",
+    }
 )
 
-# Select one default view
-df_graphers.loc[
-    (df_graphers["ySlugs"] == "gini")
-    & (df_graphers["Show breaks between less comparable surveys Checkbox"] == "false")
-    & (df_graphers["tableSlug"] == "income_consumption_2017"),
-    ["defaultView"],
-] = "true"
-
 
 # %% [markdown]
 # ## Explorer generation
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: views_written)
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["survey_type"])
 # Define list of variables to iterate: survey types and the list of variables (the latter for spell tables)
 survey_list = list(survey_type["table_name"].unique())
-var_list = list(df_spells["master_var"].unique())
+var_list = list(df_tables["slug"].unique())
 
 # Header is converted into a tab-separated text
 header_tsv = df_header.to_csv(sep="\t", header=False)
 
-# Auxiliar variable `survey_type` is dropped and graphers table is converted into a tab-separated text
-graphers_tsv = df_graphers.drop(columns=["survey_type"])
-graphers_tsv = graphers_tsv.to_csv(sep="\t", index=False)
-
-# This table is indented, to follow explorers' format
-graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
-
-# The dataframes are combined, including tables which are filtered by survey type and variable
+# The dataframes are combined, including tables which are filtered by survey type and variable.
+# They are written as indented blocks, to follow explorers' format, without the auxiliar variables `survey_type`
+# and `master_var` (see explorer_tools/blocks.py). Views, spell views and spell tables are built while they are
+# written, survey type by survey type and variable by variable, so that only one chunk of them is in memory at a time.
+# Spell views follow all the other views, so the views of each survey type are built again for them.
+views_written = 0
+rewrites = {}
 with open(outfile, "w", newline="\n", encoding="utf-8") as f:
     f.write(header_tsv)
-    f.write("\ngraphers\n" + graphers_tsv_indented)
+    f.write("\ngraphers\n")
+    for survey in range(len(survey_type)):
+        df_graphers = default_view.mark(survey_views(survey, rewrites))
+        df_graphers = apply_schema(
+            df_graphers, GRAPHERS_SCHEMA, auxiliary=["survey_type"]
+        )
+        write_block(f, df_graphers, drop=["survey_type"], header=survey == 0)
+        views_written += len(df_graphers)
+    for column, cells in rewrites.items():
+        report_rewrites(column, cells)
+    default_view.check()
+
+    for survey in range(len(survey_type)):
+        views = survey_views(survey)
+        # Spell views have the same columns as the other views
+        df_graphers_spells = spell_views(views).reindex(columns=views.columns)
+        df_graphers_spells = apply_schema(
+            df_graphers_spells, GRAPHERS_SCHEMA, auxiliary=["survey_type"]
+        )
+        write_block(f, df_graphers_spells, drop=["survey_type"], header=False)
+        views_written += len(df_graphers_spells)
 
     for i in survey_list:
-        table_tsv = (
-            df_tables[df_tables["survey_type"] == i].copy().reset_index(drop=True)
-        )
-        table_tsv = table_tsv.drop(columns=["survey_type"])
-        table_tsv = table_tsv.to_csv(sep="\t", index=False)
-        table_tsv_indented = textwrap.indent(table_tsv, "\t")
         f.write(
             "\ntable\t"
             + "https://catalog.ourworldindata.org/explorers/wb/latest/world_bank_pip/"
@@ -570,20 +587,18 @@ with open(outfile, "w", newline="\n", encoding="utf-8") as f:
             + ".csv\t"
             + i
         )
-        f.write("\ncolumns\t" + i + "\n" + table_tsv_indented)
+        f.write("\ncolumns\t" + i + "\n")
+        write_block(f, df_tables[df_tables["survey_type"] == i], drop=["survey_type"])
 
     for var in var_list:
+        # Variables without spells (e.g. country and year) have no spell tables
+        df_spells = spell_columns(df_tables[df_tables["slug"] == var])
+        if df_spells.empty:
+            continue
+        df_spells = apply_schema(
+            df_spells, COLUMNS_SCHEMA, auxiliary=["master_var", "survey_type"]
+        )
         for i in survey_list:
-            table_tsv = (
-                df_spells[
-                    (df_spells["master_var"] == var) & (df_spells["survey_type"] == i)
-                ]
-                .copy()
-                .reset_index(drop=True)
-            )
-            table_tsv = table_tsv.drop(columns=["master_var", "survey_type"])
-            table_tsv = table_tsv.to_csv(sep="\t", index=False)
-            table_tsv_indented = textwrap.indent(table_tsv, "\t")
             f.write(
                 "\ntable\t"
                 + "https://catalog.ourworldindata.org/explorers/wb/latest/world_bank_pip/"
@@ -595,4 +610,13 @@ with open(outfile, "w", newline="\n", encoding="utf-8") as f:
                 + "_"
                 + var
             )
-            f.write("\ncolumns\t" + i + "_" + var + "\n" + table_tsv_indented)
+            f.write("\ncolumns\t" + i + "_" + var + "\n")
+            write_block(
+                f,
+                df_spells[df_spells["survey_type"] == i],
+                drop=["master_var", "survey_type"],
+            )
+
+# %%
+# Optionally write a copy declaring the long repeated descriptions only once, see explorer_tools/shared_text.py
+write_shared_text_copy(outfile, SHARED_TEXTS_PIP)
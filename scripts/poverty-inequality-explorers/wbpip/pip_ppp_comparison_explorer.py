@@ -2,7 +2,6 @@
 # # Poverty Data Explorer of World Bank data: 2011 vs 2017 prices
 # This code creates the tsv file for the PPP comparison explorer from the World Bank PIP data, available [here](https://ourworldindata.org/explorers/poverty-explorer-2011-vs-2017-ppp)
 
-import textwrap
 from pathlib import Path
 
 import numpy as np
@@ -10,7 +9,21 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.blocks import write_block
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.shared_text import write_shared_text_copy
+from ...explorer_tools.ordering import sort_views
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.text_rules import rewrite_texts
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "poverty-explorer-2011-vs-2017-ppp.explorer.tsv"
@@ -20,41 +33,38 @@ outfile = PARENT_DIR / "explorers" / "poverty-explorer-2011-vs-2017-ppp.explorer
 # These spreadsheets provide with different details depending on each poverty line (from 2011 and 2017 prices), both prices together, relative poverty or survey type.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "1mR0LPEGlY-wCp1q9lNTlDbVIG65JazKvHL16my9tH8Y"
 
 # Poverty lines in 2011 prices sheet
 sheet_name = "povlines_ppp2011"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_ppp2011 = pd.read_csv(url, dtype={"dollars_text": "str"})
+povlines_ppp2011 = read_sheet(sheet_id, sheet_name, dtype={"dollars_text": "str"})
 
 # Poverty lines in 2017 prices sheet
 sheet_name = "povlines_ppp2017"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_ppp2017 = pd.read_csv(url, dtype={"dollars_text": "str"})
+povlines_ppp2017 = read_sheet(sheet_id, sheet_name, dtype={"dollars_text": "str"})
 
 # Poverty lines in both 2011 and 2017 prices sheet
 sheet_name = "povlines_both"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_both = pd.read_csv(
-    url, dtype={"dollars_2011_text": "str", "dollars_2017_text": "str"}
+povlines_both = read_sheet(
+    sheet_id, sheet_name, dtype={"dollars_2011_text": "str", "dollars_2017_text": "str"}
 )
 
 # Relative poverty lines sheet
 sheet_name = "povlines_rel"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-povlines_rel = pd.read_csv(url)
+povlines_rel = read_sheet(sheet_id, sheet_name)
 
 # Survey type sheet
 sheet_name = "survey_type"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-survey_type = pd.read_csv(url)
+survey_type = read_sheet(sheet_id, sheet_name)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Poverty - World Bank 2011 vs. 2017 prices",
@@ -76,13 +86,13 @@ df_header = df_header[0].apply(pd.Series)
 # Variables are grouped by type to iterate by different poverty lines and survey types at the same time. The output is the list of all the variables being used in the explorer, with metadata.
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 sourceName = SOURCE_NAME_PIP
 dataPublishedBy = DATA_PUBLISHED_BY_PIP
 sourceLink = SOURCE_LINK_PIP
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
 colorScaleEqualSizeBins = COLOR_SCALE_EQUAL_SIZEBINS
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
@@ -96,7 +106,7 @@ ppp_description_2011 = PPP_DESCRIPTION_PIP_2011
 relative_poverty_description = RELATIVE_POVERTY_DESCRIPTION_PIP
 
 # Table generation
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for survey in range(len(survey_type)):
@@ -123,15 +133,13 @@ for survey in range(len(survey_type)):
         df_tables.loc[j, "slug"] = (
             f"headcount_ratio_{povlines_ppp2011.cents[p_2011]}_ppp2011"
         )
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"% of population living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2011.dollars_text[p_2011]} a day (2011 prices).",
-                ppp_description_2011,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"% of population living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2011.dollars_text[p_2011]} a day (2011 prices).",
+            ppp_description_2011,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "%"
         df_tables.loc[j, "shortUnit"] = "%"
@@ -149,15 +157,13 @@ for survey in range(len(survey_type)):
         df_tables.loc[j, "slug"] = (
             f"headcount_ratio_{povlines_ppp2017.cents[p_2017]}_ppp2017"
         )
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"% of population living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2017.dollars_text[p_2017]} a day (2017 prices).",
-                ppp_description_2017,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"% of population living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2017.dollars_text[p_2017]} a day (2017 prices).",
+            ppp_description_2017,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "%"
         df_tables.loc[j, "shortUnit"] = "%"
@@ -173,15 +179,13 @@ for survey in range(len(survey_type)):
             f"Number of people below ${povlines_ppp2011.dollars_text[p_2011]} a day (2011 prices)"
         )
         df_tables.loc[j, "slug"] = f"headcount_{povlines_ppp2011.cents[p_2011]}_ppp2011"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"Number of people living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2011.dollars_text[p_2011]} a day (2011 prices).",
-                ppp_description_2011,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"Number of people living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2011.dollars_text[p_2011]} a day (2011 prices).",
+            ppp_description_2011,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = np.nan
         df_tables.loc[j, "shortUnit"] = np.nan
@@ -199,15 +203,13 @@ for survey in range(len(survey_type)):
             f"Number of people below ${povlines_ppp2017.dollars_text[p_2017]} a day (2017 prices)"
         )
         df_tables.loc[j, "slug"] = f"headcount_{povlines_ppp2017.cents[p_2017]}_ppp2017"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"Number of people living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2017.dollars_text[p_2017]} a day (2017 prices).",
-                ppp_description_2017,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"Number of people living in households with an {survey_type.text[survey]} per person below ${povlines_ppp2017.dollars_text[p_2017]} a day (2017 prices).",
+            ppp_description_2017,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = np.nan
         df_tables.loc[j, "shortUnit"] = np.nan
@@ -227,15 +229,13 @@ for survey in range(len(survey_type)):
         df_tables.loc[j, "slug"] = (
             f"headcount_ratio_{povlines_rel.slug_suffix[pct]}_ppp2011"
         )
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"% of population living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2011 prices).",
-                relative_poverty_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"% of population living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2011 prices).",
+            relative_poverty_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "%"
         df_tables.loc[j, "shortUnit"] = "%"
@@ -253,15 +253,13 @@ for survey in range(len(survey_type)):
         df_tables.loc[j, "slug"] = (
             f"headcount_ratio_{povlines_rel.slug_suffix[pct]}_ppp2017"
         )
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"% of population living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2017 prices).",
-                relative_poverty_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"% of population living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2017 prices).",
+            relative_poverty_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = "%"
         df_tables.loc[j, "shortUnit"] = "%"
@@ -277,15 +275,13 @@ for survey in range(len(survey_type)):
             f"{povlines_rel.percent[pct]} of median - total number of people below poverty line (2011 prices)"
         )
         df_tables.loc[j, "slug"] = f"headcount_{povlines_rel.slug_suffix[pct]}_ppp2011"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"Number of people living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2011 prices).",
-                relative_poverty_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"Number of people living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2011 prices).",
+            relative_poverty_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = np.nan
         df_tables.loc[j, "shortUnit"] = np.nan
@@ -303,15 +299,13 @@ for survey in range(len(survey_type)):
             f"{povlines_rel.percent[pct]} of median - total number of people below poverty line (2017 prices)"
         )
         df_tables.loc[j, "slug"] = f"headcount_{povlines_rel.slug_suffix[pct]}_ppp2017"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"Number of people living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2017 prices).",
-                relative_poverty_description,
-                survey_type.description[survey],
-                additional_description,
-                notes_title,
-                processing_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"Number of people living in households with an {survey_type.text[survey]} per person below {povlines_rel.percent[pct]} of the median (2017 prices).",
+            relative_poverty_description,
+            survey_type.description[survey],
+            additional_description,
+            notes_title,
+            processing_description,
         )
         df_tables.loc[j, "unit"] = np.nan
         df_tables.loc[j, "shortUnit"] = np.nan
@@ -326,15 +320,13 @@ for survey in range(len(survey_type)):
     # Mean (2011)
     df_tables.loc[j, "name"] = f"Mean {survey_type.text[survey]} per day (2011 prices)"
     df_tables.loc[j, "slug"] = "mean_ppp2011"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The mean level of {survey_type.text[survey]} per day (2011 prices).",
-            ppp_description_2011,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The mean level of {survey_type.text[survey]} per day (2011 prices).",
+        ppp_description_2011,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ at 2011 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -347,15 +339,13 @@ for survey in range(len(survey_type)):
     # Mean (2017)
     df_tables.loc[j, "name"] = f"Mean {survey_type.text[survey]} per day (2017 prices)"
     df_tables.loc[j, "slug"] = "mean_ppp2017"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The mean level of {survey_type.text[survey]} per day (2017 prices).",
-            ppp_description_2017,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The mean level of {survey_type.text[survey]} per day (2017 prices).",
+        ppp_description_2017,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -370,15 +360,13 @@ for survey in range(len(survey_type)):
         f"Median {survey_type.text[survey]} per day (2011 prices)"
     )
     df_tables.loc[j, "slug"] = "median_ppp2011"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per day below which half of the population live (2011 prices).",
-            ppp_description_2011,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per day below which half of the population live (2011 prices).",
+        ppp_description_2011,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ at 2011 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -393,15 +381,13 @@ for survey in range(len(survey_type)):
         f"Median {survey_type.text[survey]} per day (2017 prices)"
     )
     df_tables.loc[j, "slug"] = "median_ppp2017"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per day below which half of the population live (2017 prices).",
-            ppp_description_2017,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per day below which half of the population live (2017 prices).",
+        ppp_description_2017,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -414,15 +400,13 @@ for survey in range(len(survey_type)):
     # P10 (2011)
     df_tables.loc[j, "name"] = "P10 (2011 prices)"
     df_tables.loc[j, "slug"] = "decile1_thr_ppp2011"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per day below which 10% of the population falls (2011 prices).",
-            ppp_description_2011,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per day below which 10% of the population falls (2011 prices).",
+        ppp_description_2011,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ at 2011 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -435,15 +419,13 @@ for survey in range(len(survey_type)):
     # P10 (2017)
     df_tables.loc[j, "name"] = "P10 (2017 prices)"
     df_tables.loc[j, "slug"] = "decile1_thr_ppp2017"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per day below which 10% of the population falls (2017 prices).",
-            ppp_description_2017,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per day below which 10% of the population falls (2017 prices).",
+        ppp_description_2017,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -456,15 +438,13 @@ for survey in range(len(survey_type)):
     # P90 (2011)
     df_tables.loc[j, "name"] = "P90 (2011 prices)"
     df_tables.loc[j, "slug"] = "decile9_thr_ppp2011"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per day below which 90% of the population falls (2011 prices).",
-            ppp_description_2011,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per day below which 90% of the population falls (2011 prices).",
+        ppp_description_2011,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ at 2011 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -477,15 +457,13 @@ for survey in range(len(survey_type)):
     # P90 (2017)
     df_tables.loc[j, "name"] = "P90 (2017 prices)"
     df_tables.loc[j, "slug"] = "decile9_thr_ppp2017"
-    df_tables.loc[j, "description"] = new_line.join(
-        [
-            f"The level of {survey_type.text[survey]} per day below which 90% of the population falls (2017 prices).",
-            ppp_description_2017,
-            survey_type.description[survey],
-            additional_description,
-            notes_title,
-            processing_description,
-        ]
+    df_tables.loc[j, "description"] = describe(
+        f"The level of {survey_type.text[survey]} per day below which 90% of the population falls (2017 prices).",
+        ppp_description_2017,
+        survey_type.description[survey],
+        additional_description,
+        notes_title,
+        processing_description,
     )
     df_tables.loc[j, "unit"] = "international-$ in 2017 prices"
     df_tables.loc[j, "shortUnit"] = "$"
@@ -502,17 +480,15 @@ df_tables["colorScaleNumericMinValue"] = colorScaleNumericMinValue
 df_tables["tolerance"] = tolerance
 df_tables["colorScaleEqualSizeBins"] = colorScaleEqualSizeBins
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
 # %% [markdown]
 # ## Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by survey type and poverty lines.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -1180,39 +1156,19 @@ df_graphers["relatedQuestionUrl"] = (
 )
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["ySlugs"] == "headcount_ratio_190_ppp2011 headcount_ratio_215_ppp2017")
-    & (df_graphers["tableSlug"] == "income_consumption_2011_2017"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "ySlugs": "headcount_ratio_190_ppp2011 headcount_ratio_215_ppp2017",
+        "tableSlug": "income_consumption_2011_2017",
+    },
+)
 
 # When the "Depending on" footnote is introduced, it generates unwanted texts as:
 # "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita)."
 # "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita)."
 
-# When int-$ are not included
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, the data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "The data relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, the data relates to consumption [per capita](#dod:per-capita).",
-    "The data relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
-)
-
-# When int-$ are included
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, it relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    "It relates to income measured after taxes and benefits [per capita](#dod:per-capita).",
-    regex=False,
-)
-df_graphers["note"] = df_graphers["note"].str.replace(
-    "Depending on the country and year, it relates to consumption [per capita](#dod:per-capita).",
-    "It relates to consumption [per capita](#dod:per-capita).",
-    regex=False,
-)
+df_graphers["note"] = rewrite_texts(df_graphers["note"], NOTE_RULES_PIP)
 
 # Reorder dropdown menus
 povline_dropdown_list = [
@@ -1235,50 +1191,31 @@ povline_dropdown_list = [
     "Relative poverty: 60% of median",
 ]
 
-
-df_graphers_mapping = pd.DataFrame(
-    {
-        "povline_dropdown": povline_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("povline_dropdown")
-
-df_graphers["povline_dropdown_aux"] = df_graphers["Poverty line Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-df_graphers = df_graphers.sort_values("povline_dropdown_aux", ignore_index=True)
-df_graphers = df_graphers.drop(columns=["povline_dropdown_aux"])
+df_graphers = sort_views(df_graphers, {"Poverty line Dropdown": povline_dropdown_list})
 
 # %% [markdown]
 # ## Explorer generation
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["survey_type"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA, auxiliary=["survey_type"])
 # Define list of variables to iterate: survey types
 survey_list = list(survey_type["table_name"].unique())
 
 # Header is converted into a tab-separated text
 header_tsv = df_header.to_csv(sep="\t", header=False)
 
-# Auxiliar variable `survey_type` is dropped and graphers table is converted into a tab-separated text
-graphers_tsv = df_graphers.drop(columns=["survey_type"])
-graphers_tsv = graphers_tsv.to_csv(sep="\t", index=False)
-
-# This table is indented, to follow explorers' format
-graphers_tsv_indented = textwrap.indent(graphers_tsv, "\t")
-
-# The dataframes are combined, including tables which are filtered by survey type and variable
+# The dataframes are combined, including tables which are filtered by survey type and variable.
+# They are written as indented blocks, to follow explorers' format, without the auxiliar variable `survey_type`
+# (see explorer_tools/blocks.py)
 with open(outfile, "w", newline="\n", encoding="utf-8") as f:
     f.write(header_tsv)
-    f.write("\ngraphers\n" + graphers_tsv_indented)
+    f.write("\ngraphers\n")
+    write_block(f, df_graphers, drop=["survey_type"])
 
     for i in survey_list:
-        table_tsv = (
-            df_tables[df_tables["survey_type"] == i].copy().reset_index(drop=True)
-        )
-        table_tsv = table_tsv.drop(columns=["survey_type"])
-        table_tsv = table_tsv.to_csv(sep="\t", index=False)
-        table_tsv_indented = textwrap.indent(table_tsv, "\t")
         f.write(
             "\ntable\t"
             + "https://catalog.ourworldindata.org/explorers/wb/latest/world_bank_pip/"
@@ -1286,4 +1223,9 @@ with open(outfile, "w", newline="\n", encoding="utf-8") as f:
             + ".csv\t"
             + i
         )
-        f.write("\ncolumns\t" + i + "\n" + table_tsv_indented)
+        f.write("\ncolumns\t" + i + "\n")
+        write_block(f, df_tables[df_tables["survey_type"] == i], drop=["survey_type"])
+
+# %%
+# Optionally write a copy declaring the long repeated descriptions only once, see explorer_tools/shared_text.py
+write_shared_text_copy(outfile, SHARED_TEXTS_PIP_PPP_COMPARISON)
@@ -10,7 +10,19 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.ordering import sort_views
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..descriptions import describe
+from ..income_aggregation import aggregate_incomes, bins_columns
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "incomes-across-distribution-wid.explorer.tsv"
@@ -20,39 +32,34 @@ outfile = PARENT_DIR / "explorers" / "incomes-across-distribution-wid.explorer.t
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "18T5IGnpyJwb8KL9USYvME6IaLEcYIo26ioHCpkDnwRQ"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-welfare = pd.read_csv(url, keep_default_na=False)
+welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Tables sheet
 sheet_name = "tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-tables = pd.read_csv(url, keep_default_na=False)
+tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles9 sheet (needed to handle thresholds data)
 sheet_name = "deciles9"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles9 = pd.read_csv(url, keep_default_na=False)
+deciles9 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Deciles10 sheet (needed to handle average and share data)
 sheet_name = "deciles10"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-deciles10 = pd.read_csv(url, keep_default_na=False)
+deciles10 = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Top sheet (needed to handle data at the top of the distribution)
 sheet_name = "top_pct"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-top_pct = pd.read_csv(url, keep_default_na=False, dtype={"percentage": "str"})
+top_pct = read_sheet(sheet_id, sheet_name, keep_default_na=False, dtype={"percentage": "str"})
 
 # Income aggregation sheet (day, month, year)
 sheet_name = "income_aggregation"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-income_aggregation = pd.read_csv(
-    url, keep_default_na=False, dtype={"multiplier": "str"}
+income_aggregation = read_sheet(
+    sheet_id, sheet_name, keep_default_na=False, dtype={"multiplier": "str"}
 )
 
 # %% [markdown]
@@ -60,6 +67,7 @@ income_aggregation = pd.read_csv(
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Incomes Across the Distribution - World Inequality Database",
@@ -91,6 +99,7 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 # Table generation
 
 sourceName = SOURCE_NAME_WID
@@ -98,14 +107,13 @@ dataPublishedBy = DATA_PUBLISHED_BY_WID
 sourceLink = SOURCE_LINK_WID
 colorScaleNumericMinValue = COLOR_SCALE_NUMERIC_MIN_VALUE
 tolerance = TOLERANCE
-new_line = NEW_LINE
 
 yAxisMin = Y_AXIS_MIN
 
 additional_description = ADDITIONAL_DESCRIPTION_WID
 ppp_description = PPP_DESCRIPTION_WID
 
-df_tables = pd.DataFrame()
+df_tables = new_frame(COLUMNS_SCHEMA)
 j = 0
 
 for tab in range(len(tables)):
@@ -134,13 +142,11 @@ for tab in range(len(tables)):
             f"Mean {welfare['welfare_type'][wel]} {welfare['title'][wel]}"
         )
         df_tables.loc[j, "slug"] = f"p0p100_avg_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"Mean {welfare['welfare_type'][wel]}",
-                welfare["description"][wel],
-                ppp_description,
-                additional_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"Mean {welfare['welfare_type'][wel]}",
+            welfare["description"][wel],
+            ppp_description,
+            additional_description,
         )
         df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
         df_tables.loc[j, "shortUnit"] = "$"
@@ -155,13 +161,11 @@ for tab in range(len(tables)):
             f"Median {welfare['welfare_type'][wel]} {welfare['title'][wel]}"
         )
         df_tables.loc[j, "slug"] = f"median_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The level of {welfare['welfare_type'][wel]} below which half of the population falls.",
-                welfare["description"][wel],
-                ppp_description,
-                additional_description,
-            ]
+        df_tables.loc[j, "description"] = describe(
+            f"The level of {welfare['welfare_type'][wel]} below which half of the population falls.",
+            welfare["description"][wel],
+            ppp_description,
+            additional_description,
         )
         df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
         df_tables.loc[j, "shortUnit"] = "$"
@@ -179,13 +183,11 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"{deciles9['wid_notation'][dec9]}_thr_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {welfare['welfare_type'][wel]} below which {deciles9['decile'][dec9]}0% of the population falls.",
-                    welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The level of {welfare['welfare_type'][wel]} below which {deciles9['decile'][dec9]}0% of the population falls.",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
             df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
             df_tables.loc[j, "shortUnit"] = "$"
@@ -203,13 +205,11 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"{deciles10['wid_notation'][dec10]}_avg_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The mean {welfare['welfare_type'][wel]} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
-                    welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The mean {welfare['welfare_type'][wel]} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
             df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
             df_tables.loc[j, "shortUnit"] = "$"
@@ -227,12 +227,10 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"{deciles10['wid_notation'][dec10]}_share_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {welfare['welfare_type'][wel]} received by the {deciles10['ordinal'][dec10]} (tenth of the population).",
-                    welfare["description"][wel],
-                    additional_description,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the {deciles10['ordinal'][dec10]} (tenth of the population).",
+                welfare["description"][wel],
+                additional_description,
             )
             df_tables.loc[j, "unit"] = "%"
             df_tables.loc[j, "shortUnit"] = "%"
@@ -253,13 +251,11 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"{top_pct['wid_notation'][top]}_thr_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {welfare['welfare_type'][wel]} marking the richest {top_pct['percentage'][top]}",
-                    welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The level of {welfare['welfare_type'][wel]} marking the richest {top_pct['percentage'][top]}",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
             df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
             df_tables.loc[j, "shortUnit"] = "$"
@@ -277,13 +273,11 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"{top_pct['wid_notation'][top]}_avg_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The mean {welfare['welfare_type'][wel]} within the richest {top_pct['percentage'][top]}.",
-                    welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The mean {welfare['welfare_type'][wel]} within the richest {top_pct['percentage'][top]}.",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
             df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
             df_tables.loc[j, "shortUnit"] = "$"
@@ -301,12 +295,10 @@ for tab in range(len(tables)):
             df_tables.loc[j, "slug"] = (
                 f"{top_pct['wid_notation'][top]}_share_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The share of {welfare['welfare_type'][wel]} received by the richest {top_pct['percentage'][top]} of the population.",
-                    welfare["description"][wel],
-                    additional_description,
-                ]
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the richest {top_pct['percentage'][top]} of the population.",
+                welfare["description"][wel],
+                additional_description,
             )
             df_tables.loc[j, "unit"] = "%"
             df_tables.loc[j, "shortUnit"] = "%"
@@ -318,179 +310,157 @@ for tab in range(len(tables)):
             df_tables.loc[j, "colorScaleScheme"] = "OrRd"
             j += 1
 
-        # Income aggregations
-        for agg in range(len(income_aggregation)):
-            # Mean
-            df_tables.loc[j, "name"] = (
-                f"Mean {welfare['welfare_type'][wel]} {welfare['title'][wel]}"
-            )
-            df_tables.loc[j, "slug"] = (
-                f"p0p100_avg_{welfare['slug'][wel]}{income_aggregation['slug_suffix'][agg]}"
+        # Income aggregations, defined once for all periods (see income_aggregation.py)
+        df_base = pd.DataFrame()
+        k = 0
+
+        # Mean
+        df_base.loc[k, "name"] = (
+            f"Mean {welfare['welfare_type'][wel]} {welfare['title'][wel]}"
+        )
+        df_base.loc[k, "slug"] = f"p0p100_avg_{welfare['slug'][wel]}"
+        df_base.loc[k, "description"] = describe(
+            f"Mean {welfare['welfare_type'][wel]} per {{aggregation}}.",
+            welfare["description"][wel],
+            ppp_description,
+            additional_description,
+        )
+        df_base.loc[k, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+        df_base.loc[k, "shortUnit"] = "$"
+        df_base.loc[k, "type"] = "Numeric"
+        df_base.loc[k, bins_columns(income_aggregation)] = income_aggregation[
+            f"scale_{welfare['slug'][wel]}"
+        ].values
+        df_base.loc[k, "colorScaleEqualSizeBins"] = "true"
+        df_base.loc[k, "colorScaleScheme"] = "BuGn"
+        k += 1
+
+        # Median
+        df_base.loc[k, "name"] = (
+            f"Median {welfare['welfare_type'][wel]} {welfare['title'][wel]}"
+        )
+        df_base.loc[k, "slug"] = f"median_{welfare['slug'][wel]}"
+        df_base.loc[k, "description"] = describe(
+            f"The level of {welfare['welfare_type'][wel]} per {{aggregation}} below which hald of the population falls.",
+            welfare["description"][wel],
+            ppp_description,
+            additional_description,
+        )
+        df_base.loc[k, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+        df_base.loc[k, "shortUnit"] = "$"
+        df_base.loc[k, "type"] = "Numeric"
+        df_base.loc[k, bins_columns(income_aggregation)] = income_aggregation[
+            f"scale_{welfare['slug'][wel]}"
+        ].values
+        df_base.loc[k, "colorScaleEqualSizeBins"] = "true"
+        df_base.loc[k, "colorScaleScheme"] = "Blues"
+        k += 1
+
+        # Thresholds - Deciles
+        for dec9 in range(len(deciles9)):
+            df_base.loc[k, "name"] = (
+                f"{deciles9['ordinal'][dec9].capitalize()} {welfare['title'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"Mean {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]}.",
-                    welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_base.loc[k, "slug"] = (
+                f"{deciles9['wid_notation'][dec9]}_thr_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-            df_tables.loc[j, "shortUnit"] = "$"
-            df_tables.loc[j, "type"] = "Numeric"
-            df_tables.loc[j, "colorScaleNumericBins"] = income_aggregation[
-                f"scale_{welfare['slug'][wel]}"
-            ][agg]
-            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-            df_tables.loc[j, "colorScaleScheme"] = "BuGn"
-            df_tables.loc[j, "transform"] = (
-                f"multiplyBy p0p100_avg_{welfare['slug'][wel]} {income_aggregation['multiplier'][agg]}"
+            df_base.loc[k, "description"] = describe(
+                f"The level of {welfare['welfare_type'][wel]} per {{aggregation}} below which {deciles9['decile'][dec9]}0% of the population falls.",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
-            j += 1
+            df_base.loc[k, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+            df_base.loc[k, "shortUnit"] = "$"
+            df_base.loc[k, "type"] = "Numeric"
+            df_base.loc[k, bins_columns(income_aggregation)] = deciles9.loc[
+                dec9,
+                bins_columns(income_aggregation, f"scale_thr_{welfare['slug'][wel]}_"),
+            ].values
+            df_base.loc[k, "colorScaleEqualSizeBins"] = "true"
+            df_base.loc[k, "colorScaleScheme"] = "Purples"
+            k += 1
 
-            # Median
-            df_tables.loc[j, "name"] = (
-                f"Median {welfare['welfare_type'][wel]} {welfare['title'][wel]}"
-            )
-            df_tables.loc[j, "slug"] = (
-                f"median_{welfare['slug'][wel]}{income_aggregation['slug_suffix'][agg]}"
+        # Averages - Deciles
+        for dec10 in range(len(deciles10)):
+            df_base.loc[k, "name"] = (
+                f"{deciles10['ordinal'][dec10].capitalize()} {welfare['title'][wel]}"
             )
-            df_tables.loc[j, "description"] = new_line.join(
-                [
-                    f"The level of {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} below which hald of the population falls.",
-                    welfare["description"][wel],
-                    ppp_description,
-                    additional_description,
-                ]
+            df_base.loc[k, "slug"] = (
+                f"{deciles10['wid_notation'][dec10]}_avg_{welfare['slug'][wel]}"
             )
-            df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-            df_tables.loc[j, "shortUnit"] = "$"
-            df_tables.loc[j, "type"] = "Numeric"
-            df_tables.loc[j, "colorScaleNumericBins"] = income_aggregation[
-                f"scale_{welfare['slug'][wel]}"
-            ][agg]
-            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-            df_tables.loc[j, "colorScaleScheme"] = "Blues"
-            df_tables.loc[j, "transform"] = (
-                f"multiplyBy median_{welfare['slug'][wel]} {income_aggregation['multiplier'][agg]}"
+            df_base.loc[k, "description"] = describe(
+                f"The mean {welfare['welfare_type'][wel]} per {{aggregation}} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
             )
-            j += 1
-
-            # Thresholds - Deciles
-            for dec9 in range(len(deciles9)):
-                df_tables.loc[j, "name"] = (
-                    f"{deciles9['ordinal'][dec9].capitalize()} {welfare['title'][wel]}"
-                )
-                df_tables.loc[j, "slug"] = (
-                    f"{deciles9['wid_notation'][dec9]}_thr_{welfare['slug'][wel]}{income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} below which {deciles9['decile'][dec9]}0% of the population falls.",
-                        welfare["description"][wel],
-                        ppp_description,
-                        additional_description,
-                    ]
-                )
-                df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-                df_tables.loc[j, "shortUnit"] = "$"
-                df_tables.loc[j, "type"] = "Numeric"
-                df_tables.loc[j, "colorScaleNumericBins"] = deciles9[
-                    f"scale_thr_{welfare['slug'][wel]}_{income_aggregation['aggregation'][agg]}"
-                ][dec9]
-                df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-                df_tables.loc[j, "colorScaleScheme"] = "Purples"
-                df_tables.loc[j, "transform"] = (
-                    f"multiplyBy {deciles9['wid_notation'][dec9]}_thr_{welfare['slug'][wel]} {income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
-
-            # Averages - Deciles
-            for dec10 in range(len(deciles10)):
-                df_tables.loc[j, "name"] = (
-                    f"{deciles10['ordinal'][dec10].capitalize()} {welfare['title'][wel]}"
-                )
-                df_tables.loc[j, "slug"] = (
-                    f"{deciles10['wid_notation'][dec10]}_avg_{welfare['slug'][wel]}{income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The mean {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} within the {deciles10['ordinal'][dec10]} (tenth of the population).",
-                        welfare["description"][wel],
-                        ppp_description,
-                        additional_description,
-                    ]
-                )
-                df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-                df_tables.loc[j, "shortUnit"] = "$"
-                df_tables.loc[j, "type"] = "Numeric"
-                df_tables.loc[j, "colorScaleNumericBins"] = deciles10[
-                    f"scale_avg_{welfare['slug'][wel]}_{income_aggregation['aggregation'][agg]}"
-                ][dec10]
-                df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-                df_tables.loc[j, "colorScaleScheme"] = "Greens"
-                df_tables.loc[j, "transform"] = (
-                    f"multiplyBy {deciles10['wid_notation'][dec10]}_avg_{welfare['slug'][wel]} {income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
+            df_base.loc[k, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+            df_base.loc[k, "shortUnit"] = "$"
+            df_base.loc[k, "type"] = "Numeric"
+            df_base.loc[k, bins_columns(income_aggregation)] = deciles10.loc[
+                dec10,
+                bins_columns(income_aggregation, f"scale_avg_{welfare['slug'][wel]}_"),
+            ].values
+            df_base.loc[k, "colorScaleEqualSizeBins"] = "true"
+            df_base.loc[k, "colorScaleScheme"] = "Greens"
+            k += 1
 
-            # Thresholds - Top percentiles
-            for top in range(len(top_pct)):
-                df_tables.loc[j, "name"] = (
-                    f"{top_pct['name'][top].capitalize()} {welfare['title'][wel]}"
-                )
-                df_tables.loc[j, "slug"] = (
-                    f"{top_pct['wid_notation'][top]}_thr_{welfare['slug'][wel]}{income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The level of {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} marking the richest {top_pct['percentage'][top]}",
-                        welfare["description"][wel],
-                        ppp_description,
-                        additional_description,
-                    ]
-                )
-                df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-                df_tables.loc[j, "shortUnit"] = "$"
-                df_tables.loc[j, "type"] = "Numeric"
-                df_tables.loc[j, "colorScaleNumericBins"] = top_pct[
-                    f"scale_thr_{welfare['slug'][wel]}_{income_aggregation['aggregation'][agg]}"
-                ][top]
-                df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-                df_tables.loc[j, "colorScaleScheme"] = "Purples"
-                df_tables.loc[j, "transform"] = (
-                    f"multiplyBy {top_pct['wid_notation'][top]}_thr_{welfare['slug'][wel]} {income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
+        # Thresholds - Top percentiles
+        for top in range(len(top_pct)):
+            df_base.loc[k, "name"] = (
+                f"{top_pct['name'][top].capitalize()} {welfare['title'][wel]}"
+            )
+            df_base.loc[k, "slug"] = (
+                f"{top_pct['wid_notation'][top]}_thr_{welfare['slug'][wel]}"
+            )
+            df_base.loc[k, "description"] = describe(
+                f"The level of {welfare['welfare_type'][wel]} per {{aggregation}} marking the richest {top_pct['percentage'][top]}",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
+            )
+            df_base.loc[k, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+            df_base.loc[k, "shortUnit"] = "$"
+            df_base.loc[k, "type"] = "Numeric"
+            df_base.loc[k, bins_columns(income_aggregation)] = top_pct.loc[
+                top,
+                bins_columns(income_aggregation, f"scale_thr_{welfare['slug'][wel]}_"),
+            ].values
+            df_base.loc[k, "colorScaleEqualSizeBins"] = "true"
+            df_base.loc[k, "colorScaleScheme"] = "Purples"
+            k += 1
 
-            # Averages - Top percentiles
-            for top in range(len(top_pct)):
-                df_tables.loc[j, "name"] = (
-                    f"{top_pct['name'][top].capitalize()} {welfare['title'][wel]}"
-                )
-                df_tables.loc[j, "slug"] = (
-                    f"{top_pct['wid_notation'][top]}_avg_{welfare['slug'][wel]}{income_aggregation['slug_suffix'][agg]}"
-                )
-                df_tables.loc[j, "description"] = new_line.join(
-                    [
-                        f"The mean {welfare['welfare_type'][wel]} per {income_aggregation['aggregation'][agg]} within the richest {top_pct['percentage'][top]}.",
-                        welfare["description"][wel],
-                        ppp_description,
-                        additional_description,
-                    ]
-                )
-                df_tables.loc[j, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
-                df_tables.loc[j, "shortUnit"] = "$"
-                df_tables.loc[j, "type"] = "Numeric"
-                df_tables.loc[j, "colorScaleNumericBins"] = top_pct[
-                    f"scale_avg_{welfare['slug'][wel]}_{income_aggregation['aggregation'][agg]}"
-                ][top]
-                df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-                df_tables.loc[j, "colorScaleScheme"] = "Greens"
-                df_tables.loc[j, "transform"] = (
-                    f"multiplyBy {top_pct['wid_notation'][top]}_avg_{welfare['slug'][wel]} {income_aggregation['multiplier'][agg]}"
-                )
-                j += 1
+        # Averages - Top percentiles
+        for top in range(len(top_pct)):
+            df_base.loc[k, "name"] = (
+                f"{top_pct['name'][top].capitalize()} {welfare['title'][wel]}"
+            )
+            df_base.loc[k, "slug"] = (
+                f"{top_pct['wid_notation'][top]}_avg_{welfare['slug'][wel]}"
+            )
+            df_base.loc[k, "description"] = describe(
+                f"The mean {welfare['welfare_type'][wel]} per {{aggregation}} within the richest {top_pct['percentage'][top]}.",
+                welfare["description"][wel],
+                ppp_description,
+                additional_description,
+            )
+            df_base.loc[k, "unit"] = f"international-$ in {PPP_YEAR_WID} prices"
+            df_base.loc[k, "shortUnit"] = "$"
+            df_base.loc[k, "type"] = "Numeric"
+            df_base.loc[k, bins_columns(income_aggregation)] = top_pct.loc[
+                top,
+                bins_columns(income_aggregation, f"scale_avg_{welfare['slug'][wel]}_"),
+            ].values
+            df_base.loc[k, "colorScaleEqualSizeBins"] = "true"
+            df_base.loc[k, "colorScaleScheme"] = "Greens"
+            k += 1
+
+        df_tables = pd.concat(
+            [df_tables, aggregate_incomes(df_base, income_aggregation)],
+            ignore_index=True,
+        )
+        j = len(df_tables)
 
     df_tables["tableSlug"] = tables["name"][tab]
 
@@ -503,22 +473,15 @@ df_tables["dataPublishedBy"] = dataPublishedBy
 df_tables["sourceLink"] = sourceLink
 df_tables["tolerance"] = tolerance
 
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
-
-# Also make colorScaleNumericMinValue integer
-df_tables["colorScaleNumericMinValue"] = df_tables["colorScaleNumericMinValue"].astype(
-    "Int64"
-)
-
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -1123,13 +1086,15 @@ df_graphers["relatedQuestionUrl"] = np.nan
 df_graphers["yAxisMin"] = yAxisMin
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Decile thresholds")
-    & (df_graphers["Decile/quantile Dropdown"] == "9 (richest)")
-    & (df_graphers["Income measure Dropdown"] == "After tax")
-    & (df_graphers["Period Radio"] == "Year"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Decile thresholds",
+        "Decile/quantile Dropdown": "9 (richest)",
+        "Income measure Dropdown": "After tax",
+        "Period Radio": "Year",
+    },
+)
 
 # Reorder dropdown menus
 # Decile/quantile Dropdown
@@ -1152,18 +1117,9 @@ decile_dropdown_list = [
     "Top 0.1%",
     "Top 0.01%",
     "Top 0.001%",
+    "All deciles + top",
 ]
 
-df_graphers_mapping = pd.DataFrame(
-    {
-        "decile_dropdown": decile_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("decile_dropdown")
-df_graphers["decile_dropdown_aux"] = df_graphers["Decile/quantile Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
 # Metric dropdown
 metric_dropdown_list = [
     "Mean income",
@@ -1173,27 +1129,23 @@ metric_dropdown_list = [
     "Decile shares",
 ]
 
-df_graphers_mapping = pd.DataFrame(
+# Sort by the order of both dropdowns
+df_graphers = sort_views(
+    df_graphers,
     {
-        "metric_dropdown": metric_dropdown_list,
-    }
-)
-df_graphers_mapping = df_graphers_mapping.reset_index().set_index("metric_dropdown")
-df_graphers["metric_dropdown_aux"] = df_graphers["Indicator Dropdown"].map(
-    df_graphers_mapping["index"]
-)
-
-# Sort by auxiliary variables and drop
-df_graphers = df_graphers.sort_values(
-    ["decile_dropdown_aux", "metric_dropdown_aux"], ignore_index=True
+        "Decile/quantile Dropdown": decile_dropdown_list,
+        "Indicator Dropdown": metric_dropdown_list,
+    },
 )
-df_graphers = df_graphers.drop(columns=["metric_dropdown_aux", "decile_dropdown_aux"])
 
 # %% [markdown]
 # ## Explorer generation
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names
 table_list = list(tables["name"].unique())
 
@@ -10,7 +10,18 @@ import numpy as np
 # %%
 import pandas as pd
 
+from ...explorer_tools.schema import (
+    COLUMNS_SCHEMA,
+    GRAPHERS_SCHEMA,
+    apply_schema,
+    new_frame,
+)
+from ...explorer_tools.sheets import read_sheet
+from ...explorer_tools.tracing import stage
+from ...explorer_tools.views import set_default_view
 from ..common_parameters import *
+from ..source_artifacts import source_artifact
+from ..wid_inequality_tables import wid_inequality_tables
 
 PARENT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 outfile = PARENT_DIR / "explorers" / "inequality-wid.explorer.tsv"
@@ -20,24 +31,24 @@ outfile = PARENT_DIR / "explorers" / "inequality-wid.explorer.tsv"
 # These spreadsheets provide with different details depending on each type of welfare measure or tables considered.
 
 # %%
+stage("sheets")
 # Read Google sheets
 sheet_id = "18T5IGnpyJwb8KL9USYvME6IaLEcYIo26ioHCpkDnwRQ"
 
 # Welfare type sheet
 sheet_name = "welfare"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-welfare = pd.read_csv(url, keep_default_na=False)
+welfare = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # Tables sheet
 sheet_name = "tables"
-url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-tables = pd.read_csv(url, keep_default_na=False)
+tables = read_sheet(sheet_id, sheet_name, keep_default_na=False)
 
 # %% [markdown]
 # ## Header
 # General settings of the explorer are defined here, like the title, subtitle, default country selection, publishing status and others.
 
 # %%
+stage("header")
 # The header is defined as a dictionary first and then it is converted into a index-oriented dataframe
 header_dict = {
     "explorerTitle": "Inequality - World Inequality Database",
@@ -69,182 +80,23 @@ df_header = df_header[0].apply(pd.Series)
 # These variables consider a continous series, without breaks due to changes in surveys' methodology
 
 # %%
+stage("tables", rows=lambda: len(df_tables))
 # Table generation
-
-sourceName = SOURCE_NAME_WID
-dataPublishedBy = DATA_PUBLISHED_BY_WID
-sourceLink = SOURCE_LINK_WID
-tolerance = TOLERANCE
-new_line = NEW_LINE
+# The same columns are in the multi-source inequality explorer, see wid_inequality_tables.py
 
 yAxisMin = Y_AXIS_MIN
 
-additional_description = ADDITIONAL_DESCRIPTION_WID
-ppp_description = PPP_DESCRIPTION_WID
-
-df_tables = pd.DataFrame()
-j = 0
-
-for tab in range(len(tables)):
-    # Define country as entityName
-    df_tables.loc[j, "name"] = "Country"
-    df_tables.loc[j, "slug"] = "country"
-    df_tables.loc[j, "type"] = "EntityName"
-    j += 1
-
-    # Define year as Year
-    df_tables.loc[j, "name"] = "Year"
-    df_tables.loc[j, "slug"] = "year"
-    df_tables.loc[j, "type"] = "Year"
-    j += 1
-
-    for wel in range(len(welfare)):
-        # Define additional description depending on the welfare type
-        if wel == 0:
-            additional_description = ADDITIONAL_DESCRIPTION_WID_POST_TAX
-        else:
-            additional_description = ADDITIONAL_DESCRIPTION_WID
-
-        # Gini coefficient
-        df_tables.loc[j, "name"] = f"Gini coefficient {welfare['title'][wel]}"
-        df_tables.loc[j, "slug"] = f"p0p100_gini_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
-                welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = np.nan
-        df_tables.loc[j, "shortUnit"] = np.nan
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_gini"][wel]
-        df_tables.loc[j, "colorScaleNumericMinValue"] = 1
-        df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables.loc[j, "colorScaleScheme"] = "Oranges"
-        j += 1
-
-        # Share of the top 10%
-        df_tables.loc[j, "name"] = (
-            f"{welfare['welfare_type'][wel].capitalize()} share of the richest 10% {welfare['title'][wel]}"
-        )
-        df_tables.loc[j, "slug"] = f"p90p100_share_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {welfare['welfare_type'][wel]} received by the richest 10% of the population.",
-                welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = "%"
-        df_tables.loc[j, "shortUnit"] = "%"
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_top10"][wel]
-        df_tables.loc[j, "colorScaleNumericMinValue"] = 100
-        df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
-
-        # Share of the top 1%
-        df_tables.loc[j, "name"] = (
-            f"{welfare['welfare_type'][wel].capitalize()} share of the richest 1% {welfare['title'][wel]}"
-        )
-        df_tables.loc[j, "slug"] = f"p99p100_share_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {welfare['welfare_type'][wel]} received by the richest 1% of the population.",
-                welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = "%"
-        df_tables.loc[j, "shortUnit"] = "%"
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_top1"][wel]
-        df_tables.loc[j, "colorScaleNumericMinValue"] = 0
-        df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
-
-        # Share of the top 0.1%
-        df_tables.loc[j, "name"] = (
-            f"{welfare['welfare_type'][wel].capitalize()} share of the richest 0.1% {welfare['title'][wel]}"
-        )
-        df_tables.loc[j, "slug"] = f"p99_9p100_share_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {welfare['welfare_type'][wel]} received by the richest 0.1% of the population.",
-                welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = "%"
-        df_tables.loc[j, "shortUnit"] = "%"
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_top01"][wel]
-        df_tables.loc[j, "colorScaleNumericMinValue"] = 0
-        df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables.loc[j, "colorScaleScheme"] = "OrRd"
-        j += 1
-
-        # Share of the bottom 50%
-        df_tables.loc[j, "name"] = (
-            f"{welfare['welfare_type'][wel].capitalize()} share of the poorest 50% {welfare['title'][wel]}"
-        )
-        df_tables.loc[j, "slug"] = f"p0p50_share_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                f"The share of {welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
-                welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = "%"
-        df_tables.loc[j, "shortUnit"] = "%"
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_bottom50"][wel]
-        df_tables.loc[j, "colorScaleNumericMinValue"] = 100
-        df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables.loc[j, "colorScaleScheme"] = "Blues"
-        j += 1
-
-        # Palma ratio
-        df_tables.loc[j, "name"] = f"Palma ratio {welfare['title'][wel]}"
-        df_tables.loc[j, "slug"] = f"palma_ratio_{welfare['slug'][wel]}"
-        df_tables.loc[j, "description"] = new_line.join(
-            [
-                "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
-                welfare["description"][wel],
-                additional_description,
-            ]
-        )
-        df_tables.loc[j, "unit"] = np.nan
-        df_tables.loc[j, "shortUnit"] = np.nan
-        df_tables.loc[j, "type"] = "Numeric"
-        df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_palma_ratio"][wel]
-        df_tables.loc[j, "colorScaleNumericMinValue"] = 0
-        df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
-        df_tables.loc[j, "colorScaleScheme"] = "YlOrBr"
-        j += 1
-
-    df_tables["tableSlug"] = tables["name"][tab]
-
-df_tables["sourceName"] = sourceName
-df_tables["dataPublishedBy"] = dataPublishedBy
-df_tables["sourceLink"] = sourceLink
-df_tables["tolerance"] = tolerance
-
-# Make tolerance integer (to not break the parameter in the platform)
-df_tables["tolerance"] = df_tables["tolerance"].astype("Int64")
+df_tables = source_artifact(wid_inequality_tables, welfare, tables)
 
 # %% [markdown]
 # ### Grapher views
 # Similar to the tables, this creates the grapher views by grouping by types of variables and then running by welfare type.
 
 # %%
+stage("graphers", rows=lambda: len(df_graphers))
 # Grapher table generation
 
-df_graphers = pd.DataFrame()
+df_graphers = new_frame(GRAPHERS_SCHEMA)
 
 j = 0
 
@@ -473,11 +325,13 @@ df_graphers["relatedQuestionUrl"] = np.nan
 df_graphers["yAxisMin"] = yAxisMin
 
 # Select one default view
-df_graphers.loc[
-    (df_graphers["Indicator Dropdown"] == "Gini coefficient")
-    & (df_graphers["Income measure Dropdown"] == "After tax"),
-    ["defaultView"],
-] = "true"
+set_default_view(
+    df_graphers,
+    {
+        "Indicator Dropdown": "Gini coefficient",
+        "Income measure Dropdown": "After tax",
+    },
+)
 
 
 # %% [markdown]
@@ -485,6 +339,9 @@ df_graphers.loc[
 # Here, the header, tables and graphers dataframes are combined to be shown in for format required for OWID data explorers.
 
 # %%
+stage("write", rows=lambda: len(df_graphers))
+df_tables = apply_schema(df_tables, COLUMNS_SCHEMA, auxiliary=["tableSlug"])
+df_graphers = apply_schema(df_graphers, GRAPHERS_SCHEMA)
 # Define list of variables to iterate: table names
 table_list = list(tables["name"].unique())
 
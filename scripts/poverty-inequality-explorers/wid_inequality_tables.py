@@ -0,0 +1,178 @@
+"""Columns of the inequality explorers of the World Inequality Database, from the `welfare` and `tables` sheets of WID.
+
+The WID inequality explorer shows them all, and the multi-source inequality explorer the pretax ones, with the source in
+their names:
+
+    df_tables = wid_inequality_tables(welfare, tables)
+    df_tables_wid = wid_inequality_tables(wid_welfare, wid_tables, name_suffix=" (World Inequality Database)")
+
+"""
+
+import numpy as np
+
+from ..explorer_tools.schema import COLUMNS_SCHEMA, new_frame
+from .common_parameters import (
+    ADDITIONAL_DESCRIPTION_WID,
+    ADDITIONAL_DESCRIPTION_WID_POST_TAX,
+    DATA_PUBLISHED_BY_WID,
+    SOURCE_LINK_WID,
+    SOURCE_NAME_WID,
+    TOLERANCE,
+)
+from .descriptions import describe
+
+
+def wid_inequality_tables(welfare, tables, name_suffix=""):
+    # Returns the columns of every table, with `tableSlug`. `name_suffix` is added to the names of the indicators.
+    sourceName = SOURCE_NAME_WID
+    dataPublishedBy = DATA_PUBLISHED_BY_WID
+    sourceLink = SOURCE_LINK_WID
+    tolerance = TOLERANCE
+
+    additional_description = ADDITIONAL_DESCRIPTION_WID
+
+    df_tables = new_frame(COLUMNS_SCHEMA)
+    j = 0
+
+    for tab in range(len(tables)):
+        # Define country as entityName
+        df_tables.loc[j, "name"] = "Country"
+        df_tables.loc[j, "slug"] = "country"
+        df_tables.loc[j, "type"] = "EntityName"
+        j += 1
+
+        # Define year as Year
+        df_tables.loc[j, "name"] = "Year"
+        df_tables.loc[j, "slug"] = "year"
+        df_tables.loc[j, "type"] = "Year"
+        j += 1
+
+        for wel in range(len(welfare)):
+            # Define additional description depending on the welfare type
+            if wel == 0:
+                additional_description = ADDITIONAL_DESCRIPTION_WID_POST_TAX
+            else:
+                additional_description = ADDITIONAL_DESCRIPTION_WID
+
+            # Gini coefficient
+            df_tables.loc[j, "name"] = (
+                f"Gini coefficient {welfare['title'][wel]}{name_suffix}"
+            )
+            df_tables.loc[j, "slug"] = f"p0p100_gini_{welfare['slug'][wel]}"
+            df_tables.loc[j, "description"] = describe(
+                "The Gini coefficient measures inequality on a scale from 0 to 1. Higher values indicate higher inequality.",
+                welfare["description"][wel],
+                additional_description,
+            )
+            df_tables.loc[j, "unit"] = np.nan
+            df_tables.loc[j, "shortUnit"] = np.nan
+            df_tables.loc[j, "type"] = "Numeric"
+            df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_gini"][wel]
+            df_tables.loc[j, "colorScaleNumericMinValue"] = 1
+            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
+            df_tables.loc[j, "colorScaleScheme"] = "Oranges"
+            j += 1
+
+            # Share of the top 10%
+            df_tables.loc[j, "name"] = (
+                f"{welfare['welfare_type'][wel].capitalize()} share of the richest 10% {welfare['title'][wel]}{name_suffix}"
+            )
+            df_tables.loc[j, "slug"] = f"p90p100_share_{welfare['slug'][wel]}"
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the richest 10% of the population.",
+                welfare["description"][wel],
+                additional_description,
+            )
+            df_tables.loc[j, "unit"] = "%"
+            df_tables.loc[j, "shortUnit"] = "%"
+            df_tables.loc[j, "type"] = "Numeric"
+            df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_top10"][wel]
+            df_tables.loc[j, "colorScaleNumericMinValue"] = 100
+            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
+            df_tables.loc[j, "colorScaleScheme"] = "OrRd"
+            j += 1
+
+            # Share of the top 1%
+            df_tables.loc[j, "name"] = (
+                f"{welfare['welfare_type'][wel].capitalize()} share of the richest 1% {welfare['title'][wel]}{name_suffix}"
+            )
+            df_tables.loc[j, "slug"] = f"p99p100_share_{welfare['slug'][wel]}"
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the richest 1% of the population.",
+                welfare["description"][wel],
+                additional_description,
+            )
+            df_tables.loc[j, "unit"] = "%"
+            df_tables.loc[j, "shortUnit"] = "%"
+            df_tables.loc[j, "type"] = "Numeric"
+            df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_top1"][wel]
+            df_tables.loc[j, "colorScaleNumericMinValue"] = 0
+            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
+            df_tables.loc[j, "colorScaleScheme"] = "OrRd"
+            j += 1
+
+            # Share of the top 0.1%
+            df_tables.loc[j, "name"] = (
+                f"{welfare['welfare_type'][wel].capitalize()} share of the richest 0.1% {welfare['title'][wel]}{name_suffix}"
+            )
+            df_tables.loc[j, "slug"] = f"p99_9p100_share_{welfare['slug'][wel]}"
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the richest 0.1% of the population.",
+                welfare["description"][wel],
+                additional_description,
+            )
+            df_tables.loc[j, "unit"] = "%"
+            df_tables.loc[j, "shortUnit"] = "%"
+            df_tables.loc[j, "type"] = "Numeric"
+            df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_top01"][wel]
+            df_tables.loc[j, "colorScaleNumericMinValue"] = 0
+            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
+            df_tables.loc[j, "colorScaleScheme"] = "OrRd"
+            j += 1
+
+            # Share of the bottom 50%
+            df_tables.loc[j, "name"] = (
+                f"{welfare['welfare_type'][wel].capitalize()} share of the poorest 50% {welfare['title'][wel]}{name_suffix}"
+            )
+            df_tables.loc[j, "slug"] = f"p0p50_share_{welfare['slug'][wel]}"
+            df_tables.loc[j, "description"] = describe(
+                f"The share of {welfare['welfare_type'][wel]} received by the poorest 50% of the population.",
+                welfare["description"][wel],
+                additional_description,
+            )
+            df_tables.loc[j, "unit"] = "%"
+            df_tables.loc[j, "shortUnit"] = "%"
+            df_tables.loc[j, "type"] = "Numeric"
+            df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_bottom50"][wel]
+            df_tables.loc[j, "colorScaleNumericMinValue"] = 100
+            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
+            df_tables.loc[j, "colorScaleScheme"] = "Blues"
+            j += 1
+
+            # Palma ratio
+            df_tables.loc[j, "name"] = (
+                f"Palma ratio {welfare['title'][wel]}{name_suffix}"
+            )
+            df_tables.loc[j, "slug"] = f"palma_ratio_{welfare['slug'][wel]}"
+            df_tables.loc[j, "description"] = describe(
+                "The Palma ratio is a measure of inequality that divides the share received by the richest 10% by the share of the poorest 40%. Higher values indicate higher inequality.",
+                welfare["description"][wel],
+                additional_description,
+            )
+            df_tables.loc[j, "unit"] = np.nan
+            df_tables.loc[j, "shortUnit"] = np.nan
+            df_tables.loc[j, "type"] = "Numeric"
+            df_tables.loc[j, "colorScaleNumericBins"] = welfare["scale_palma_ratio"][wel]
+            df_tables.loc[j, "colorScaleNumericMinValue"] = 0
+            df_tables.loc[j, "colorScaleEqualSizeBins"] = "true"
+            df_tables.loc[j, "colorScaleScheme"] = "YlOrBr"
+            j += 1
+
+        df_tables["tableSlug"] = tables["name"][tab]
+
+    df_tables["sourceName"] = sourceName
+    df_tables["dataPublishedBy"] = dataPublishedBy
+    df_tables["sourceLink"] = sourceLink
+    df_tables["tolerance"] = tolerance
+
+    return df_tables
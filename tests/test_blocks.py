@@ -0,0 +1,94 @@
+"""Tests of scripts/explorer_tools/blocks.py: blocks written in chunks are the same bytes as blocks written at once, and
+writing a large block in chunks stays within a memory bound.
+
+    python -m pytest tests/test_blocks.py
+"""
+
+import hashlib
+import io
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.explorer_tools.blocks import write_block
+
+# Rows of the synthetic graphers table, several times the views of the largest explorer
+LARGE_ROWS = 200_000
+# Chunks written at a time, and the memory they may take while the block is written
+CHUNK_ROWS = 2_000
+MEMORY_BOUND_MB = 4
+
+
+class HashWriter:
+    # File that only keeps the hash of what is written to it, so that the output takes no memory
+    def __init__(self):
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.hash.update(data)
+        self.size += len(data)
+
+
+def graphers(rows):
+    # Graphers table with the kinds of columns explorers have: text, controls, missing values, numbers and categories
+    i = np.arange(rows)
+    return pd.DataFrame(
+        {
+            "title": [f"Share of population below poverty line {n}" for n in i],
+            "ySlugs": [f"headcount_ratio_{n % 97}" for n in i],
+            "Indicator Dropdown": pd.Categorical(np.where(i % 3, "Share in poverty", "Number in poverty")),
+            "Poverty line Dropdown": [f"${n % 40}.15 per day" for n in i],
+            "note": [np.nan if n % 5 == 0 else "It relates to income measured after taxes and benefits." for n in i],
+            "yAxisMin": pd.array(np.where(i % 7, 0, 1), dtype="Int64"),
+            "hasMapTab": "true",
+            "survey_type": np.where(i < rows // 2, "income_consumption_2017", "income_2017"),
+        }
+    )
+
+
+def written(df, **kwargs):
+    f = io.StringIO()
+    write_block(f, df, **kwargs)
+    return f.getvalue()
+
+
+@pytest.mark.parametrize("rows", [0, 1, 6, 7, 8, 50])
+@pytest.mark.parametrize("chunk_rows", [1, 7, 1000])
+def test_chunks_are_the_same_bytes(rows, chunk_rows):
+    df = graphers(rows)
+    for header in (True, False):
+        expected = written(df, drop=["survey_type"], chunk_rows=0, header=header)
+        assert written(df, drop=["survey_type"], chunk_rows=chunk_rows, header=header) == expected
+
+
+def test_parts_are_one_block():
+    # A block written in parts, the parts after the first one without header, is the block of all the rows
+    df = graphers(50)
+    f = io.StringIO()
+    write_block(f, df.iloc[:20], drop=["survey_type"], chunk_rows=7)
+    write_block(f, df.iloc[20:], drop=["survey_type"], chunk_rows=7, header=False)
+    assert f.getvalue() == written(df, drop=["survey_type"], chunk_rows=0)
+
+
+def test_large_block_in_chunks_is_the_same_bytes_within_the_memory_bound():
+    df = graphers(LARGE_ROWS)
+
+    at_once = HashWriter()
+    write_block(at_once, df, drop=["survey_type"], chunk_rows=0)
+
+    tracemalloc.start()
+    try:
+        in_chunks = HashWriter()
+        write_block(in_chunks, df, drop=["survey_type"], chunk_rows=CHUNK_ROWS)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert in_chunks.hash.digest() == at_once.hash.digest()
+    # The bound only holds if the block is much larger than it, as written at once
+    assert at_once.size > 4 * MEMORY_BOUND_MB * 2**20
+    assert peak < MEMORY_BOUND_MB * 2**20, f"Writing in chunks took {peak / 2**20:.1f} MB"
@@ -0,0 +1,72 @@
+"""Tests of the poverty explorer generator on the fixture sheets in tests/fixtures/sheets: writing its blocks in chunks
+gives the same explorer as writing them at once, with a single default view, and the generator stays within a memory
+limit (see EXPLORER_MEMORY_LIMIT in scripts/explorer_tools/tracing.py).
+
+    python -m pytest tests/test_generators.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent
+FIXTURE_SHEETS = Path(__file__).parent / "fixtures" / "sheets"
+GENERATOR = "scripts.poverty-inequality-explorers.wbpip.pip_poverty_explorer"
+OUTPUT = "explorers/poverty-explorer.explorer.tsv"
+# Peak memory (RSS) of the whole run, most of which is Python with pandas (about 75 MB)
+MEMORY_LIMIT_MB = 150
+
+
+@pytest.fixture
+def tree(tmp_path):
+    # Copy of the generator's packages, so that the explorer is written to tmp_path/explorers and not over the real one
+    for package in ["explorer_tools", "poverty-inequality-explorers"]:
+        shutil.copytree(
+            ROOT_DIR / "scripts" / package,
+            tmp_path / "scripts" / package,
+            ignore=shutil.ignore_patterns("__pycache__", ".cache"),
+        )
+    (tmp_path / "explorers").mkdir()
+    return tmp_path
+
+
+def run(tree, **env):
+    # Runs the generator on the fixture sheets, without the EXPLORER_ settings of the environment
+    env = {
+        **{key: value for key, value in os.environ.items() if not key.startswith("EXPLORER_")},
+        "EXPLORER_SHEET_CACHE": str(FIXTURE_SHEETS),
+        **env,
+    }
+    return subprocess.run([sys.executable, "-m", GENERATOR], cwd=tree, env=env, capture_output=True, encoding="utf-8")
+
+
+def generate(tree, **env):
+    # Runs the generator on the fixture sheets and returns its explorer
+    result = run(tree, **env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return (tree / OUTPUT).read_text(encoding="utf-8")
+
+
+def test_chunked_explorer_is_the_same_within_the_memory_limit(tree):
+    at_once = generate(tree, EXPLORER_CHUNK_ROWS="0")
+    in_chunks = generate(tree, EXPLORER_CHUNK_ROWS="7", EXPLORER_MEMORY_LIMIT=str(MEMORY_LIMIT_MB))
+    assert in_chunks == at_once
+
+    # The views of every survey type are one graphers block, followed by their spell views, with one default view
+    graphers = at_once.split("\ngraphers\n")[1].split("\ntable\t")[0].splitlines()
+    columns = graphers[0].split("\t")
+    views = [dict(zip(columns, line.split("\t"))) for line in graphers[1:]]
+    assert len({len(line.split("\t")) for line in graphers}) == 1
+    assert [view["defaultView"] for view in views].count("true") == 1
+    spells = [view["Show breaks between less comparable surveys Checkbox"] == "true" for view in views]
+    assert spells == sorted(spells) and any(spells) and not all(spells)
+
+
+def test_generator_fails_above_the_memory_limit(tree):
+    result = run(tree, EXPLORER_MEMORY_LIMIT="1")
+    assert result.returncode != 0
+    assert "above EXPLORER_MEMORY_LIMIT" in result.stderr